@@ -22,6 +22,33 @@ class Settings:
     mongo_games_collection: str
     mongo_players_collection: str
     mongo_follows_collection: str
+    mongo_sync_jobs_collection: str
+    mongo_cards_collection: str
+    mongo_playgroup_stats_collection: str
+    mongo_playgroup_ratings_collection: str
+    mongo_matchups_collection: str
+    mongo_timelines_collection: str
+    card_catalog_cache_size: int
+    mongo_bulk_write_batch_size: int
+    deck_stream_batch_size: int
+    game_stream_page_size: int
+    rating_k_factor: int
+    moxfield_transport: str
+    deck_cache_max_age_seconds: int
+    deck_cache_stale_while_revalidate_seconds: int
+    deck_cache_stale_if_error_seconds: int
+    sync_worker_enabled: bool
+    sync_worker_concurrency: int
+    sync_job_poll_interval_seconds: int
+    sync_job_lease_seconds: int
+    sync_job_max_attempts: int
+    follow_counter_reconcile_enabled: bool
+    follow_counter_reconcile_interval_seconds: int
+    public_profile_stage_timeout_ms: int
+    profile_cache_size: int
+    profile_cache_ttl_seconds: int
+    feed_timeline_cap: int
+    feed_fanout_max_followers: int
     cors_allow_origins: tuple[str, ...]
 
     @classmethod
@@ -45,6 +72,45 @@ class Settings:
             mongo_games_collection=os.getenv("MONGO_GAMES_COLLECTION", "games"),
             mongo_players_collection=os.getenv("MONGO_PLAYERS_COLLECTION", "players"),
             mongo_follows_collection=os.getenv("MONGO_FOLLOWS_COLLECTION", "follows"),
+            mongo_sync_jobs_collection=os.getenv("MONGO_SYNC_JOBS_COLLECTION", "sync_jobs"),
+            mongo_cards_collection=os.getenv("MONGO_CARDS_COLLECTION", "cards"),
+            mongo_playgroup_stats_collection=os.getenv(
+                "MONGO_PLAYGROUP_STATS_COLLECTION", "playgroup_stats"
+            ),
+            mongo_playgroup_ratings_collection=os.getenv(
+                "MONGO_PLAYGROUP_RATINGS_COLLECTION", "playgroup_ratings"
+            ),
+            mongo_matchups_collection=os.getenv("MONGO_MATCHUPS_COLLECTION", "matchups"),
+            mongo_timelines_collection=os.getenv("MONGO_TIMELINES_COLLECTION", "timelines"),
+            card_catalog_cache_size=_load_positive_int("CARD_CATALOG_CACHE_SIZE", 5000),
+            mongo_bulk_write_batch_size=_load_positive_int("MONGO_BULK_WRITE_BATCH_SIZE", 500),
+            deck_stream_batch_size=_load_positive_int("DECK_STREAM_BATCH_SIZE", 25),
+            game_stream_page_size=_load_positive_int("GAME_STREAM_PAGE_SIZE", 100),
+            rating_k_factor=_load_positive_int("RATING_K_FACTOR", 32),
+            moxfield_transport=os.getenv("MOXFIELD_TRANSPORT", "auto").strip().lower() or "auto",
+            deck_cache_max_age_seconds=_load_positive_int("DECK_CACHE_MAX_AGE_SECONDS", 900),
+            deck_cache_stale_while_revalidate_seconds=_load_positive_int(
+                "DECK_CACHE_STALE_WHILE_REVALIDATE_SECONDS", 86400
+            ),
+            deck_cache_stale_if_error_seconds=_load_positive_int(
+                "DECK_CACHE_STALE_IF_ERROR_SECONDS", 604800
+            ),
+            sync_worker_enabled=_load_bool("SYNC_WORKER_ENABLED", True),
+            sync_worker_concurrency=_load_positive_int("SYNC_WORKER_CONCURRENCY", 2),
+            sync_job_poll_interval_seconds=_load_positive_int("SYNC_JOB_POLL_INTERVAL_SECONDS", 2),
+            sync_job_lease_seconds=_load_positive_int("SYNC_JOB_LEASE_SECONDS", 300),
+            sync_job_max_attempts=_load_positive_int("SYNC_JOB_MAX_ATTEMPTS", 5),
+            follow_counter_reconcile_enabled=_load_bool("FOLLOW_COUNTER_RECONCILE_ENABLED", True),
+            follow_counter_reconcile_interval_seconds=_load_positive_int(
+                "FOLLOW_COUNTER_RECONCILE_INTERVAL_SECONDS", 3600
+            ),
+            public_profile_stage_timeout_ms=_load_positive_int(
+                "PUBLIC_PROFILE_STAGE_TIMEOUT_MS", 1500
+            ),
+            profile_cache_size=_load_positive_int("PROFILE_CACHE_SIZE", 1000),
+            profile_cache_ttl_seconds=_load_positive_int("PROFILE_CACHE_TTL_SECONDS", 30),
+            feed_timeline_cap=_load_positive_int("FEED_TIMELINE_CAP", 200),
+            feed_fanout_max_followers=_load_positive_int("FEED_FANOUT_MAX_FOLLOWERS", 1000),
             cors_allow_origins=_load_cors_origins(),
         )
 
@@ -55,6 +121,26 @@ def get_settings() -> Settings:
     return Settings.from_env()
 
 
+def _load_positive_int(name: str, default: int) -> int:
+    """Return a strictly positive integer from the environment, or the default."""
+    raw = os.getenv(name)
+    if not raw or not raw.strip():
+        return default
+    try:
+        value = int(raw.strip())
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _load_bool(name: str, default: bool) -> bool:
+    """Return a boolean flag from the environment (1/true/yes/on), or the default."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
 def _load_cors_origins() -> tuple[str, ...]:
     """Return tuple of allowed CORS origins based on environment variables."""
     raw = os.getenv("API_CORS_ALLOW_ORIGINS")
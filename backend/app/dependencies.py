@@ -8,13 +8,22 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from .config import get_settings
 from .moxfield import MoxfieldClient
+from .moxfield.transport import build_transport
 from .repositories import MoxfieldCacheRepository
+from .services.sync import SingleFlight
 
 
 @lru_cache(maxsize=1)
 def get_moxfield_client() -> MoxfieldClient:
     """Return a singleton Moxfield client instance."""
-    return MoxfieldClient()
+    settings = get_settings()
+    return MoxfieldClient(transport=build_transport(settings.moxfield_transport))
+
+
+@lru_cache(maxsize=1)
+def get_sync_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight registry used to coalesce syncs."""
+    return SingleFlight()
 
 
 @lru_cache(maxsize=1)
@@ -50,3 +59,11 @@ def close_mongo_client() -> None:
     """Close the cached MongoDB client."""
     client = get_mongo_client()
     client.close()
+
+
+async def close_moxfield_client() -> None:
+    """Close the cached Moxfield client if it was created."""
+    if get_moxfield_client.cache_info().currsize == 0:
+        return
+    await get_moxfield_client().aclose()
+    get_moxfield_client.cache_clear()
@@ -3,12 +3,22 @@
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .dependencies import close_mongo_client, get_mongo_database
+from .dependencies import (
+    close_mongo_client,
+    close_moxfield_client,
+    get_mongo_database,
+    get_moxfield_client,
+    get_sync_single_flight,
+)
 from .logging_utils import get_logger
+from .services.profile_search import backfill_profile_search_fields
+from .services.social import run_follow_counter_reconciler
+from .services.sync_jobs import SyncJobWorker
 from .version import get_application_version
 from .repositories import (
     ensure_deck_personalization_indexes,
@@ -16,6 +26,7 @@ from .repositories import (
     ensure_moxfield_cache_indexes,
     ensure_play_data_indexes,
     ensure_player_indexes,
+    ensure_sync_job_indexes,
     ensure_user_profile_indexes,
 )
 from .routers import (
@@ -26,6 +37,7 @@ from .routers import (
     playgroups_router,
     profiles_router,
     social_router,
+    stats_router,
     users_router,
 )
 
@@ -38,6 +50,7 @@ def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(_: FastAPI) -> AsyncIterator[None]:
         """Manage startup/shutdown work without relying on deprecated hooks."""
+        settings = get_settings()
         database = get_mongo_database()
         try:
             await ensure_moxfield_cache_indexes(database)
@@ -64,8 +77,38 @@ def create_app() -> FastAPI:
         except Exception:  # pragma: no cover - defensive logging
             logger.exception("Failed to ensure user profile indexes during startup.")
         try:
-            yield
+            await backfill_profile_search_fields(database)
+        except Exception:  # pragma: no cover - defensive logging
+            logger.exception("Failed to backfill profile search prefixes during startup.")
+        try:
+            await ensure_sync_job_indexes(database)
+        except Exception:  # pragma: no cover - defensive logging
+            logger.exception("Failed to ensure sync job indexes during startup.")
+        try:
+            async with anyio.create_task_group() as task_group:
+                if settings.sync_worker_enabled:
+                    worker = SyncJobWorker(
+                        database,
+                        client_factory=get_moxfield_client,
+                        single_flight=get_sync_single_flight(),
+                        concurrency=settings.sync_worker_concurrency,
+                        poll_interval=settings.sync_job_poll_interval_seconds,
+                        lease_seconds=settings.sync_job_lease_seconds,
+                    )
+                    task_group.start_soon(worker.run)
+                if settings.follow_counter_reconcile_enabled:
+                    task_group.start_soon(
+                        run_follow_counter_reconciler,
+                        database,
+                        settings.follow_counter_reconcile_interval_seconds,
+                    )
+                yield
+                task_group.cancel_scope.cancel()
         finally:
+            try:
+                await close_moxfield_client()
+            except Exception:  # pragma: no cover - defensive logging
+                logger.exception("Failed to close the Moxfield client during shutdown.")
             close_mongo_client()
 
     app = FastAPI(
@@ -92,6 +135,7 @@ def create_app() -> FastAPI:
     app.include_router(meta_router)
     app.include_router(playgroups_router)
     app.include_router(games_router)
+    app.include_router(stats_router)
     app.include_router(profiles_router)
     app.include_router(players_router)
     app.include_router(social_router)
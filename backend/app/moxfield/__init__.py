@@ -2,5 +2,19 @@
 
 from .client import MoxfieldClient
 from .errors import MoxfieldError, MoxfieldNotFoundError
+from .scheduler import (
+    RequestPriority,
+    RequestScheduler,
+    get_request_scheduler,
+    request_priority,
+)
 
-__all__ = ["MoxfieldClient", "MoxfieldError", "MoxfieldNotFoundError"]
+__all__ = [
+    "MoxfieldClient",
+    "MoxfieldError",
+    "MoxfieldNotFoundError",
+    "RequestPriority",
+    "RequestScheduler",
+    "get_request_scheduler",
+    "request_priority",
+]
@@ -3,14 +3,20 @@
 from __future__ import annotations
 
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
 
 import anyio
 import cloudscraper
-from requests import Response
 
 from ..logging_utils import get_logger
 from .errors import MoxfieldError, MoxfieldNotFoundError
+from .scheduler import RequestScheduler, classify_endpoint, get_request_scheduler
+from .transport import (
+    CloudscraperTransport,
+    MoxfieldTransport,
+    TransportResponse,
+    build_transport,
+)
 
 DEFAULT_BASE_URL = "https://api2.moxfield.com"
 
@@ -18,14 +24,22 @@ logger = get_logger("moxfield.client")
 
 
 class MoxfieldClient:
-    """Minimal client wrapper around the Moxfield API."""
+    """Minimal client wrapper around the Moxfield API.
+
+    HTTP calls go through a pluggable :class:`MoxfieldTransport`. The default is a
+    native asyncio ``httpx`` transport that falls back to cloudscraper when
+    Cloudflare challenges it; passing ``scraper`` pins the legacy cloudscraper path.
+    Every attempt first waits on the process-wide :class:`RequestScheduler`.
+    """
 
     def __init__(
         self,
         *,
         base_url: str = DEFAULT_BASE_URL,
         timeout: float = 15.0,
+        transport: Optional[MoxfieldTransport] = None,
         scraper: Optional[cloudscraper.CloudScraper] = None,
+        scheduler: Optional[RequestScheduler] = None,
         max_attempts: int = 3,
         retry_backoff_base: float = 0.75,
         detail_concurrency_limit: int = 4,
@@ -35,20 +49,19 @@ class MoxfieldClient:
         self.max_attempts = max(1, max_attempts)
         self.retry_backoff_base = max(0.0, retry_backoff_base)
         self.detail_concurrency_limit = max(1, detail_concurrency_limit)
-        self._scraper = scraper or cloudscraper.create_scraper(
-            browser={"browser": "chrome", "platform": "windows", "mobile": False}
-        )
-        # Moxfield is more stable if a referer/user-agent is provided.
-        self._scraper.headers.update(
-            {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/118.0.0.0 Safari/537.36"
-                ),
-                "Referer": "https://www.moxfield.com/",
-            }
-        )
+        if transport is None:
+            transport = CloudscraperTransport(scraper) if scraper is not None else build_transport()
+        self._transport = transport
+        self._scheduler = scheduler or get_request_scheduler()
+
+    @property
+    def transport(self) -> MoxfieldTransport:
+        """Return the HTTP transport used for Moxfield requests."""
+        return self._transport
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the underlying transport."""
+        await self._transport.aclose()
 
     # --------------------------------------------------------------------- #
     # Public API methods                                                    #
@@ -109,8 +122,17 @@ class MoxfieldClient:
         *,
         page_size: int = 100,
         include_pinned: bool = True,
+        should_fetch_detail: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
     ) -> Dict[str, Any]:
-        """Gather the summary user data alongside full deck details."""
+        """Gather the summary user data alongside full deck details.
+
+        ``should_fetch_detail`` receives each deck summary and lets callers skip the
+        detail request for decks they already hold (delta sync). Skipped decks are
+        reported in ``skipped_public_ids``; ``public_ids`` preserves summary order.
+        ``on_progress`` is awaited with ``(fetched, total)`` detail counts once the
+        summaries are known and after every detail request.
+        """
         started_at = time.perf_counter()
         user_summary = await self.get_user_summary(username)
         deck_summaries = await self.get_user_deck_summaries(
@@ -119,20 +141,32 @@ class MoxfieldClient:
             include_pinned=include_pinned,
         )
         semaphore = anyio.Semaphore(self.detail_concurrency_limit)
+        public_ids: list[str] = []
+        skipped_public_ids: list[str] = []
         indexed_public_ids: list[tuple[int, str]] = []
         for index, deck in enumerate(deck_summaries):
             public_id = deck.get("publicId")
-            if public_id:
-                indexed_public_ids.append((index, public_id))
+            if not public_id:
+                continue
+            public_ids.append(public_id)
+            if should_fetch_detail is not None and not should_fetch_detail(deck):
+                skipped_public_ids.append(public_id)
+                continue
+            indexed_public_ids.append((index, public_id))
 
         results: dict[int, Dict[str, Any]] = {}
         lock = anyio.Lock()
+        total = len(indexed_public_ids)
+        if on_progress is not None:
+            await on_progress(0, total)
 
         async def _fetch_detail(position: int, public_id: str) -> None:
             async with semaphore:
                 detail = await self.get_deck_details(public_id)
             async with lock:
                 results[position] = detail
+                if on_progress is not None:
+                    await on_progress(len(results), total)
 
         async with anyio.create_task_group() as task_group:
             for position, public_id in indexed_public_ids:
@@ -145,6 +179,7 @@ class MoxfieldClient:
             extra={
                 "moxfield_user": user_summary.get("userName"),
                 "moxfield_deck_count": len(decks),
+                "moxfield_skipped_deck_count": len(skipped_public_ids),
                 "moxfield_detail_concurrency": self.detail_concurrency_limit,
                 "moxfield_collect_duration_ms": duration_ms,
             },
@@ -152,8 +187,53 @@ class MoxfieldClient:
         return {
             "user": user_summary,
             "decks": decks,
+            "public_ids": public_ids,
+            "skipped_public_ids": skipped_public_ids,
         }
 
+    async def iter_deck_details(
+        self,
+        public_ids: Sequence[str],
+        *,
+        chunk_size: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield deck details in ``public_ids`` order, fetching one chunk at a time.
+
+        Each chunk (``detail_concurrency_limit`` decks by default) is fetched
+        concurrently and yielded before the next one starts, so at most one chunk
+        of raw payloads is held in memory while callers stream the results. Decks
+        deleted since the summaries were listed (HTTP 404) are skipped; any other
+        upstream failure is raised once the current chunk settles.
+        """
+        effective_chunk = max(1, chunk_size or self.detail_concurrency_limit)
+        semaphore = anyio.Semaphore(self.detail_concurrency_limit)
+        for start in range(0, len(public_ids), effective_chunk):
+            chunk = public_ids[start : start + effective_chunk]
+            results: list[Optional[Dict[str, Any]]] = [None] * len(chunk)
+            errors: list[MoxfieldError] = []
+
+            async def _fetch_detail(position: int, public_id: str) -> None:
+                async with semaphore:
+                    try:
+                        results[position] = await self.get_deck_details(public_id)
+                    except MoxfieldNotFoundError:
+                        logger.info(
+                            "Skipping Moxfield deck that disappeared while streaming.",
+                            extra={"moxfield_deck": public_id},
+                        )
+                    except MoxfieldError as exc:
+                        errors.append(exc)
+
+            async with anyio.create_task_group() as task_group:
+                for position, public_id in enumerate(chunk):
+                    task_group.start_soon(_fetch_detail, position, public_id)
+
+            if errors:
+                raise errors[0]
+            for detail in results:
+                if detail is not None:
+                    yield detail
+
     # --------------------------------------------------------------------- #
     # Internal helpers                                                      #
     # --------------------------------------------------------------------- #
@@ -179,24 +259,26 @@ class MoxfieldClient:
         path: str,
         *,
         params: Optional[Dict[str, Any]] = None,
-    ) -> Response:
+    ) -> TransportResponse:
         url = path if path.startswith("http") else f"{self.base_url}{path}"
+        endpoint = classify_endpoint(path)
         attempts = 0
         last_exception: Exception | None = None
-        last_response: Response | None = None
+        last_response: TransportResponse | None = None
 
         while attempts < self.max_attempts:
             attempts += 1
+            wait_ms = await self._scheduler.acquire(endpoint)
             attempt_started = time.perf_counter()
             try:
-                response = await anyio.to_thread.run_sync(
-                    self._make_request_sync,
+                response = await self._transport.request(
                     method,
                     url,
-                    params,
-                    cancellable=True,
+                    params=params,
+                    timeout=self.timeout,
                 )
             except Exception as exc:  # pragma: no cover - network failure
+                self._scheduler.record_outcome(endpoint, None)
                 last_exception = exc
                 logger.warning(
                     "Moxfield request attempt failed due to exception.",
@@ -212,6 +294,7 @@ class MoxfieldClient:
                 )
             else:
                 duration_ms = round((time.perf_counter() - attempt_started) * 1000.0, 2)
+                self._scheduler.record_outcome(endpoint, response.status_code)
                 if response.status_code == 404:
                     logger.info(
                         "Moxfield resource returned 404.",
@@ -235,6 +318,8 @@ class MoxfieldClient:
                             "moxfield_status": response.status_code,
                             "moxfield_attempt": attempts,
                             "moxfield_duration_ms": duration_ms,
+                            "moxfield_transport": self._transport.name,
+                            "moxfield_queue_wait_ms": round(wait_ms, 2),
                         },
                     )
                     return response
@@ -273,16 +358,3 @@ class MoxfieldClient:
             )
 
         raise MoxfieldError(f"Moxfield request to '{url}' failed.")
-
-    def _make_request_sync(
-        self,
-        method: str,
-        url: str,
-        params: Optional[Dict[str, Any]],
-    ) -> Response:
-        return self._scraper.request(
-            method,
-            url,
-            params=params,
-            timeout=self.timeout,
-        )
@@ -0,0 +1,252 @@
+"""Process-wide token-bucket scheduler shared by every Moxfield request."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+import anyio
+
+from ..logging_utils import get_logger
+
+logger = get_logger("moxfield.scheduler")
+
+
+class RequestPriority(IntEnum):
+    """Scheduling lanes; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_current_priority: ContextVar[RequestPriority] = ContextVar(
+    "moxfield_request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Run the enclosed Moxfield calls (and tasks spawned from it) in ``priority``."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> RequestPriority:
+    """Return the priority lane of the current context."""
+    return _current_priority.get()
+
+
+@dataclass(frozen=True)
+class EndpointBudget:
+    """Sustained request rate (per second) and burst size for one endpoint family."""
+
+    rate: float
+    burst: int
+
+
+DEFAULT_BUDGETS: Dict[str, EndpointBudget] = {
+    "user_search": EndpointBudget(rate=2.0, burst=4),
+    "deck_search": EndpointBudget(rate=4.0, burst=6),
+    "deck_detail": EndpointBudget(rate=8.0, burst=8),
+    "default": EndpointBudget(rate=4.0, burst=4),
+}
+
+
+def classify_endpoint(path: str) -> str:
+    """Map a Moxfield URL or path to the budget it consumes."""
+    if "/users/search" in path:
+        return "user_search"
+    if "/decks/search" in path:
+        return "deck_search"
+    if "/decks/all/" in path:
+        return "deck_detail"
+    return "default"
+
+
+class _Waiter:
+    __slots__ = ("event", "cancelled")
+
+    def __init__(self) -> None:
+        self.event = anyio.Event()
+        self.cancelled = False
+
+
+class _TokenBucket:
+    """Token bucket with a priority queue of waiters and AIMD rate adaptation."""
+
+    def __init__(
+        self,
+        name: str,
+        budget: EndpointBudget,
+        *,
+        min_rate_factor: float,
+        recovery_step: float,
+    ) -> None:
+        self.name = name
+        self.budget = budget
+        self.min_rate_factor = min_rate_factor
+        self.recovery_step = recovery_step
+        self.rate_factor = 1.0
+        self.tokens = float(budget.burst)
+        self.updated_at = time.monotonic()
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self.queue_depth: Dict[RequestPriority, int] = {lane: 0 for lane in RequestPriority}
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    @property
+    def effective_rate(self) -> float:
+        return self.budget.rate * self.rate_factor
+
+    async def acquire(self, priority: RequestPriority) -> float:
+        started_at = time.monotonic()
+        self._refill()
+        if not self._heap and self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self._record_wait(0.0)
+            return 0.0
+
+        waiter = _Waiter()
+        heapq.heappush(self._heap, (int(priority), next(self._sequence), waiter))
+        self.queue_depth[priority] += 1
+        granted = False
+        try:
+            while True:
+                if self._heap[0][2] is waiter:
+                    self._refill()
+                    if self.tokens >= 1.0:
+                        heapq.heappop(self._heap)
+                        self.tokens -= 1.0
+                        granted = True
+                        break
+                    await anyio.sleep((1.0 - self.tokens) / self.effective_rate)
+                else:
+                    waiter.event = anyio.Event()
+                    await waiter.event.wait()
+        finally:
+            self.queue_depth[priority] -= 1
+            if not granted:
+                waiter.cancelled = True
+                self._discard_cancelled()
+            self._wake_head()
+
+        wait_ms = (time.monotonic() - started_at) * 1000.0
+        self._record_wait(wait_ms)
+        return wait_ms
+
+    def record_outcome(self, status_code: Optional[int]) -> None:
+        throttled = status_code is None or status_code == 429 or status_code >= 500
+        if throttled:
+            self.throttled += 1
+            previous = self.rate_factor
+            self.rate_factor = max(self.min_rate_factor, self.rate_factor / 2.0)
+            if self.rate_factor < previous:
+                logger.warning(
+                    "Slowing down Moxfield '%s' requests to %.2f/s after status %s.",
+                    self.name,
+                    self.effective_rate,
+                    status_code,
+                )
+        elif self.rate_factor < 1.0:
+            self.rate_factor = min(1.0, self.rate_factor + self.recovery_step)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "endpoint": self.name,
+            "rate": self.budget.rate,
+            "burst": self.budget.burst,
+            "effective_rate": round(self.effective_rate, 3),
+            "available_tokens": round(self.tokens, 3),
+            "queue_depth": {lane.name.lower(): depth for lane, depth in self.queue_depth.items()},
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "average_wait_ms": round(self.total_wait_ms / self.acquired, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(float(self.budget.burst), self.tokens + elapsed * self.effective_rate)
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self.acquired += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def _discard_cancelled(self) -> None:
+        self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+        heapq.heapify(self._heap)
+
+    def _wake_head(self) -> None:
+        if self._heap:
+            self._heap[0][2].event.set()
+
+
+class RequestScheduler:
+    """Rate-limit Moxfield traffic across every client and sync in the process.
+
+    Each endpoint family owns a token bucket. Waiters are served by priority lane
+    (interactive before background) then arrival order, and a bucket halves its
+    rate on 429/5xx responses before recovering additively on successes.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, EndpointBudget]] = None,
+        *,
+        min_rate_factor: float = 0.125,
+        recovery_step: float = 0.05,
+    ) -> None:
+        merged = dict(DEFAULT_BUDGETS)
+        merged.update(budgets or {})
+        self._buckets = {
+            name: _TokenBucket(
+                name,
+                budget,
+                min_rate_factor=min_rate_factor,
+                recovery_step=recovery_step,
+            )
+            for name, budget in merged.items()
+        }
+
+    async def acquire(self, endpoint: str, priority: Optional[RequestPriority] = None) -> float:
+        """Wait for a token on ``endpoint`` and return the time spent queued (ms)."""
+        lane = current_priority() if priority is None else priority
+        return await self._bucket(endpoint).acquire(lane)
+
+    def record_outcome(self, endpoint: str, status_code: Optional[int]) -> None:
+        """Feed a response status (``None`` for transport errors) into rate adaptation."""
+        self._bucket(endpoint).record_outcome(status_code)
+
+    def snapshot(self) -> list[Dict[str, Any]]:
+        """Return per-endpoint queue depth, wait-time and throttling metrics."""
+        return [bucket.snapshot() for bucket in self._buckets.values()]
+
+    def _bucket(self, endpoint: str) -> _TokenBucket:
+        return self._buckets.get(endpoint) or self._buckets["default"]
+
+
+_scheduler: Optional[RequestScheduler] = None
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Return the process-wide scheduler shared by Moxfield clients."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler()
+    return _scheduler
@@ -0,0 +1,222 @@
+"""Pluggable HTTP transports used by the Moxfield client."""
+
+from __future__ import annotations
+
+import importlib.util
+import time
+from functools import partial
+from typing import Any, Dict, Optional, Protocol
+
+import anyio
+import cloudscraper
+import httpx
+
+from ..logging_utils import get_logger
+
+logger = get_logger("moxfield.transport")
+
+# Moxfield is more stable if a referer/user-agent is provided.
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/118.0.0.0 Safari/537.36"
+    ),
+    "Referer": "https://www.moxfield.com/",
+}
+
+TRANSPORT_KINDS = ("auto", "httpx", "cloudscraper")
+
+
+class TransportResponse(Protocol):
+    """Subset of the response API shared by ``requests`` and ``httpx``."""
+
+    status_code: int
+    text: str
+    headers: Any
+
+    def json(self) -> Any:  # pragma: no cover - protocol definition
+        ...
+
+
+class MoxfieldTransport(Protocol):
+    """Interface every transport used by :class:`MoxfieldClient` implements."""
+
+    name: str
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float,
+    ) -> TransportResponse:  # pragma: no cover - protocol definition
+        ...
+
+    async def aclose(self) -> None:  # pragma: no cover - protocol definition
+        ...
+
+
+class CloudscraperTransport:
+    """Blocking cloudscraper session offloaded to AnyIO worker threads."""
+
+    name = "cloudscraper"
+
+    def __init__(self, scraper: Optional[cloudscraper.CloudScraper] = None) -> None:
+        self._scraper = scraper or cloudscraper.create_scraper(
+            browser={"browser": "chrome", "platform": "windows", "mobile": False}
+        )
+        self._scraper.headers.update(DEFAULT_HEADERS)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float,
+    ) -> TransportResponse:
+        call = partial(self._scraper.request, method, url, params=params, timeout=timeout)
+        return await anyio.to_thread.run_sync(call, abandon_on_cancel=True)
+
+    async def aclose(self) -> None:
+        self._scraper.close()
+
+
+class HttpxTransport:
+    """Native asyncio transport backed by a pooled ``httpx.AsyncClient``.
+
+    HTTP/2 is negotiated when the optional ``h2`` package is installed; otherwise
+    the client falls back to HTTP/1.1 with keep-alive connection reuse.
+    """
+
+    name = "httpx"
+
+    def __init__(
+        self,
+        *,
+        client: Optional[httpx.AsyncClient] = None,
+        http2: Optional[bool] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+    ) -> None:
+        if client is None:
+            use_http2 = _http2_available() if http2 is None else http2
+            client = httpx.AsyncClient(
+                http2=use_http2,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+            )
+        self._client = client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float,
+    ) -> TransportResponse:
+        return await self._client.request(
+            method, url, params=_encode_params(params), timeout=timeout
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class FallbackTransport:
+    """Use a primary transport and switch to a fallback when it gets challenged.
+
+    Cloudflare answers plain HTTP clients with 403/503 challenge pages. When the
+    primary transport hits one (or fails outright) the request is replayed through
+    the fallback, which then stays active for ``sticky_seconds``.
+    """
+
+    def __init__(
+        self,
+        primary: MoxfieldTransport,
+        fallback: MoxfieldTransport,
+        *,
+        sticky_seconds: float = 300.0,
+    ) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.sticky_seconds = max(0.0, sticky_seconds)
+        self.name = f"{primary.name}+{fallback.name}"
+        self._fallback_until = 0.0
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float,
+    ) -> TransportResponse:
+        if time.monotonic() < self._fallback_until:
+            return await self.fallback.request(method, url, params=params, timeout=timeout)
+
+        try:
+            response = await self.primary.request(method, url, params=params, timeout=timeout)
+        except Exception as exc:  # pragma: no cover - network failure
+            logger.warning(
+                "Primary Moxfield transport '%s' failed (%s); retrying with '%s'.",
+                self.primary.name,
+                exc,
+                self.fallback.name,
+            )
+        else:
+            if not _is_challenge(response):
+                return response
+            logger.warning(
+                "Primary Moxfield transport '%s' was challenged (HTTP %d); switching to '%s'.",
+                self.primary.name,
+                response.status_code,
+                self.fallback.name,
+            )
+
+        self._fallback_until = time.monotonic() + self.sticky_seconds
+        return await self.fallback.request(method, url, params=params, timeout=timeout)
+
+    async def aclose(self) -> None:
+        await self.primary.aclose()
+        await self.fallback.aclose()
+
+
+def build_transport(kind: str = "auto") -> MoxfieldTransport:
+    """Instantiate the transport configured through ``MOXFIELD_TRANSPORT``."""
+    normalized = (kind or "auto").strip().lower()
+    if normalized == "cloudscraper":
+        return CloudscraperTransport()
+    if normalized == "httpx":
+        return HttpxTransport()
+    if normalized != "auto":
+        logger.warning("Unknown Moxfield transport '%s'; using 'auto'.", kind)
+    return FallbackTransport(HttpxTransport(), CloudscraperTransport())
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _encode_params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Serialise booleans the way ``requests`` does so both transports send identical URLs."""
+    if not params:
+        return params
+    return {key: str(value) if isinstance(value, bool) else value for key, value in params.items()}
+
+
+def _is_challenge(response: TransportResponse) -> bool:
+    """Return ``True`` for Cloudflare challenges, not for ordinary 403s such as private decks."""
+    if response.status_code not in (403, 503):
+        return False
+    server = str(response.headers.get("server", "")).lower()
+    return "cloudflare" in server or response.headers.get("cf-mitigated") is not None
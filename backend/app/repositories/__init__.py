@@ -1,26 +1,50 @@
 """Repository helpers for MongoDB persistence."""
 
+from .card_catalog import CardCatalogRepository
 from .deck_personalization import (
     DeckPersonalizationRepository,
     ensure_deck_personalization_indexes,
 )
-from .moxfield_cache import MoxfieldCacheRepository, ensure_moxfield_cache_indexes
+from .moxfield_cache import (
+    BulkWriteBatch,
+    BulkWriteReport,
+    DeckProjection,
+    MoxfieldCacheRepository,
+    ensure_moxfield_cache_indexes,
+)
+from .game_analytics import GameAnalyticsRepository
+from .matchups import MatchupRepository
 from .play_data import GameRepository, PlaygroupRepository, ensure_play_data_indexes
+from .playgroup_ratings import PlaygroupRatingsRepository
+from .playgroup_stats import PlaygroupStatsRepository
 from .players import PlayerRepository, ensure_player_indexes
 from .follows import FollowRepository, ensure_follow_indexes
 from .profiles import ensure_user_profile_indexes
+from .sync_jobs import SyncJobRepository, ensure_sync_job_indexes
+from .timelines import TimelineRepository
 
 __all__ = [
+    "BulkWriteBatch",
+    "BulkWriteReport",
+    "CardCatalogRepository",
+    "DeckProjection",
     "MoxfieldCacheRepository",
     "PlaygroupRepository",
     "GameRepository",
+    "GameAnalyticsRepository",
+    "MatchupRepository",
+    "PlaygroupStatsRepository",
+    "PlaygroupRatingsRepository",
     "PlayerRepository",
     "FollowRepository",
     "DeckPersonalizationRepository",
+    "SyncJobRepository",
+    "TimelineRepository",
     "ensure_moxfield_cache_indexes",
     "ensure_play_data_indexes",
     "ensure_deck_personalization_indexes",
     "ensure_player_indexes",
     "ensure_follow_indexes",
     "ensure_user_profile_indexes",
+    "ensure_sync_job_indexes",
 ]
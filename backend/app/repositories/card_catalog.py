@@ -0,0 +1,111 @@
+"""Shared card catalog referenced by cached deck documents."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Iterable, Mapping
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.card_catalog")
+
+
+class _CardLRU:
+    """Bounded ``card_id -> card`` mapping evicting the least recently used entries."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(0, maxsize)
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, card_id: str) -> dict[str, Any] | None:
+        card = self._entries.get(card_id)
+        if card is not None:
+            self._entries.move_to_end(card_id)
+        return card
+
+    def put(self, card_id: str, card: dict[str, Any]) -> None:
+        if self.maxsize == 0:
+            return
+        self._entries[card_id] = card
+        self._entries.move_to_end(card_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class CardCatalogRepository:
+    """Store each Moxfield card once, keyed by its card id.
+
+    Deck documents only keep a ``card_ref`` per board entry. Reads resolve the
+    references with a single ``$in`` query, and an in-process LRU keeps popular
+    staples out of Mongo entirely. The same LRU lets writes skip cards whose
+    stored copy is already identical.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase, *, cache_size: int | None = None) -> None:
+        settings = get_settings()
+        self._settings = settings
+        self.collection: AsyncIOMotorCollection = database[settings.mongo_cards_collection]
+        self._cache = _CardLRU(
+            settings.card_catalog_cache_size if cache_size is None else cache_size
+        )
+
+    async def upsert_cards(self, cards: Mapping[str, dict[str, Any]]) -> int:
+        """Write cards missing from (or different in) the catalog; returns the number written."""
+        pending = [
+            (card_id, card) for card_id, card in cards.items() if self._cache.get(card_id) != card
+        ]
+        operations = [
+            ReplaceOne({"card_id": card_id}, {"card_id": card_id, "data": card}, upsert=True)
+            for card_id, card in pending
+        ]
+
+        batch_size = max(1, self._settings.mongo_bulk_write_batch_size)
+        for start in range(0, len(operations), batch_size):
+            await self.collection.bulk_write(operations[start : start + batch_size], ordered=False)
+            # Only remember cards once their write succeeded, so a failed batch is retried.
+            for card_id, card in pending[start : start + batch_size]:
+                self._cache.put(card_id, card)
+        if operations:
+            logger.info(
+                "Mongo write: upserted %d of %d catalog card(s).", len(operations), len(cards)
+            )
+        return len(operations)
+
+    async def fetch_cards(self, card_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Return cards keyed by id, reading only LRU misses from Mongo in one query."""
+        found: dict[str, dict[str, Any]] = {}
+        missing: list[str] = []
+        for card_id in dict.fromkeys(card_ids):
+            card = self._cache.get(card_id)
+            if card is None:
+                missing.append(card_id)
+            else:
+                found[card_id] = card
+
+        cache_hits = len(found)
+        if missing:
+            cursor = self.collection.find({"card_id": {"$in": missing}}, {"_id": 0})
+            for document in await cursor.to_list(length=None):
+                card = document.get("data") or {}
+                found[document["card_id"]] = card
+                self._cache.put(document["card_id"], card)
+
+        logger.debug(
+            "Card catalog read: %d card(s) from the LRU, %d requested from Mongo.",
+            cache_hits,
+            len(missing),
+        )
+        return found
+
+    async def ensure_indexes(self) -> None:
+        logger.info("Ensuring Mongo indexes for card catalog collection.")
+        await self.collection.create_indexes(
+            [IndexModel([("card_id", ASCENDING)], name="card_id_unique", unique=True)]
+        )
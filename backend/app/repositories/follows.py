@@ -6,10 +6,12 @@ from datetime import datetime, timezone
 from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
-from pymongo import ASCENDING, IndexModel
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from ..config import get_settings
 from ..logging_utils import get_logger
+from .timelines import TimelineRepository
 
 logger = get_logger("repositories.follows")
 
@@ -24,12 +26,23 @@ def _strip_storage_fields(document: dict[str, Any]) -> dict[str, Any]:
     return cleaned
 
 
+FOLLOWERS_COUNT = "followers_count"
+FOLLOWING_COUNT = "following_count"
+
+
 class FollowRepository:
-    """Encapsulates Mongo persistence for follow relationships."""
+    """Encapsulates Mongo persistence for follow relationships.
+
+    Follower and following counts are denormalized onto the user profile documents
+    and ``$inc``-updated only when a follow is actually created or removed. Counters
+    are only incremented once initialised (see :meth:`initialize_counters`), and
+    :meth:`reconcile_counters` rewrites any that drifted.
+    """
 
     def __init__(self, database: AsyncIOMotorDatabase) -> None:
         settings = get_settings()
         self._collection: AsyncIOMotorCollection = database[settings.mongo_follows_collection]
+        self._profiles: AsyncIOMotorCollection = database[settings.mongo_users_collection]
 
     @staticmethod
     def _key_filter(follower_sub: str, target_sub: str) -> dict[str, Any]:
@@ -55,7 +68,23 @@ class FollowRepository:
         )
         return cleaned
 
-    async def add_follow(self, follower_sub: str, target_sub: str) -> dict[str, Any]:
+    async def _bump_counters(self, follower_sub: str, target_sub: str, delta: int) -> None:
+        await self._profiles.bulk_write(
+            [
+                UpdateOne(
+                    {"google_sub": target_sub, FOLLOWERS_COUNT: {"$exists": True}},
+                    {"$inc": {FOLLOWERS_COUNT: delta}},
+                ),
+                UpdateOne(
+                    {"google_sub": follower_sub, FOLLOWING_COUNT: {"$exists": True}},
+                    {"$inc": {FOLLOWING_COUNT: delta}},
+                ),
+            ],
+            ordered=False,
+        )
+
+    async def add_follow(self, follower_sub: str, target_sub: str) -> bool:
+        """Create the follow if missing; returns ``True`` only when it was created."""
         now = _now()
         document = {
             "follower_sub": follower_sub,
@@ -63,16 +92,27 @@ class FollowRepository:
             "created_at": now,
             "updated_at": now,
         }
-        await self._collection.update_one(
-            self._key_filter(follower_sub, target_sub),
-            {"$set": document},
-            upsert=True,
-        )
-        return document
+        try:
+            result = await self._collection.update_one(
+                self._key_filter(follower_sub, target_sub),
+                {"$setOnInsert": document},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # A concurrent request created the same follow.
+            return False
+        if getattr(result, "upserted_id", None) is None:
+            return False
+        await self._bump_counters(follower_sub, target_sub, 1)
+        return True
 
     async def remove_follow(self, follower_sub: str, target_sub: str) -> bool:
+        """Delete the follow if present; returns ``True`` only when one was removed."""
         result = await self._collection.delete_one(self._key_filter(follower_sub, target_sub))
-        return getattr(result, "deleted_count", 0) > 0
+        if getattr(result, "deleted_count", 0) == 0:
+            return False
+        await self._bump_counters(follower_sub, target_sub, -1)
+        return True
 
     async def is_following(self, follower_sub: str, target_sub: str) -> bool:
         document = await self._collection.find_one(self._key_filter(follower_sub, target_sub))
@@ -84,6 +124,46 @@ class FollowRepository:
     async def count_following(self, follower_sub: str) -> int:
         return await self._collection.count_documents({"follower_sub": follower_sub})
 
+    async def initialize_counters(self, google_sub: str) -> tuple[int, int]:
+        """Count a profile's follows and store them if its counters are still missing."""
+        followers = await self.count_followers(google_sub)
+        following = await self.count_following(google_sub)
+        await self._profiles.update_one(
+            {"google_sub": google_sub, FOLLOWERS_COUNT: {"$exists": False}},
+            {"$set": {FOLLOWERS_COUNT: followers, FOLLOWING_COUNT: following}},
+        )
+        return followers, following
+
+    async def _grouped_counts(self, field: str) -> dict[str, int]:
+        cursor = self._collection.aggregate([{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}])
+        return {row["_id"]: int(row["count"]) async for row in cursor if row.get("_id")}
+
+    async def reconcile_counters(self, *, batch_size: int) -> int:
+        """Rewrite every profile counter that disagrees with the follows; returns profiles fixed.
+
+        A follow landing between the count and the write can leave a counter off by
+        one until the next pass.
+        """
+        followers = await self._grouped_counts("target_sub")
+        following = await self._grouped_counts("follower_sub")
+        operations = []
+        cursor = self._profiles.find(
+            {}, {"_id": 0, "google_sub": 1, FOLLOWERS_COUNT: 1, FOLLOWING_COUNT: 1}
+        )
+        async for profile in cursor:
+            google_sub = profile.get("google_sub")
+            if not google_sub:
+                continue
+            expected = {
+                FOLLOWERS_COUNT: followers.get(google_sub, 0),
+                FOLLOWING_COUNT: following.get(google_sub, 0),
+            }
+            if any(profile.get(field) != value for field, value in expected.items()):
+                operations.append(UpdateOne({"google_sub": google_sub}, {"$set": expected}))
+        for start in range(0, len(operations), max(1, batch_size)):
+            await self._profiles.bulk_write(operations[start : start + batch_size], ordered=False)
+        return len(operations)
+
     async def ensure_indexes(self) -> None:
         logger.info("Ensuring Mongo indexes for follows collection.")
         await self._collection.create_indexes(
@@ -100,6 +180,7 @@ class FollowRepository:
 
 
 async def ensure_follow_indexes(database: AsyncIOMotorDatabase) -> None:
-    """Ensure indexes exist for the follows collection."""
+    """Ensure indexes exist for the follows and feed timelines collections."""
     repository = FollowRepository(database)
     await repository.ensure_indexes()
+    await TimelineRepository(database).ensure_indexes()
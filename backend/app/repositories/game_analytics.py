@@ -0,0 +1,113 @@
+"""Aggregation pipelines computing player and deck statistics over recorded games."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.game_analytics")
+
+# Ranks are validated to be >= 1, so 0 stands for "no ranking recorded for this seat".
+_RANK = {"$ifNull": ["$ranking.rank", 0]}
+_IS_WIN = {"$cond": [{"$eq": [_RANK, 1]}, 1, 0]}
+_IS_PODIUM = {"$cond": [{"$and": [{"$gte": [_RANK, 1]}, {"$lte": [_RANK, 3]}]}, 1, 0]}
+
+
+class GameAnalyticsRepository:
+    """Run ``$unwind``/``$group`` pipelines over the games collection.
+
+    Games are matched on ``owner_sub`` (and optionally ``playgroup_id``) and sorted
+    by ``created_at``; the ``games_owner_created_desc`` and
+    ``games_playgroup_created_desc`` indexes serve both stages, walked backwards.
+    Each seat is joined to its ranking in-pipeline, so only one row per player or
+    deck leaves the server. Descriptive fields come from the most recent game,
+    mirroring the incremental playgroup stats.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        settings = get_settings()
+        self._collection: AsyncIOMotorCollection = database[settings.mongo_games_collection]
+
+    @staticmethod
+    def _match(owner_sub: str, playgroup_id: str | None) -> dict[str, Any]:
+        filter_: dict[str, Any] = {"owner_sub": owner_sub}
+        if playgroup_id:
+            filter_["playgroup_id"] = playgroup_id
+        return filter_
+
+    def _seat_stages(self, owner_sub: str, playgroup_id: str | None) -> list[dict[str, Any]]:
+        """Stages emitting one ``{seat, ranking}`` row per player per game, oldest first."""
+        return [
+            {"$match": self._match(owner_sub, playgroup_id)},
+            {"$sort": {"created_at": 1}},
+            {"$project": {"_id": 0, "players": 1, "rankings": 1}},
+            {"$unwind": "$players"},
+            {
+                "$project": {
+                    "seat": "$players",
+                    "ranking": {
+                        "$first": {
+                            "$filter": {
+                                "input": "$rankings",
+                                "as": "ranking",
+                                "cond": {"$eq": ["$$ranking.player_id", "$players.id"]},
+                            }
+                        }
+                    },
+                }
+            },
+        ]
+
+    async def count_games(self, owner_sub: str, *, playgroup_id: str | None = None) -> int:
+        return await self._collection.count_documents(self._match(owner_sub, playgroup_id))
+
+    async def player_performance(
+        self, owner_sub: str, *, playgroup_id: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Return per-player rows sorted by wins, games played, then name."""
+        pipeline = [
+            *self._seat_stages(owner_sub, playgroup_id),
+            {
+                "$group": {
+                    "_id": {"$ifNull": ["$seat.google_sub", "$seat.id"]},
+                    "player_id": {"$last": "$seat.id"},
+                    "google_sub": {"$last": "$seat.google_sub"},
+                    "name": {"$last": "$seat.name"},
+                    "games_played": {"$sum": 1},
+                    "wins": {"$sum": _IS_WIN},
+                    "podiums": {"$sum": _IS_PODIUM},
+                }
+            },
+            {"$sort": {"wins": -1, "games_played": -1, "name": 1}},
+        ]
+        rows = await self._collection.aggregate(pipeline).to_list(length=None)
+        logger.debug("Aggregated %d player row(s) for owner '%s'.", len(rows), owner_sub)
+        return rows
+
+    async def deck_performance(
+        self, owner_sub: str, *, playgroup_id: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Return per-deck rows (keyed by deck id, else name) sorted by wins, games, then name."""
+        pipeline = [
+            *self._seat_stages(owner_sub, playgroup_id),
+            {"$addFields": {"deck_key": {"$ifNull": ["$seat.deck_id", "$seat.deck_name"]}}},
+            {"$match": {"deck_key": {"$nin": [None, ""]}}},
+            {
+                "$group": {
+                    "_id": "$deck_key",
+                    "deck_id": {"$last": "$seat.deck_id"},
+                    "deck_name": {"$last": "$seat.deck_name"},
+                    "deck_format": {"$last": "$seat.deck_format"},
+                    "games_played": {"$sum": 1},
+                    "wins": {"$sum": _IS_WIN},
+                }
+            },
+            {"$sort": {"wins": -1, "games_played": -1, "deck_name": 1}},
+        ]
+        rows = await self._collection.aggregate(pipeline).to_list(length=None)
+        logger.debug("Aggregated %d deck row(s) for owner '%s'.", len(rows), owner_sub)
+        return rows
@@ -0,0 +1,27 @@
+"""Shared helpers for maintaining MongoDB indexes."""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure
+
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.indexes")
+
+# Server error code raised when dropping an index that does not exist.
+INDEX_NOT_FOUND = 27
+
+
+async def drop_indexes_if_present(collection: AsyncIOMotorCollection, names: Iterable[str]) -> None:
+    """Drop indexes superseded by newer definitions; names already gone are ignored."""
+    for name in names:
+        try:
+            await collection.drop_index(name)
+        except OperationFailure as error:
+            if error.code != INDEX_NOT_FOUND:
+                raise
+            continue
+        logger.info("Dropped superseded Mongo index '%s'.", name)
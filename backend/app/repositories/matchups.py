@@ -0,0 +1,233 @@
+"""MongoDB repository for sparse head-to-head matchup counters."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.matchups")
+
+STATE_KIND = "state"
+PAIR_KINDS = ("player", "deck")
+# How long a rebuild may hold the owner's matchups before another one can take over.
+REBUILD_LEASE = timedelta(minutes=5)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MatchupRepository:
+    """Encapsulates Mongo persistence for pairwise player and deck matchups.
+
+    Only pairs that actually met are stored, one document per
+    ``(owner_sub, kind, subject, opponent)`` and both directions of every pair, so
+    the strongest opponents of a subject are one range scan of the
+    ``matchups_top_opponents`` index. A per-owner ``state`` document guards them:
+
+    * ``generation`` is bumped unconditionally when a game starts and finishes, and
+      a rebuild only marks the counters fresh if it did not move while it ran;
+    * ``epoch`` only moves when a rebuild lands, so a game whose pairs were applied
+      across a rebuild (and may be counted twice) flags the counters stale, while
+      games recorded concurrently with each other never conflict.
+
+    Rebuilds hold a lease on the state document and rewrite rows in place, so
+    concurrent rebuilds never collide and readers never see an emptied table.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        settings = get_settings()
+        self._collection: AsyncIOMotorCollection = database[settings.mongo_matchups_collection]
+
+    @staticmethod
+    def state_filter(owner_sub: str) -> dict[str, Any]:
+        return {"owner_sub": owner_sub, "kind": STATE_KIND}
+
+    async def find_state(self, owner_sub: str) -> dict[str, Any] | None:
+        return await self._collection.find_one(self.state_filter(owner_sub), {"_id": 0})
+
+    async def begin_game(self, owner_sub: str) -> int | None:
+        """Bump the owner's generation before a game is stored; returns the epoch when fresh.
+
+        Pass the returned epoch to :meth:`finish_game` once the pairs are applied.
+        """
+        state = await self._collection.find_one_and_update(
+            self.state_filter(owner_sub),
+            {
+                "$inc": {"generation": 1},
+                "$set": {"updated_at": _now()},
+                "$setOnInsert": {"stale": True},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 0, "epoch": 1, "stale": 1},
+        )
+        if not state or state.get("stale") is not False:
+            return None
+        return int(state.get("epoch", 0))
+
+    async def finish_game(self, owner_sub: str, epoch: int) -> bool:
+        """Confirm a game's pairs; ``False`` when a rebuild landed or a flag was raised meanwhile.
+
+        The generation bump always lands, so a rebuild still running cannot mark the
+        counters fresh over pairs it may have missed.
+        """
+        state = await self._collection.find_one_and_update(
+            self.state_filter(owner_sub),
+            {"$inc": {"generation": 1}, "$set": {"updated_at": _now()}},
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 0, "epoch": 1, "stale": 1},
+        )
+        return bool(state) and state.get("stale") is False and int(state.get("epoch", 0)) == epoch
+
+    async def apply_pairs(self, owner_sub: str, pairs: Iterable[dict[str, Any]]) -> None:
+        """Fold one game's ordered pairs in a single unordered ``bulk_write``."""
+        now = _now()
+        operations = [
+            UpdateOne(
+                {
+                    "owner_sub": owner_sub,
+                    "kind": pair["kind"],
+                    "subject": pair["subject"],
+                    "opponent": pair["opponent"],
+                },
+                {
+                    "$inc": {
+                        "games": 1,
+                        "wins": pair["wins"],
+                        "losses": pair["losses"],
+                        "ties": pair["ties"],
+                    },
+                    "$set": {
+                        "subject_name": pair["subject_name"],
+                        "opponent_name": pair["opponent_name"],
+                        "updated_at": now,
+                    },
+                },
+                upsert=True,
+            )
+            for pair in pairs
+        ]
+        if operations:
+            await self._collection.bulk_write(operations, ordered=False)
+
+    async def mark_stale(self, owner_sub: str) -> None:
+        """Flag an owner's matchups for a rebuild on next read."""
+        await self._collection.update_one(
+            self.state_filter(owner_sub),
+            {"$set": {"stale": True, "updated_at": _now()}, "$inc": {"generation": 1}},
+            upsert=True,
+        )
+
+    async def claim_rebuild(self, owner_sub: str, generation: int, token: str) -> bool:
+        """Take the owner's rebuild lease; ``False`` while another rebuild holds it."""
+        now = _now()
+        result = await self._collection.update_one(
+            {
+                **self.state_filter(owner_sub),
+                "generation": generation,
+                "$or": [{"rebuild_until": {"$exists": False}}, {"rebuild_until": {"$lt": now}}],
+            },
+            {"$set": {"rebuild_token": token, "rebuild_until": now + REBUILD_LEASE}},
+        )
+        return getattr(result, "matched_count", 0) > 0
+
+    async def replace_all(
+        self,
+        owner_sub: str,
+        generation: int,
+        rows: list[dict[str, Any]],
+        *,
+        token: str,
+        batch_size: int,
+    ) -> bool:
+        """Swap in rebuilt counters under the lease ``token``; fresh only if ``generation`` held.
+
+        Rows are upserted in place and tagged with ``token``, then rows this rebuild did
+        not write (pairs that no longer exist) are deleted. The lease is released either way.
+        """
+        now = _now()
+        operations = [
+            UpdateOne(
+                {
+                    "owner_sub": owner_sub,
+                    "kind": row["kind"],
+                    "subject": row["subject"],
+                    "opponent": row["opponent"],
+                },
+                {"$set": {**row, "rebuild_token": token, "updated_at": now}},
+                upsert=True,
+            )
+            for row in rows
+        ]
+        for start in range(0, len(operations), max(1, batch_size)):
+            await self._collection.bulk_write(operations[start : start + batch_size], ordered=False)
+        await self._collection.delete_many(
+            {
+                "owner_sub": owner_sub,
+                "kind": {"$in": list(PAIR_KINDS)},
+                "rebuild_token": {"$ne": token},
+            }
+        )
+        release = {"$unset": {"rebuild_token": "", "rebuild_until": ""}}
+        result = await self._collection.update_one(
+            {**self.state_filter(owner_sub), "generation": generation, "rebuild_token": token},
+            {
+                **release,
+                "$set": {"stale": False, "rebuilt_at": now, "updated_at": now},
+                "$inc": {"generation": 1, "epoch": 1},
+            },
+        )
+        if getattr(result, "matched_count", 0) > 0:
+            return True
+        await self._collection.update_one(
+            {**self.state_filter(owner_sub), "rebuild_token": token}, release
+        )
+        return False
+
+    async def top_opponents(
+        self, owner_sub: str, kind: str, subject: str, limit: int
+    ) -> list[dict[str, Any]]:
+        """Return a subject's most frequent opponents, most games first."""
+        cursor = (
+            self._collection.find(
+                {"owner_sub": owner_sub, "kind": kind, "subject": subject},
+                {"_id": 0, "owner_sub": 0, "updated_at": 0, "rebuild_token": 0},
+            )
+            .sort([("games", DESCENDING), ("opponent", ASCENDING)])
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    async def ensure_indexes(self) -> None:
+        logger.info("Ensuring Mongo indexes for matchups collection.")
+        await self._collection.create_indexes(
+            [
+                IndexModel(
+                    [
+                        ("owner_sub", ASCENDING),
+                        ("kind", ASCENDING),
+                        ("subject", ASCENDING),
+                        ("opponent", ASCENDING),
+                    ],
+                    unique=True,
+                    name="matchups_unique",
+                ),
+                IndexModel(
+                    [
+                        ("owner_sub", ASCENDING),
+                        ("kind", ASCENDING),
+                        ("subject", ASCENDING),
+                        ("games", DESCENDING),
+                        ("opponent", ASCENDING),
+                    ],
+                    name="matchups_top_opponents",
+                ),
+            ]
+        )
@@ -2,18 +2,90 @@
 
 from __future__ import annotations
 
-from typing import Any, Iterable, Literal, Sequence
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterable, Literal, Sequence
 
 from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
-from pymongo import ASCENDING, IndexModel
+from pymongo import ASCENDING, DeleteMany, IndexModel, ReplaceOne
 
 from ..config import get_settings
 from ..logging_utils import get_logger
+from ..schemas import DeckDetail
+from .card_catalog import CardCatalogRepository
 
 logger = get_logger("repositories.moxfield_cache")
 
 DeckCollectionName = Literal["decks", "deck_summaries"]
 
+# Storage metadata never returned to API clients.
+_STORAGE_FIELD_EXCLUSIONS = {"_id": 0, "user_name": 0, "user_key": 0, "synced_at": 0}
+
+
+@dataclass(frozen=True)
+class DeckProjection:
+    """Which parts of cached deck documents are read from Mongo.
+
+    ``include_boards=False`` drops card lists entirely. ``boards`` keeps only the
+    named boards (for example ``commanders`` and ``mainboard``) using a ``$filter``
+    projection, so the other card lists never leave the database.
+    """
+
+    include_boards: bool = True
+    boards: tuple[str, ...] | None = None
+
+    def to_mongo(self) -> dict[str, Any]:
+        """Return the ``find`` projection document for this selection."""
+        if not self.include_boards:
+            return {**_STORAGE_FIELD_EXCLUSIONS, "boards": 0}
+        if self.boards is None:
+            return dict(_STORAGE_FIELD_EXCLUSIONS)
+        # Aggregation expressions make the projection inclusive, so list every field.
+        projection: dict[str, Any] = {
+            field: 1 for field in DeckDetail.model_fields if field != "boards"
+        }
+        projection["_id"] = 0
+        projection["boards"] = {
+            "$filter": {
+                "input": "$boards",
+                "as": "board",
+                "cond": {"$in": ["$$board.name", list(self.boards)]},
+            }
+        }
+        return projection
+
+
+FULL_DECK_PROJECTION = DeckProjection()
+
+
+@dataclass(frozen=True)
+class BulkWriteBatch:
+    """Timing information for a single ``bulk_write`` round-trip."""
+
+    operations: int
+    duration_ms: float
+
+
+@dataclass
+class BulkWriteReport:
+    """Outcome of a batched deck persistence pass."""
+
+    collection: str
+    upserted: int = 0
+    modified: int = 0
+    deleted: int = 0
+    batches: list[BulkWriteBatch] = field(default_factory=list)
+
+    @property
+    def round_trips(self) -> int:
+        """Number of ``bulk_write`` calls issued against Mongo."""
+        return len(self.batches)
+
+    @property
+    def duration_ms(self) -> float:
+        """Total time spent waiting on Mongo across every batch."""
+        return round(sum(batch.duration_ms for batch in self.batches), 2)
+
 
 class MoxfieldCacheRepository:
     """Encapsulates Mongo persistence details for cached Moxfield data."""
@@ -27,6 +99,7 @@ class MoxfieldCacheRepository:
         self.deck_summaries: AsyncIOMotorCollection = database[
             settings.mongo_deck_summaries_collection
         ]
+        self.cards = CardCatalogRepository(database)
 
     @staticmethod
     def canonical_username(username: str) -> str:
@@ -49,7 +122,11 @@ class MoxfieldCacheRepository:
         }
 
     async def replace_user(self, document: dict[str, Any]) -> None:
-        """Replace or upsert a user cache document."""
+        """Upsert a user cache document.
+
+        Fields are ``$set`` rather than replaced so per-kind sync timestamps written
+        by deck and deck-summary syncs do not overwrite each other.
+        """
         username = document.get("user_name")
         if not isinstance(username, str):
             raise ValueError("User document must include a 'user_name' string.")
@@ -59,7 +136,7 @@ class MoxfieldCacheRepository:
         doc["user_name"] = username
         doc["user_key"] = canonical
 
-        await self.users.replace_one(self.user_filter(username), doc, upsert=True)
+        await self.users.update_one(self.user_filter(username), {"$set": doc}, upsert=True)
 
     async def replace_documents(
         self,
@@ -67,45 +144,157 @@ class MoxfieldCacheRepository:
         documents: Iterable[dict[str, Any]],
         *,
         collection: DeckCollectionName,
-    ) -> None:
-        """Replace or upsert deck-oriented documents for a user."""
+        prune_missing: bool = False,
+        batch_size: int | None = None,
+    ) -> BulkWriteReport:
+        """Replace or upsert deck-oriented documents for a user.
+
+        Documents are sent as unordered ``bulk_write`` batches of ``ReplaceOne``
+        operations. When ``prune_missing`` is set, decks stored for the user that
+        are absent from ``documents`` are deleted in the final batch. Full decks
+        store ``card_ref`` identifiers; the referenced cards are written to the card
+        catalog before each deck batch so references never dangle.
+        """
         canonical = self.canonical_username(username)
         target_collection = self._resolve_collection(collection)
+        effective_batch_size = max(1, batch_size or self._settings.mongo_bulk_write_batch_size)
+        report = BulkWriteReport(collection=collection)
+
+        kept_ids: list[str] = []
+        pending: list[Any] = []
+        pending_cards: dict[str, dict[str, Any]] = {}
         for document in documents:
             public_id = document.get("public_id")
             if not isinstance(public_id, str):
                 raise ValueError("Deck documents must include a 'public_id' string.")
             doc = dict(document)
+            if collection == "decks":
+                doc = _extract_card_refs(doc, pending_cards)
             doc["user_name"] = username
             doc["user_key"] = canonical
-            await target_collection.replace_one(
-                self.deck_filter(username, public_id), doc, upsert=True
-            )
+            kept_ids.append(public_id)
+            pending.append(ReplaceOne(self.deck_filter(username, public_id), doc, upsert=True))
+            if len(pending) >= effective_batch_size:
+                await self.cards.upsert_cards(pending_cards)
+                pending_cards = {}
+                await self._flush_bulk_write(target_collection, pending, report)
+                pending = []
+
+        if pending_cards:
+            await self.cards.upsert_cards(pending_cards)
+
+        if prune_missing:
+            prune_filter = {**self.user_filter(username), "public_id": {"$nin": kept_ids}}
+            pending.append(DeleteMany(prune_filter))
+
+        if pending:
+            await self._flush_bulk_write(target_collection, pending, report)
+
+        logger.info(
+            "Mongo bulk write: %d deck document(s) for user '%s' on '%s' in %d round-trip(s) "
+            "(%.2f ms, batches_ms=%s, upserted=%d, modified=%d, deleted=%d)",
+            len(kept_ids),
+            username,
+            collection,
+            report.round_trips,
+            report.duration_ms,
+            [batch.duration_ms for batch in report.batches],
+            report.upserted,
+            report.modified,
+            report.deleted,
+        )
+        return report
 
     async def replace_decks(
         self, username: str, documents: Iterable[dict[str, Any]]
-    ) -> None:
+    ) -> BulkWriteReport:
         """Backward compatibility wrapper for deck upserts."""
-        await self.replace_documents(username, documents, collection="decks")
+        return await self.replace_documents(username, documents, collection="decks")
 
     async def replace_deck_summaries(
         self, username: str, documents: Iterable[dict[str, Any]]
-    ) -> None:
+    ) -> BulkWriteReport:
         """Backward compatibility wrapper for deck summary upserts."""
-        await self.replace_documents(username, documents, collection="deck_summaries")
+        return await self.replace_documents(username, documents, collection="deck_summaries")
 
     async def fetch_user(self, username: str) -> dict[str, Any] | None:
         """Return the cached user document, if present."""
         return await self.users.find_one(self.user_filter(username))
 
-    async def fetch_decks(self, username: str) -> list[dict[str, Any]]:
-        """Return deck documents for a given user."""
-        cursor = self.decks.find(self.user_filter(username))
-        return await cursor.to_list(length=None)
+    async def fetch_decks(
+        self,
+        username: str,
+        *,
+        public_ids: Sequence[str] | None = None,
+        projection: DeckProjection = FULL_DECK_PROJECTION,
+    ) -> list[dict[str, Any]]:
+        """Return deck documents for a given user, optionally restricted to some decks.
+
+        Storage metadata is excluded by the projection; ``projection`` can also
+        drop or narrow the boards at the Mongo level.
+        """
+        filter_ = self.user_filter(username)
+        if public_ids is not None:
+            filter_["public_id"] = {"$in": list(public_ids)}
+        cursor = self.decks.find(filter_, projection.to_mongo())
+        return await self._hydrate_cards(await cursor.to_list(length=None))
+
+    async def iter_decks(
+        self,
+        username: str,
+        *,
+        batch_size: int | None = None,
+        projection: DeckProjection = FULL_DECK_PROJECTION,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield deck documents for a user, reading the cursor ``batch_size`` documents at a time.
+
+        Card references are resolved once per batch.
+        """
+        effective_batch_size = max(1, batch_size or self._settings.deck_stream_batch_size)
+        cursor = self.decks.find(self.user_filter(username), projection.to_mongo())
+        cursor.batch_size(effective_batch_size)
+        batch: list[dict[str, Any]] = []
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) >= effective_batch_size:
+                for hydrated in await self._hydrate_cards(batch):
+                    yield hydrated
+                batch = []
+        for hydrated in await self._hydrate_cards(batch):
+            yield hydrated
+
+    async def prune_documents(
+        self,
+        username: str,
+        kept_ids: Sequence[str],
+        *,
+        collection: DeckCollectionName,
+    ) -> int:
+        """Delete a user's documents whose ``public_id`` is not in ``kept_ids``."""
+        target_collection = self._resolve_collection(collection)
+        result = await target_collection.delete_many(
+            {**self.user_filter(username), "public_id": {"$nin": list(kept_ids)}}
+        )
+        return getattr(result, "deleted_count", 0) or 0
+
+    async def fetch_deck_versions(self, username: str) -> dict[str, Any]:
+        """Return ``public_id -> last_updated_at`` for the decks stored for a user."""
+        cursor = self.decks.find(
+            self.user_filter(username),
+            {"_id": 0, "public_id": 1, "last_updated_at": 1},
+        )
+        documents = await cursor.to_list(length=None)
+        return {
+            document["public_id"]: document.get("last_updated_at")
+            for document in documents
+            if isinstance(document.get("public_id"), str)
+        }
 
     async def fetch_deck_summaries(self, username: str) -> list[dict[str, Any]]:
-        """Return deck summary documents for a given user."""
-        cursor = self.deck_summaries.find(self.user_filter(username))
+        """Return deck summary documents for a given user, without storage metadata."""
+        cursor = self.deck_summaries.find(
+            self.user_filter(username), dict(_STORAGE_FIELD_EXCLUSIONS)
+        )
         return await cursor.to_list(length=None)
 
     async def delete_deck(self, username: str, deck_id: str) -> int:
@@ -152,6 +341,49 @@ class MoxfieldCacheRepository:
                 IndexModel([("user_key", ASCENDING)], name="summary_user_key_lookup"),
             ],
         )
+        await self.cards.ensure_indexes()
+
+    async def _hydrate_cards(self, documents: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Replace ``card_ref`` entries with catalog cards, fetching every reference at once."""
+        card_ids = {
+            entry["card_ref"]
+            for document in documents
+            for entry in _iter_card_entries(document)
+            if isinstance(entry.get("card_ref"), str)
+        }
+        if not card_ids:
+            return documents
+        cards = await self.cards.fetch_cards(card_ids)
+        missing = card_ids.difference(cards)
+        if missing:
+            logger.warning("Card catalog is missing %d referenced card(s).", len(missing))
+        for document in documents:
+            for entry in _iter_card_entries(document):
+                card_ref = entry.pop("card_ref", None)
+                if isinstance(card_ref, str):
+                    entry["card"] = cards.get(card_ref, {"id": card_ref})
+        return documents
+
+    @staticmethod
+    async def _flush_bulk_write(
+        collection: AsyncIOMotorCollection,
+        operations: list[Any],
+        report: BulkWriteReport,
+    ) -> None:
+        """Send one unordered ``bulk_write`` batch and record its timing."""
+        started_at = time.perf_counter()
+        result = await collection.bulk_write(operations, ordered=False)
+        duration_ms = round((time.perf_counter() - started_at) * 1000.0, 2)
+        report.batches.append(BulkWriteBatch(operations=len(operations), duration_ms=duration_ms))
+        report.upserted += getattr(result, "upserted_count", 0) or 0
+        report.modified += getattr(result, "modified_count", 0) or 0
+        report.deleted += getattr(result, "deleted_count", 0) or 0
+        logger.debug(
+            "Mongo bulk write: batch %d applied %d operation(s) in %.2f ms",
+            report.round_trips,
+            len(operations),
+            duration_ms,
+        )
 
     @staticmethod
     async def _create_indexes(
@@ -170,6 +402,46 @@ class MoxfieldCacheRepository:
         raise ValueError(f"Unknown collection name: {name}")
 
 
+def _iter_card_entries(document: dict[str, Any]) -> Iterable[dict[str, Any]]:
+    boards = document.get("boards")
+    if not isinstance(boards, list):
+        return
+    for board in boards:
+        if not isinstance(board, dict):
+            continue
+        for entry in board.get("cards") or []:
+            if isinstance(entry, dict):
+                yield entry
+
+
+def _extract_card_refs(
+    document: dict[str, Any], catalog: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """Return ``document`` with card payloads swapped for ``card_ref`` ids collected in ``catalog``.
+
+    Cards without a Moxfield ``id`` are kept inline, as are legacy documents.
+    """
+    boards = document.get("boards")
+    if not isinstance(boards, list):
+        return document
+    normalized_boards = []
+    for board in boards:
+        if not isinstance(board, dict):
+            normalized_boards.append(board)
+            continue
+        entries = []
+        for entry in board.get("cards") or []:
+            card = entry.get("card") if isinstance(entry, dict) else None
+            card_id = card.get("id") if isinstance(card, dict) else None
+            if isinstance(card_id, str) and card_id:
+                catalog[card_id] = card
+                entry = {key: value for key, value in entry.items() if key != "card"}
+                entry["card_ref"] = card_id
+            entries.append(entry)
+        normalized_boards.append({**board, "cards": entries})
+    return {**document, "boards": normalized_boards}
+
+
 async def ensure_moxfield_cache_indexes(database: AsyncIOMotorDatabase) -> None:
     """Ensure Mongo indexes exist for collections backing the Moxfield cache."""
     repository = MoxfieldCacheRepository(database)
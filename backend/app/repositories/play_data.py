@@ -3,20 +3,30 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Iterable
+from typing import Any, AsyncIterator, Iterable
 from uuid import uuid4
 
 import re
 import unicodedata
 
 from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
-from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo import ASCENDING, DESCENDING, IndexModel, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from ..config import get_settings
 from ..logging_utils import get_logger
+from .indexes import drop_indexes_if_present
+from .matchups import MatchupRepository
+from .playgroup_ratings import PlaygroupRatingsRepository
+from .playgroup_stats import PlaygroupStatsRepository
 
 logger = get_logger("repositories.play_data")
 
+# How a game reaches its owner's followers' activity feeds (see ``services.feed``).
+FEED_DELIVERY = "feed_delivery"
+FEED_PUSH = "push"
+FEED_PULL = "pull"
+
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
@@ -133,37 +143,100 @@ class PlaygroupRepository:
         )
         return document
 
-    async def touch(
+    async def resolve_for_game(
         self,
         owner_sub: str,
-        playgroup_id: str,
+        name: str,
         *,
-        last_used_at: datetime | None = None,
-        game_count: int | None = None,
-        name: str | None = None,
+        playgroup_id: str | None = None,
     ) -> dict[str, Any] | None:
-        """Update playgroup metadata when recording a game."""
-        document = await self.find_by_id(owner_sub, playgroup_id)
-        if not document:
-            return None
-
-        updates: dict[str, Any] = {"updated_at": _now()}
-        if last_used_at:
-            updates["last_used_at"] = last_used_at
-        if game_count is not None:
-            updates["game_count"] = max(game_count, 0)
-        if name:
-            safe_name = self._normalize_name(name)
-            updates["name"] = safe_name
-            updates["slug"] = self._slugify(safe_name)
-
-        document.update(updates)
+        """Find the playgroup a game is about to be recorded in, creating named ones.
+
+        Nothing is counted here: call :meth:`register_game` once the game is stored,
+        so a failed insert never inflates ``game_count``. Without ``playgroup_id`` the
+        playgroup is matched by slug and created (uncounted) when missing; with it,
+        the returned document carries the name :meth:`register_game` will store.
+        Returns ``None`` when ``playgroup_id`` does not exist.
+        """
+        safe_name = self._normalize_name(name)
+        slug = self._slugify(safe_name)
+        if playgroup_id:
+            document = await self.find_by_id(owner_sub, playgroup_id)
+            return {**document, "name": safe_name, "slug": slug} if document else None
+
+        now = _now()
+        filter_ = {"owner_sub": owner_sub, "slug": slug}
+        try:
+            document = await self._collection.find_one_and_update(
+                filter_,
+                {
+                    "$setOnInsert": {
+                        "id": uuid4().hex,
+                        "name": safe_name,
+                        "created_at": now,
+                        "updated_at": now,
+                        "game_count": 0,
+                        "members": [],
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # A concurrent recording created the playgroup first; use it.
+            document = await self._collection.find_one(filter_)
+        return _strip_storage_fields(document) if document else None
+
+    async def register_game(
+        self,
+        owner_sub: str,
+        playgroup: dict[str, Any],
+        *,
+        played_at: datetime,
+    ) -> None:
+        """Count one stored game against a playgroup in a single atomic write.
+
+        ``playgroup`` comes from :meth:`resolve_for_game`, whose name and slug are
+        stored. ``game_count`` is incremented server-side and ``last_used_at`` only
+        moves forward, so concurrent recordings cannot lose updates.
+        """
+        slug = playgroup.get("slug") or self._slugify(playgroup["name"])
         await self._collection.update_one(
-            self.id_filter(owner_sub, playgroup_id),
-            {"$set": document},
-            upsert=True,
+            self.id_filter(owner_sub, playgroup["id"]),
+            {
+                "$set": {"name": playgroup["name"], "slug": slug, "updated_at": _now()},
+                "$inc": {"game_count": 1},
+                "$max": {"last_used_at": played_at},
+            },
+        )
+
+    async def add_games(
+        self,
+        owner_sub: str,
+        usage: dict[str, tuple[int, datetime]],
+    ) -> None:
+        """Count imported games per playgroup in one unordered ``bulk_write``.
+
+        ``usage`` maps playgroup ids to ``(games, latest_played_at)``; counters are
+        incremented and ``last_used_at`` only moves forward, as in :meth:`register_game`.
+        """
+        if not usage:
+            return
+        now = _now()
+        await self._collection.bulk_write(
+            [
+                UpdateOne(
+                    self.id_filter(owner_sub, playgroup_id),
+                    {
+                        "$inc": {"game_count": games},
+                        "$max": {"last_used_at": latest},
+                        "$set": {"updated_at": now},
+                    },
+                )
+                for playgroup_id, (games, latest) in usage.items()
+            ],
+            ordered=False,
         )
-        return document
 
     async def delete(self, owner_sub: str, playgroup_id: str) -> bool:
         result = await self._collection.delete_one(self.id_filter(owner_sub, playgroup_id))
@@ -203,20 +276,83 @@ class GameRepository:
         )
         return document
 
+    async def insert(self, document: dict[str, Any]) -> dict[str, Any]:
+        """Store a new game with a plain insert (no upsert lookup); ``document`` is left unchanged."""
+        if "id" not in document or "owner_sub" not in document:
+            raise ValueError("Game documents must include 'id' and 'owner_sub'.")
+        await self._collection.insert_one(dict(document))
+        return document
+
+    async def bulk_insert(self, documents: list[dict[str, Any]]) -> dict[int, str]:
+        """Insert new games in one unordered ``bulk_write``.
+
+        Returns ``{index: error}`` for the documents Mongo rejected; the others are stored.
+        """
+        if not documents:
+            return {}
+        try:
+            await self._collection.bulk_write(
+                [InsertOne(dict(document)) for document in documents], ordered=False
+            )
+        except BulkWriteError as error:
+            return {
+                entry["index"]: entry.get("errmsg", "")
+                for entry in error.details.get("writeErrors", [])
+            }
+        return {}
+
     async def list_for_owner(
         self,
         owner_sub: str,
         *,
         playgroup_id: str | None = None,
         limit: int | None = None,
+        after: tuple[datetime, str] | None = None,
     ) -> list[dict[str, Any]]:
+        """Return games newest first, ordered by ``(created_at, id)`` descending.
+
+        ``after`` is the ``(created_at, id)`` key of the last game already seen;
+        only games strictly older in that order are returned (keyset pagination).
+        """
         filter_ = self.owner_filter(owner_sub)
         if playgroup_id:
             filter_["playgroup_id"] = playgroup_id
+        return await self._list_newest(filter_, limit=limit, after=after)
+
+    async def list_pulled_for_owners(
+        self,
+        owner_subs: list[str],
+        *,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the newest feed-pulled games across several owners, in ``list_for_owner`` order.
+
+        Served by the partial ``games_feed_pulled`` index, which only holds pulled games.
+        """
+        if not owner_subs:
+            return []
+        return await self._list_newest(
+            {"owner_sub": {"$in": owner_subs}, FEED_DELIVERY: FEED_PULL}, limit=limit, after=after
+        )
+
+    async def _list_newest(
+        self,
+        filter_: dict[str, Any],
+        *,
+        limit: int | None,
+        after: tuple[datetime, str] | None,
+    ) -> list[dict[str, Any]]:
+        if after is not None:
+            created_at, game_id = after
+            filter_["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "id": {"$lt": game_id}},
+            ]
 
         projection = {"_id": 0}
         cursor = self._collection.find(filter_, projection).sort(
-            [("created_at", DESCENDING), ("updated_at", DESCENDING)]
+            [("created_at", DESCENDING), ("id", DESCENDING)]
         )
         if limit is not None and limit > 0:
             cursor = cursor.limit(limit)
@@ -224,15 +360,76 @@ class GameRepository:
         documents = await cursor.to_list(length=None)
         return [_strip_storage_fields(document) for document in documents]
 
+    async def iter_for_playgroup(
+        self,
+        owner_sub: str,
+        playgroup_id: str,
+        *,
+        since: datetime | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield a playgroup's games oldest first with only the fields rating replays need."""
+        filter_: dict[str, Any] = {**self.owner_filter(owner_sub), "playgroup_id": playgroup_id}
+        if since is not None:
+            filter_["created_at"] = {"$gte": since}
+        cursor = self._collection.find(
+            filter_, {"_id": 0, "players": 1, "rankings": 1, "created_at": 1}
+        ).sort([("created_at", ASCENDING), ("id", ASCENDING)])
+        async for document in cursor:
+            yield document
+
+    async def iter_for_owner(self, owner_sub: str) -> AsyncIterator[dict[str, Any]]:
+        """Yield all of an owner's games oldest first with only the seat and ranking fields."""
+        cursor = self._collection.find(
+            self.owner_filter(owner_sub), {"_id": 0, "players": 1, "rankings": 1}
+        ).sort([("created_at", ASCENDING), ("id", ASCENDING)])
+        async for document in cursor:
+            yield document
+
+    def scan_all(self, *, batch_size: int) -> Any:
+        """Cursor over every stored game, limited to the fields stats need, in server batches."""
+        return self._collection.find(
+            {},
+            {
+                "_id": 0,
+                "owner_sub": 1,
+                "playgroup_id": 1,
+                "created_at": 1,
+                "players": 1,
+                "rankings": 1,
+            },
+        ).batch_size(batch_size)
+
     async def ensure_indexes(self) -> None:
         logger.info("Ensuring Mongo indexes for games collection.")
         await self._collection.create_indexes(
             [
                 IndexModel([("owner_sub", ASCENDING), ("id", ASCENDING)], unique=True, name="owner_game_unique"),
-                IndexModel([("owner_sub", ASCENDING), ("created_at", ASCENDING)], name="games_owner_created"),
+                IndexModel(
+                    [("owner_sub", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                    name="games_owner_created_desc",
+                ),
                 IndexModel([("playgroup_id", ASCENDING)], name="games_playgroup_lookup"),
+                IndexModel([("owner_sub", ASCENDING), ("players.id", ASCENDING)], name="games_owner_player"),
+                IndexModel(
+                    [
+                        ("owner_sub", ASCENDING),
+                        ("playgroup_id", ASCENDING),
+                        ("created_at", DESCENDING),
+                        ("id", DESCENDING),
+                    ],
+                    name="games_playgroup_created_desc",
+                ),
+                IndexModel(
+                    [("owner_sub", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                    partialFilterExpression={FEED_DELIVERY: FEED_PULL},
+                    name="games_feed_pulled",
+                ),
             ]
         )
+        # Ascending predecessors of the ``*_desc`` indexes; the keyset pages never use them.
+        await drop_indexes_if_present(
+            self._collection, ["games_owner_created", "games_playgroup_created"]
+        )
 
     async def update_player_identity(
         self,
@@ -243,45 +440,46 @@ class GameRepository:
         player_type: str | None = None,
         name: str | None = None,
     ) -> int:
-        """Update stored games when a player's identity changes."""
-        cursor = self._collection.find(self.owner_filter(owner_sub))
-        documents = await cursor.to_list(length=None)
-        updated = 0
-        now = _now()
-
-        for document in documents:
-            players = document.get("players", [])
-            changed = False
-            for entry in players:
-                if entry.get("id") != player_id:
-                    continue
-                if google_sub is not None:
-                    entry["google_sub"] = google_sub
-                    entry["linked_google_sub"] = google_sub
-                if player_type is not None:
-                    entry["player_type"] = player_type
-                if name is not None:
-                    entry["name"] = name
-                changed = True
-
-            if not changed:
-                continue
-
-            document["players"] = players
-            document["updated_at"] = now
-            await self._collection.update_one(
-                self.id_filter(owner_sub, document["id"]),
-                {"$set": document},
-                upsert=True,
-            )
-            updated += 1
-
-        return updated
+        """Rewrite a player's seat in every stored game with one server-side update.
+
+        The ``$[seat]`` filtered positional operator targets only the matching
+        entries of ``players``; the ``games_owner_player`` multikey index finds the
+        affected games. Returns the number of games migrated.
+        """
+        seat_updates: dict[str, Any] = {}
+        if google_sub is not None:
+            seat_updates["players.$[seat].google_sub"] = google_sub
+            seat_updates["players.$[seat].linked_google_sub"] = google_sub
+        if player_type is not None:
+            seat_updates["players.$[seat].player_type"] = player_type
+        if name is not None:
+            seat_updates["players.$[seat].name"] = name
+        if not seat_updates:
+            return 0
+
+        result = await self._collection.update_many(
+            {**self.owner_filter(owner_sub), "players.id": player_id},
+            {"$set": {**seat_updates, "updated_at": _now()}},
+            array_filters=[{"seat.id": player_id}],
+        )
+        migrated = getattr(result, "modified_count", 0)
+        logger.info(
+            "Migrated identity of player '%s' in %d game(s) for owner '%s'.",
+            player_id,
+            migrated,
+            owner_sub,
+        )
+        return migrated
 
 
 async def ensure_play_data_indexes(database: AsyncIOMotorDatabase) -> None:
-    """Ensure Mongo indexes exist for playgroup and game collections."""
+    """Ensure Mongo indexes exist for playgroup, game, stats, rating and matchup collections."""
     playgroups = PlaygroupRepository(database)
     games = GameRepository(database)
+    stats = PlaygroupStatsRepository(database)
+    ratings = PlaygroupRatingsRepository(database)
     await playgroups.ensure_indexes()
     await games.ensure_indexes()
+    await stats.ensure_indexes()
+    await ratings.ensure_indexes()
+    await MatchupRepository(database).ensure_indexes()
@@ -0,0 +1,195 @@
+"""MongoDB repository for precomputed playgroup rating leaderboards."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable, Mapping
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.playgroup_ratings")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class PlaygroupRatingsRepository:
+    """Encapsulates Mongo persistence for per-playgroup, per-window rating documents.
+
+    One document exists per ``(owner_sub, playgroup_id, window)``. Like the stats
+    documents, writes are guarded by a ``generation`` counter and a ``stale`` flag:
+    a game reserves a generation before it is inserted, an update only lands if
+    nobody else wrote since that reservation, and anything that cannot be applied
+    in order flags the window for a replay on next read.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        settings = get_settings()
+        self._collection: AsyncIOMotorCollection = database[
+            settings.mongo_playgroup_ratings_collection
+        ]
+
+    @staticmethod
+    def id_filter(owner_sub: str, playgroup_id: str, window: str) -> dict[str, Any]:
+        return {"owner_sub": owner_sub, "playgroup_id": playgroup_id, "window": window}
+
+    async def find(self, owner_sub: str, playgroup_id: str, window: str) -> dict[str, Any] | None:
+        return await self._collection.find_one(
+            self.id_filter(owner_sub, playgroup_id, window), {"_id": 0}
+        )
+
+    async def reserve_windows(
+        self,
+        owner_sub: str,
+        playgroup_id: str,
+        windows: list[str],
+        *,
+        players: Iterable[str] = (),
+        decks: Iterable[str] = (),
+    ) -> dict[str, dict[str, Any] | None]:
+        """Bump several windows' generations before a game is stored; returns the fresh ones.
+
+        One ``update_many`` reserves every window and one ``find`` reads them back,
+        projected to the entries of ``players`` and ``decks`` so the read stays the size
+        of a game rather than of the leaderboard. A replay reading a window before the
+        bump cannot land, so the game is never missed; fold it into the returned
+        documents and store them with :meth:`apply_windows`. Missing and stale windows
+        map to ``None``.
+        """
+        filter_ = {"owner_sub": owner_sub, "playgroup_id": playgroup_id, "window": {"$in": windows}}
+        await self._collection.update_many(
+            filter_, {"$inc": {"generation": 1}, "$set": {"updated_at": _now()}}
+        )
+        projection: dict[str, Any] = {
+            "_id": 0,
+            "window": 1,
+            "generation": 1,
+            "stale": 1,
+            "total_games": 1,
+            "oldest_game_at": 1,
+            "last_game_at": 1,
+        }
+        projection.update({f"players.{key}": 1 for key in players})
+        projection.update({f"decks.{key}": 1 for key in decks})
+        reserved: dict[str, dict[str, Any] | None] = {window: None for window in windows}
+        async for document in self._collection.find(filter_, projection):
+            if document.get("stale") is False:
+                reserved[document["window"]] = document
+        return reserved
+
+    async def apply_windows(
+        self,
+        owner_sub: str,
+        playgroup_id: str,
+        updates: Mapping[str, tuple[int, dict[str, Any]] | None],
+    ) -> None:
+        """Store the windows a game reserved in one unordered ``bulk_write``.
+
+        ``updates`` maps a window to ``(generation, fields)`` -- ``fields`` are ``$set``
+        paths, so only the entries a game touched are rewritten -- or to ``None`` to
+        flag it. A window that moved past its generation meanwhile is flagged too.
+        """
+        now = _now()
+        token = uuid4().hex
+        stale_update = {"$set": {"stale": True, "updated_at": now}, "$inc": {"generation": 1}}
+        operations: list[UpdateOne] = []
+        conditional: list[str] = []
+        for window, update in updates.items():
+            if update is None:
+                operations.append(
+                    UpdateOne(
+                        self.id_filter(owner_sub, playgroup_id, window), stale_update, upsert=True
+                    )
+                )
+                continue
+            generation, fields = update
+            conditional.append(window)
+            operations.append(
+                UpdateOne(
+                    {**self.id_filter(owner_sub, playgroup_id, window), "generation": generation},
+                    {
+                        "$set": {**fields, "stale": False, "updated_at": now, "write_token": token},
+                        "$inc": {"generation": 1},
+                    },
+                )
+            )
+        if not operations:
+            return
+
+        result = await self._collection.bulk_write(operations, ordered=False)
+        landed = getattr(result, "matched_count", 0) + getattr(result, "upserted_count", 0)
+        if landed < len(operations) and conditional:
+            # A window raced another writer: flag the ones our write did not stamp.
+            await self._collection.update_many(
+                {
+                    "owner_sub": owner_sub,
+                    "playgroup_id": playgroup_id,
+                    "window": {"$in": conditional},
+                    "write_token": {"$ne": token},
+                },
+                stale_update,
+            )
+
+    async def replace_if_generation(
+        self,
+        owner_sub: str,
+        playgroup_id: str,
+        window: str,
+        generation: int,
+        ratings: dict[str, Any],
+    ) -> bool:
+        """Store ``ratings`` unless the document moved past ``generation`` meanwhile."""
+        result = await self._collection.update_one(
+            {**self.id_filter(owner_sub, playgroup_id, window), "generation": generation},
+            {
+                "$set": {**ratings, "stale": False, "updated_at": _now()},
+                "$inc": {"generation": 1},
+            },
+        )
+        return getattr(result, "matched_count", 0) > 0
+
+    async def mark_stale(
+        self,
+        owner_sub: str,
+        playgroup_id: str | None = None,
+        window: str | None = None,
+    ) -> None:
+        """Flag one window, one playgroup, or all of an owner's leaderboards for a replay."""
+        update = {"$set": {"stale": True, "updated_at": _now()}, "$inc": {"generation": 1}}
+        if playgroup_id is None or window is None:
+            filter_: dict[str, Any] = {"owner_sub": owner_sub}
+            if playgroup_id is not None:
+                filter_["playgroup_id"] = playgroup_id
+            await self._collection.update_many(filter_, update)
+            return
+        await self._collection.update_one(
+            self.id_filter(owner_sub, playgroup_id, window), update, upsert=True
+        )
+
+    async def mark_playgroups_stale(self, owner_sub: str, playgroup_ids: list[str]) -> None:
+        """Flag every window of several playgroups for a replay."""
+        await self._collection.update_many(
+            {"owner_sub": owner_sub, "playgroup_id": {"$in": playgroup_ids}},
+            {"$set": {"stale": True, "updated_at": _now()}, "$inc": {"generation": 1}},
+        )
+
+    async def delete_for_playgroup(self, owner_sub: str, playgroup_id: str) -> None:
+        await self._collection.delete_many({"owner_sub": owner_sub, "playgroup_id": playgroup_id})
+
+    async def ensure_indexes(self) -> None:
+        logger.info("Ensuring Mongo indexes for playgroup ratings collection.")
+        await self._collection.create_indexes(
+            [
+                IndexModel(
+                    [("owner_sub", ASCENDING), ("playgroup_id", ASCENDING), ("window", ASCENDING)],
+                    unique=True,
+                    name="playgroup_ratings_unique",
+                ),
+            ]
+        )
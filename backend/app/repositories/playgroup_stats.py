@@ -0,0 +1,210 @@
+"""MongoDB repository for materialized playgroup statistics."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.playgroup_stats")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class PlaygroupStatsRepository:
+    """Encapsulates Mongo persistence for per-playgroup statistics documents.
+
+    Each document carries a ``generation`` counter and a ``stale`` flag. A game
+    reserves a generation before it is inserted and its increments only land if
+    that generation still holds; anything else marks the document stale so the
+    next read rebuilds it from the games. A rebuild only lands if the generation
+    did not move while it was scanning, and bumps it so reservations taken before
+    the rebuild can no longer apply.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        settings = get_settings()
+        self._collection: AsyncIOMotorCollection = database[
+            settings.mongo_playgroup_stats_collection
+        ]
+
+    @staticmethod
+    def id_filter(owner_sub: str, playgroup_id: str) -> dict[str, Any]:
+        return {"owner_sub": owner_sub, "playgroup_id": playgroup_id}
+
+    async def find(self, owner_sub: str, playgroup_id: str) -> dict[str, Any] | None:
+        return await self._collection.find_one(
+            self.id_filter(owner_sub, playgroup_id), {"_id": 0}
+        )
+
+    async def reserve_generation(self, owner_sub: str, playgroup_id: str) -> int | None:
+        """Bump the generation before a game is stored; returns it when the stats are fresh.
+
+        A rebuild reading the counter before the bump cannot land, so the game is never
+        missed; pass the returned generation to :meth:`apply_increments`.
+        """
+        document = await self._collection.find_one_and_update(
+            self.id_filter(owner_sub, playgroup_id),
+            {
+                "$inc": {"generation": 1},
+                "$set": {"updated_at": _now()},
+                "$setOnInsert": {"stale": True},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 0, "generation": 1, "stale": 1},
+        )
+        if not document or document.get("stale") is not False:
+            return None
+        return int(document.get("generation", 0))
+
+    async def apply_increments(
+        self,
+        owner_sub: str,
+        playgroup_id: str,
+        *,
+        generation: int | None,
+        increments: dict[str, int],
+        updates: dict[str, Any],
+    ) -> bool:
+        """Atomically fold one game into the stats it reserved; otherwise flag them for a rebuild.
+
+        ``generation`` is the value returned by :meth:`reserve_generation`. Returns
+        ``True`` when the increments were applied.
+        """
+        if generation is not None:
+            result = await self._collection.update_one(
+                {
+                    **self.id_filter(owner_sub, playgroup_id),
+                    "stale": False,
+                    "generation": generation,
+                },
+                {
+                    "$inc": {**increments, "generation": 1},
+                    "$set": {**updates, "updated_at": _now()},
+                },
+            )
+            if getattr(result, "matched_count", 0) > 0:
+                return True
+        await self.mark_stale(owner_sub, playgroup_id)
+        return False
+
+    async def mark_stale(self, owner_sub: str, playgroup_id: str | None = None) -> None:
+        """Flag one playgroup's stats (or all of an owner's) for a rebuild on next read."""
+        update = {"$set": {"stale": True, "updated_at": _now()}, "$inc": {"generation": 1}}
+        if playgroup_id is None:
+            await self._collection.update_many({"owner_sub": owner_sub}, update)
+            return
+        await self._collection.update_one(
+            self.id_filter(owner_sub, playgroup_id), update, upsert=True
+        )
+
+    async def mark_playgroups_stale(self, owner_sub: str, playgroup_ids: list[str]) -> None:
+        """Flag several playgroups at once; missing documents are rebuilt on read anyway."""
+        await self._collection.update_many(
+            {"owner_sub": owner_sub, "playgroup_id": {"$in": playgroup_ids}},
+            {"$set": {"stale": True, "updated_at": _now()}, "$inc": {"generation": 1}},
+        )
+
+    async def replace_if_generation(
+        self,
+        owner_sub: str,
+        playgroup_id: str,
+        generation: int,
+        stats: dict[str, Any],
+    ) -> bool:
+        """Store rebuilt stats unless a game was recorded since ``generation`` was read."""
+        now = _now()
+        result = await self._collection.update_one(
+            {**self.id_filter(owner_sub, playgroup_id), "generation": generation},
+            {
+                "$set": {**stats, "stale": False, "rebuilt_at": now, "updated_at": now},
+                "$inc": {"generation": 1},
+            },
+        )
+        return getattr(result, "matched_count", 0) > 0
+
+    async def generations(self) -> dict[tuple[str, str], int]:
+        """Snapshot every document's generation, keyed by ``(owner_sub, playgroup_id)``."""
+        cursor = self._collection.find(
+            {}, {"_id": 0, "owner_sub": 1, "playgroup_id": 1, "generation": 1}
+        )
+        return {
+            (document["owner_sub"], document["playgroup_id"]): int(document.get("generation", 0))
+            async for document in cursor
+        }
+
+    async def bulk_store_rebuilt(
+        self,
+        entries: list[tuple[str, str, int | None, dict[str, Any]]],
+        *,
+        run_id: str,
+        batch_size: int,
+    ) -> int:
+        """Write backfilled stats as unordered ``bulk_write`` batches; returns documents written.
+
+        Each entry is ``(owner_sub, playgroup_id, generation, stats)``. Existing documents
+        are only replaced if their generation still matches the snapshot; missing ones are
+        upserted. Written documents are tagged with ``run_id`` so the caller can flag the
+        rest with :meth:`mark_stale_outside_run`.
+        """
+        now = _now()
+        operations = []
+        for owner_sub, playgroup_id, generation, stats in entries:
+            filter_ = self.id_filter(owner_sub, playgroup_id)
+            if generation is not None:
+                filter_["generation"] = generation
+            operations.append(
+                UpdateOne(
+                    filter_,
+                    {
+                        "$set": {
+                            **stats,
+                            "stale": False,
+                            "backfill_run": run_id,
+                            "rebuilt_at": now,
+                            "updated_at": now,
+                        },
+                        "$inc": {"generation": 1},
+                    },
+                    upsert=generation is None,
+                )
+            )
+
+        written = 0
+        for start in range(0, len(operations), max(1, batch_size)):
+            result = await self._collection.bulk_write(
+                operations[start : start + batch_size], ordered=False
+            )
+            written += getattr(result, "matched_count", 0) + getattr(result, "upserted_count", 0)
+        return written
+
+    async def mark_stale_outside_run(self, run_id: str) -> int:
+        """Flag documents a backfill did not write (they moved meanwhile) for a rebuild."""
+        result = await self._collection.update_many(
+            {"backfill_run": {"$ne": run_id}},
+            {"$set": {"stale": True, "updated_at": _now()}, "$inc": {"generation": 1}},
+        )
+        return getattr(result, "modified_count", 0)
+
+    async def delete(self, owner_sub: str, playgroup_id: str) -> None:
+        await self._collection.delete_one(self.id_filter(owner_sub, playgroup_id))
+
+    async def ensure_indexes(self) -> None:
+        logger.info("Ensuring Mongo indexes for playgroup stats collection.")
+        await self._collection.create_indexes(
+            [
+                IndexModel(
+                    [("owner_sub", ASCENDING), ("playgroup_id", ASCENDING)],
+                    unique=True,
+                    name="playgroup_stats_unique",
+                ),
+            ]
+        )
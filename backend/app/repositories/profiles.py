@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ASCENDING, IndexModel, TEXT
+from pymongo import ASCENDING, IndexModel
 
 from ..config import get_settings
 from ..logging_utils import get_logger
+from .indexes import drop_indexes_if_present
 
 logger = get_logger("repositories.profiles")
 
+SEARCH_PREFIXES = "search_prefixes"
+SEARCH_WORDS = "search_words"
+SEARCH_NAME = "search_name"
+SEARCH_VERSION = "search_version"
+
 
 async def ensure_user_profile_indexes(database: AsyncIOMotorDatabase) -> None:
     """Ensure indexes exist for efficient user profile lookups."""
@@ -23,8 +29,15 @@ async def ensure_user_profile_indexes(database: AsyncIOMotorDatabase) -> None:
             IndexModel([("is_public", ASCENDING), ("display_name", ASCENDING)], name="profile_public_display_idx"),
             IndexModel([("is_public", ASCENDING), ("email", ASCENDING)], name="profile_public_email_idx"),
             IndexModel(
-                [("display_name", TEXT), ("given_name", TEXT), ("email", TEXT), ("description", TEXT)],
-                name="profile_search_text_idx",
+                [(SEARCH_PREFIXES, ASCENDING), ("is_public", ASCENDING), (SEARCH_NAME, ASCENDING)],
+                name="profile_search_prefix_idx",
+            ),
+            IndexModel(
+                [(SEARCH_WORDS, ASCENDING), ("is_public", ASCENDING), (SEARCH_NAME, ASCENDING)],
+                name="profile_search_words_idx",
             ),
+            IndexModel([("is_public", ASCENDING), (SEARCH_NAME, ASCENDING)], name="profile_public_search_name_idx"),
         ]
     )
+    # The prefix index replaced full-text search.
+    await drop_indexes_if_present(collection, ["profile_search_text_idx"])
@@ -0,0 +1,221 @@
+"""MongoDB repository backing the background Moxfield sync job queue."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.sync_jobs")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _strip_storage_fields(document: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    if document is None:
+        return None
+    cleaned = dict(document)
+    cleaned.pop("_id", None)
+    cleaned.pop("active_key", None)
+    return cleaned
+
+
+class SyncJobRepository:
+    """Encapsulates Mongo persistence for queued Moxfield sync jobs.
+
+    A job keeps an ``active_key`` (``kind:user_key``) while it is queued or
+    running. The unique sparse index on that field deduplicates enqueues, and
+    the field is unset once the job reaches a terminal state.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        settings = get_settings()
+        self._collection: AsyncIOMotorCollection = database[settings.mongo_sync_jobs_collection]
+
+    @staticmethod
+    def active_key(kind: str, user_key: str) -> str:
+        return f"{kind}:{user_key}"
+
+    async def enqueue(
+        self,
+        *,
+        username: str,
+        user_key: str,
+        kind: str,
+        mode: str,
+        max_attempts: int,
+    ) -> dict[str, Any]:
+        """Queue a sync job, returning the already active job for the same user if any."""
+        now = _now()
+        active_key = self.active_key(kind, user_key)
+        document = {
+            "id": uuid4().hex,
+            "username": username,
+            "user_key": user_key,
+            "kind": kind,
+            "mode": mode,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "run_at": now,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "progress": {"stage": "queued", "decks_fetched": 0, "decks_total": None},
+            "last_error": None,
+            "total_decks": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        try:
+            job = await self._collection.find_one_and_update(
+                {"active_key": active_key},
+                {"$setOnInsert": document},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another request inserted the active job concurrently; reuse it.
+            job = await self._collection.find_one({"active_key": active_key})
+        return _strip_storage_fields(job) or document
+
+    async def get(self, job_id: str, user_key: str) -> Optional[dict[str, Any]]:
+        document = await self._collection.find_one({"id": job_id, "user_key": user_key})
+        return _strip_storage_fields(document)
+
+    async def claim(self, worker_id: str, lease_seconds: int) -> Optional[dict[str, Any]]:
+        """Atomically lease the next due job (or one whose previous lease expired)."""
+        now = _now()
+        document = await self._collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued", "run_at": {"$lte": now}},
+                    {"status": "running", "lease_expires_at": {"$lte": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return _strip_storage_fields(document)
+
+    async def record_progress(
+        self,
+        job_id: str,
+        worker_id: str,
+        progress: dict[str, Any],
+        lease_seconds: int,
+    ) -> bool:
+        """Store progress and extend the lease; returns False if the lease was lost."""
+        now = _now()
+        result = await self._collection.update_one(
+            {"id": job_id, "worker_id": worker_id, "status": "running"},
+            {
+                "$set": {
+                    "progress": progress,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now,
+                }
+            },
+        )
+        return getattr(result, "matched_count", 0) > 0
+
+    async def mark_succeeded(self, job_id: str, worker_id: str, *, total_decks: int) -> None:
+        now = _now()
+        await self._collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {
+                "$set": {
+                    "status": "succeeded",
+                    "total_decks": total_decks,
+                    "progress": {
+                        "stage": "completed",
+                        "decks_fetched": total_decks,
+                        "decks_total": total_decks,
+                    },
+                    "last_error": None,
+                    "lease_expires_at": None,
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"active_key": ""},
+            },
+        )
+
+    async def mark_retry(self, job_id: str, worker_id: str, *, error: str, run_at: datetime) -> None:
+        await self._collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {
+                "$set": {
+                    "status": "queued",
+                    "run_at": run_at,
+                    "last_error": error,
+                    "lease_expires_at": None,
+                    "worker_id": None,
+                    "updated_at": _now(),
+                }
+            },
+        )
+
+    async def mark_failed(self, job_id: str, worker_id: str, *, error: str) -> None:
+        now = _now()
+        await self._collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {
+                "$set": {
+                    "status": "failed",
+                    "last_error": error,
+                    "lease_expires_at": None,
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"active_key": ""},
+            },
+        )
+
+    async def ensure_indexes(self) -> None:
+        logger.info("Ensuring Mongo indexes for sync jobs collection.")
+        await self._collection.create_indexes(
+            [
+                IndexModel("id", unique=True, name="sync_jobs_id_unique"),
+                IndexModel(
+                    "active_key",
+                    unique=True,
+                    sparse=True,
+                    name="sync_jobs_active_key_unique",
+                ),
+                IndexModel(
+                    [("status", ASCENDING), ("run_at", ASCENDING)],
+                    name="sync_jobs_status_run_at",
+                ),
+                IndexModel(
+                    [("user_key", ASCENDING), ("created_at", DESCENDING)],
+                    name="sync_jobs_user_created",
+                ),
+            ]
+        )
+
+
+async def ensure_sync_job_indexes(database: AsyncIOMotorDatabase) -> None:
+    """Ensure indexes exist for the sync jobs collection."""
+    repository = SyncJobRepository(database)
+    await repository.ensure_indexes()
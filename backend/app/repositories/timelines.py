@@ -0,0 +1,76 @@
+"""MongoDB repository for per-follower activity feed timelines."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+
+logger = get_logger("repositories.timelines")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TimelineRepository:
+    """Encapsulates Mongo persistence for fanned-out feed timelines.
+
+    Each follower has one document whose ``entries`` array holds the newest games
+    of the accounts they follow, newest first. Pushes use ``$each``/``$sort``/``$slice``
+    so the array is re-sorted and capped by the same atomic update, and reading a
+    timeline is a single document fetch regardless of how many accounts are followed.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        settings = get_settings()
+        self._collection: AsyncIOMotorCollection = database[settings.mongo_timelines_collection]
+
+    async def push_entry(
+        self,
+        follower_subs: Iterable[str],
+        entry: dict[str, Any],
+        *,
+        cap: int,
+        batch_size: int,
+    ) -> int:
+        """Add ``entry`` to every follower's timeline; returns the number of timelines written."""
+        now = _now()
+        operations = [
+            UpdateOne(
+                {"follower_sub": follower_sub},
+                {
+                    "$push": {
+                        "entries": {
+                            "$each": [entry],
+                            "$sort": {"created_at": -1, "game_id": -1},
+                            "$slice": cap,
+                        }
+                    },
+                    "$set": {"updated_at": now},
+                },
+                upsert=True,
+            )
+            for follower_sub in follower_subs
+        ]
+        for start in range(0, len(operations), max(1, batch_size)):
+            await self._collection.bulk_write(operations[start : start + batch_size], ordered=False)
+        return len(operations)
+
+    async def list_entries(self, follower_sub: str) -> list[dict[str, Any]]:
+        """Return a follower's timeline entries, newest first."""
+        document = await self._collection.find_one(
+            {"follower_sub": follower_sub}, {"_id": 0, "entries": 1}
+        )
+        return list((document or {}).get("entries") or [])
+
+    async def ensure_indexes(self) -> None:
+        logger.info("Ensuring Mongo indexes for timelines collection.")
+        await self._collection.create_indexes(
+            [IndexModel([("follower_sub", ASCENDING)], unique=True, name="timelines_follower_unique")]
+        )
@@ -7,6 +7,7 @@ from .playgroups import router as playgroups_router
 from .players import router as players_router
 from .profiles import router as profiles_router
 from .social import router as social_router
+from .stats import router as stats_router
 from .users import router as users_router
 
 __all__ = [
@@ -17,5 +18,6 @@ __all__ = [
     "players_router",
     "profiles_router",
     "social_router",
+    "stats_router",
     "users_router",
 ]
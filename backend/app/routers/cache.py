@@ -1,15 +1,38 @@
 """Routers that expose cached payloads without hitting Moxfield."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from ..dependencies import get_moxfield_cache_repository
-from ..repositories import MoxfieldCacheRepository
+from ..repositories import DeckProjection, MoxfieldCacheRepository
 from ..schemas import UserDeckSummariesResponse, UserDecksResponse
-from ..services.storage import fetch_user_deck_summaries, fetch_user_decks
+from ..services.storage import (
+    fetch_user_deck_summaries,
+    fetch_user_decks,
+    open_cached_user_decks_stream,
+)
+from ..services.streaming import NDJSON_MEDIA_TYPE
 
 router = APIRouter(prefix="/cache", tags=["cache"])
 
 
+def get_deck_projection(
+    include_boards: bool = Query(
+        default=True,
+        description="Set to `false` to omit card lists entirely (names, colours and stats only).",
+    ),
+    boards: Optional[List[str]] = Query(
+        default=None,
+        description="Only return these boards, e.g. `boards=commanders&boards=mainboard`.",
+    ),
+) -> DeckProjection:
+    """Translate query parameters into the Mongo projection used for cached decks."""
+    selected = tuple(dict.fromkeys(board.strip() for board in boards or [] if board.strip()))
+    return DeckProjection(include_boards=include_boards, boards=selected or None)
+
+
 @router.get(
     "/users/{username}/decks",
     response_model=UserDecksResponse,
@@ -17,14 +40,31 @@ router = APIRouter(prefix="/cache", tags=["cache"])
 )
 async def get_cached_user_decks(
     username: str,
+    projection: DeckProjection = Depends(get_deck_projection),
     repository: MoxfieldCacheRepository = Depends(get_moxfield_cache_repository),
 ) -> UserDecksResponse:
-    payload = await fetch_user_decks(repository, username)
+    payload = await fetch_user_decks(repository, username, projection=projection)
     if not payload:
         raise HTTPException(status_code=404, detail="No cached deck data for this user.")
     return payload
 
 
+@router.get(
+    "/users/{username}/decks/stream",
+    response_class=StreamingResponse,
+    summary="Stream cached decks as NDJSON, one deck per line.",
+)
+async def stream_cached_user_decks(
+    username: str,
+    projection: DeckProjection = Depends(get_deck_projection),
+    repository: MoxfieldCacheRepository = Depends(get_moxfield_cache_repository),
+) -> StreamingResponse:
+    stream = await open_cached_user_decks_stream(repository, username, projection=projection)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="No cached deck data for this user.")
+    return StreamingResponse(stream.lines, media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.get(
     "/users/{username}/deck-summaries",
     response_model=UserDeckSummariesResponse,
@@ -1,11 +1,14 @@
 """Routers for recording and listing game results."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..dependencies import get_mongo_database
-from ..schemas import GameCreate, GameList, GameRecord
-from ..services.play_data import list_games, record_game
+from ..schemas import GameCreate, GameImportFormat, GameImportReport, GameList, GameRecord
+from ..services.game_import import import_game_stream
+from ..services.play_data import list_games, record_game, stream_games
+from ..services.streaming import NDJSON_MEDIA_TYPE
 
 router = APIRouter(prefix="/profiles/{google_sub}/games", tags=["games"])
 
@@ -22,11 +25,46 @@ async def list_user_games(
         default=None,
         ge=1,
         le=500,
-        description="Optional cap on the number of games to return, sorted by most recent first.",
+        description=(
+            "Page size, sorted by most recent first. When more games remain, the response "
+            "carries a `next_cursor` to pass back as `cursor`."
+        ),
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description="Continuation token returned as `next_cursor` by the previous page.",
+    ),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> Response:
+    try:
+        page = await list_games(
+            database, google_sub, playgroup_id=playgroup_id, limit=limit, cursor=cursor
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    # Rows are encoded directly; `response_model` still documents the GameList shape.
+    return Response(content=page.to_json_bytes(), media_type="application/json")
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    summary="Stream the full game history as NDJSON, one game per line.",
+)
+async def stream_user_games(
+    google_sub: str,
+    playgroup_id: str | None = Query(default=None, description="Filter games by playgroup identifier."),
+    cursor: str | None = Query(
+        default=None,
+        description="Resume after the game identified by a `next_cursor` token.",
     ),
     database: AsyncIOMotorDatabase = Depends(get_mongo_database),
-) -> GameList:
-    return await list_games(database, google_sub, playgroup_id=playgroup_id, limit=limit)
+) -> StreamingResponse:
+    try:
+        lines = stream_games(database, google_sub, playgroup_id=playgroup_id, cursor=cursor)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.post(
@@ -38,11 +76,47 @@ async def list_user_games(
 async def create_user_game(
     google_sub: str,
     payload: GameCreate,
+    background_tasks: BackgroundTasks,
     database: AsyncIOMotorDatabase = Depends(get_mongo_database),
 ) -> GameRecord:
     try:
-        return await record_game(database, google_sub, payload)
+        return await record_game(
+            database, google_sub, payload, schedule_fanout=background_tasks.add_task
+        )
     except LookupError as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
     except ValueError as error:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+
+
+@router.post(
+    "/import",
+    response_model=GameImportReport,
+    summary="Bulk import historical games from an NDJSON or CSV stream.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_user_games(
+    google_sub: str,
+    request: Request,
+    import_format: GameImportFormat | None = Query(
+        default=None,
+        alias="format",
+        description="Stream format; defaults to CSV for `text/csv` uploads and NDJSON otherwise.",
+    ),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> GameImportReport:
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = GameImportFormat.CSV if "csv" in content_type else GameImportFormat.NDJSON
+    try:
+        return await import_game_stream(database, google_sub, request.stream(), import_format)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
@@ -2,6 +2,10 @@
 
 from fastapi import APIRouter
 
+from ..moxfield import get_request_scheduler
+from ..schemas import MoxfieldSchedulerDiagnostics, ProfileCacheDiagnostics
+from ..services.profiles import get_profile_cache
+
 router = APIRouter(tags=["meta"])
 
 
@@ -9,3 +13,23 @@ router = APIRouter(tags=["meta"])
 async def health_check() -> dict[str, str]:
     """Simple health endpoint for uptime checks."""
     return {"status": "ok"}
+
+
+@router.get(
+    "/diagnostics/moxfield-scheduler",
+    response_model=MoxfieldSchedulerDiagnostics,
+    summary="Inspect Moxfield rate limiting queues and wait times.",
+)
+async def moxfield_scheduler_diagnostics() -> MoxfieldSchedulerDiagnostics:
+    """Return per-endpoint queue depth, wait-time and throttling metrics."""
+    return MoxfieldSchedulerDiagnostics(endpoints=get_request_scheduler().snapshot())
+
+
+@router.get(
+    "/diagnostics/profile-cache",
+    response_model=ProfileCacheDiagnostics,
+    summary="Inspect the in-process user profile cache.",
+)
+async def profile_cache_diagnostics() -> ProfileCacheDiagnostics:
+    """Return the profile cache size and hit/miss counters for this process."""
+    return ProfileCacheDiagnostics(**get_profile_cache().snapshot())
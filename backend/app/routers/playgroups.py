@@ -1,10 +1,18 @@
 """Routers for managing playgroups."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..dependencies import get_mongo_database
-from ..schemas import PlaygroupCreate, PlaygroupDetail, PlaygroupList, PlaygroupSummary, PlaygroupUpdate
+from ..schemas import (
+    LeaderboardWindow,
+    PlaygroupCreate,
+    PlaygroupDetail,
+    PlaygroupLeaderboard,
+    PlaygroupList,
+    PlaygroupSummary,
+    PlaygroupUpdate,
+)
 from ..services.play_data import (
     delete_playgroup,
     get_playgroup_detail,
@@ -12,6 +20,7 @@ from ..services.play_data import (
     update_playgroup,
     upsert_playgroup,
 )
+from ..services.ratings import get_playgroup_leaderboard
 
 router = APIRouter(prefix="/profiles/{google_sub}/playgroups", tags=["playgroups"])
 
@@ -61,6 +70,26 @@ async def get_user_playgroup_detail(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
 
 
+@router.get(
+    "/{playgroup_id}/leaderboard",
+    response_model=PlaygroupLeaderboard,
+    summary="Fetch the precomputed Elo leaderboard of a playgroup over a rolling window.",
+)
+async def get_user_playgroup_leaderboard(
+    google_sub: str,
+    playgroup_id: str,
+    window: LeaderboardWindow = Query(
+        default=LeaderboardWindow.ALL_TIME,
+        description="Rolling window of games to rate: `30d`, `90d`, `365d`, or `all`.",
+    ),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> PlaygroupLeaderboard:
+    try:
+        return await get_playgroup_leaderboard(database, google_sub, playgroup_id, window)
+    except LookupError as error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
+
+
 @router.put(
     "/{playgroup_id}",
     response_model=PlaygroupSummary,
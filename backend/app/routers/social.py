@@ -5,11 +5,13 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..dependencies import get_mongo_database
 from ..schemas import (
+    ActivityFeed,
     FollowList,
     FollowRequest,
     PublicUserProfile,
     UserSearchResponse,
 )
+from ..services.feed import get_activity_feed
 from ..services.social import (
     follow_user,
     get_public_profile,
@@ -48,6 +50,11 @@ async def fetch_public_user_profile(
         return await get_public_profile(database, google_sub)
     except LookupError as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
+    except TimeoutError as error:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Profil temporairement indisponible.",
+        ) from error
 
 
 @router.post(
@@ -89,3 +96,20 @@ async def list_following_profiles(
     database: AsyncIOMotorDatabase = Depends(get_mongo_database),
 ) -> FollowList:
     return await list_following(database, follower_sub)
+
+
+@router.get(
+    "/users/{viewer_sub}/feed",
+    response_model=ActivityFeed,
+    summary="List recent games recorded by the accounts a user follows.",
+)
+async def fetch_activity_feed(
+    viewer_sub: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> ActivityFeed:
+    try:
+        return await get_activity_feed(database, viewer_sub, limit=limit, cursor=cursor)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
@@ -0,0 +1,64 @@
+"""Routers exposing aggregated player and deck statistics."""
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..dependencies import get_mongo_database
+from ..schemas import DeckPerformanceList, MatchupKind, MatchupList, PlayerPerformanceList
+from ..services.analytics import get_deck_performance, get_player_performance
+from ..services.matchups import get_matchups
+
+router = APIRouter(prefix="/profiles/{google_sub}/stats", tags=["stats"])
+
+_PLAYGROUP_FILTER_DESCRIPTION = "Restrict statistics to a single playgroup."
+
+
+@router.get(
+    "/players",
+    response_model=PlayerPerformanceList,
+    summary="Aggregate wins, podiums, and games played per player.",
+)
+async def list_player_stats(
+    google_sub: str,
+    playgroup_id: str | None = Query(default=None, description=_PLAYGROUP_FILTER_DESCRIPTION),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> PlayerPerformanceList:
+    return await get_player_performance(database, google_sub, playgroup_id=playgroup_id)
+
+
+@router.get(
+    "/decks",
+    response_model=DeckPerformanceList,
+    summary="Aggregate wins and games played per deck.",
+)
+async def list_deck_stats(
+    google_sub: str,
+    playgroup_id: str | None = Query(default=None, description=_PLAYGROUP_FILTER_DESCRIPTION),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> DeckPerformanceList:
+    return await get_deck_performance(database, google_sub, playgroup_id=playgroup_id)
+
+
+@router.get(
+    "/matchups",
+    response_model=MatchupList,
+    summary="Head-to-head record of a player or deck against its most frequent opponents.",
+)
+async def list_matchups(
+    google_sub: str,
+    background_tasks: BackgroundTasks,
+    subject: str = Query(
+        description="Player (account or player id) or deck (deck id, else deck name) to look up.",
+    ),
+    kind: MatchupKind = Query(default=MatchupKind.DECK, description="Compare players or decks."),
+    limit: int = Query(default=10, ge=1, le=100, description="Number of opponents to return."),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> MatchupList:
+    return await get_matchups(
+        database,
+        google_sub,
+        kind,
+        subject,
+        limit=limit,
+        schedule_rebuild=background_tasks.add_task,
+    )
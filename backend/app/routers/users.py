@@ -2,26 +2,53 @@
 
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable
+from datetime import timezone
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from ..dependencies import get_moxfield_cache_repository, get_moxfield_client
+from ..dependencies import (
+    get_mongo_database,
+    get_moxfield_cache_repository,
+    get_moxfield_client,
+    get_sync_single_flight,
+)
 from ..logging_utils import get_logger
 from ..moxfield import MoxfieldClient, MoxfieldError, MoxfieldNotFoundError
 from ..repositories import MoxfieldCacheRepository
-from ..schemas import UserDeckSummariesResponse, UserDecksResponse
-from ..services.moxfield import build_user_deck_summaries_response, build_user_decks_response
-from ..services.storage import (
-    delete_user_deck,
-    upsert_user_deck_summaries,
-    upsert_user_decks,
+from ..schemas import SyncJob, SyncJobRequest, UserDeckSummariesResponse, UserDecksResponse
+from ..services.freshness import FreshnessPolicy, cache_age
+from ..services.moxfield import open_user_decks_stream
+from ..services.storage import delete_user_deck
+from ..services.streaming import NDJSON_MEDIA_TYPE
+from ..services.sync import (
+    FreshnessResult,
+    SingleFlight,
+    resolve_user_deck_summaries,
+    resolve_user_decks,
+    sync_user_deck_summaries,
+    sync_user_decks,
 )
+from ..services.sync_jobs import enqueue_sync_job, get_sync_job
 
 logger = get_logger("backend")
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Upper bound for the freshness overrides; larger windows overflow the timedelta math.
+_MAX_FRESHNESS_SECONDS = 365 * 24 * 3600
+
+_MAX_AGE_DESCRIPTION = (
+    "`swr` mode only: seconds a cached snapshot is served without revalidation "
+    "(defaults to `DECK_CACHE_MAX_AGE_SECONDS`)."
+)
+_STALE_IF_ERROR_DESCRIPTION = (
+    "`swr` mode only: extra seconds beyond `max_age` during which a cached snapshot is "
+    "served when Moxfield fails (defaults to `DECK_CACHE_STALE_IF_ERROR_SECONDS`)."
+)
+
 
 @router.get(
     "/{username}/deck-summaries",
@@ -30,15 +57,48 @@ router = APIRouter(prefix="/users", tags=["users"])
 )
 async def get_user_deck_summaries(
     username: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    mode: Literal["full", "swr"] = Query(
+        default="full",
+        description=(
+            "`full` always syncs from Moxfield; `swr` serves the Mongo cache under the "
+            "freshness policy and revalidates stale entries in the background."
+        ),
+    ),
+    max_age: Optional[int] = Query(
+        default=None, ge=0, le=_MAX_FRESHNESS_SECONDS, description=_MAX_AGE_DESCRIPTION
+    ),
+    stale_if_error: Optional[int] = Query(
+        default=None, ge=0, le=_MAX_FRESHNESS_SECONDS, description=_STALE_IF_ERROR_DESCRIPTION
+    ),
     client: MoxfieldClient = Depends(get_moxfield_client),
     repository: MoxfieldCacheRepository = Depends(get_moxfield_cache_repository),
+    single_flight: SingleFlight = Depends(get_sync_single_flight),
 ) -> UserDeckSummariesResponse:
     try:
-        response = await build_user_deck_summaries_response(client, username)
+        if mode == "swr":
+            result = await resolve_user_deck_summaries(
+                client,
+                repository,
+                username,
+                single_flight=single_flight,
+                policy=FreshnessPolicy.from_settings(
+                    max_age_seconds=max_age, stale_if_error_seconds=stale_if_error
+                ),
+                schedule_refresh=background_tasks.add_task,
+            )
+            _apply_cache_headers(response, result)
+            payload = result.payload
+        else:
+            payload = await sync_user_deck_summaries(
+                client, repository, username, single_flight=single_flight
+            )
         logger.info(
-            "Deck summary sync succeeded for user '%s' with %d deck summaries.",
+            "Deck summary sync (%s) succeeded for user '%s' with %d deck summaries.",
+            mode,
             username,
-            len(response.decks),
+            len(payload.decks),
         )
     except MoxfieldNotFoundError as exc:
         logger.info(
@@ -54,8 +114,7 @@ async def get_user_deck_summaries(
         )
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
-    await _try_upsert(upsert_user_deck_summaries, repository, response)
-    return response
+    return payload
 
 
 @router.get(
@@ -65,15 +124,49 @@ async def get_user_deck_summaries(
 )
 async def get_user_decks(
     username: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    mode: Literal["full", "delta", "swr"] = Query(
+        default="full",
+        description=(
+            "`full` re-downloads every deck; `delta` only fetches decks whose "
+            "`lastUpdatedAtUtc` differs from the cached copy; `swr` serves the Mongo "
+            "cache under the freshness policy and revalidates stale entries in the background."
+        ),
+    ),
+    max_age: Optional[int] = Query(
+        default=None, ge=0, le=_MAX_FRESHNESS_SECONDS, description=_MAX_AGE_DESCRIPTION
+    ),
+    stale_if_error: Optional[int] = Query(
+        default=None, ge=0, le=_MAX_FRESHNESS_SECONDS, description=_STALE_IF_ERROR_DESCRIPTION
+    ),
     client: MoxfieldClient = Depends(get_moxfield_client),
     repository: MoxfieldCacheRepository = Depends(get_moxfield_cache_repository),
+    single_flight: SingleFlight = Depends(get_sync_single_flight),
 ) -> UserDecksResponse:
     try:
-        response = await build_user_decks_response(client, username)
+        if mode == "swr":
+            result = await resolve_user_decks(
+                client,
+                repository,
+                username,
+                single_flight=single_flight,
+                policy=FreshnessPolicy.from_settings(
+                    max_age_seconds=max_age, stale_if_error_seconds=stale_if_error
+                ),
+                schedule_refresh=background_tasks.add_task,
+            )
+            _apply_cache_headers(response, result)
+            payload = result.payload
+        else:
+            payload = await sync_user_decks(
+                client, repository, username, single_flight=single_flight, mode=mode
+            )
         logger.info(
-            "Deck sync succeeded for user '%s' with %d deck(s).",
+            "Deck sync (%s) succeeded for user '%s' with %d deck(s).",
+            mode,
             username,
-            len(response.decks),
+            len(payload.decks),
         )
     except MoxfieldNotFoundError as exc:
         logger.info(
@@ -89,8 +182,39 @@ async def get_user_decks(
         )
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
-    await _try_upsert(upsert_user_decks, repository, response)
-    return response
+    return payload
+
+
+@router.get(
+    "/{username}/decks/stream",
+    response_class=StreamingResponse,
+    summary="Stream a user's decks from Moxfield as NDJSON, one deck per line.",
+)
+async def stream_user_decks(
+    username: str,
+    client: MoxfieldClient = Depends(get_moxfield_client),
+    repository: MoxfieldCacheRepository = Depends(get_moxfield_cache_repository),
+) -> StreamingResponse:
+    try:
+        stream = await open_user_decks_stream(client, repository, username)
+    except MoxfieldNotFoundError as exc:
+        logger.info(
+            "Deck stream skipped because user '%s' was not found on Moxfield.",
+            username,
+        )
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except MoxfieldError as exc:
+        logger.warning(
+            "Deck stream failed for user '%s' due to upstream error: %s",
+            username,
+            exc,
+        )
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    logger.info(
+        "Deck stream started for user '%s' with %d deck(s).", username, stream.total_decks
+    )
+    return StreamingResponse(stream.lines, media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.delete(
@@ -109,23 +233,48 @@ async def delete_user_deck_endpoint(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-async def _try_upsert(
-    func: Callable[[MoxfieldCacheRepository, Any], Awaitable[None]],
-    repository: MoxfieldCacheRepository,
-    payload: UserDeckSummariesResponse | UserDecksResponse,
-) -> None:
-    """Persist payloads to MongoDB without disrupting the response path."""
+@router.post(
+    "/{username}/sync-jobs",
+    response_model=SyncJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue a background Moxfield sync for a user.",
+)
+async def create_sync_job(
+    username: str,
+    payload: SyncJobRequest = Body(default_factory=SyncJobRequest),
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> SyncJob:
     try:
-        await func(repository, payload)
-    except Exception:  # pragma: no cover - defensive logging
-        logger.exception(
-            "Deck persistence failed for user '%s' with %d item(s).",
-            payload.user.user_name,
-            len(payload.decks),
-        )
-    else:
-        logger.info(
-            "Deck persistence completed for user '%s' with %d item(s).",
-            payload.user.user_name,
-            len(payload.decks),
-        )
+        return await enqueue_sync_job(database, username, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get(
+    "/{username}/sync-jobs/{job_id}",
+    response_model=SyncJob,
+    summary="Poll the status and progress of a background Moxfield sync.",
+)
+async def get_sync_job_status(
+    username: str,
+    job_id: str,
+    database: AsyncIOMotorDatabase = Depends(get_mongo_database),
+) -> SyncJob:
+    try:
+        return await get_sync_job(database, username, job_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+def _apply_cache_headers(response: Response, result: FreshnessResult) -> None:
+    """Expose how the payload was obtained and how old it is."""
+    response.headers["X-Cache-Status"] = result.status.value
+    if result.synced_at is None:
+        return
+    synced_at = result.synced_at
+    if synced_at.tzinfo is None:
+        synced_at = synced_at.replace(tzinfo=timezone.utc)
+    response.headers["Age"] = str(int(cache_age(synced_at).total_seconds()))
+    response.headers["X-Cache-Synced-At"] = synced_at.astimezone(timezone.utc).isoformat()
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
@@ -318,6 +318,26 @@ class PublicGameSummary(BaseModel):
     runner_up: Optional[str] = None
 
 
+class FeedItem(BaseModel):
+    """A game recorded by a followed account, as shown in the activity feed."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    google_sub: str
+    display_name: Optional[str] = None
+    picture: Optional[str] = None
+    game: PublicGameSummary
+
+
+class ActivityFeed(BaseModel):
+    """One page of the activity feed, newest games first."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[FeedItem] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
 class PublicUserProfile(BaseModel):
     """Public-facing representation of a user."""
 
@@ -549,6 +569,37 @@ class GameList(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     games: List[GameRecord] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque token for the next page; absent when no older games remain.",
+    )
+
+
+class GameImportFormat(str, Enum):
+    """Stream formats accepted by the bulk game import."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class GameImportError(BaseModel):
+    """A rejected import row and the reason it was skipped."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    row: int = Field(description="1-based line number of the row in the uploaded stream.")
+    error: str
+
+
+class GameImportReport(BaseModel):
+    """Outcome of a bulk game import."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    imported: int = 0
+    rejected: int = 0
+    playgroup_ids: List[str] = Field(default_factory=list)
+    errors: List[GameImportError] = Field(default_factory=list)
 
 
 class PlayerPerformanceSummary(BaseModel):
@@ -592,6 +643,24 @@ class DeckPerformanceSummary(BaseModel):
     games_played: int = 0
 
 
+class PlayerPerformanceList(BaseModel):
+    """Per-player statistics aggregated across an owner's recorded games."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    total_games: int = 0
+    players: List[PlayerPerformanceSummary] = Field(default_factory=list)
+
+
+class DeckPerformanceList(BaseModel):
+    """Per-deck statistics aggregated across an owner's recorded games."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    total_games: int = 0
+    decks: List[DeckPerformanceSummary] = Field(default_factory=list)
+
+
 class PlaygroupStats(BaseModel):
     """Aggregated statistics for a playgroup."""
 
@@ -602,6 +671,105 @@ class PlaygroupStats(BaseModel):
     deck_performance: List[DeckPerformanceSummary] = Field(default_factory=list)
 
 
+class LeaderboardWindow(str, Enum):
+    """Rolling time windows for which playgroup leaderboards are precomputed."""
+
+    DAYS_30 = "30d"
+    DAYS_90 = "90d"
+    DAYS_365 = "365d"
+    ALL_TIME = "all"
+
+
+class PlayerRating(BaseModel):
+    """Multiplayer Elo rating of a player within a playgroup leaderboard."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    player_id: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("player_id", "playerId"),
+        serialization_alias="playerId",
+    )
+    google_sub: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("google_sub", "googleSub"),
+        serialization_alias="googleSub",
+    )
+    name: Optional[str] = None
+    rating: float
+    games_played: int = 0
+    wins: int = 0
+
+
+class DeckRating(BaseModel):
+    """Multiplayer Elo rating of a deck within a playgroup leaderboard."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    deck_id: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("deck_id", "deckId"),
+        serialization_alias="deckId",
+    )
+    deck_name: Optional[str] = None
+    deck_format: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("deck_format", "deckFormat"),
+        serialization_alias="deckFormat",
+    )
+    rating: float
+    games_played: int = 0
+    wins: int = 0
+
+
+class PlaygroupLeaderboard(BaseModel):
+    """Rating leaderboard of a playgroup over a rolling time window."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    window: LeaderboardWindow
+    total_games: int = 0
+    updated_at: Optional[datetime] = None
+    players: List[PlayerRating] = Field(default_factory=list)
+    decks: List[DeckRating] = Field(default_factory=list)
+
+
+class MatchupKind(str, Enum):
+    """Entities compared by head-to-head matchups."""
+
+    PLAYER = "player"
+    DECK = "deck"
+
+
+class Matchup(BaseModel):
+    """Head-to-head record of a subject against one opponent."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    opponent: str
+    opponent_name: Optional[str] = None
+    games: int = Field(description="Games in which both sides were seated.")
+    wins: int = Field(description="Games the subject finished higher than the opponent.")
+    losses: int
+    ties: int
+    win_rate: float
+
+
+class MatchupList(BaseModel):
+    """Top opponents of a player or deck, most frequent first."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: MatchupKind
+    subject: str
+    subject_name: Optional[str] = None
+    stale: bool = Field(
+        default=False,
+        description="Counters are being rebuilt from the games; the rows may be out of date.",
+    )
+    matchups: List[Matchup] = Field(default_factory=list)
+
+
 class PlaygroupDetail(BaseModel):
     """Detailed representation of a playgroup including members and stats."""
 
@@ -624,3 +792,101 @@ class PlaygroupList(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     playgroups: List[PlaygroupSummary] = Field(default_factory=list)
+
+
+class SchedulerQueueDepth(BaseModel):
+    """Number of Moxfield requests waiting in each priority lane."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    interactive: int = 0
+    background: int = 0
+
+
+class SchedulerEndpointMetrics(BaseModel):
+    """Token-bucket state and wait-time metrics for one Moxfield endpoint family."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    endpoint: str
+    rate: float
+    burst: int
+    effective_rate: float
+    available_tokens: float
+    queue_depth: SchedulerQueueDepth
+    acquired: int = 0
+    throttled: int = 0
+    average_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+
+class MoxfieldSchedulerDiagnostics(BaseModel):
+    """Snapshot of the process-wide Moxfield request scheduler."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    endpoints: List[SchedulerEndpointMetrics] = Field(default_factory=list)
+
+
+class ProfileCacheDiagnostics(BaseModel):
+    """Hit/miss counters of the in-process user profile cache."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    hit_rate: float = 0.0
+
+
+class SyncJobStatus(str, Enum):
+    """Lifecycle states of a background Moxfield sync job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class SyncJobRequest(BaseModel):
+    """Payload used to enqueue a background Moxfield sync."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: Literal["decks", "deck_summaries"] = "decks"
+    mode: Literal["full", "delta"] = "full"
+
+
+class SyncJobProgress(BaseModel):
+    """Progress reported by the worker while a sync job runs."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    stage: str = "queued"
+    decks_fetched: int = 0
+    decks_total: Optional[int] = None
+
+
+class SyncJob(BaseModel):
+    """State of a background Moxfield sync job."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    id: str
+    username: str
+    kind: Literal["decks", "deck_summaries"]
+    mode: Literal["full", "delta"]
+    status: SyncJobStatus
+    attempts: int = 0
+    max_attempts: int
+    progress: SyncJobProgress = Field(default_factory=SyncJobProgress)
+    last_error: Optional[str] = None
+    total_decks: Optional[int] = None
+    run_at: datetime
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
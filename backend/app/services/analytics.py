@@ -0,0 +1,57 @@
+"""Game analytics computed by Mongo aggregation pipelines."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..repositories import GameAnalyticsRepository
+from ..schemas import (
+    DeckPerformanceList,
+    DeckPerformanceSummary,
+    PlayerPerformanceList,
+    PlayerPerformanceSummary,
+)
+
+
+def _row_fields(row: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in row.items() if key != "_id"}
+
+
+def _map_player_row(row: dict[str, Any]) -> PlayerPerformanceSummary:
+    return PlayerPerformanceSummary(**_row_fields(row))
+
+
+def _map_deck_row(row: dict[str, Any]) -> DeckPerformanceSummary:
+    return DeckPerformanceSummary(**_row_fields(row))
+
+
+async def get_player_performance(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    *,
+    playgroup_id: str | None = None,
+) -> PlayerPerformanceList:
+    repository = GameAnalyticsRepository(database)
+    rows = await repository.player_performance(owner_sub, playgroup_id=playgroup_id)
+    total_games = await repository.count_games(owner_sub, playgroup_id=playgroup_id)
+    return PlayerPerformanceList(
+        total_games=total_games,
+        players=[_map_player_row(row) for row in rows],
+    )
+
+
+async def get_deck_performance(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    *,
+    playgroup_id: str | None = None,
+) -> DeckPerformanceList:
+    repository = GameAnalyticsRepository(database)
+    rows = await repository.deck_performance(owner_sub, playgroup_id=playgroup_id)
+    total_games = await repository.count_games(owner_sub, playgroup_id=playgroup_id)
+    return DeckPerformanceList(
+        total_games=total_games,
+        decks=[_map_deck_row(row) for row in rows],
+    )
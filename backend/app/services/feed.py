@@ -0,0 +1,174 @@
+"""Activity feed of games recorded by followed accounts.
+
+Games are fanned out on write into each follower's capped timeline. Games of
+accounts with more than ``FEED_FANOUT_MAX_FOLLOWERS`` followers are skipped at write
+time and pulled at read time instead, so neither recording a game nor reading a feed
+costs more than a handful of indexed queries. The choice is stored on each game, so
+a game stays in the feed however its owner's follower count moves later.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..repositories import FollowRepository, GameRepository, TimelineRepository
+from ..repositories.follows import FOLLOWERS_COUNT
+from ..repositories.play_data import FEED_DELIVERY, FEED_PULL, FEED_PUSH
+from ..schemas import ActivityFeed, FeedItem, PublicGameSummary
+from .game_rows import decode_game_cursor, encode_game_cursor
+from .profiles import fetch_user_profiles, get_profile_cache
+
+logger = get_logger("services.feed")
+
+
+def game_feed_entry(game: dict[str, Any]) -> dict[str, Any]:
+    """Return the timeline entry stored for a recorded game."""
+    names = {player.get("id"): player.get("name") for player in game.get("players", []) or []}
+    rankings = sorted(game.get("rankings", []) or [], key=lambda entry: entry.get("rank", 0))
+    return {
+        "game_id": game["id"],
+        "owner_sub": game["owner_sub"],
+        "created_at": game["created_at"],
+        "playgroup_name": game.get("playgroup_name"),
+        "winner": names.get(rankings[0].get("player_id")) if rankings else None,
+        "runner_up": names.get(rankings[1].get("player_id")) if len(rankings) > 1 else None,
+    }
+
+
+async def _public_follower_count(database: AsyncIOMotorDatabase, google_sub: str) -> int:
+    """Return how many accounts follow ``google_sub``, or ``0`` if its profile is not public."""
+    settings = get_settings()
+    profile = await database[settings.mongo_users_collection].find_one(
+        {"google_sub": google_sub}, {"_id": 0, "is_public": 1, FOLLOWERS_COUNT: 1}
+    )
+    if not profile or not profile.get("is_public"):
+        return 0
+    if FOLLOWERS_COUNT in profile:
+        return int(profile[FOLLOWERS_COUNT])
+    # Store the counters now so readers can tell whether this account is pulled.
+    followers, _ = await FollowRepository(database).initialize_counters(google_sub)
+    get_profile_cache().invalidate(google_sub)
+    return followers
+
+
+async def plan_game_delivery(database: AsyncIOMotorDatabase, owner_sub: str) -> str | None:
+    """Decide how a game about to be recorded reaches its owner's followers.
+
+    Returns :data:`FEED_PUSH` (fanned out into timelines), :data:`FEED_PULL` (heavily
+    followed or undecidable: readers query the games) or ``None`` when the profile is
+    private or has no followers. Store the result on the game under ``feed_delivery``.
+    """
+    try:
+        followers = await _public_follower_count(database, owner_sub)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Failed to count followers of '%s'; its game will be pulled.", owner_sub)
+        return FEED_PULL
+    if followers == 0:
+        return None
+    return FEED_PULL if followers > get_settings().feed_fanout_max_followers else FEED_PUSH
+
+
+async def apply_game_to_feed(database: AsyncIOMotorDatabase, game: dict[str, Any]) -> None:
+    """Push a newly recorded game into its owner's followers' timelines.
+
+    Only games planned for :data:`FEED_PUSH` by :func:`plan_game_delivery` are fanned
+    out; pulled games are found by readers instead. Failures are logged, not raised.
+    """
+    if game.get(FEED_DELIVERY) != FEED_PUSH:
+        return
+    settings = get_settings()
+    try:
+        follower_subs = [
+            entry["follower_sub"]
+            for entry in await FollowRepository(database).list_followers(game["owner_sub"])
+            if entry.get("follower_sub")
+        ]
+        written = await TimelineRepository(database).push_entry(
+            follower_subs,
+            game_feed_entry(game),
+            cap=settings.feed_timeline_cap,
+            batch_size=settings.mongo_bulk_write_batch_size,
+        )
+        logger.info("Fanned out game '%s' to %d timeline(s).", game["id"], written)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Failed to fan out game '%s' to follower timelines.", game.get("id"))
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Mongo returns naive UTC datetimes; compare everything as aware UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _feed_key(entry: dict[str, Any]) -> tuple[datetime, str]:
+    return _as_utc(entry["created_at"]), entry["game_id"]
+
+
+async def get_activity_feed(
+    database: AsyncIOMotorDatabase,
+    viewer_sub: str,
+    *,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> ActivityFeed:
+    """Return the newest games of the accounts ``viewer_sub`` follows, one page at a time.
+
+    The page merges the viewer's timeline with the followed accounts' games that were
+    recorded for pulling. Followed accounts are narrowed to public profiles before
+    either source is read, so entries of accounts no longer followed or no longer
+    public never take a slot in the page.
+    """
+    after = decode_game_cursor(cursor) if cursor else None
+    following = {
+        entry["target_sub"]
+        for entry in await FollowRepository(database).list_following(viewer_sub)
+        if entry.get("target_sub")
+    }
+    profiles = {
+        sub: profile
+        for sub, profile in (await fetch_user_profiles(database, following)).items()
+        if profile.is_public
+    }
+    if not profiles:
+        return ActivityFeed()
+
+    candidates: dict[str, dict[str, Any]] = {}
+    for entry in await TimelineRepository(database).list_entries(viewer_sub):
+        if entry.get("owner_sub") in profiles:
+            candidates.setdefault(entry["game_id"], entry)
+    pulled_games = await GameRepository(database).list_pulled_for_owners(
+        sorted(profiles), limit=limit + 1, after=after
+    )
+    for game in pulled_games:
+        candidates.setdefault(game["id"], game_feed_entry(game))
+
+    visible = sorted(candidates.values(), key=_feed_key, reverse=True)
+    if after is not None:
+        visible = [entry for entry in visible if _feed_key(entry) < after]
+
+    next_cursor = None
+    if len(visible) > limit:
+        visible = visible[:limit]
+        last = visible[-1]
+        next_cursor = encode_game_cursor({"created_at": last["created_at"], "id": last["game_id"]})
+
+    items = [
+        FeedItem(
+            google_sub=entry["owner_sub"],
+            display_name=profiles[entry["owner_sub"]].display_name,
+            picture=profiles[entry["owner_sub"]].picture,
+            game=PublicGameSummary(
+                id=entry["game_id"],
+                playgroup_name=entry.get("playgroup_name"),
+                created_at=entry["created_at"],
+                winner=entry.get("winner"),
+                runner_up=entry.get("runner_up"),
+            ),
+        )
+        for entry in visible
+    ]
+    return ActivityFeed(items=items, next_cursor=next_cursor)
@@ -0,0 +1,90 @@
+"""Freshness policy applied to cached Moxfield payloads (stale-while-revalidate)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Optional
+
+from ..config import get_settings
+
+
+class CacheStatus(str, Enum):
+    """Outcome reported to clients through the ``X-Cache-Status`` header."""
+
+    HIT = "HIT"
+    STALE = "STALE"
+    MISS = "MISS"
+    STALE_IF_ERROR = "STALE-IF-ERROR"
+
+
+class CacheDecision(str, Enum):
+    """What to do with a cached snapshot of a given age."""
+
+    SERVE = "serve"
+    SERVE_AND_REVALIDATE = "serve_and_revalidate"
+    REFRESH = "refresh"
+
+
+@dataclass(frozen=True)
+class FreshnessPolicy:
+    """Age thresholds that decide whether cached decks can be served.
+
+    * ``max_age``: snapshots younger than this are served as-is (``HIT``).
+    * ``stale_while_revalidate``: beyond ``max_age`` and within this extra window the
+      snapshot is served immediately while a background refresh runs (``STALE``).
+    * ``stale_if_error``: when a blocking refresh fails upstream, snapshots younger
+      than ``max_age + stale_if_error`` are still served (``STALE-IF-ERROR``).
+    """
+
+    max_age: timedelta
+    stale_while_revalidate: timedelta
+    stale_if_error: timedelta
+
+    @classmethod
+    def from_settings(
+        cls,
+        *,
+        max_age_seconds: Optional[int] = None,
+        stale_if_error_seconds: Optional[int] = None,
+    ) -> "FreshnessPolicy":
+        """Build the default policy, optionally overriding values per request."""
+        settings = get_settings()
+        return cls(
+            max_age=timedelta(
+                seconds=settings.deck_cache_max_age_seconds
+                if max_age_seconds is None
+                else max_age_seconds
+            ),
+            stale_while_revalidate=timedelta(
+                seconds=settings.deck_cache_stale_while_revalidate_seconds
+            ),
+            stale_if_error=timedelta(
+                seconds=settings.deck_cache_stale_if_error_seconds
+                if stale_if_error_seconds is None
+                else stale_if_error_seconds
+            ),
+        )
+
+    def decide(self, age: timedelta) -> CacheDecision:
+        """Return how a snapshot of ``age`` should be handled."""
+        if age <= self.max_age:
+            return CacheDecision.SERVE
+        if age <= self.max_age + self.stale_while_revalidate:
+            return CacheDecision.SERVE_AND_REVALIDATE
+        return CacheDecision.REFRESH
+
+    def can_serve_on_error(self, age: timedelta) -> bool:
+        """Return whether a snapshot of ``age`` may be served when a refresh failed."""
+        return age <= self.max_age + self.stale_if_error
+
+
+def cache_age(synced_at: Optional[datetime], *, now: Optional[datetime] = None) -> timedelta:
+    """Return the age of a snapshot; unknown sync times are treated as infinitely old."""
+    if synced_at is None:
+        return timedelta.max
+    if synced_at.tzinfo is None:
+        synced_at = synced_at.replace(tzinfo=timezone.utc)
+    current = now or datetime.now(timezone.utc)
+    return max(timedelta(0), current - synced_at)
@@ -0,0 +1,166 @@
+"""Parsing of bulk game imports streamed as NDJSON or CSV."""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import re
+from typing import Any, AsyncIterator, Mapping
+from uuid import NAMESPACE_URL, uuid5
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+
+from ..repositories import PlayerRepository
+from ..schemas import GameCreate, GameImportFormat, GameImportReport
+from .play_data import import_games
+
+_SEAT_COLUMN = re.compile(r"^player_(\d+)$")
+
+ImportRow = tuple[int, GameCreate | str]
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield its lines without terminators."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _validate(data: Any) -> GameCreate | str:
+    try:
+        return GameCreate.model_validate(data)
+    except ValidationError as error:
+        first = error.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+async def _ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ImportRow]:
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            yield number, "JSON invalide."
+            continue
+        yield number, _validate(data)
+
+
+def _csv_game(
+    row: Mapping[str, str],
+    seats: list[int],
+    owner_sub: str,
+    tracked_players: Mapping[str, dict[str, Any]],
+) -> dict[str, Any]:
+    """Map one spreadsheet row to a ``GameCreate`` payload.
+
+    Players are matched by name to the owner's tracked players; other names get an
+    identifier derived from the name so a guest keeps one identity across the import.
+    Without ``rank_N`` columns, seats are read in finishing order.
+    """
+    players: list[dict[str, Any]] = []
+    rankings: list[dict[str, Any]] = []
+    for seat in seats:
+        name = (row.get(f"player_{seat}") or "").strip()
+        if not name:
+            continue
+        tracked = tracked_players.get(name.casefold())
+        if tracked:
+            player_id = tracked["id"]
+            google_sub = tracked.get("google_sub")
+        else:
+            player_id = uuid5(NAMESPACE_URL, f"{owner_sub}/{name.casefold()}").hex
+            google_sub = None
+        players.append(
+            {
+                "id": player_id,
+                "name": name,
+                "is_owner": google_sub is not None and google_sub == owner_sub,
+                "deck_name": (row.get(f"deck_{seat}") or "").strip() or None,
+                "google_sub": google_sub,
+            }
+        )
+        rankings.append(
+            {"player_id": player_id, "rank": (row.get(f"rank_{seat}") or "").strip() or len(players)}
+        )
+    return {
+        "playgroup": {
+            "id": (row.get("playgroup_id") or "").strip() or None,
+            "name": row.get("playgroup") or "",
+        },
+        "players": players,
+        "rankings": rankings,
+        "recorded_at": (row.get("recorded_at") or "").strip() or None,
+        "notes": (row.get("notes") or "").strip() or None,
+    }
+
+
+async def _csv_rows(
+    lines: AsyncIterator[str],
+    owner_sub: str,
+    tracked_players: Mapping[str, dict[str, Any]],
+) -> AsyncIterator[ImportRow]:
+    header: list[str] | None = None
+    seats: list[int] = []
+    buffered: list[str] = []
+    number = start = 0
+    async for line in lines:
+        number += 1
+        if not buffered:
+            start = number
+        buffered.append(line)
+        record = "\n".join(buffered)
+        if record.count('"') % 2:
+            continue  # A quoted field continues on the next line.
+        buffered.clear()
+        values = next(csv.reader([record]), [])
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            seats = sorted(
+                int(match.group(1)) for match in map(_SEAT_COLUMN.match, header) if match
+            )
+            if "playgroup" not in header or not seats:
+                raise ValueError(
+                    "En-tête CSV invalide : les colonnes « playgroup » et « player_1 » sont requises."
+                )
+            continue
+        if not any(value.strip() for value in values):
+            continue
+        yield start, _validate(_csv_game(dict(zip(header, values)), seats, owner_sub, tracked_players))
+    if buffered:
+        yield start, "Guillemet non fermé."
+
+
+async def import_game_stream(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    chunks: AsyncIterator[bytes],
+    import_format: GameImportFormat,
+) -> GameImportReport:
+    """Parse an uploaded NDJSON or CSV stream row by row and import the games it holds.
+
+    NDJSON lines use the same shape as ``POST /profiles/{google_sub}/games``. CSV
+    files need a header with ``playgroup`` and ``player_1``…``player_N`` columns,
+    plus optional ``playgroup_id``, ``recorded_at``, ``notes``, ``deck_N`` and ``rank_N``.
+    """
+    lines = iter_text_lines(chunks)
+    if import_format is GameImportFormat.CSV:
+        tracked_players: dict[str, dict[str, Any]] = {}
+        for player in await PlayerRepository(database).list_for_owner(owner_sub):
+            tracked_players.setdefault((player.get("name") or "").casefold(), player)
+        rows = _csv_rows(lines, owner_sub, tracked_players)
+    else:
+        rows = _ndjson_rows(lines)
+    return await import_games(database, owner_sub, rows)
@@ -0,0 +1,175 @@
+"""Compact game rows used on list and stream paths instead of per-game Pydantic models."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional, Sequence
+
+from pydantic_core import to_json
+
+from ..schemas import GamePlayer, GameRecord
+
+
+class PlaygroupRow(NamedTuple):
+    id: str
+    name: str
+
+
+class PlayerRow(NamedTuple):
+    """One seat; field order mirrors :class:`GamePlayer` so keys can be zipped on."""
+
+    id: str
+    name: str
+    is_owner: bool
+    deck_id: Optional[str]
+    deck_name: Optional[str]
+    deck_format: Optional[str]
+    deck_slug: Optional[str]
+    deck_public_url: Optional[str]
+    order: Optional[int]
+    player_type: Optional[str]
+    google_sub: Optional[str]
+    linked_google_sub: Optional[str]
+
+
+class RankingRow(NamedTuple):
+    player_id: str
+    rank: int
+
+
+# JSON keys of a serialized GamePlayer (camelCase aliases where the schema declares one).
+PLAYER_JSON_KEYS: tuple[str, ...] = tuple(
+    field.serialization_alias or name for name, field in GamePlayer.model_fields.items()
+)
+
+
+def _player_row(player: dict[str, Any]) -> PlayerRow:
+    return PlayerRow(
+        player["id"],
+        player.get("name", ""),
+        bool(player.get("is_owner", False)),
+        player.get("deck_id"),
+        player.get("deck_name"),
+        player.get("deck_format"),
+        player.get("deck_slug"),
+        player.get("deck_public_url"),
+        player.get("order"),
+        player.get("player_type"),
+        player.get("google_sub"),
+        player.get("linked_google_sub"),
+    )
+
+
+def _seat_order(player: PlayerRow) -> int:
+    return player.order if player.order is not None else 0
+
+
+def _ranking_order(ranking: RankingRow) -> tuple[int, str]:
+    return ranking.rank, ranking.player_id
+
+
+class GameRow:
+    """A stored game as plain tuples, serialized to the same JSON as :class:`GameRecord`.
+
+    Listing and streaming build one of these per game instead of a ``GameRecord``
+    plus its nested playgroup, player and ranking models, and encode it straight to
+    bytes without validation. Use :meth:`to_record` where a typed model is required.
+    """
+
+    __slots__ = ("id", "playgroup", "created_at", "updated_at", "players", "rankings", "notes")
+
+    def __init__(
+        self,
+        id: str,  # pylint: disable=redefined-builtin
+        playgroup: PlaygroupRow,
+        created_at: datetime,
+        updated_at: datetime,
+        players: Sequence[PlayerRow],
+        rankings: Sequence[RankingRow],
+        notes: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.playgroup = playgroup
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.players = players
+        self.rankings = rankings
+        self.notes = notes
+
+    @classmethod
+    def from_document(cls, document: dict[str, Any]) -> GameRow:
+        players = [_player_row(player) for player in document.get("players", [])]
+        players.sort(key=_seat_order)
+        rankings = [
+            RankingRow(ranking.get("player_id"), int(ranking.get("rank", 0)))
+            for ranking in document.get("rankings", [])
+        ]
+        rankings.sort(key=_ranking_order)
+        return cls(
+            document["id"],
+            PlaygroupRow(document["playgroup_id"], document.get("playgroup_name", "")),
+            document.get("created_at"),
+            document.get("updated_at"),
+            players,
+            rankings,
+            document.get("notes"),
+        )
+
+    def to_json_data(self) -> dict[str, Any]:
+        """Return the API payload as builtins, keyed exactly like ``GameRecord`` by alias."""
+        return {
+            "id": self.id,
+            "playgroup": {"id": self.playgroup.id, "name": self.playgroup.name},
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "players": [dict(zip(PLAYER_JSON_KEYS, player)) for player in self.players],
+            "rankings": [
+                {"player_id": ranking.player_id, "rank": ranking.rank} for ranking in self.rankings
+            ],
+            "notes": self.notes,
+        }
+
+    def to_json_bytes(self) -> bytes:
+        return to_json(self.to_json_data())
+
+    def to_record(self) -> GameRecord:
+        return GameRecord.model_validate(self.to_json_data())
+
+
+class GameRowPage(NamedTuple):
+    """One page of listed games; serializes to the ``GameList`` JSON shape."""
+
+    games: list[GameRow]
+    next_cursor: Optional[str] = None
+
+    def to_json_bytes(self) -> bytes:
+        return to_json(
+            {
+                "games": [game.to_json_data() for game in self.games],
+                "next_cursor": self.next_cursor,
+            }
+        )
+
+
+def encode_game_cursor(document: dict) -> str:
+    payload = json.dumps(
+        {"created_at": document["created_at"].isoformat(), "id": document["id"]},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_game_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["created_at"])
+        game_id = str(payload["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Curseur de pagination invalide.") from exc
+    # Mongo reads aware datetimes as UTC; callers compare keys in memory as aware UTC too.
+    if created_at.tzinfo is None:
+        return created_at.replace(tzinfo=timezone.utc), game_id
+    return created_at.astimezone(timezone.utc), game_id
@@ -0,0 +1,217 @@
+"""Head-to-head player and deck matchups maintained as sparse pairwise counters."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Iterator, Mapping
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..repositories import GameRepository, MatchupRepository
+from ..schemas import Matchup, MatchupKind, MatchupList
+from .sync import RefreshScheduler
+
+logger = get_logger("services.matchups")
+
+
+def _game_sides(game: dict[str, Any]) -> dict[str, dict[str, tuple[int, str | None]]]:
+    """Return ``{kind: {key: (rank, name)}}`` for the ranked seats of a game.
+
+    Players are keyed like the stats (account, else seat id) and decks by id, else
+    name; a key seen twice in one game keeps its first seat.
+    """
+    ranks = {
+        ranking.get("player_id"): int(ranking.get("rank", 0))
+        for ranking in game.get("rankings", []) or []
+    }
+    sides: dict[str, dict[str, tuple[int, str | None]]] = {kind.value: {} for kind in MatchupKind}
+    for player in game.get("players", []) or []:
+        rank = ranks.get(player.get("id"))
+        if rank is None:
+            continue
+        player_key = player.get("google_sub") or player.get("id")
+        if player_key:
+            sides[MatchupKind.PLAYER.value].setdefault(player_key, (rank, player.get("name")))
+        deck_key = player.get("deck_id") or player.get("deck_name")
+        if deck_key:
+            sides[MatchupKind.DECK.value].setdefault(deck_key, (rank, player.get("deck_name")))
+    return sides
+
+
+def game_matchup_pairs(game: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield both ordered directions of every player and deck pair that met in ``game``.
+
+    The subject wins a pair when it finished higher (lower rank) than the opponent.
+    """
+    for kind, seats in _game_sides(game).items():
+        for subject, (subject_rank, subject_name) in seats.items():
+            for opponent, (opponent_rank, opponent_name) in seats.items():
+                if opponent == subject:
+                    continue
+                yield {
+                    "kind": kind,
+                    "subject": subject,
+                    "opponent": opponent,
+                    "subject_name": subject_name,
+                    "opponent_name": opponent_name,
+                    "wins": int(subject_rank < opponent_rank),
+                    "losses": int(subject_rank > opponent_rank),
+                    "ties": int(subject_rank == opponent_rank),
+                }
+
+
+async def reserve_game_matchups(database: AsyncIOMotorDatabase, owner_sub: str) -> int | None:
+    """Reserve the owner's matchup counters for a game about to be inserted; returns the epoch.
+
+    Must run before the insert, like :func:`~.playgroup_stats.reserve_game_stats`.
+    Returns ``None`` when the counters are stale, missing or could not be reached.
+    """
+    try:
+        return await MatchupRepository(database).begin_game(owner_sub)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Failed to reserve matchups for owner '%s'.", owner_sub)
+        return None
+
+
+async def apply_game_to_matchups(
+    database: AsyncIOMotorDatabase, game: dict[str, Any], epoch: int | None
+) -> None:
+    """Increment the pair counters of a newly recorded game in one ``bulk_write``.
+
+    ``epoch`` comes from :func:`reserve_game_matchups`. Games recorded concurrently
+    all apply; stale or missing counters are left alone, and counters a rebuild
+    landed on since the reservation are flagged. Both are rebuilt out of band.
+    """
+    repository = MatchupRepository(database)
+    owner_sub = game["owner_sub"]
+    try:
+        if epoch is not None:
+            await repository.apply_pairs(owner_sub, game_matchup_pairs(game))
+            if await repository.finish_game(owner_sub, epoch):
+                return
+        await repository.mark_stale(owner_sub)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception(
+            "Failed to update matchups for owner '%s'; flagging them for a rebuild.", owner_sub
+        )
+        await repository.mark_stale(owner_sub)
+
+
+async def rebuild_matchups(database: AsyncIOMotorDatabase, owner_sub: str) -> None:
+    """Recount every pair from the owner's games and store them if nothing raced us."""
+    repository = MatchupRepository(database)
+    state = await repository.find_state(owner_sub)
+    if state is None:
+        await repository.mark_stale(owner_sub)
+        state = await repository.find_state(owner_sub) or {}
+    generation = int(state.get("generation", 0))
+    token = uuid4().hex
+    if not await repository.claim_rebuild(owner_sub, generation, token):
+        logger.info("Matchups of owner '%s' are already being rebuilt.", owner_sub)
+        return
+
+    counters: dict[tuple[str, str, str], dict[str, Any]] = {}
+    games = 0
+    async for game in GameRepository(database).iter_for_owner(owner_sub):
+        games += 1
+        for pair in game_matchup_pairs(game):
+            key = (pair["kind"], pair["subject"], pair["opponent"])
+            row = counters.setdefault(
+                key,
+                {
+                    "kind": pair["kind"],
+                    "subject": pair["subject"],
+                    "opponent": pair["opponent"],
+                    "games": 0,
+                    "wins": 0,
+                    "losses": 0,
+                    "ties": 0,
+                },
+            )
+            row["games"] += 1
+            row["wins"] += pair["wins"]
+            row["losses"] += pair["losses"]
+            row["ties"] += pair["ties"]
+            row["subject_name"] = pair["subject_name"]
+            row["opponent_name"] = pair["opponent_name"]
+
+    stored = await repository.replace_all(
+        owner_sub,
+        generation,
+        list(counters.values()),
+        token=token,
+        batch_size=get_settings().mongo_bulk_write_batch_size,
+    )
+    logger.info(
+        "Rebuilt %d matchup row(s) for owner '%s' from %d game(s)%s.",
+        len(counters),
+        owner_sub,
+        games,
+        "" if stored else " (left stale: a game was recorded meanwhile)",
+    )
+
+
+def _to_matchup(row: dict[str, Any]) -> Matchup:
+    games = int(row.get("games", 0))
+    wins = int(row.get("wins", 0))
+    return Matchup(
+        opponent=row["opponent"],
+        opponent_name=row.get("opponent_name"),
+        games=games,
+        wins=wins,
+        losses=int(row.get("losses", 0)),
+        ties=int(row.get("ties", 0)),
+        win_rate=round(wins / games, 3) if games else 0.0,
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Mongo returns naive UTC datetimes; compare everything as aware UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _rebuild_in_progress(state: Mapping[str, Any] | None) -> bool:
+    rebuild_until = (state or {}).get("rebuild_until")
+    return rebuild_until is not None and _as_utc(rebuild_until) > datetime.now(timezone.utc)
+
+
+async def _rebuild_in_background(database: AsyncIOMotorDatabase, owner_sub: str) -> None:
+    try:
+        await rebuild_matchups(database, owner_sub)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Background matchup rebuild failed for owner '%s'.", owner_sub)
+
+
+async def get_matchups(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    kind: MatchupKind,
+    subject: str,
+    *,
+    limit: int = 10,
+    schedule_rebuild: RefreshScheduler | None = None,
+) -> MatchupList:
+    """Serve a subject's top-``limit`` opponents from one indexed range scan.
+
+    Stale or missing counters are served as they stand with ``stale`` set: the
+    full-history rebuild never runs on the request path but is handed to
+    ``schedule_rebuild`` (``BackgroundTasks.add_task`` in the router), unless
+    another rebuild already holds the lease.
+    """
+    repository = MatchupRepository(database)
+    state = await repository.find_state(owner_sub)
+    stale = state is None or state.get("stale", True) is not False
+    if stale and schedule_rebuild is not None and not _rebuild_in_progress(state):
+        schedule_rebuild(partial(_rebuild_in_background, database, owner_sub))
+    rows = await repository.top_opponents(owner_sub, kind.value, subject, limit)
+    return MatchupList(
+        kind=kind,
+        subject=subject,
+        subject_name=rows[0].get("subject_name") if rows else None,
+        stale=stale,
+        matchups=[_to_matchup(row) for row in rows],
+    )
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Set
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
 
-from ..moxfield import MoxfieldClient
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..moxfield import MoxfieldClient, MoxfieldError
+from ..repositories import MoxfieldCacheRepository
 from ..schemas import (
     Author,
     DeckBoard,
@@ -18,19 +21,179 @@ from ..schemas import (
     UserDecksResponse,
     UserSummary,
 )
+from .storage import (
+    fetch_user_deck_details,
+    finalize_user_decks_stream,
+    persist_user_deck_batch,
+)
+from .streaming import (
+    DeckStream,
+    encode_deck_line,
+    encode_end_line,
+    encode_error_line,
+    encode_user_line,
+)
+
+logger = get_logger("services.moxfield")
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
 
 
 async def build_user_decks_response(
     client: MoxfieldClient,
     username: str,
+    *,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> UserDecksResponse:
     """Fetch and normalize the payload returned by the API endpoint."""
-    raw_payload = await client.collect_user_decks_with_details(username)
+    raw_payload = await client.collect_user_decks_with_details(username, on_progress=on_progress)
     user_summary = _transform_user_summary(raw_payload["user"])
     decks = [_transform_deck(detail) for detail in raw_payload["decks"]]
     return UserDecksResponse(user=user_summary, total_decks=len(decks), decks=decks)
 
 
+async def build_user_decks_delta_response(
+    client: MoxfieldClient,
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    on_progress: Optional[ProgressCallback] = None,
+) -> UserDecksResponse:
+    """Fetch details only for decks that changed since the cached snapshot.
+
+    Deck summaries are compared on ``lastUpdatedAtUtc`` against the stored
+    ``last_updated_at``; unchanged decks are rehydrated from Mongo instead of
+    calling ``/v3/decks/all/{id}`` again. Decks missing upstream are simply
+    absent from the response and get pruned when the snapshot is persisted.
+    """
+    known_versions = await repository.fetch_deck_versions(username)
+
+    def _needs_detail(summary: Dict[str, Any]) -> bool:
+        public_id = summary.get("publicId")
+        if public_id not in known_versions:
+            return True
+        stored = known_versions.get(public_id)
+        current = _parse_timestamp(summary.get("lastUpdatedAtUtc"))
+        if stored is None or current is None:
+            return True
+        return _as_utc(stored) != _as_utc(current)
+
+    raw_payload = await client.collect_user_decks_with_details(
+        username, should_fetch_detail=_needs_detail, on_progress=on_progress
+    )
+    user_summary = _transform_user_summary(raw_payload["user"])
+    fetched = {deck.public_id: deck for deck in (_transform_deck(d) for d in raw_payload["decks"])}
+
+    skipped_ids = [
+        public_id for public_id in raw_payload.get("skipped_public_ids", []) if public_id not in fetched
+    ]
+    cached = await fetch_user_deck_details(repository, username, skipped_ids)
+    for public_id in skipped_ids:
+        if public_id not in cached:
+            # The cached copy vanished between the version check and the read.
+            fetched[public_id] = _transform_deck(await client.get_deck_details(public_id))
+
+    ordered_ids = raw_payload.get("public_ids") or list(fetched)
+    decks: List[DeckDetail] = []
+    for public_id in ordered_ids:
+        deck = fetched.get(public_id) or cached.get(public_id)
+        if deck is not None:
+            decks.append(deck)
+
+    logger.info(
+        "Delta deck sync for user '%s': %d fetched, %d reused from cache.",
+        user_summary.user_name,
+        len(fetched),
+        len(decks) - len(fetched),
+    )
+    return UserDecksResponse(user=user_summary, total_decks=len(decks), decks=decks)
+
+
+async def open_user_decks_stream(
+    client: MoxfieldClient,
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    batch_size: Optional[int] = None,
+) -> DeckStream:
+    """Resolve a user's deck list, then stream each deck detail as an NDJSON line.
+
+    The user lookup and summary listing happen before the first byte is sent so
+    routes can still answer 404/502. Streamed decks are persisted every
+    ``batch_size`` decks; the user document and the prune of removed decks are only
+    written once every deck has been streamed, so an interrupted stream never
+    deletes cached decks.
+    """
+    raw_user = await client.get_user_summary(username)
+    raw_summaries = await client.get_user_deck_summaries(raw_user["userName"])
+    user_summary = _transform_user_summary(raw_user)
+    public_ids = [deck["publicId"] for deck in raw_summaries if deck.get("publicId")]
+    effective_batch_size = max(1, batch_size or get_settings().deck_stream_batch_size)
+
+    async def _lines() -> AsyncIterator[bytes]:
+        synced_at = datetime.now(timezone.utc)
+        streamed_ids: List[str] = []
+        batch: List[DeckDetail] = []
+        persisted = True
+        yield encode_user_line(user_summary, len(public_ids))
+        try:
+            async for raw_deck in client.iter_deck_details(public_ids):
+                deck = _transform_deck(raw_deck)
+                yield encode_deck_line(deck)
+                streamed_ids.append(deck.public_id)
+                batch.append(deck)
+                if len(batch) >= effective_batch_size:
+                    persisted = await _persist_stream_batch(
+                        repository, user_summary, batch, synced_at
+                    ) and persisted
+                    batch = []
+        except MoxfieldError as exc:
+            logger.warning(
+                "Deck stream for user '%s' aborted after %d deck(s): %s",
+                user_summary.user_name,
+                len(streamed_ids),
+                exc,
+            )
+            if batch:
+                await _persist_stream_batch(repository, user_summary, batch, synced_at)
+            yield encode_error_line(str(exc))
+            return
+
+        if batch:
+            persisted = await _persist_stream_batch(
+                repository, user_summary, batch, synced_at
+            ) and persisted
+        if persisted:
+            try:
+                await finalize_user_decks_stream(repository, user_summary, streamed_ids, synced_at)
+            except Exception:  # pragma: no cover - defensive logging
+                logger.exception(
+                    "Finalising streamed deck sync failed for user '%s'.", user_summary.user_name
+                )
+        yield encode_end_line(len(streamed_ids))
+
+    return DeckStream(user=user_summary, total_decks=len(public_ids), lines=_lines())
+
+
+async def _persist_stream_batch(
+    repository: MoxfieldCacheRepository,
+    user: UserSummary,
+    decks: List[DeckDetail],
+    synced_at: datetime,
+) -> bool:
+    """Persist streamed decks without interrupting the stream; returns False on failure."""
+    try:
+        await persist_user_deck_batch(repository, user.user_name, decks, synced_at)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception(
+            "Deck persistence failed for user '%s' with %d streamed deck(s).",
+            user.user_name,
+            len(decks),
+        )
+        return False
+    return True
+
+
 async def build_user_deck_summaries_response(
     client: MoxfieldClient, username: str
 ) -> UserDeckSummariesResponse:
@@ -169,6 +332,13 @@ def _transform_tags(raw_tags: Any) -> List[DeckTag]:
     return tags
 
 
+def _as_utc(value: datetime) -> datetime:
+    """Normalise naive (Mongo) and aware datetimes to aware UTC for comparison."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
     if not value:
         return None
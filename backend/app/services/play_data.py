@@ -3,24 +3,32 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Iterable, List
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List
 from uuid import uuid4
 
+import anyio
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from ..config import get_settings
 from ..logging_utils import get_logger
-from ..repositories import GameRepository, PlaygroupRepository
+from ..repositories import (
+    GameRepository,
+    MatchupRepository,
+    PlaygroupRatingsRepository,
+    PlaygroupRepository,
+    PlaygroupStatsRepository,
+)
+from ..repositories.play_data import FEED_DELIVERY
 from ..schemas import (
     GameCreate,
-    GameList,
-    GamePlaygroup,
+    GameImportError,
+    GameImportReport,
     GameRecord,
     GameRanking,
     GameRankingInput,
     GamePlayer,
     GamePlayerInput,
-    DeckPerformanceSummary,
-    PlayerPerformanceSummary,
     PlayerType,
     PlaygroupCreate,
     PlaygroupDetail,
@@ -28,10 +36,16 @@ from ..schemas import (
     PlaygroupMember,
     PlaygroupMemberUpdate,
     PlaygroupReference,
-    PlaygroupStats,
     PlaygroupSummary,
     PlaygroupUpdate,
 )
+from .feed import apply_game_to_feed, plan_game_delivery
+from .game_rows import GameRow, GameRowPage, decode_game_cursor, encode_game_cursor
+from .matchups import apply_game_to_matchups, reserve_game_matchups
+from .playgroup_stats import apply_game_to_stats, load_playgroup_stats, reserve_game_stats
+from .ratings import apply_game_to_ratings, reserve_game_ratings
+from .streaming import encode_game_line, encode_games_end_line
+from .sync import RefreshScheduler
 
 logger = get_logger("services.play_data")
 
@@ -200,106 +214,6 @@ def _map_playgroup_summary(document: dict) -> PlaygroupSummary:
     return PlaygroupSummary(**data)
 
 
-def _map_game_record(document: dict) -> GameRecord:
-    playgroup = GamePlaygroup(id=document["playgroup_id"], name=document.get("playgroup_name", ""))
-    players = [
-        GamePlayer(
-            id=player["id"],
-            name=player.get("name", ""),
-            is_owner=bool(player.get("is_owner", False)),
-            deck_id=player.get("deck_id"),
-            deck_name=player.get("deck_name"),
-            deck_format=player.get("deck_format"),
-            deck_slug=player.get("deck_slug"),
-            deck_public_url=player.get("deck_public_url"),
-            order=player.get("order"),
-            player_type=player.get("player_type"),
-            google_sub=player.get("google_sub"),
-            linked_google_sub=player.get("linked_google_sub"),
-        )
-        for player in document.get("players", [])
-    ]
-    players.sort(key=lambda entry: entry.order if entry.order is not None else 0)
-
-    rankings = [
-        GameRanking(player_id=ranking.get("player_id"), rank=int(ranking.get("rank", 0)))
-        for ranking in document.get("rankings", [])
-    ]
-    rankings.sort(key=lambda entry: (entry.rank, entry.player_id))
-
-    return GameRecord(
-        id=document["id"],
-        playgroup=playgroup,
-        created_at=document.get("created_at"),
-        updated_at=document.get("updated_at"),
-        players=players,
-        rankings=rankings,
-        notes=document.get("notes"),
-    )
-
-
-def _compute_playgroup_stats(games: Iterable[GameRecord]) -> PlaygroupStats:
-    total_games = 0
-    player_map: dict[str, PlayerPerformanceSummary] = {}
-    deck_map: dict[str, DeckPerformanceSummary] = {}
-
-    for game in games:
-        total_games += 1
-        ranking_lookup = {ranking.player_id: ranking.rank for ranking in game.rankings}
-        for player in game.players:
-            key = player.google_sub or player.id
-            summary = player_map.get(key)
-            if summary is None:
-                summary = PlayerPerformanceSummary(
-                    player_id=player.id,
-                    google_sub=player.google_sub,
-                    name=player.name,
-                    games_played=0,
-                    wins=0,
-                    podiums=0,
-                )
-                player_map[key] = summary
-            summary.games_played += 1
-            rank = ranking_lookup.get(player.id)
-            if rank is not None:
-                if rank == 1:
-                    summary.wins += 1
-                if rank <= 3:
-                    summary.podiums += 1
-
-            deck_identifier = player.deck_id or player.deck_name
-            if not deck_identifier:
-                continue
-            deck_summary = deck_map.get(deck_identifier)
-            if deck_summary is None:
-                deck_summary = DeckPerformanceSummary(
-                    deck_id=player.deck_id,
-                    deck_name=player.deck_name,
-                    deck_format=player.deck_format,
-                    wins=0,
-                    games_played=0,
-                )
-                deck_map[deck_identifier] = deck_summary
-            deck_summary.games_played += 1
-            if rank == 1:
-                deck_summary.wins += 1
-
-    player_performance = sorted(
-        player_map.values(),
-        key=lambda entry: (-entry.wins, -entry.games_played, entry.name or ""),
-    )
-    deck_performance = sorted(
-        deck_map.values(),
-        key=lambda entry: (-entry.wins, -entry.games_played, entry.deck_name or ""),
-    )
-
-    return PlaygroupStats(
-        total_games=total_games,
-        player_performance=player_performance,
-        deck_performance=deck_performance,
-    )
-
-
 async def list_playgroups(database: AsyncIOMotorDatabase, owner_sub: str) -> PlaygroupList:
     repository = PlaygroupRepository(database)
     documents = await repository.list_for_owner(owner_sub)
@@ -321,38 +235,21 @@ async def upsert_playgroup(
     return _map_playgroup_summary(document)
 
 
-async def resolve_playgroup(
+async def _resolve_game_playgroup(
     database: AsyncIOMotorDatabase,
     owner_sub: str,
     reference: PlaygroupReference,
 ) -> dict:
     repository = PlaygroupRepository(database)
     cleaned = _clean_playgroup_payload(reference)
-
-    if reference.id:
-        document = await repository.find_by_id(owner_sub, reference.id)
-        if not document:
-            raise LookupError("Groupe introuvable.")
-        if document.get("name") != cleaned.name:
-            document = await repository.touch(
-                owner_sub,
-                document["id"],
-                name=cleaned.name,
-            )
-        return document
-
-    return await repository.upsert(owner_sub, cleaned.name)
+    document = await repository.resolve_for_game(owner_sub, cleaned.name, playgroup_id=reference.id)
+    if not document:
+        raise LookupError("Groupe introuvable.")
+    return document
 
 
-async def record_game(
-    database: AsyncIOMotorDatabase,
-    owner_sub: str,
-    payload: GameCreate,
-) -> GameRecord:
-    playgroups = PlaygroupRepository(database)
-    games = GameRepository(database)
-
-    resolved_playgroup = await resolve_playgroup(database, owner_sub, payload.playgroup)
+def _new_game_document(owner_sub: str, payload: GameCreate) -> dict:
+    """Validate a game payload and build its stored document, minus the playgroup fields."""
     players = _clean_player_payload(payload.players, owner_sub)
 
     if len(players) < 2:
@@ -361,41 +258,199 @@ async def record_game(
     rankings = _clean_rankings(payload.rankings, (player.id for player in players))
 
     recorded_at = payload.recorded_at or _now()
-    notes = _trim(payload.notes) or None
-
-    document = {
+    return {
         "id": uuid4().hex,
         "owner_sub": owner_sub,
-        "playgroup_id": resolved_playgroup["id"],
-        "playgroup_name": resolved_playgroup.get("name", ""),
         "created_at": recorded_at,
         "updated_at": recorded_at,
         "players": [player.model_dump() for player in players],
         "rankings": [ranking.model_dump() for ranking in rankings],
-        "notes": notes,
+        "notes": _trim(payload.notes) or None,
     }
 
-    await games.save(document)
 
-    game_count = int(resolved_playgroup.get("game_count", 0)) + 1
-    updated_playgroup = await playgroups.touch(
-        owner_sub,
-        resolved_playgroup["id"],
-        last_used_at=recorded_at,
-        game_count=game_count,
-        name=resolved_playgroup.get("name"),
-    )
-    if updated_playgroup:
-        document["playgroup_name"] = updated_playgroup.get("name", document["playgroup_name"])
+async def record_game(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    payload: GameCreate,
+    *,
+    schedule_fanout: RefreshScheduler | None = None,
+) -> GameRecord:
+    """Record a game: reserve its derived views, insert it, then count and fold it.
+
+    The payload is fully validated first and the playgroup is only counted once the
+    insert succeeded, so a rejected or failed game never counts against it. The
+    reservations (stats, leaderboards, matchups, feed delivery) are independent and
+    run concurrently, as do the updates after the insert. Fanning the game out to
+    follower timelines is handed to ``schedule_fanout`` (``BackgroundTasks.add_task``
+    in the router) so it runs after the response; without one it is awaited here.
+    """
+    document = _new_game_document(owner_sub, payload)
+    playgroup = await _resolve_game_playgroup(database, owner_sub, payload.playgroup)
+    playgroup_id = playgroup["id"]
+    document["playgroup_id"] = playgroup_id
+    document["playgroup_name"] = playgroup.get("name", "")
+
+    reserved: dict[str, Any] = {}
+
+    async def reserve(key: str, reservation: Callable[[], Awaitable[Any]]) -> None:
+        reserved[key] = await reservation()
+
+    # Reserve before inserting so a rebuild racing the insert cannot count the game twice.
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(
+            reserve, "stats", partial(reserve_game_stats, database, owner_sub, playgroup_id)
+        )
+        task_group.start_soon(reserve, "ratings", partial(reserve_game_ratings, database, document))
+        task_group.start_soon(
+            reserve, "matchups", partial(reserve_game_matchups, database, owner_sub)
+        )
+        task_group.start_soon(
+            reserve, FEED_DELIVERY, partial(plan_game_delivery, database, owner_sub)
+        )
+    document[FEED_DELIVERY] = reserved[FEED_DELIVERY]
+    await GameRepository(database).insert(document)
+
+    # The game is stored: its playgroup count and derived views must follow even if
+    # the client goes away.
+    with anyio.CancelScope(shield=True):
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(
+                partial(
+                    PlaygroupRepository(database).register_game,
+                    owner_sub,
+                    playgroup,
+                    played_at=document["created_at"],
+                )
+            )
+            task_group.start_soon(apply_game_to_stats, database, document, reserved["stats"])
+            task_group.start_soon(apply_game_to_ratings, database, document, reserved["ratings"])
+            task_group.start_soon(
+                apply_game_to_matchups, database, document, reserved["matchups"]
+            )
+    if schedule_fanout is None:
+        await apply_game_to_feed(database, document)
+    else:
+        schedule_fanout(partial(apply_game_to_feed, database, document))
 
     logger.info(
         "Recorded game '%s' for owner '%s' in playgroup '%s'",
         document["id"],
         owner_sub,
-        document["playgroup_id"],
+        playgroup_id,
     )
 
-    return _map_game_record(document)
+    return GameRow.from_document(document).to_record()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+async def import_games(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    rows: AsyncIterator[tuple[int, GameCreate | str]],
+) -> GameImportReport:
+    """Validate and store parsed import rows in batches, then update playgroups once.
+
+    ``rows`` yields ``(row_number, payload)`` pairs, where a string payload is the
+    reason the row could not be parsed. Each distinct playgroup reference is resolved
+    once (named playgroups are created as needed), games are inserted through
+    unordered ``bulk_write`` batches, and playgroup counters, stats and leaderboards
+    are updated in a single pass at the end. Rejected rows are reported, not fatal.
+
+    Stats, leaderboards and matchups are flagged stale before a playgroup's first
+    batch lands, and the final pass also runs when the stream is cut off midway, so
+    the games already stored are always counted.
+    """
+    playgroups = PlaygroupRepository(database)
+    games = GameRepository(database)
+    batch_size = get_settings().mongo_bulk_write_batch_size
+    flagged: set[str] = set()
+    resolved: dict[tuple[str, str], dict | None] = {}
+    usage: dict[str, tuple[int, datetime]] = {}
+    errors: list[GameImportError] = []
+    pending: list[tuple[int, dict]] = []
+    imported = 0
+
+    async def resolve(reference: PlaygroupReference) -> dict:
+        name = _clean_playgroup_payload(reference).name
+        key = ("id", reference.id) if reference.id else ("name", " ".join(name.split()).casefold())
+        if key not in resolved:
+            resolved[key] = (
+                await playgroups.find_by_id(owner_sub, reference.id)
+                if reference.id
+                else await playgroups.upsert(owner_sub, name)
+            )
+        document = resolved[key]
+        if not document:
+            raise LookupError("Groupe introuvable.")
+        return document
+
+    async def flag_stale(playgroup_ids: list[str]) -> None:
+        await PlaygroupStatsRepository(database).mark_playgroups_stale(owner_sub, playgroup_ids)
+        await PlaygroupRatingsRepository(database).mark_playgroups_stale(owner_sub, playgroup_ids)
+        await MatchupRepository(database).mark_stale(owner_sub)
+
+    async def flush() -> int:
+        unflagged = sorted({document["playgroup_id"] for _, document in pending} - flagged)
+        if unflagged:
+            await flag_stale(unflagged)
+            flagged.update(unflagged)
+        failures = await games.bulk_insert([document for _, document in pending])
+        stored = 0
+        for index, (row, document) in enumerate(pending):
+            if index in failures:
+                errors.append(GameImportError(row=row, error=failures[index] or "Insertion refusée."))
+                continue
+            stored += 1
+            played_at = _as_utc(document["created_at"])
+            count, latest = usage.get(document["playgroup_id"], (0, played_at))
+            usage[document["playgroup_id"]] = (count + 1, max(latest, played_at))
+        pending.clear()
+        return stored
+
+    try:
+        async for row, payload in rows:
+            if isinstance(payload, str):
+                errors.append(GameImportError(row=row, error=payload))
+                continue
+            try:
+                document = _new_game_document(owner_sub, payload)
+                playgroup = await resolve(payload.playgroup)
+            except (LookupError, ValueError) as error:
+                errors.append(GameImportError(row=row, error=str(error)))
+                continue
+            document["playgroup_id"] = playgroup["id"]
+            document["playgroup_name"] = playgroup.get("name", "")
+            pending.append((row, document))
+            if len(pending) >= batch_size:
+                imported += await flush()
+        if pending:
+            imported += await flush()
+    finally:
+        # Count what was stored even if the stream was cut off or the client went away.
+        playgroup_ids = list(usage)
+        if playgroup_ids:
+            with anyio.CancelScope(shield=True):
+                await playgroups.add_games(owner_sub, usage)
+                await flag_stale(playgroup_ids)
+
+    errors.sort(key=lambda entry: entry.row)
+    logger.info(
+        "Imported %d game(s) for owner '%s' into %d playgroup(s); %d row(s) rejected.",
+        imported,
+        owner_sub,
+        len(playgroup_ids),
+        len(errors),
+    )
+    return GameImportReport(
+        imported=imported,
+        rejected=len(errors),
+        playgroup_ids=playgroup_ids,
+        errors=errors,
+    )
 
 
 async def list_games(
@@ -404,11 +459,65 @@ async def list_games(
     *,
     playgroup_id: str | None = None,
     limit: int | None = None,
-) -> GameList:
+    cursor: str | None = None,
+) -> GameRowPage:
+    """List games newest first as compact rows; with ``limit``, return one page plus ``next_cursor``."""
     repository = GameRepository(database)
-    documents = await repository.list_for_owner(owner_sub, playgroup_id=playgroup_id, limit=limit)
-    records = [_map_game_record(document) for document in documents]
-    return GameList(games=records)
+    after = decode_game_cursor(cursor) if cursor else None
+    # Read one extra game to know whether another page exists.
+    fetch_limit = limit + 1 if limit else None
+    documents = await repository.list_for_owner(
+        owner_sub, playgroup_id=playgroup_id, limit=fetch_limit, after=after
+    )
+    next_cursor = None
+    if limit and len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_game_cursor(documents[-1])
+    return GameRowPage([GameRow.from_document(document) for document in documents], next_cursor)
+
+
+async def iter_game_pages(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    *,
+    playgroup_id: str | None = None,
+    cursor: str | None = None,
+    page_size: int | None = None,
+) -> AsyncIterator[GameRowPage]:
+    """Yield successive keyset pages until the history is exhausted."""
+    size = page_size or get_settings().game_stream_page_size
+    while True:
+        page = await list_games(
+            database, owner_sub, playgroup_id=playgroup_id, limit=size, cursor=cursor
+        )
+        yield page
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
+
+
+def stream_games(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    *,
+    playgroup_id: str | None = None,
+    cursor: str | None = None,
+) -> AsyncIterator[bytes]:
+    """Return NDJSON lines for every game after ``cursor``, read one keyset page at a time."""
+    if cursor:
+        decode_game_cursor(cursor)  # Reject bad tokens before the response starts.
+
+    async def lines() -> AsyncIterator[bytes]:
+        streamed = 0
+        async for page in iter_game_pages(
+            database, owner_sub, playgroup_id=playgroup_id, cursor=cursor
+        ):
+            for game in page.games:
+                streamed += 1
+                yield encode_game_line(game)
+        yield encode_games_end_line(streamed)
+
+    return lines()
 
 
 async def get_playgroup_detail(
@@ -422,9 +531,9 @@ async def get_playgroup_detail(
         raise LookupError("Groupe introuvable.")
 
     members = _extract_members(document)
-    games = await list_games(database, owner_sub, playgroup_id=playgroup_id)
-    stats = _compute_playgroup_stats(games.games)
-    recent_games = games.games[:5]
+    stats = await load_playgroup_stats(database, owner_sub, playgroup_id)
+    page = await list_games(database, owner_sub, playgroup_id=playgroup_id, limit=5)
+    recent_games = [game.to_record() for game in page.games]
 
     return PlaygroupDetail(
         id=document["id"],
@@ -475,3 +584,5 @@ async def delete_playgroup(
     deleted = await repository.delete(owner_sub, playgroup_id)
     if not deleted:
         raise LookupError("Groupe introuvable.")
+    await PlaygroupStatsRepository(database).delete(owner_sub, playgroup_id)
+    await PlaygroupRatingsRepository(database).delete_for_playgroup(owner_sub, playgroup_id)
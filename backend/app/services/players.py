@@ -8,7 +8,14 @@ from typing import List
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..logging_utils import get_logger
-from ..repositories import FollowRepository, GameRepository, PlayerRepository
+from ..repositories import (
+    FollowRepository,
+    GameRepository,
+    MatchupRepository,
+    PlayerRepository,
+    PlaygroupRatingsRepository,
+    PlaygroupStatsRepository,
+)
 from ..schemas import (
     MoxfieldDeckSelection,
     PlayerCreate,
@@ -182,6 +189,10 @@ async def link_tracked_player(
         player_type=PlayerType.USER.value,
         name=document.get("name"),
     )
+    # Linking merges the seat into the account's stats and rating entries; rebuild on next read.
+    await PlaygroupStatsRepository(database).mark_stale(owner_sub)
+    await PlaygroupRatingsRepository(database).mark_stale(owner_sub)
+    await MatchupRepository(database).mark_stale(owner_sub)
 
     return _map_player_document(document)
 
@@ -0,0 +1,197 @@
+"""Materialized playgroup statistics maintained incrementally as games are recorded."""
+
+from __future__ import annotations
+
+import base64
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..logging_utils import get_logger
+from ..repositories import GameAnalyticsRepository, PlaygroupStatsRepository
+from ..schemas import DeckPerformanceSummary, PlayerPerformanceSummary, PlaygroupStats
+
+logger = get_logger("services.playgroup_stats")
+
+
+def stats_key(identifier: str) -> str:
+    """Encode player/deck identifiers into Mongo-safe field names (no ``.`` or ``$``)."""
+    return base64.urlsafe_b64encode(identifier.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def game_stats_delta(game: dict[str, Any]) -> tuple[dict[str, int], dict[str, Any]]:
+    """Return the ``$inc`` and ``$set`` paths that fold ``game`` into a stats document.
+
+    Players are keyed by Google account when linked (falling back to the seat id)
+    and decks by id (falling back to the name). Descriptive fields are overwritten,
+    so the most recently applied game provides names and formats.
+    """
+    increments: dict[str, int] = {"total_games": 1}
+    updates: dict[str, Any] = {}
+    ranks = {
+        ranking.get("player_id"): int(ranking.get("rank", 0))
+        for ranking in game.get("rankings", []) or []
+    }
+
+    for player in game.get("players", []) or []:
+        player_key = player.get("google_sub") or player.get("id")
+        if not player_key:
+            continue
+        rank = ranks.get(player.get("id"))
+        base = f"players.{stats_key(player_key)}"
+        _add(increments, f"{base}.games_played", 1)
+        _add(increments, f"{base}.wins", 1 if rank == 1 else 0)
+        _add(increments, f"{base}.podiums", 1 if rank is not None and rank <= 3 else 0)
+        updates[f"{base}.player_id"] = player.get("id")
+        updates[f"{base}.google_sub"] = player.get("google_sub")
+        updates[f"{base}.name"] = player.get("name")
+
+        deck_key = player.get("deck_id") or player.get("deck_name")
+        if not deck_key:
+            continue
+        deck_base = f"decks.{stats_key(deck_key)}"
+        _add(increments, f"{deck_base}.games_played", 1)
+        _add(increments, f"{deck_base}.wins", 1 if rank == 1 else 0)
+        updates[f"{deck_base}.deck_id"] = player.get("deck_id")
+        updates[f"{deck_base}.deck_name"] = player.get("deck_name")
+        updates[f"{deck_base}.deck_format"] = player.get("deck_format")
+
+    return increments, updates
+
+
+def _add(increments: dict[str, int], path: str, amount: int) -> None:
+    increments[path] = increments.get(path, 0) + amount
+
+
+async def _aggregate_stats_document(
+    database: AsyncIOMotorDatabase, owner_sub: str, playgroup_id: str
+) -> dict[str, Any]:
+    """Build a stats document from aggregation rows so only grouped totals are transferred."""
+    analytics = GameAnalyticsRepository(database)
+    players = await analytics.player_performance(owner_sub, playgroup_id=playgroup_id)
+    decks = await analytics.deck_performance(owner_sub, playgroup_id=playgroup_id)
+    return {
+        "total_games": await analytics.count_games(owner_sub, playgroup_id=playgroup_id),
+        "players": {
+            stats_key(row["_id"]): {key: value for key, value in row.items() if key != "_id"}
+            for row in players
+        },
+        "decks": {
+            stats_key(row["_id"]): {key: value for key, value in row.items() if key != "_id"}
+            for row in decks
+        },
+    }
+
+
+def to_playgroup_stats(document: dict[str, Any] | None) -> PlaygroupStats:
+    """Convert a stats document into the API payload, sorted like the leaderboard."""
+    if not document:
+        return PlaygroupStats()
+    players = [
+        PlayerPerformanceSummary(
+            player_id=entry.get("player_id"),
+            google_sub=entry.get("google_sub"),
+            name=entry.get("name"),
+            games_played=int(entry.get("games_played", 0)),
+            wins=int(entry.get("wins", 0)),
+            podiums=int(entry.get("podiums", 0)),
+        )
+        for entry in (document.get("players") or {}).values()
+    ]
+    decks = [
+        DeckPerformanceSummary(
+            deck_id=entry.get("deck_id"),
+            deck_name=entry.get("deck_name"),
+            deck_format=entry.get("deck_format"),
+            games_played=int(entry.get("games_played", 0)),
+            wins=int(entry.get("wins", 0)),
+        )
+        for entry in (document.get("decks") or {}).values()
+    ]
+    players.sort(key=lambda entry: (-entry.wins, -entry.games_played, entry.name or ""))
+    decks.sort(key=lambda entry: (-entry.wins, -entry.games_played, entry.deck_name or ""))
+    return PlaygroupStats(
+        total_games=int(document.get("total_games", 0)),
+        player_performance=players,
+        deck_performance=decks,
+    )
+
+
+async def reserve_game_stats(
+    database: AsyncIOMotorDatabase, owner_sub: str, playgroup_id: str
+) -> int | None:
+    """Reserve a stats generation for a game about to be inserted.
+
+    Must run before the insert: a rebuild racing the insert either misses the
+    reservation and cannot land, or lands and invalidates it. Returns ``None`` when
+    the stats are stale, missing or could not be reached.
+    """
+    try:
+        return await PlaygroupStatsRepository(database).reserve_generation(owner_sub, playgroup_id)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Failed to reserve stats for playgroup '%s'.", playgroup_id)
+        return None
+
+
+async def apply_game_to_stats(
+    database: AsyncIOMotorDatabase, game: dict[str, Any], generation: int | None
+) -> None:
+    """Fold a newly recorded game into its playgroup stats with a single ``$inc`` update.
+
+    ``generation`` comes from :func:`reserve_game_stats`; if anything moved since,
+    the stats are flagged for a rebuild instead.
+    """
+    repository = PlaygroupStatsRepository(database)
+    increments, updates = game_stats_delta(game)
+    try:
+        applied = await repository.apply_increments(
+            game["owner_sub"],
+            game["playgroup_id"],
+            generation=generation,
+            increments=increments,
+            updates=updates,
+        )
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception(
+            "Failed to update stats for playgroup '%s'; it will be rebuilt on next read.",
+            game.get("playgroup_id"),
+        )
+        return
+    if not applied:
+        logger.info(
+            "Stats for playgroup '%s' are missing or stale; deferring to a rebuild.",
+            game["playgroup_id"],
+        )
+
+
+async def rebuild_playgroup_stats(
+    database: AsyncIOMotorDatabase, owner_sub: str, playgroup_id: str
+) -> dict[str, Any]:
+    """Recompute a playgroup's stats with aggregation pipelines and store them if nothing raced us."""
+    repository = PlaygroupStatsRepository(database)
+    current = await repository.find(owner_sub, playgroup_id)
+    if current is None:
+        await repository.mark_stale(owner_sub, playgroup_id)
+        current = await repository.find(owner_sub, playgroup_id) or {}
+    generation = int(current.get("generation", 0))
+
+    document = await _aggregate_stats_document(database, owner_sub, playgroup_id)
+    stored = await repository.replace_if_generation(owner_sub, playgroup_id, generation, document)
+    logger.info(
+        "Rebuilt stats for playgroup '%s' from %d game(s)%s.",
+        playgroup_id,
+        document["total_games"],
+        "" if stored else " (not stored: a game was recorded meanwhile)",
+    )
+    return document
+
+
+async def load_playgroup_stats(
+    database: AsyncIOMotorDatabase, owner_sub: str, playgroup_id: str
+) -> PlaygroupStats:
+    """Return materialized stats, rebuilding them first when missing or stale."""
+    repository = PlaygroupStatsRepository(database)
+    document = await repository.find(owner_sub, playgroup_id)
+    if document is None or document.get("stale", True):
+        document = await rebuild_playgroup_stats(database, owner_sub, playgroup_id)
+    return to_playgroup_stats(document)
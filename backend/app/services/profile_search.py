@@ -0,0 +1,105 @@
+"""Autocomplete tokens for public profile search.
+
+Each profile stores the accent-folded edge prefixes of the words in its display name
+(or given name) and email local part, the whole words themselves, plus a folded sort
+key. A search-as-you-type query is then an indexed ``$all`` lookup on those prefixes,
+sorted by name, with name-prefix and whole-word matches ranked first. Words are
+Unicode word runs, so Cyrillic, Greek or CJK names are searchable too.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..repositories.profiles import SEARCH_NAME, SEARCH_PREFIXES, SEARCH_VERSION, SEARCH_WORDS
+
+logger = get_logger("services.profile_search")
+
+MAX_PREFIX_LENGTH = 20
+# Bump when the tokenizer changes so the startup backfill recomputes stored prefixes.
+SEARCH_FIELDS_VERSION = 3
+_WORD = re.compile(r"\w+")
+
+
+def fold_text(value: str | None) -> str:
+    """Casefold ``value`` and strip accents (``Éloïse`` → ``eloise``)."""
+    if not isinstance(value, str):
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def search_words(value: str | None) -> list[str]:
+    return _WORD.findall(fold_text(value))
+
+
+def query_tokens(query: str | None) -> list[str]:
+    """Return the prefix tokens a query must all match, longest first.
+
+    Mongo bounds an ``$all`` index scan on its first element, so the most selective
+    token leads.
+    """
+    tokens = {word[:MAX_PREFIX_LENGTH] for word in search_words(query)}
+    return sorted(tokens, key=lambda token: (-len(token), token))
+
+
+def profile_search_fields(document: dict[str, Any]) -> dict[str, Any]:
+    """Return the stored search fields for a profile document."""
+    name = document.get("display_name") or document.get("given_name") or ""
+    email = document.get("email") or ""
+    words = [word[:MAX_PREFIX_LENGTH] for word in search_words(name)]
+    words += [word[:MAX_PREFIX_LENGTH] for word in search_words(email.split("@", 1)[0])]
+    prefixes = {
+        word[:length]
+        for word in words
+        for length in range(1, len(word) + 1)
+    }
+    return {
+        SEARCH_PREFIXES: sorted(prefixes),
+        # Whole words, capped like query tokens, so exact word matches can rank first.
+        SEARCH_WORDS: sorted(set(words)),
+        SEARCH_NAME: fold_text(name).strip(),
+        SEARCH_VERSION: SEARCH_FIELDS_VERSION,
+    }
+
+
+async def backfill_profile_search_fields(database: AsyncIOMotorDatabase) -> int:
+    """Store search fields on profiles written before they (or this tokenizer) existed.
+
+    Returns the number of profiles updated.
+    """
+    settings = get_settings()
+    profiles = database[settings.mongo_users_collection]
+    batch_size = settings.mongo_bulk_write_batch_size
+    cursor = profiles.find(
+        {SEARCH_VERSION: {"$ne": SEARCH_FIELDS_VERSION}},
+        {"_id": 0, "google_sub": 1, "display_name": 1, "given_name": 1, "email": 1},
+    )
+    operations: list[UpdateOne] = []
+    updated = 0
+    async for document in cursor:
+        if not document.get("google_sub"):
+            continue
+        operations.append(
+            UpdateOne(
+                {"google_sub": document["google_sub"]},
+                {"$set": profile_search_fields(document)},
+            )
+        )
+        if len(operations) >= batch_size:
+            await profiles.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+    if operations:
+        await profiles.bulk_write(operations, ordered=False)
+        updated += len(operations)
+    if updated:
+        logger.info("Stored search prefixes on %d profile(s).", updated)
+    return updated
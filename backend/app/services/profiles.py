@@ -2,32 +2,171 @@
 
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Iterable
+from typing import Any, Iterable, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..config import get_settings
+from ..repositories.follows import FOLLOWERS_COUNT, FOLLOWING_COUNT
+from ..repositories.profiles import SEARCH_NAME, SEARCH_PREFIXES, SEARCH_VERSION, SEARCH_WORDS
 from ..schemas import UserProfile, UserProfileUpdate
+from .profile_search import profile_search_fields
 
 
-async def fetch_user_profile(
+ProfileEntry = tuple[UserProfile, Optional[tuple[int, int]]]
+
+
+class ProfileCache:
+    """Bounded, TTL-based ``google_sub -> (profile, follow counts)`` cache.
+
+    Entries are evicted least recently used first and expire ``ttl_seconds`` after
+    being read from Mongo. Writes in this process invalidate explicitly; the TTL
+    bounds how long another worker's writes can go unseen. Missing profiles are
+    not cached.
+
+    Readers take a :meth:`version` before reading Mongo and pass it to :meth:`put`,
+    which drops the entry if the profile was invalidated meanwhile, so a slow read
+    cannot cache data older than a concurrent write.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = max(0, maxsize)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, ProfileEntry]] = OrderedDict()
+        # Version at which each recently written profile was invalidated, oldest first.
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._version = 0
+        # Reads started before this version may miss a write whose record was pruned.
+        self._oldest_valid_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, google_sub: str) -> ProfileEntry | None:
+        cached = self._entries.get(google_sub)
+        if cached is not None and cached[0] > time.monotonic():
+            self._entries.move_to_end(google_sub)
+            self.hits += 1
+            return cached[1]
+        if cached is not None:
+            del self._entries[google_sub]
+        self.misses += 1
+        return None
+
+    def version(self) -> int:
+        """Return the token to pass to :meth:`put` for a read about to start."""
+        return self._version
+
+    def put(self, google_sub: str, entry: ProfileEntry, *, version: int) -> None:
+        if self.maxsize == 0:
+            return
+        if version < self._oldest_valid_version or self._invalidated.get(google_sub, 0) > version:
+            return
+        self._entries[google_sub] = (time.monotonic() + self.ttl_seconds, entry)
+        self._entries.move_to_end(google_sub)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *google_subs: str) -> None:
+        self._version += 1
+        for google_sub in google_subs:
+            self._entries.pop(google_sub, None)
+            self._invalidated[google_sub] = self._version
+            self._invalidated.move_to_end(google_sub)
+        while len(self._invalidated) > max(1, self.maxsize):
+            _, pruned = self._invalidated.popitem(last=False)
+            self._oldest_valid_version = max(self._oldest_valid_version, pruned)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.clear()
+        self._version += 1
+        self._oldest_valid_version = self._version
+
+    def snapshot(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_profile_cache: Optional[ProfileCache] = None
+
+
+def get_profile_cache() -> ProfileCache:
+    """Return the process-wide profile cache."""
+    global _profile_cache
+    if _profile_cache is None:
+        settings = get_settings()
+        _profile_cache = ProfileCache(settings.profile_cache_size, settings.profile_cache_ttl_seconds)
+    return _profile_cache
+
+
+def _to_entry(document: dict[str, Any]) -> ProfileEntry:
+    counts = None
+    if FOLLOWERS_COUNT in document and FOLLOWING_COUNT in document:
+        counts = (int(document[FOLLOWERS_COUNT]), int(document[FOLLOWING_COUNT]))
+    return UserProfile.model_validate(_strip_profile_storage_fields(document)), counts
+
+
+async def _load_profile_entry(
     database: AsyncIOMotorDatabase, google_sub: str
-) -> UserProfile | None:
-    """Return the persisted profile for the given Google subject identifier."""
+) -> ProfileEntry | None:
+    cache = get_profile_cache()
+    entry = cache.get(google_sub)
+    if entry is not None:
+        return entry
+    version = cache.version()
     settings = get_settings()
     profiles = database[settings.mongo_users_collection]
     document = await profiles.find_one({"google_sub": google_sub})
     if not document:
         return None
-    return UserProfile.model_validate(_strip_profile_storage_fields(document))
+    entry = _to_entry(document)
+    cache.put(google_sub, entry, version=version)
+    return entry
+
+
+async def fetch_user_profile(
+    database: AsyncIOMotorDatabase, google_sub: str
+) -> UserProfile | None:
+    """Return the persisted profile for the given Google subject identifier."""
+    entry = await _load_profile_entry(database, google_sub)
+    return entry[0] if entry else None
+
+
+async def fetch_user_profile_with_follow_counts(
+    database: AsyncIOMotorDatabase, google_sub: str
+) -> tuple[UserProfile | None, tuple[int, int] | None]:
+    """Return the profile and its stored ``(followers, following)`` counts in one read.
+
+    The counts are ``None`` until they have been initialised on the profile document.
+    """
+    entry = await _load_profile_entry(database, google_sub)
+    return entry if entry else (None, None)
 
 
 async def fetch_user_profiles(
     database: AsyncIOMotorDatabase,
     google_subs: Iterable[str],
 ) -> dict[str, UserProfile]:
-    """Return a mapping of Google subject identifiers to their stored profiles."""
+    """Return a mapping of Google subject identifiers to their stored profiles.
+
+    Cached profiles are served directly; only the misses are read, in one ``$in`` query.
+    """
     normalized_subs: set[str] = set()
     for raw in google_subs:
         if not isinstance(raw, str):
@@ -39,19 +178,31 @@ async def fetch_user_profiles(
     if not normalized_subs:
         return {}
 
+    cache = get_profile_cache()
+    profiles_by_sub: dict[str, UserProfile] = {}
+    missing: list[str] = []
+    for google_sub in sorted(normalized_subs):
+        entry = cache.get(google_sub)
+        if entry is None:
+            missing.append(google_sub)
+        else:
+            profiles_by_sub[google_sub] = entry[0]
+    if not missing:
+        return profiles_by_sub
+
+    version = cache.version()
     settings = get_settings()
     profiles_collection = database[settings.mongo_users_collection]
-    cursor = profiles_collection.find({"google_sub": {"$in": list(normalized_subs)}})
+    cursor = profiles_collection.find({"google_sub": {"$in": missing}})
     documents = await cursor.to_list(length=None)
 
-    profiles_by_sub: dict[str, UserProfile] = {}
     for document in documents:
         google_sub = document.get("google_sub")
         if not isinstance(google_sub, str):
             continue
-        profiles_by_sub[google_sub] = UserProfile.model_validate(
-            _strip_profile_storage_fields(document)
-        )
+        entry = _to_entry(document)
+        cache.put(google_sub, entry, version=version)
+        profiles_by_sub[google_sub] = entry[0]
     return profiles_by_sub
 
 
@@ -106,12 +257,14 @@ async def upsert_user_profile(
     merged.setdefault("moxfield_decks", [])
     merged.setdefault("is_public", False)
     merged["updated_at"] = now
+    merged.update(profile_search_fields(merged))
 
     await profiles.update_one(
         {"google_sub": google_sub},
         {"$set": merged},
         upsert=True,
     )
+    get_profile_cache().invalidate(google_sub)
 
     stored = await profiles.find_one({"google_sub": google_sub})
     if not stored:
@@ -120,7 +273,13 @@ async def upsert_user_profile(
 
 
 def _strip_profile_storage_fields(document: dict[str, Any]) -> dict[str, Any]:
-    """Drop Mongo-specific fields before validating with Pydantic."""
+    """Drop Mongo-specific and denormalized fields before validating with Pydantic."""
     clean_doc = dict(document)
     clean_doc.pop("_id", None)
+    clean_doc.pop(FOLLOWERS_COUNT, None)
+    clean_doc.pop(FOLLOWING_COUNT, None)
+    clean_doc.pop(SEARCH_PREFIXES, None)
+    clean_doc.pop(SEARCH_NAME, None)
+    clean_doc.pop(SEARCH_VERSION, None)
+    clean_doc.pop(SEARCH_WORDS, None)
     return clean_doc
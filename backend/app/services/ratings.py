@@ -0,0 +1,353 @@
+"""Multiplayer Elo ratings and rolling-window playgroup leaderboards."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Mapping
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..repositories import GameRepository, PlaygroupRatingsRepository, PlaygroupRepository
+from ..schemas import DeckRating, LeaderboardWindow, PlayerRating, PlaygroupLeaderboard
+from .playgroup_stats import stats_key
+
+logger = get_logger("services.ratings")
+
+INITIAL_RATING = 1500.0
+
+_WINDOW_DAYS: dict[LeaderboardWindow, int | None] = {
+    LeaderboardWindow.DAYS_30: 30,
+    LeaderboardWindow.DAYS_90: 90,
+    LeaderboardWindow.DAYS_365: 365,
+    LeaderboardWindow.ALL_TIME: None,
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Mongo returns naive UTC datetimes; compare everything as aware UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def multiplayer_elo_deltas(
+    ratings: Mapping[str, float],
+    ranks: Mapping[str, int],
+    k_factor: float,
+) -> dict[str, float]:
+    """Return rating changes for one game, scored as pairwise Elo duels.
+
+    Every pair of seats is a duel won by the better rank (ties score 0.5). The
+    K-factor is divided by ``n - 1`` so a game moves at most ``k_factor`` points
+    per player regardless of pod size; deltas always sum to zero.
+    """
+    keys = list(ranks)
+    if len(keys) < 2:
+        return {key: 0.0 for key in keys}
+    scale = k_factor / (len(keys) - 1)
+    deltas: dict[str, float] = {}
+    for key in keys:
+        total = 0.0
+        for opponent in keys:
+            if opponent == key:
+                continue
+            expected = 1.0 / (1.0 + 10 ** ((ratings[opponent] - ratings[key]) / 400.0))
+            if ranks[key] < ranks[opponent]:
+                actual = 1.0
+            elif ranks[key] == ranks[opponent]:
+                actual = 0.5
+            else:
+                actual = 0.0
+            total += actual - expected
+        deltas[key] = scale * total
+    return deltas
+
+
+# Ranked seats of one game: leaderboard key -> (rank, entry fields).
+Seats = dict[str, tuple[int, dict[str, Any]]]
+
+
+def _empty_state() -> dict[str, Any]:
+    return {
+        "total_games": 0,
+        "players": {},
+        "decks": {},
+        "oldest_game_at": None,
+        "last_game_at": None,
+        "expires_at": None,
+    }
+
+
+def _rate_entries(
+    entries: dict[str, dict[str, Any]],
+    seats: Seats,
+    k_factor: float,
+) -> None:
+    ratings = {
+        key: float(entries.get(key, {}).get("rating", INITIAL_RATING)) for key in seats
+    }
+    deltas = multiplayer_elo_deltas(
+        ratings, {key: rank for key, (rank, _) in seats.items()}, k_factor
+    )
+    for key, (rank, fields) in seats.items():
+        entry = entries.setdefault(key, {"games_played": 0, "wins": 0})
+        entry.update(fields)
+        entry["rating"] = ratings[key] + deltas[key]
+        entry["games_played"] = int(entry.get("games_played", 0)) + 1
+        entry["wins"] = int(entry.get("wins", 0)) + (1 if rank == 1 else 0)
+
+
+def _game_seats(game: Mapping[str, Any]) -> tuple[Seats, Seats]:
+    """Return the ranked player and deck entries of one game, keyed like the leaderboards."""
+    ranks = {
+        ranking.get("player_id"): int(ranking.get("rank", 0))
+        for ranking in game.get("rankings", []) or []
+    }
+    players: Seats = {}
+    decks: Seats = {}
+    for player in game.get("players", []) or []:
+        rank = ranks.get(player.get("id"))
+        player_key = player.get("google_sub") or player.get("id")
+        if rank is None or not player_key:
+            continue
+        players.setdefault(
+            stats_key(player_key),
+            (
+                rank,
+                {
+                    "player_id": player.get("id"),
+                    "google_sub": player.get("google_sub"),
+                    "name": player.get("name"),
+                },
+            ),
+        )
+        deck_key = player.get("deck_id") or player.get("deck_name")
+        if deck_key:
+            decks.setdefault(
+                stats_key(deck_key),
+                (
+                    rank,
+                    {
+                        "deck_id": player.get("deck_id"),
+                        "deck_name": player.get("deck_name"),
+                        "deck_format": player.get("deck_format"),
+                    },
+                ),
+            )
+    return players, decks
+
+
+def _fold_game(state: dict[str, Any], game: dict[str, Any], k_factor: float) -> None:
+    """Apply one game to a leaderboard state, rating players and decks separately."""
+    players, decks = _game_seats(game)
+    _rate_entries(state["players"], players, k_factor)
+    _rate_entries(state["decks"], decks, k_factor)
+    played_at = _as_utc(game["created_at"])
+    state["total_games"] = int(state.get("total_games", 0)) + 1
+    if state.get("oldest_game_at") is None:
+        state["oldest_game_at"] = played_at
+    state["last_game_at"] = played_at
+
+
+def _expires_at(state: Mapping[str, Any], window: LeaderboardWindow) -> datetime | None:
+    """When the oldest rated game leaves the window, the leaderboard must be replayed."""
+    days = _WINDOW_DAYS[window]
+    oldest = state.get("oldest_game_at")
+    if days is None or oldest is None:
+        return None
+    return _as_utc(oldest) + timedelta(days=days)
+
+
+def _state_fields(state: Mapping[str, Any], window: LeaderboardWindow) -> dict[str, Any]:
+    return {
+        "total_games": state["total_games"],
+        "players": state["players"],
+        "decks": state["decks"],
+        "oldest_game_at": state["oldest_game_at"],
+        "last_game_at": state["last_game_at"],
+        "expires_at": _expires_at(state, window),
+    }
+
+
+def _game_fields(
+    state: Mapping[str, Any], window: LeaderboardWindow, game: Mapping[str, Any]
+) -> dict[str, Any]:
+    """``$set`` paths for an incremental update: only the entries ``game`` touched."""
+    players, decks = _game_seats(game)
+    fields = {f"players.{key}": state["players"][key] for key in players}
+    fields.update({f"decks.{key}": state["decks"][key] for key in decks})
+    fields.update(
+        total_games=state["total_games"],
+        oldest_game_at=state["oldest_game_at"],
+        last_game_at=state["last_game_at"],
+        expires_at=_expires_at(state, window),
+    )
+    return fields
+
+
+async def reserve_game_ratings(
+    database: AsyncIOMotorDatabase, game: dict[str, Any]
+) -> dict[LeaderboardWindow, dict[str, Any] | None]:
+    """Reserve every window leaderboard a game about to be inserted belongs to.
+
+    Must run before the insert: a replay racing the insert either misses the
+    reservation and cannot land, or lands and invalidates it. All windows are
+    reserved with one write and read back with one query; windows that are stale,
+    missing or unreachable map to ``None``.
+    """
+    owner_sub, playgroup_id = game["owner_sub"], game["playgroup_id"]
+    played_at = _as_utc(game["created_at"])
+    now = _now()
+    windows = [
+        window
+        for window, days in _WINDOW_DAYS.items()
+        if days is None or played_at >= now - timedelta(days=days)
+    ]
+    players, decks = _game_seats(game)
+    try:
+        documents = await PlaygroupRatingsRepository(database).reserve_windows(
+            owner_sub,
+            playgroup_id,
+            [window.value for window in windows],
+            players=players,
+            decks=decks,
+        )
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Failed to reserve the leaderboards of playgroup '%s'.", playgroup_id)
+        documents = {}
+    return {window: documents.get(window.value) for window in windows}
+
+
+async def apply_game_to_ratings(
+    database: AsyncIOMotorDatabase,
+    game: dict[str, Any],
+    reserved: Mapping[LeaderboardWindow, dict[str, Any] | None],
+) -> None:
+    """Fold a newly recorded game into the window leaderboards it reserved.
+
+    ``reserved`` comes from :func:`reserve_game_ratings`; every window is written in
+    one ``bulk_write`` that only touches the game's own players and decks. A window
+    that was not fresh, a game older than the last rated one (it cannot be applied
+    in order), and a concurrent writer since the reservation all flag the window so
+    the next read replays it.
+    """
+    k_factor = get_settings().rating_k_factor
+    played_at = _as_utc(game["created_at"])
+
+    updates: dict[str, tuple[int, dict[str, Any]] | None] = {}
+    for window, document in reserved.items():
+        last_game_at = (document or {}).get("last_game_at")
+        if document is None or (last_game_at is not None and played_at < _as_utc(last_game_at)):
+            updates[window.value] = None
+            continue
+        state = {**_empty_state(), **document}
+        _fold_game(state, game, k_factor)
+        updates[window.value] = (
+            int(document.get("generation", 0)),
+            _game_fields(state, window, game),
+        )
+    repository = PlaygroupRatingsRepository(database)
+    try:
+        await repository.apply_windows(game["owner_sub"], game["playgroup_id"], updates)
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception(
+            "Failed to update leaderboards of playgroup '%s'; flagging them for a replay.",
+            game["playgroup_id"],
+        )
+        await repository.mark_stale(game["owner_sub"], game["playgroup_id"])
+
+
+async def rebuild_leaderboard(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    playgroup_id: str,
+    window: LeaderboardWindow,
+) -> dict[str, Any]:
+    """Replay the games inside ``window`` and store the result if nothing raced us."""
+    repository = PlaygroupRatingsRepository(database)
+    current = await repository.find(owner_sub, playgroup_id, window.value)
+    if current is None:
+        await repository.mark_stale(owner_sub, playgroup_id, window.value)
+        current = await repository.find(owner_sub, playgroup_id, window.value) or {}
+    generation = int(current.get("generation", 0))
+
+    days = _WINDOW_DAYS[window]
+    since = _now() - timedelta(days=days) if days is not None else None
+    k_factor = get_settings().rating_k_factor
+    state = _empty_state()
+    games = GameRepository(database)
+    async for game in games.iter_for_playgroup(owner_sub, playgroup_id, since=since):
+        _fold_game(state, game, k_factor)
+
+    fields = _state_fields(state, window)
+    stored = await repository.replace_if_generation(
+        owner_sub, playgroup_id, window.value, generation, fields
+    )
+    logger.info(
+        "Replayed %s leaderboard for playgroup '%s' from %d game(s)%s.",
+        window.value,
+        playgroup_id,
+        state["total_games"],
+        "" if stored else " (not stored: a game was recorded meanwhile)",
+    )
+    return {**fields, "updated_at": _now()}
+
+
+def _to_leaderboard(window: LeaderboardWindow, document: Mapping[str, Any]) -> PlaygroupLeaderboard:
+    players = [
+        PlayerRating(
+            player_id=entry.get("player_id"),
+            google_sub=entry.get("google_sub"),
+            name=entry.get("name"),
+            rating=round(float(entry.get("rating", INITIAL_RATING)), 1),
+            games_played=int(entry.get("games_played", 0)),
+            wins=int(entry.get("wins", 0)),
+        )
+        for entry in (document.get("players") or {}).values()
+    ]
+    decks = [
+        DeckRating(
+            deck_id=entry.get("deck_id"),
+            deck_name=entry.get("deck_name"),
+            deck_format=entry.get("deck_format"),
+            rating=round(float(entry.get("rating", INITIAL_RATING)), 1),
+            games_played=int(entry.get("games_played", 0)),
+            wins=int(entry.get("wins", 0)),
+        )
+        for entry in (document.get("decks") or {}).values()
+    ]
+    players.sort(key=lambda entry: (-entry.rating, -entry.games_played, entry.name or ""))
+    decks.sort(key=lambda entry: (-entry.rating, -entry.games_played, entry.deck_name or ""))
+    return PlaygroupLeaderboard(
+        window=window,
+        total_games=int(document.get("total_games", 0)),
+        updated_at=document.get("updated_at"),
+        players=players,
+        decks=decks,
+    )
+
+
+async def get_playgroup_leaderboard(
+    database: AsyncIOMotorDatabase,
+    owner_sub: str,
+    playgroup_id: str,
+    window: LeaderboardWindow = LeaderboardWindow.ALL_TIME,
+) -> PlaygroupLeaderboard:
+    """Serve a leaderboard with one indexed read, replaying the window only when needed."""
+    repository = PlaygroupRatingsRepository(database)
+    document = await repository.find(owner_sub, playgroup_id, window.value)
+    expires_at = (document or {}).get("expires_at")
+    if (
+        document is None
+        or document.get("stale", True)
+        or (expires_at is not None and _as_utc(expires_at) <= _now())
+    ):
+        playgroup = await PlaygroupRepository(database).find_by_id(owner_sub, playgroup_id)
+        if not playgroup:
+            raise LookupError("Groupe introuvable.")
+        document = await rebuild_leaderboard(database, owner_sub, playgroup_id, window)
+    return _to_leaderboard(window, document)
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
-from typing import Any, List
+from typing import Any, Awaitable, Callable, List, TypeVar
 
+import anyio
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
 
 from ..config import get_settings
 from ..logging_utils import get_logger
 from ..repositories import FollowRepository
+from ..repositories.profiles import SEARCH_NAME, SEARCH_PREFIXES, SEARCH_WORDS
 from ..schemas import (
     FollowList,
     FollowSummary,
@@ -18,19 +22,18 @@ from ..schemas import (
     UserSearchResult,
 )
 from .play_data import list_games
-from .profiles import fetch_user_profile, fetch_user_profiles
+from .profile_search import fold_text, query_tokens
+from .profiles import fetch_user_profile_with_follow_counts, fetch_user_profiles, get_profile_cache
 
 logger = get_logger("services.social")
 
+T = TypeVar("T")
+
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _normalize_query(value: str | None) -> str:
-    return value.strip().casefold() if isinstance(value, str) else ""
-
-
 async def _load_following_set(
     repository: FollowRepository,
     follower_sub: str,
@@ -46,78 +49,188 @@ async def search_public_profiles(
     viewer_sub: str | None = None,
     limit: int = 20,
 ) -> List[UserSearchResult]:
-    normalized_query = _normalize_query(query)
+    """Return public profiles whose name or email words start with every query word.
+
+    Results are ranked in three tiers, each ordered by accent-folded name: names that
+    start with the query, then profiles where every query word is a whole word, then
+    the remaining prefix matches. Each tier is one bounded query, served by
+    ``profile_public_search_name_idx``, ``profile_search_words_idx`` and
+    ``profile_search_prefix_idx`` respectively, and later tiers only run while the
+    page is not full. A query containing ``@`` is matched against the full email
+    instead (served by ``profile_public_email_idx``); a query without any word
+    matches nothing.
+    """
     settings = get_settings()
     profiles_collection = database[settings.mongo_users_collection]
 
-    filter_query: dict[str, Any] = {"is_public": True}
+    filter_query: dict[str, Any] = {"is_public": True, "google_sub": {"$ne": None}}
+    cleaned = (query or "").strip()
+    tokens = query_tokens(cleaned)
+    if "@" in cleaned:
+        tiers = [{**filter_query, "email": {"$in": sorted({cleaned, cleaned.lower()})}}]
+    elif tokens:
+        folded = fold_text(cleaned)
+        tiers = [
+            {**filter_query, SEARCH_NAME: {"$gte": folded, "$lt": folded + "\U0010ffff"}},
+            {**filter_query, SEARCH_WORDS: {"$all": tokens}},
+            {**filter_query, SEARCH_PREFIXES: {"$all": tokens}},
+        ]
+    elif cleaned:
+        return []
+    else:
+        tiers = [filter_query]
     projection = {
+        "_id": 0,
         "google_sub": 1,
         "display_name": 1,
-        "given_name": 1,
-        "email": 1,
         "description": 1,
         "picture": 1,
         "is_public": 1,
     }
 
-    if normalized_query:
-        filter_query["$text"] = {"$search": normalized_query}
-        projection["score"] = {"$meta": "textScore"}
-
-    cursor = profiles_collection.find(filter_query, projection)
-    fetch_limit = max(limit, 20)
-    raw_documents = await cursor.limit(fetch_limit).to_list(length=None)  # type: ignore[attr-defined]
+    documents: list[dict[str, Any]] = []
+    for tier in tiers:
+        remaining = limit - len(documents)
+        if remaining <= 0:
+            break
+        if documents:
+            seen = [document["google_sub"] for document in documents]
+            tier = {**tier, "google_sub": {"$ne": None, "$nin": seen}}
+        cursor = (
+            profiles_collection.find(tier, projection)
+            .sort(SEARCH_NAME, ASCENDING)
+            .limit(remaining)
+        )
+        documents.extend(await cursor.to_list(length=remaining))
 
     follow_repository = FollowRepository(database)
     followed_targets = await _load_following_set(follow_repository, viewer_sub) if viewer_sub else set()
 
-    matches: List[UserSearchResult] = []
-    for document in raw_documents:
-        google_sub = document.get("google_sub")
-        if not google_sub:
-            continue
-        display_name = document.get("display_name") or document.get("given_name") or ""
-        email = document.get("email") or ""
-
-        haystack = " ".join([display_name, email]).casefold()
-        if normalized_query and normalized_query not in haystack:
-            continue
-
-        matches.append(
-            UserSearchResult(
-                google_sub=google_sub,
-                display_name=document.get("display_name"),
-                description=document.get("description"),
-                picture=document.get("picture"),
-                is_public=bool(document.get("is_public")),
-                is_followed=google_sub in followed_targets,
-            )
+    return [
+        UserSearchResult(
+            google_sub=document["google_sub"],
+            display_name=document.get("display_name"),
+            description=document.get("description"),
+            picture=document.get("picture"),
+            is_public=bool(document.get("is_public")),
+            is_followed=document["google_sub"] in followed_targets,
         )
-        if len(matches) >= limit:
-            break
+        for document in documents
+    ]
 
-    matches.sort(key=lambda entry: (entry.display_name or "").lower())
-    return matches
+
+async def _timed_stage(
+    name: str,
+    call: Callable[[], Awaitable[T]],
+    *,
+    timeout_seconds: float,
+    timings: dict[str, float],
+    degraded: list[str],
+    fallback: T | None = None,
+    required: bool = False,
+) -> T | None:
+    """Await one public profile dependency under its own timeout and record its duration.
+
+    Optional stages return ``fallback`` (and are listed in ``degraded``) when they time
+    out or fail; required ones raise.
+    """
+    started_at = time.perf_counter()
+    try:
+        with anyio.fail_after(timeout_seconds):
+            return await call()
+    except Exception:
+        if required:
+            raise
+        logger.warning("Public profile stage '%s' failed; serving a partial profile.", name, exc_info=True)
+        degraded.append(name)
+        return fallback
+    finally:
+        timings[name] = round((time.perf_counter() - started_at) * 1000.0, 2)
 
 
 async def get_public_profile(
     database: AsyncIOMotorDatabase,
     google_sub: str,
 ) -> PublicUserProfile:
-    profile = await fetch_user_profile(database, google_sub)
-    if not profile or not profile.is_public:
-        raise LookupError("Profil introuvable.")
+    """Assemble a public profile, fetching the profile and its recent games concurrently.
+
+    Each dependency runs under ``PUBLIC_PROFILE_STAGE_TIMEOUT_MS``. The profile itself
+    is required (a timeout raises ``TimeoutError``); the recent games and the one-off
+    follow counter initialisation fall back to empty values instead.
+    """
+    timeout_seconds = get_settings().public_profile_stage_timeout_ms / 1000.0
+    timings: dict[str, float] = {}
+    degraded: list[str] = []
+    results: dict[str, Any] = {}
+    started_at = time.perf_counter()
+
+    async with anyio.create_task_group() as task_group:
+
+        async def _load_profile() -> None:
+            try:
+                profile, counts = await _timed_stage(
+                    "profile",
+                    lambda: fetch_user_profile_with_follow_counts(database, google_sub),
+                    timeout_seconds=timeout_seconds,
+                    timings=timings,
+                    degraded=degraded,
+                    required=True,
+                )
+            except Exception as error:
+                # Re-raised below rather than wrapped in an exception group.
+                results["error"] = error
+                task_group.cancel_scope.cancel()
+                return
+            if not profile or not profile.is_public:
+                # No need to finish reading games nobody will see.
+                task_group.cancel_scope.cancel()
+                return
+            if counts is None:
+                counts = await _timed_stage(
+                    "follow_counts",
+                    lambda: FollowRepository(database).initialize_counters(google_sub),
+                    timeout_seconds=timeout_seconds,
+                    timings=timings,
+                    degraded=degraded,
+                    fallback=(0, 0),
+                )
+                get_profile_cache().invalidate(google_sub)
+            results["profile"] = profile
+            results["counts"] = counts
+
+        async def _load_games() -> None:
+            results["games"] = await _timed_stage(
+                "recent_games",
+                lambda: list_games(database, google_sub, limit=5),
+                timeout_seconds=timeout_seconds,
+                timings=timings,
+                degraded=degraded,
+            )
 
-    follow_repository = FollowRepository(database)
-    followers_count = await follow_repository.count_followers(google_sub)
-    following_count = await follow_repository.count_following(google_sub)
+        task_group.start_soon(_load_profile)
+        task_group.start_soon(_load_games)
+
+    if "error" in results:
+        raise results["error"]
+    profile = results.get("profile")
+    if profile is None:
+        raise LookupError("Profil introuvable.")
+    followers_count, following_count = results["counts"]
+    games_payload = results.get("games")
+    logger.info(
+        "Served public profile.",
+        extra={
+            "public_profile_sub": google_sub,
+            "public_profile_stage_ms": timings,
+            "public_profile_degraded_stages": degraded,
+            "public_profile_duration_ms": round((time.perf_counter() - started_at) * 1000.0, 2),
+        },
+    )
 
     deck_payloads = [deck.model_dump(mode="python") for deck in profile.moxfield_decks]
 
-    games_payload = await list_games(database, google_sub, limit=50)
     recent_games: List[PublicGameSummary] = []
-    for record in games_payload.games[:5]:
+    for record in games_payload.games if games_payload else []:
         winner = None
         runner_up = None
         rankings = sorted(record.rankings, key=lambda entry: entry.rank)
@@ -160,7 +273,8 @@ async def follow_user(
     if follower_sub == target_sub:
         raise ValueError("Vous ne pouvez pas vous suivre vous-même.")
     repository = FollowRepository(database)
-    await repository.add_follow(follower_sub, target_sub)
+    if await repository.add_follow(follower_sub, target_sub):
+        get_profile_cache().invalidate(follower_sub, target_sub)
 
 
 async def unfollow_user(
@@ -169,7 +283,32 @@ async def unfollow_user(
     target_sub: str,
 ) -> None:
     repository = FollowRepository(database)
-    await repository.remove_follow(follower_sub, target_sub)
+    if await repository.remove_follow(follower_sub, target_sub):
+        get_profile_cache().invalidate(follower_sub, target_sub)
+
+
+async def reconcile_follow_counters(database: AsyncIOMotorDatabase) -> int:
+    """Fix profile follow counters that drifted from the follows collection."""
+    repository = FollowRepository(database)
+    fixed = await repository.reconcile_counters(
+        batch_size=get_settings().mongo_bulk_write_batch_size
+    )
+    if fixed:
+        get_profile_cache().clear()
+        logger.info("Reconciled follow counters on %d profile(s).", fixed)
+    return fixed
+
+
+async def run_follow_counter_reconciler(
+    database: AsyncIOMotorDatabase, interval_seconds: int
+) -> None:
+    """Reconcile follow counters every ``interval_seconds`` until cancelled."""
+    while True:
+        await anyio.sleep(interval_seconds)
+        try:
+            await reconcile_follow_counters(database)
+        except Exception:  # pragma: no cover - defensive logging
+            logger.exception("Follow counter reconciliation failed; retrying next interval.")
 
 
 async def list_following(
@@ -0,0 +1,301 @@
+"""Offline recomputation of every playgroup's stats from columnar game arrays."""
+
+from __future__ import annotations
+
+import importlib.util
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..repositories import GameRepository, PlaygroupStatsRepository
+from .playgroup_stats import stats_key
+
+logger = get_logger("services.stats_backfill")
+
+_NO_DECK = -1
+
+
+def _numpy_available() -> bool:
+    return importlib.util.find_spec("numpy") is not None
+
+
+def group_sum(keys: array, weights: array | None, size: int) -> list[int]:
+    """Sum ``weights`` (or count rows) per dense group id in ``keys``.
+
+    Uses ``numpy.bincount`` over the raw array buffers when NumPy is installed and a
+    plain loop otherwise; both return identical integer totals.
+    """
+    if size == 0:
+        return []
+    if _numpy_available():
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        # Array typecodes ("q", "b") double as NumPy dtype codes, so buffers are not copied.
+        key_view = numpy.frombuffer(keys, dtype=keys.typecode)
+        weight_view = None if weights is None else numpy.frombuffer(weights, dtype=weights.typecode)
+        valid = key_view >= 0
+        totals = numpy.bincount(
+            key_view[valid],
+            weights=None if weight_view is None else weight_view[valid],
+            minlength=size,
+        )
+        return [int(value) for value in totals.tolist()]
+
+    totals = [0] * size
+    if weights is None:
+        for key in keys:
+            if key >= 0:
+                totals[key] += 1
+    else:
+        for key, weight in zip(keys, weights):
+            if key >= 0:
+                totals[key] += weight
+    return totals
+
+
+class _Interner:
+    """Assign dense integer ids to hashable keys, remembering the latest descriptive fields."""
+
+    def __init__(self) -> None:
+        self.ids: dict[Any, int] = {}
+        self.keys: list[Any] = []
+        self._fields: list[tuple[datetime | None, dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def code(
+        self,
+        key: Any,
+        played_at: datetime | None = None,
+        fields: dict[str, Any] | None = None,
+    ) -> int:
+        code = self.ids.get(key)
+        if code is None:
+            code = len(self.keys)
+            self.ids[key] = code
+            self.keys.append(key)
+            self._fields.append((played_at, fields or {}))
+            return code
+        seen_at, _ = self._fields[code]
+        newer = seen_at is None or (played_at is not None and played_at >= seen_at)
+        if fields is not None and newer:
+            self._fields[code] = (played_at, fields)
+        return code
+
+    def fields(self, code: int) -> dict[str, Any]:
+        return self._fields[code][1]
+
+
+@dataclass
+class GameColumns:
+    """Games flattened into one row per seat, stored as typed ``array`` columns.
+
+    ``seat_player``/``seat_deck`` hold dense ids of ``(playgroup, player)`` and
+    ``(playgroup, deck)`` groups (``-1`` when the seat has no deck), ``seat_win`` and
+    ``seat_podium`` are 0/1 flags, and ``game_playgroup`` has one row per game.
+    """
+
+    playgroups: _Interner = field(default_factory=_Interner)
+    players: _Interner = field(default_factory=_Interner)
+    decks: _Interner = field(default_factory=_Interner)
+    game_playgroup: array = field(default_factory=lambda: array("q"))
+    seat_player: array = field(default_factory=lambda: array("q"))
+    seat_deck: array = field(default_factory=lambda: array("q"))
+    seat_win: array = field(default_factory=lambda: array("b"))
+    seat_podium: array = field(default_factory=lambda: array("b"))
+
+    @property
+    def games(self) -> int:
+        return len(self.game_playgroup)
+
+    @property
+    def seats(self) -> int:
+        return len(self.seat_player)
+
+    @property
+    def nbytes(self) -> int:
+        columns: Sequence[array] = (
+            self.game_playgroup,
+            self.seat_player,
+            self.seat_deck,
+            self.seat_win,
+            self.seat_podium,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def append_game(self, game: dict[str, Any]) -> None:
+        owner_sub, playgroup_id = game.get("owner_sub"), game.get("playgroup_id")
+        if not owner_sub or not playgroup_id:
+            return
+        played_at = game.get("created_at")
+        playgroup = self.playgroups.code((owner_sub, playgroup_id))
+        self.game_playgroup.append(playgroup)
+        ranks = {
+            ranking.get("player_id"): int(ranking.get("rank", 0))
+            for ranking in game.get("rankings", []) or []
+        }
+        for player in game.get("players", []) or []:
+            player_key = player.get("google_sub") or player.get("id")
+            if not player_key:
+                continue
+            rank = ranks.get(player.get("id"), 0)
+            self.seat_player.append(
+                self.players.code(
+                    (playgroup, player_key),
+                    played_at,
+                    {
+                        "player_id": player.get("id"),
+                        "google_sub": player.get("google_sub"),
+                        "name": player.get("name"),
+                    },
+                )
+            )
+            deck_key = player.get("deck_id") or player.get("deck_name")
+            self.seat_deck.append(
+                self.decks.code(
+                    (playgroup, deck_key),
+                    played_at,
+                    {
+                        "deck_id": player.get("deck_id"),
+                        "deck_name": player.get("deck_name"),
+                        "deck_format": player.get("deck_format"),
+                    },
+                )
+                if deck_key
+                else _NO_DECK
+            )
+            self.seat_win.append(1 if rank == 1 else 0)
+            self.seat_podium.append(1 if 1 <= rank <= 3 else 0)
+
+
+def compute_stats_documents(columns: GameColumns) -> dict[tuple[str, str], dict[str, Any]]:
+    """Group the seat columns into playgroup stats documents (same shape as the rebuilds)."""
+    total_games = group_sum(columns.game_playgroup, None, len(columns.playgroups))
+    player_games = group_sum(columns.seat_player, None, len(columns.players))
+    player_wins = group_sum(columns.seat_player, columns.seat_win, len(columns.players))
+    player_podiums = group_sum(columns.seat_player, columns.seat_podium, len(columns.players))
+    deck_games = group_sum(columns.seat_deck, None, len(columns.decks))
+    deck_wins = group_sum(columns.seat_deck, columns.seat_win, len(columns.decks))
+
+    documents: dict[tuple[str, str], dict[str, Any]] = {
+        key: {"total_games": total_games[code], "players": {}, "decks": {}}
+        for code, key in enumerate(columns.playgroups.keys)
+    }
+    for code, (playgroup, player_key) in enumerate(columns.players.keys):
+        document = documents[columns.playgroups.keys[playgroup]]
+        document["players"][stats_key(player_key)] = {
+            **columns.players.fields(code),
+            "games_played": player_games[code],
+            "wins": player_wins[code],
+            "podiums": player_podiums[code],
+        }
+    for code, (playgroup, deck_key) in enumerate(columns.decks.keys):
+        document = documents[columns.playgroups.keys[playgroup]]
+        document["decks"][stats_key(deck_key)] = {
+            **columns.decks.fields(code),
+            "games_played": deck_games[code],
+            "wins": deck_wins[code],
+        }
+    return documents
+
+
+@dataclass(frozen=True)
+class BackfillReport:
+    """Outcome and cost of a stats backfill run."""
+
+    games: int
+    seats: int
+    playgroups: int
+    written: int
+    flagged_stale: int
+    read_seconds: float
+    compute_seconds: float
+    write_seconds: float
+    column_bytes: int
+    numpy: bool
+
+    @property
+    def total_seconds(self) -> float:
+        return self.read_seconds + self.compute_seconds + self.write_seconds
+
+    @property
+    def seconds_per_million_games(self) -> float:
+        return self.total_seconds * 1_000_000 / self.games if self.games else 0.0
+
+    @property
+    def column_bytes_per_million_games(self) -> float:
+        return self.column_bytes * 1_000_000 / self.games if self.games else 0.0
+
+
+async def run_stats_backfill(
+    database: AsyncIOMotorDatabase,
+    *,
+    batch_size: int = 5000,
+    dry_run: bool = False,
+) -> BackfillReport:
+    """Recompute every playgroup's stats document from a single pass over the games.
+
+    Generations are snapshotted first so documents that receive games while the
+    backfill runs are not overwritten; those (and any stats document without games)
+    are flagged stale instead and rebuilt on their next read.
+    """
+    stats = PlaygroupStatsRepository(database)
+    generations = await stats.generations()
+
+    started = time.perf_counter()
+    columns = GameColumns()
+    async for game in GameRepository(database).scan_all(batch_size=batch_size):
+        columns.append_game(game)
+    read_done = time.perf_counter()
+
+    documents = compute_stats_documents(columns)
+    compute_done = time.perf_counter()
+
+    written = flagged = 0
+    if not dry_run:
+        run_id = uuid4().hex
+        entries = [
+            (owner_sub, playgroup_id, generations.get((owner_sub, playgroup_id)), document)
+            for (owner_sub, playgroup_id), document in documents.items()
+        ]
+        written = await stats.bulk_store_rebuilt(
+            entries,
+            run_id=run_id,
+            batch_size=get_settings().mongo_bulk_write_batch_size,
+        )
+        flagged = await stats.mark_stale_outside_run(run_id)
+    write_done = time.perf_counter()
+
+    report = BackfillReport(
+        games=columns.games,
+        seats=columns.seats,
+        playgroups=len(documents),
+        written=written,
+        flagged_stale=flagged,
+        read_seconds=read_done - started,
+        compute_seconds=compute_done - read_done,
+        write_seconds=write_done - compute_done,
+        column_bytes=columns.nbytes,
+        numpy=_numpy_available(),
+    )
+    logger.info(
+        "Stats backfill: %d game(s), %d playgroup(s), %d written, %d flagged stale in %.2fs "
+        "(%.1fs and %.1f MiB of columns per million games, numpy=%s).",
+        report.games,
+        report.playgroups,
+        report.written,
+        report.flagged_stale,
+        report.total_seconds,
+        report.seconds_per_million_games,
+        report.column_bytes_per_million_games / (1024 * 1024),
+        report.numpy,
+    )
+    return report
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Iterator, Literal
+from typing import Any, AsyncIterator, Generic, Iterable, Iterator, Literal, Sequence, TypeVar
 
 from ..logging_utils import get_logger
-from ..repositories import MoxfieldCacheRepository
+from ..repositories import DeckProjection, MoxfieldCacheRepository
 from ..schemas import (
     DeckDetail,
     DeckSummary,
@@ -15,15 +16,29 @@ from ..schemas import (
     UserSummary,
 )
 
+from .streaming import DeckStream, encode_deck_line, encode_end_line, encode_user_line
+
 logger = get_logger("storage")
 
+_DECK_STORAGE_FIELDS = frozenset({"_id", "user_name", "user_key", "synced_at"})
+
+PayloadT = TypeVar("PayloadT", UserDecksResponse, UserDeckSummariesResponse)
+
+
+@dataclass(frozen=True)
+class CachedSnapshot(Generic[PayloadT]):
+    """Cached payload together with the time it was last synced from Moxfield."""
+
+    payload: PayloadT
+    synced_at: datetime | None
+
 
 async def upsert_user_decks(
     repository: MoxfieldCacheRepository, payload: UserDecksResponse
 ) -> None:
-    """Persist the latest deck snapshot for a user."""
+    """Persist the latest deck snapshot for a user, pruning decks no longer published."""
     synced_at = datetime.now(timezone.utc)
-    user_doc = _prepare_user_document(payload.user, payload.total_decks, synced_at)
+    user_doc = _prepare_user_document(payload.user, payload.total_decks, synced_at, kind="full")
 
     logger.info(
         "Mongo write: upserting %d deck(s) for user '%s'",
@@ -38,15 +53,18 @@ async def upsert_user_decks(
         payload.user.user_name,
         deck_documents,
         collection=_collection_for_kind("full"),
+        prune_missing=True,
     )
 
 
 async def upsert_user_deck_summaries(
     repository: MoxfieldCacheRepository, payload: UserDeckSummariesResponse
 ) -> None:
-    """Persist the lighter deck summary snapshot for a user."""
+    """Persist the lighter deck summary snapshot for a user, pruning stale summaries."""
     synced_at = datetime.now(timezone.utc)
-    user_doc = _prepare_user_document(payload.user, payload.total_decks, synced_at)
+    user_doc = _prepare_user_document(
+        payload.user, payload.total_decks, synced_at, kind="summary"
+    )
 
     logger.info(
         "Mongo write: upserting %d deck summary document(s) for user '%s'",
@@ -61,13 +79,31 @@ async def upsert_user_deck_summaries(
         payload.user.user_name,
         summary_documents,
         collection=_collection_for_kind("summary"),
+        prune_missing=True,
     )
 
 
 async def fetch_user_decks(
-    repository: MoxfieldCacheRepository, username: str
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    projection: DeckProjection | None = None,
 ) -> UserDecksResponse | None:
     """Return the cached deck payload for a user if present."""
+    snapshot = await fetch_cached_user_decks(repository, username, projection=projection)
+    return snapshot.payload if snapshot else None
+
+
+async def fetch_cached_user_decks(
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    projection: DeckProjection | None = None,
+) -> CachedSnapshot[UserDecksResponse] | None:
+    """Return the cached deck payload for a user along with its sync time.
+
+    ``projection`` narrows the boards read from Mongo (all boards by default).
+    """
     logger.info("Mongo read: fetching cached decks for user '%s'", username)
 
     user_doc = await repository.fetch_user(username)
@@ -75,7 +111,7 @@ async def fetch_user_decks(
         logger.info("Mongo read: no cached decks found for user '%s'", username)
         return None
 
-    deck_docs = await repository.fetch_decks(username)
+    deck_docs = await repository.fetch_decks(username, projection=projection or DeckProjection())
     deck_payloads = [
         DeckDetail.model_validate(_strip_deck_storage_fields(deck_doc)) for deck_doc in deck_docs
     ]
@@ -87,13 +123,24 @@ async def fetch_user_decks(
         "Mongo read: returning %d deck(s) for user '%s'", len(deck_payloads), username
     )
 
-    return UserDecksResponse(user=user_summary, total_decks=total_decks, decks=deck_payloads)
+    return CachedSnapshot(
+        payload=UserDecksResponse(user=user_summary, total_decks=total_decks, decks=deck_payloads),
+        synced_at=_synced_at_for_kind(user_doc, "full"),
+    )
 
 
 async def fetch_user_deck_summaries(
     repository: MoxfieldCacheRepository, username: str
 ) -> UserDeckSummariesResponse | None:
     """Return the cached deck summaries for a user if present."""
+    snapshot = await fetch_cached_user_deck_summaries(repository, username)
+    return snapshot.payload if snapshot else None
+
+
+async def fetch_cached_user_deck_summaries(
+    repository: MoxfieldCacheRepository, username: str
+) -> CachedSnapshot[UserDeckSummariesResponse] | None:
+    """Return the cached deck summaries for a user along with their sync time."""
     logger.info("Mongo read: fetching deck summaries for user '%s'", username)
 
     user_doc = await repository.fetch_user(username)
@@ -115,7 +162,102 @@ async def fetch_user_deck_summaries(
         username,
     )
 
-    return UserDeckSummariesResponse(user=user_summary, total_decks=total_decks, decks=summaries)
+    return CachedSnapshot(
+        payload=UserDeckSummariesResponse(
+            user=user_summary, total_decks=total_decks, decks=summaries
+        ),
+        synced_at=_synced_at_for_kind(user_doc, "summary"),
+    )
+
+
+async def fetch_user_deck_details(
+    repository: MoxfieldCacheRepository, username: str, public_ids: Iterable[str]
+) -> dict[str, DeckDetail]:
+    """Return cached deck details keyed by public identifier for the requested decks."""
+    requested = list(public_ids)
+    if not requested:
+        return {}
+    deck_docs = await repository.fetch_decks(username, public_ids=requested)
+    details: dict[str, DeckDetail] = {}
+    for deck_doc in deck_docs:
+        detail = DeckDetail.model_validate(_strip_deck_storage_fields(deck_doc))
+        details[detail.public_id] = detail
+    logger.info(
+        "Mongo read: reused %d of %d cached deck(s) for user '%s'",
+        len(details),
+        len(requested),
+        username,
+    )
+    return details
+
+
+async def open_cached_user_decks_stream(
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    batch_size: int | None = None,
+    projection: DeckProjection | None = None,
+) -> DeckStream | None:
+    """Stream cached decks as NDJSON lines, reading the Mongo cursor in batches.
+
+    Returns ``None`` when the user has never been synced. Only the current cursor
+    batch is held in memory, whatever the size of the collection.
+    """
+    user_doc = await repository.fetch_user(username)
+    if not user_doc:
+        logger.info("Mongo read: no cached decks found for user '%s'", username)
+        return None
+
+    user_summary = UserSummary.model_validate(_strip_user_storage_fields(user_doc))
+    total_decks = user_doc.get("total_decks", 0)
+
+    async def _lines() -> AsyncIterator[bytes]:
+        yield encode_user_line(user_summary, total_decks)
+        streamed = 0
+        async for deck_doc in repository.iter_decks(
+            username, batch_size=batch_size, projection=projection or DeckProjection()
+        ):
+            yield encode_deck_line(DeckDetail.model_validate(_strip_deck_storage_fields(deck_doc)))
+            streamed += 1
+        logger.info("Mongo read: streamed %d cached deck(s) for user '%s'", streamed, username)
+        yield encode_end_line(streamed)
+
+    return DeckStream(user=user_summary, total_decks=total_decks, lines=_lines())
+
+
+async def persist_user_deck_batch(
+    repository: MoxfieldCacheRepository,
+    username: str,
+    decks: Sequence[DeckDetail],
+    synced_at: datetime,
+) -> None:
+    """Upsert a batch of streamed decks without pruning the rest of the user's decks."""
+    await repository.replace_documents(
+        username,
+        (_prepare_deck_document(deck, username, synced_at) for deck in decks),
+        collection=_collection_for_kind("full"),
+    )
+
+
+async def finalize_user_decks_stream(
+    repository: MoxfieldCacheRepository,
+    user: UserSummary,
+    kept_ids: Sequence[str],
+    synced_at: datetime,
+) -> None:
+    """Record a completed streamed sync: refresh the user document and prune removed decks."""
+    await repository.replace_user(
+        _prepare_user_document(user, len(kept_ids), synced_at, kind="full")
+    )
+    deleted = await repository.prune_documents(
+        user.user_name, kept_ids, collection=_collection_for_kind("full")
+    )
+    logger.info(
+        "Mongo write: streamed sync stored %d deck(s) for user '%s' (pruned %d)",
+        len(kept_ids),
+        user.user_name,
+        deleted,
+    )
 
 
 async def delete_user_deck(
@@ -155,13 +297,14 @@ async def delete_user_deck(
 
 
 def _strip_deck_storage_fields(document: dict[str, Any]) -> dict[str, Any]:
-    """Drop internal storage metadata before validating with Pydantic."""
-    clean_doc = dict(document)
-    clean_doc.pop("_id", None)
-    clean_doc.pop("user_name", None)
-    clean_doc.pop("user_key", None)
-    clean_doc.pop("synced_at", None)
-    return clean_doc
+    """Drop internal storage metadata before validating with Pydantic.
+
+    Repository reads already exclude these fields through Mongo projections, so
+    the copy only happens for documents that still carry them.
+    """
+    if _DECK_STORAGE_FIELDS.isdisjoint(document):
+        return document
+    return {key: value for key, value in document.items() if key not in _DECK_STORAGE_FIELDS}
 
 
 def _strip_user_storage_fields(document: dict[str, Any]) -> dict[str, Any]:
@@ -169,6 +312,8 @@ def _strip_user_storage_fields(document: dict[str, Any]) -> dict[str, Any]:
     clean_doc = dict(document)
     clean_doc.pop("_id", None)
     clean_doc.pop("synced_at", None)
+    clean_doc.pop("decks_synced_at", None)
+    clean_doc.pop("deck_summaries_synced_at", None)
     clean_doc.pop("total_decks", None)
     clean_doc.pop("user_key", None)
     return clean_doc
@@ -178,11 +323,16 @@ DeckCollection = Literal["decks", "deck_summaries"]
 
 
 def _prepare_user_document(
-    user: UserSummary, total_decks: int, synced_at: datetime
+    user: UserSummary,
+    total_decks: int,
+    synced_at: datetime,
+    *,
+    kind: Literal["full", "summary"],
 ) -> dict[str, Any]:
     """Normalize user payload before persistence."""
     user_doc = user.model_dump(mode="python")
     user_doc["synced_at"] = synced_at
+    user_doc[f"{_collection_for_kind(kind)}_synced_at"] = synced_at
     user_doc["total_decks"] = total_decks
     return user_doc
 
@@ -196,12 +346,27 @@ def _prepare_deck_documents(
     """Yield deck or summary documents with shared metadata applied."""
     username = payload.user.user_name
     for deck in payload.decks:
-        deck_doc = deck.model_dump(mode="python")
-        deck_doc["user_name"] = username
-        deck_doc["synced_at"] = synced_at
-        yield deck_doc
+        yield _prepare_deck_document(deck, username, synced_at)
+
+
+def _prepare_deck_document(
+    deck: DeckDetail | DeckSummary, username: str, synced_at: datetime
+) -> dict[str, Any]:
+    """Normalize a single deck or summary before persistence."""
+    deck_doc = deck.model_dump(mode="python")
+    deck_doc["user_name"] = username
+    deck_doc["synced_at"] = synced_at
+    return deck_doc
 
 
 def _collection_for_kind(kind: Literal["full", "summary"]) -> DeckCollection:
     """Translate the document kind into the backing collection name."""
     return "decks" if kind == "full" else "deck_summaries"
+
+
+def _synced_at_for_kind(
+    user_doc: dict[str, Any], kind: Literal["full", "summary"]
+) -> datetime | None:
+    """Return when decks (or summaries) were last synced, falling back to legacy ``synced_at``."""
+    value = user_doc.get(f"{_collection_for_kind(kind)}_synced_at") or user_doc.get("synced_at")
+    return value if isinstance(value, datetime) else None
@@ -0,0 +1,53 @@
+"""NDJSON encoding for streamed deck and game payloads (one JSON document per line)."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from ..schemas import DeckDetail, UserSummary
+from .game_rows import GameRow
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@dataclass(frozen=True)
+class DeckStream:
+    """User resolved before streaming starts, plus the NDJSON lines to send.
+
+    Lines are, in order: one ``user`` header, one ``deck`` line per deck, then an
+    ``end`` line with the number of decks streamed. A failure after the header is
+    reported as a final ``error`` line instead of ``end``.
+    """
+
+    user: UserSummary
+    total_decks: int
+    lines: AsyncIterator[bytes]
+
+
+def encode_user_line(user: UserSummary, total_decks: int) -> bytes:
+    return b'{"type":"user","total_decks":%d,"user":%s}\n' % (
+        total_decks,
+        user.model_dump_json().encode("utf-8"),
+    )
+
+
+def encode_deck_line(deck: DeckDetail) -> bytes:
+    return b'{"type":"deck","deck":%s}\n' % deck.model_dump_json().encode("utf-8")
+
+
+def encode_end_line(streamed_decks: int) -> bytes:
+    return b'{"type":"end","streamed_decks":%d}\n' % streamed_decks
+
+
+def encode_game_line(game: GameRow) -> bytes:
+    return b'{"type":"game","game":%s}\n' % game.to_json_bytes()
+
+
+def encode_games_end_line(streamed_games: int) -> bytes:
+    return b'{"type":"end","streamed_games":%d}\n' % streamed_games
+
+
+def encode_error_line(detail: str) -> bytes:
+    return json.dumps({"type": "error", "detail": detail}).encode("utf-8") + b"\n"
@@ -0,0 +1,299 @@
+"""Coalesced Moxfield sync orchestration shared by the API routes."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Literal, Optional, TypeVar
+
+import anyio
+
+from ..logging_utils import get_logger
+from ..moxfield import MoxfieldClient, MoxfieldError, RequestPriority, request_priority
+from ..repositories import MoxfieldCacheRepository
+from ..schemas import UserDeckSummariesResponse, UserDecksResponse
+from .freshness import CacheDecision, CacheStatus, FreshnessPolicy, cache_age
+from .moxfield import (
+    ProgressCallback,
+    build_user_deck_summaries_response,
+    build_user_decks_delta_response,
+    build_user_decks_response,
+)
+from .storage import (
+    CachedSnapshot,
+    fetch_cached_user_deck_summaries,
+    fetch_cached_user_decks,
+    upsert_user_deck_summaries,
+    upsert_user_decks,
+)
+
+logger = get_logger("services.sync")
+
+T = TypeVar("T")
+
+SyncMode = Literal["full", "delta"]
+
+RefreshScheduler = Callable[[Callable[[], Awaitable[None]]], None]
+
+
+@dataclass(frozen=True)
+class FreshnessResult(Generic[T]):
+    """Payload served under a freshness policy and how it was obtained."""
+
+    payload: T
+    status: CacheStatus
+    synced_at: Optional[datetime]
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("event", "result", "error", "cancelled", "expires_at", "joiners")
+
+    def __init__(self) -> None:
+        self.event = anyio.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.expires_at: Optional[float] = None
+        self.joiners = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls sharing a key into one in-flight execution.
+
+    The first caller (the leader) runs ``func``; callers arriving while it runs
+    await the same outcome. Successful results keep being served for
+    ``grace_period`` seconds so late joiners (double clicks, a second tab) do not
+    start another sync. Errors are shared with current joiners but never cached,
+    and if the leader is cancelled the joiners elect a new leader.
+    """
+
+    def __init__(self, *, grace_period: float = 2.0) -> None:
+        self.grace_period = max(0.0, grace_period)
+        self._flights: Dict[Hashable, _Flight[T]] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return whether a call for ``key`` is currently running."""
+        flight = self._flights.get(key)
+        return flight is not None and flight.expires_at is None
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run ``func`` for ``key`` unless an equivalent call is running or fresh."""
+        while True:
+            self._evict_expired()
+            flight = self._flights.get(key)
+            if flight is None:
+                return await self._lead(key, func)
+
+            flight.joiners += 1
+            await flight.event.wait()
+            if flight.cancelled:
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result  # type: ignore[return-value]
+
+    async def _lead(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        flight: _Flight[T] = _Flight()
+        self._flights[key] = flight
+        try:
+            flight.result = await func()
+        except anyio.get_cancelled_exc_class():
+            flight.cancelled = True
+            raise
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            if flight.cancelled or flight.error is not None or self.grace_period == 0:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            else:
+                flight.expires_at = time.monotonic() + self.grace_period
+            if flight.joiners:
+                logger.info("Coalesced %d concurrent call(s) for %r.", flight.joiners, key)
+            flight.event.set()
+        return flight.result  # type: ignore[return-value]
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key
+            for key, flight in self._flights.items()
+            if flight.expires_at is not None and flight.expires_at <= now
+        ]
+        for key in expired:
+            del self._flights[key]
+
+
+async def sync_user_decks(
+    client: MoxfieldClient,
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    single_flight: SingleFlight[Any],
+    mode: SyncMode = "full",
+    on_progress: Optional[ProgressCallback] = None,
+    raise_persistence_errors: bool = False,
+) -> UserDecksResponse:
+    """Fetch a user's decks from Moxfield and persist them, once per concurrent burst.
+
+    ``on_progress`` only fires when this call leads the sync; joiners share the result.
+    Persistence failures are only logged unless ``raise_persistence_errors`` is set.
+    """
+
+    async def _sync() -> UserDecksResponse:
+        if mode == "delta":
+            response = await build_user_decks_delta_response(
+                client, repository, username, on_progress=on_progress
+            )
+        else:
+            response = await build_user_decks_response(client, username, on_progress=on_progress)
+        await _persist(
+            upsert_user_decks, repository, response, raise_errors=raise_persistence_errors
+        )
+        return response
+
+    key = ("decks", repository.canonical_username(username))
+    return await single_flight.run(key, _sync)
+
+
+async def sync_user_deck_summaries(
+    client: MoxfieldClient,
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    single_flight: SingleFlight[Any],
+    raise_persistence_errors: bool = False,
+) -> UserDeckSummariesResponse:
+    """Fetch a user's deck summaries from Moxfield and persist them, once per burst."""
+
+    async def _sync() -> UserDeckSummariesResponse:
+        response = await build_user_deck_summaries_response(client, username)
+        await _persist(
+            upsert_user_deck_summaries, repository, response, raise_errors=raise_persistence_errors
+        )
+        return response
+
+    key = ("deck_summaries", repository.canonical_username(username))
+    return await single_flight.run(key, _sync)
+
+
+async def resolve_user_decks(
+    client: MoxfieldClient,
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    single_flight: SingleFlight[Any],
+    policy: FreshnessPolicy,
+    schedule_refresh: RefreshScheduler,
+) -> FreshnessResult[UserDecksResponse]:
+    """Serve cached decks according to ``policy``, refreshing from Moxfield when needed."""
+
+    async def _refresh() -> UserDecksResponse:
+        return await sync_user_decks(
+            client, repository, username, single_flight=single_flight, mode="delta"
+        )
+
+    return await _resolve_with_policy(
+        lambda: fetch_cached_user_decks(repository, username),
+        _refresh,
+        key=("decks", repository.canonical_username(username)),
+        single_flight=single_flight,
+        policy=policy,
+        schedule_refresh=schedule_refresh,
+    )
+
+
+async def resolve_user_deck_summaries(
+    client: MoxfieldClient,
+    repository: MoxfieldCacheRepository,
+    username: str,
+    *,
+    single_flight: SingleFlight[Any],
+    policy: FreshnessPolicy,
+    schedule_refresh: RefreshScheduler,
+) -> FreshnessResult[UserDeckSummariesResponse]:
+    """Serve cached deck summaries according to ``policy``."""
+
+    async def _refresh() -> UserDeckSummariesResponse:
+        return await sync_user_deck_summaries(
+            client, repository, username, single_flight=single_flight
+        )
+
+    return await _resolve_with_policy(
+        lambda: fetch_cached_user_deck_summaries(repository, username),
+        _refresh,
+        key=("deck_summaries", repository.canonical_username(username)),
+        single_flight=single_flight,
+        policy=policy,
+        schedule_refresh=schedule_refresh,
+    )
+
+
+async def _resolve_with_policy(
+    load_cached: Callable[[], Awaitable[Optional[CachedSnapshot[Any]]]],
+    refresh: Callable[[], Awaitable[T]],
+    *,
+    key: Hashable,
+    single_flight: SingleFlight[Any],
+    policy: FreshnessPolicy,
+    schedule_refresh: RefreshScheduler,
+) -> FreshnessResult[T]:
+    snapshot = await load_cached()
+    if snapshot is None:
+        return FreshnessResult(await refresh(), CacheStatus.MISS, datetime.now(timezone.utc))
+
+    age = cache_age(snapshot.synced_at)
+    decision = policy.decide(age)
+    if decision is CacheDecision.SERVE:
+        return FreshnessResult(snapshot.payload, CacheStatus.HIT, snapshot.synced_at)
+
+    if decision is CacheDecision.SERVE_AND_REVALIDATE:
+        if not single_flight.in_flight(key):
+            schedule_refresh(partial(_refresh_in_background, refresh, key))
+        return FreshnessResult(snapshot.payload, CacheStatus.STALE, snapshot.synced_at)
+
+    try:
+        return FreshnessResult(await refresh(), CacheStatus.MISS, datetime.now(timezone.utc))
+    except MoxfieldError as exc:
+        if not policy.can_serve_on_error(age):
+            raise
+        logger.warning("Serving stale cache for %r after refresh failure: %s", key, exc)
+        return FreshnessResult(snapshot.payload, CacheStatus.STALE_IF_ERROR, snapshot.synced_at)
+
+
+async def _refresh_in_background(refresh: Callable[[], Awaitable[Any]], key: Hashable) -> None:
+    """Revalidate a stale cache entry on the background scheduling lane."""
+    with request_priority(RequestPriority.BACKGROUND):
+        try:
+            await refresh()
+        except MoxfieldError as exc:
+            logger.warning("Background refresh failed for %r: %s", key, exc)
+        else:
+            logger.info("Background refresh completed for %r.", key)
+
+
+async def _persist(
+    func: Callable[[MoxfieldCacheRepository, Any], Awaitable[None]],
+    repository: MoxfieldCacheRepository,
+    payload: UserDeckSummariesResponse | UserDecksResponse,
+    *,
+    raise_errors: bool = False,
+) -> None:
+    """Persist payloads to MongoDB; failures are logged and only re-raised on request.
+
+    The HTTP path still answers with the fetched payload when Mongo is unavailable,
+    while background jobs raise so the failure is retried instead of reported as a success.
+    """
+    try:
+        await func(repository, payload)
+    except Exception:
+        logger.exception(
+            "Deck persistence failed for user '%s' with %d item(s).",
+            payload.user.user_name,
+            len(payload.decks),
+        )
+        if raise_errors:
+            raise
@@ -0,0 +1,243 @@
+"""Background Moxfield sync jobs: enqueueing, status lookups and the worker loop."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+import anyio
+import anyio.lowlevel
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..logging_utils import get_logger
+from ..moxfield import (
+    MoxfieldClient,
+    MoxfieldError,
+    MoxfieldNotFoundError,
+    RequestPriority,
+    request_priority,
+)
+from ..repositories import MoxfieldCacheRepository, SyncJobRepository
+from ..schemas import SyncJob, SyncJobRequest
+from .sync import SingleFlight, sync_user_deck_summaries, sync_user_decks
+
+logger = get_logger("services.sync_jobs")
+
+_INTERNAL_FIELDS = ("user_key", "worker_id", "lease_expires_at")
+
+
+def _to_sync_job(document: dict[str, Any]) -> SyncJob:
+    payload = {key: value for key, value in document.items() if key not in _INTERNAL_FIELDS}
+    return SyncJob.model_validate(payload)
+
+
+def _normalize_username(username: str) -> str:
+    cleaned = username.strip() if isinstance(username, str) else ""
+    if not cleaned:
+        raise ValueError("Le nom d'utilisateur Moxfield est obligatoire.")
+    return cleaned
+
+
+async def enqueue_sync_job(
+    database: AsyncIOMotorDatabase,
+    username: str,
+    request: SyncJobRequest,
+) -> SyncJob:
+    """Queue a sync for ``username``; an already active job for the same user is reused."""
+    cleaned = _normalize_username(username)
+    repository = SyncJobRepository(database)
+    document = await repository.enqueue(
+        username=cleaned,
+        user_key=MoxfieldCacheRepository.canonical_username(cleaned),
+        kind=request.kind,
+        mode=request.mode,
+        max_attempts=get_settings().sync_job_max_attempts,
+    )
+    return _to_sync_job(document)
+
+
+async def get_sync_job(database: AsyncIOMotorDatabase, username: str, job_id: str) -> SyncJob:
+    """Return the job ``job_id`` belonging to ``username``."""
+    cleaned = _normalize_username(username)
+    repository = SyncJobRepository(database)
+    document = await repository.get(job_id, MoxfieldCacheRepository.canonical_username(cleaned))
+    if document is None:
+        raise LookupError("Tâche de synchronisation introuvable.")
+    return _to_sync_job(document)
+
+
+class SyncJobWorker:
+    """Poll the job collection and run Moxfield syncs outside of request handlers.
+
+    Jobs are leased with ``find_one_and_update`` so several API processes can run
+    workers against the same database. Progress updates extend the lease; a worker
+    that dies leaves its job to be reclaimed once the lease expires. Upstream
+    failures are retried with exponential backoff up to ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        *,
+        client_factory: Callable[[], MoxfieldClient],
+        single_flight: SingleFlight[Any],
+        concurrency: int = 2,
+        poll_interval: float = 2.0,
+        lease_seconds: int = 300,
+        retry_backoff_base: float = 30.0,
+        retry_backoff_max: float = 900.0,
+        progress_interval: float = 1.0,
+    ) -> None:
+        self.database = database
+        self.client_factory = client_factory
+        self.single_flight = single_flight
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = max(0.0, poll_interval)
+        self.lease_seconds = max(1, lease_seconds)
+        self.retry_backoff_base = max(0.0, retry_backoff_base)
+        self.retry_backoff_max = max(self.retry_backoff_base, retry_backoff_max)
+        self.progress_interval = max(0.0, progress_interval)
+        self.worker_id = uuid4().hex
+        self._jobs = SyncJobRepository(database)
+        self._cache = MoxfieldCacheRepository(database)
+
+    async def run(self) -> None:
+        """Process jobs forever with ``concurrency`` parallel runners."""
+        logger.info(
+            "Starting sync job worker %s with concurrency %d.", self.worker_id, self.concurrency
+        )
+        async with anyio.create_task_group() as task_group:
+            for _ in range(self.concurrency):
+                task_group.start_soon(self._runner)
+
+    async def _runner(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception:  # pragma: no cover - defensive logging
+                logger.exception("Sync job worker iteration failed.")
+                processed = False
+            if not processed:
+                await anyio.sleep(self.poll_interval)
+
+    async def run_once(self) -> bool:
+        """Claim and process a single due job; returns False when the queue is empty."""
+        job = await self._jobs.claim(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        job_id = job["id"]
+        attempts = int(job.get("attempts") or 1)
+        max_attempts = int(job.get("max_attempts") or 1)
+        if attempts > max_attempts:
+            await self._jobs.mark_failed(
+                job_id, self.worker_id, error="Job lease expired too many times."
+            )
+            return True
+
+        started_at = time.perf_counter()
+        try:
+            # Queued syncs yield to users' interactive requests in the Moxfield scheduler.
+            with anyio.CancelScope() as lease_scope, request_priority(RequestPriority.BACKGROUND):
+                total_decks = await self._execute(job, lease_scope)
+            if lease_scope.cancel_called:
+                logger.warning(
+                    "Sync job %s lost its lease; leaving it to the worker that reclaimed it.",
+                    job_id,
+                )
+                return True
+        except MoxfieldNotFoundError as exc:
+            await self._jobs.mark_failed(job_id, self.worker_id, error=str(exc))
+            logger.info("Sync job %s failed permanently: %s", job_id, exc)
+        except Exception as exc:
+            if not isinstance(exc, MoxfieldError):
+                logger.exception("Sync job %s raised an unexpected error.", job_id)
+            await self._retry_or_fail(job_id, attempts, max_attempts, exc)
+        else:
+            await self._jobs.mark_succeeded(job_id, self.worker_id, total_decks=total_decks)
+            logger.info(
+                "Sync job %s (%s for '%s') succeeded with %d deck(s) in %.2f ms.",
+                job_id,
+                job.get("kind"),
+                job.get("username"),
+                total_decks,
+                (time.perf_counter() - started_at) * 1000.0,
+            )
+        return True
+
+    async def _execute(self, job: dict[str, Any], lease_scope: anyio.CancelScope) -> int:
+        client = self.client_factory()
+        username = job["username"]
+        if job.get("kind") == "deck_summaries":
+            await self._report(job["id"], "fetching_summaries", 0, None, lease_scope)
+            summaries = await sync_user_deck_summaries(
+                client,
+                self._cache,
+                username,
+                single_flight=self.single_flight,
+                raise_persistence_errors=True,
+            )
+            return summaries.total_decks
+
+        last_report = 0.0
+
+        async def _on_progress(fetched: int, total: int) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if fetched not in (0, total) and now - last_report < self.progress_interval:
+                return
+            last_report = now
+            await self._report(job["id"], "fetching_decks", fetched, total, lease_scope)
+
+        await self._report(job["id"], "fetching_summaries", 0, None, lease_scope)
+        response = await sync_user_decks(
+            client,
+            self._cache,
+            username,
+            single_flight=self.single_flight,
+            mode=job.get("mode") or "full",
+            on_progress=_on_progress,
+            raise_persistence_errors=True,
+        )
+        return response.total_decks
+
+    async def _report(
+        self,
+        job_id: str,
+        stage: str,
+        fetched: int,
+        total: Optional[int],
+        lease_scope: anyio.CancelScope,
+    ) -> None:
+        """Store progress and extend the lease; abort the job once the lease is lost."""
+        held = await self._jobs.record_progress(
+            job_id,
+            self.worker_id,
+            {"stage": stage, "decks_fetched": fetched, "decks_total": total},
+            self.lease_seconds,
+        )
+        if not held:
+            lease_scope.cancel()
+            await anyio.lowlevel.checkpoint()
+
+    async def _retry_or_fail(
+        self, job_id: str, attempts: int, max_attempts: int, exc: Exception
+    ) -> None:
+        if attempts >= max_attempts:
+            await self._jobs.mark_failed(job_id, self.worker_id, error=str(exc))
+            logger.warning("Sync job %s failed after %d attempt(s): %s", job_id, attempts, exc)
+            return
+        delay = min(self.retry_backoff_max, self.retry_backoff_base * (2 ** (attempts - 1)))
+        run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        await self._jobs.mark_retry(job_id, self.worker_id, error=str(exc), run_at=run_at)
+        logger.warning(
+            "Sync job %s attempt %d/%d failed (%s); retrying in %.0f s.",
+            job_id,
+            attempts,
+            max_attempts,
+            exc,
+            delay,
+        )
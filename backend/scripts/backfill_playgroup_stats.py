@@ -0,0 +1,57 @@
+"""Recompute every playgroup's stats document in one columnar pass over the games."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import anyio
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.dependencies import (  # pylint: disable=wrong-import-position
+    close_mongo_client,
+    get_mongo_database,
+)
+from app.services.stats_backfill import run_stats_backfill  # pylint: disable=wrong-import-position
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        report = await run_stats_backfill(
+            get_mongo_database(), batch_size=args.batch_size, dry_run=args.dry_run
+        )
+    finally:
+        close_mongo_client()
+
+    print(  # noqa: T201
+        f"games={report.games} seats={report.seats} playgroups={report.playgroups} "
+        f"written={report.written} flagged_stale={report.flagged_stale} numpy={report.numpy}"
+    )
+    print(  # noqa: T201
+        f"read={report.read_seconds:.2f}s compute={report.compute_seconds:.2f}s "
+        f"write={report.write_seconds:.2f}s"
+    )
+    print(  # noqa: T201
+        f"per million games: {report.seconds_per_million_games:.1f}s, "
+        f"{report.column_bytes_per_million_games / (1024 * 1024):.1f} MiB of columns"
+    )
+
+
+def main() -> None:
+    """Run the backfill and print throughput and column memory per million games."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Games per Mongo cursor batch."
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Compute and report without writing stats."
+    )
+    anyio.run(_main, parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare Moxfield transports against a local stub server with simulated latency."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import anyio
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.logging_utils import get_logger  # pylint: disable=wrong-import-position
+from app.moxfield import MoxfieldClient  # pylint: disable=wrong-import-position
+from app.moxfield.transport import (  # pylint: disable=wrong-import-position
+    CloudscraperTransport,
+    HttpxTransport,
+)
+
+PAYLOAD = json.dumps({"publicId": "deck", "boards": {"mainboard": {"cards": {}}}}).encode()
+
+
+class _StubServer(ThreadingHTTPServer):
+    # Accept bursts of new connections without SYN backlog stalls.
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def _serve_stub(latency_ms: float, port_queue: "multiprocessing.Queue[int]") -> None:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            time.sleep(latency_ms / 1000.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+        def log_message(self, *_: object) -> None:
+            return
+
+    server = _StubServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _start_stub_server(latency_ms: float) -> tuple[multiprocessing.Process, int]:
+    """Run the stub in a separate process so it does not compete for the client's GIL."""
+    port_queue: "multiprocessing.Queue[int]" = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_serve_stub, args=(latency_ms, port_queue), daemon=True
+    )
+    process.start()
+    return process, port_queue.get(timeout=10)
+
+
+async def _run(client: MoxfieldClient, requests: int, concurrency: int) -> float:
+    limiter = anyio.Semaphore(concurrency)
+
+    async def _one(index: int) -> None:
+        async with limiter:
+            await client.get_deck_details(f"deck-{index}")
+
+    started = time.perf_counter()
+    async with anyio.create_task_group() as task_group:
+        for index in range(requests):
+            task_group.start_soon(_one, index)
+    return time.perf_counter() - started
+
+
+async def _main(args: argparse.Namespace) -> None:
+    server, port = _start_stub_server(args.latency_ms)
+    base_url = f"http://127.0.0.1:{port}"
+    transports = {
+        "cloudscraper": lambda: CloudscraperTransport(),
+        "httpx": lambda: HttpxTransport(http2=False, max_connections=args.concurrency),
+    }
+    try:
+        for name, factory in transports.items():
+            client = MoxfieldClient(base_url=base_url, transport=factory(), max_attempts=1)
+            try:
+                elapsed = await _run(client, args.requests, args.concurrency)
+            finally:
+                await client.aclose()
+            print(  # noqa: T201
+                f"{name:<13} {args.requests} requests @ concurrency {args.concurrency}: "
+                f"{elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)"
+            )
+    finally:
+        server.terminate()
+
+
+def main() -> None:
+    """Run the benchmark and print throughput per transport."""
+    # Per-request INFO logs would dominate the measurement.
+    get_logger().setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    anyio.run(_main, parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
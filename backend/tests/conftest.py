@@ -16,8 +16,14 @@ for path in (ROOT, WORKSPACE_ROOT):
     if str(path) not in sys.path:
         sys.path.insert(0, str(path))
 
-from app.dependencies import get_mongo_database, get_moxfield_client  # noqa: E402
+from app.dependencies import (  # noqa: E402
+    get_mongo_database,
+    get_moxfield_client,
+    get_sync_single_flight,
+)
 from app.main import create_app  # noqa: E402
+from app.services import profiles as profile_service  # noqa: E402
+from app.services.sync import SingleFlight  # noqa: E402
 from backend.tests.utils import StubDatabase, StubMoxfieldClient
 
 
@@ -47,6 +53,12 @@ def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item
             item.add_marker(skip_prod)
 
 
+@pytest.fixture(autouse=True)
+def fresh_profile_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test with an empty process-wide profile cache."""
+    monkeypatch.setattr(profile_service, "_profile_cache", None)
+
+
 @pytest.fixture()
 def api_client() -> TestClient:
     """Provide a FastAPI TestClient with dependency overrides reset after use."""
@@ -54,6 +66,8 @@ def api_client() -> TestClient:
     stub_db = StubDatabase()
     app.dependency_overrides[get_mongo_database] = lambda: stub_db
     app.dependency_overrides[get_moxfield_client] = lambda: StubMoxfieldClient()
+    single_flight = SingleFlight()
+    app.dependency_overrides[get_sync_single_flight] = lambda: single_flight
     app.state.stub_db = stub_db
     client = TestClient(app)
     try:
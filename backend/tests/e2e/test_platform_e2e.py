@@ -10,9 +10,10 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 
 from app import main as app_main
-from app.dependencies import get_mongo_database, get_moxfield_client
+from app.dependencies import get_mongo_database, get_moxfield_client, get_sync_single_flight
 from app.main import create_app
 from app.moxfield import MoxfieldError, MoxfieldNotFoundError
+from app.services.sync import SingleFlight
 from backend.tests.utils import StubDatabase, StubMoxfieldClient
 
 pytestmark = pytest.mark.anyio
@@ -151,6 +152,8 @@ async def _stubbed_app_context(stub_moxfield: StubMoxfieldClient) -> AsyncIterat
     stub_db = StubDatabase()
     app.dependency_overrides[get_mongo_database] = lambda: stub_db
     app.dependency_overrides[get_moxfield_client] = lambda: stub_moxfield
+    single_flight = SingleFlight()
+    app.dependency_overrides[get_sync_single_flight] = lambda: single_flight
 
     original_get_db: Callable[[], Any] = app_main.get_mongo_database  # type: ignore[assignment]
     original_close: Callable[[], Any] = app_main.close_mongo_client  # type: ignore[assignment]
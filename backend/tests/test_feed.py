@@ -0,0 +1,140 @@
+"""Tests for the fan-out-on-write activity feed."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.services import feed
+from app.services.game_rows import encode_game_cursor
+from backend.tests.utils import record_game
+
+
+def _march(day: int) -> datetime:
+    return datetime(2024, 3, day, 20, tzinfo=timezone.utc)
+
+
+def _feed(client: TestClient, viewer: str, **params: object) -> dict:
+    response = client.get(f"/social/users/{viewer}/feed", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_feed_merges_capped_timelines_with_pulled_heavy_accounts(
+    api_client: TestClient, monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        feed,
+        "get_settings",
+        lambda: replace(get_settings(), feed_timeline_cap=3, feed_fanout_max_followers=1),
+    )
+    for sub, is_public in [("pal", True), ("star", True), ("hidden", False), ("reader", True)]:
+        api_client.put(f"/profiles/{sub}", json={"display_name": sub.title(), "is_public": is_public})
+    for follower, target in [("reader", "pal"), ("reader", "star"), ("reader", "hidden"), ("fan", "star")]:
+        response = api_client.post(f"/social/users/{follower}/follow", json={"target_sub": target})
+        assert response.status_code == 204
+
+    for day in (1, 3, 5, 7):
+        record_game(api_client, "pal", ["paula", "rival"], recorded_at=_march(day))
+    for day in (2, 6):
+        record_game(api_client, "star", ["stella", "rival"], recorded_at=_march(day))
+    record_game(api_client, "hidden", ["hugo", "rival"], recorded_at=_march(8))
+
+    timelines = api_client.app.state.stub_db["timelines"].documents
+    # Only the lightly followed public account is fanned out, capped to the newest three.
+    assert [entry["owner_sub"] for entry in timelines[0]["entries"]] == ["pal"] * 3
+    assert {document["follower_sub"] for document in timelines} == {"reader"}
+
+    first = _feed(api_client, "reader", limit=3)
+    assert [(item["google_sub"], item["game"]["created_at"][:10]) for item in first["items"]] == [
+        ("pal", "2024-03-07"),
+        ("star", "2024-03-06"),
+        ("pal", "2024-03-05"),
+    ]
+    assert first["items"][0]["display_name"] == "Pal"
+    assert first["items"][0]["game"]["winner"] == "Paula"
+    assert first["items"][0]["game"]["runner_up"] == "Rival"
+
+    second = _feed(api_client, "reader", limit=3, cursor=first["next_cursor"])
+    assert [item["game"]["created_at"][:10] for item in second["items"]] == ["2024-03-03", "2024-03-02"]
+    assert second["next_cursor"] is None
+
+    api_client.delete("/social/users/reader/follow/pal")
+    assert {item["google_sub"] for item in _feed(api_client, "reader")["items"]} == {"star"}
+    assert _feed(api_client, "nobody")["items"] == []
+
+    invalid = api_client.get("/social/users/reader/feed", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+
+def test_feed_keeps_games_when_follower_count_crosses_threshold(
+    api_client: TestClient, monkeypatch
+) -> None:
+    """Each game keeps its push/pull decision, and offset-aware cursors are normalized."""
+    monkeypatch.setattr(
+        feed, "get_settings", lambda: replace(get_settings(), feed_fanout_max_followers=1)
+    )
+    for sub in ("climber", "first", "second"):
+        api_client.put(f"/profiles/{sub}", json={"display_name": sub.title(), "is_public": True})
+
+    def _follow(follower: str) -> None:
+        response = api_client.post(f"/social/users/{follower}/follow", json={"target_sub": "climber"})
+        assert response.status_code == 204
+
+    _follow("first")
+    # One follower: pushed.
+    record_game(api_client, "climber", ["cleo", "rival"], recorded_at=_march(1))
+    _follow("second")
+    # Two followers: pulled.
+    record_game(api_client, "climber", ["cleo", "rival"], recorded_at=_march(2))
+    games = api_client.app.state.stub_db["games"].documents
+    assert [game["feed_delivery"] for game in games] == ["push", "pull"]
+
+    # Dropping back under the threshold must not hide the pulled game.
+    assert api_client.delete("/social/users/second/follow/climber").status_code == 204
+    days = [item["game"]["created_at"][:10] for item in _feed(api_client, "first")["items"]]
+    assert days == ["2024-03-02", "2024-03-01"]
+
+    # Mongo hands back naive UTC datetimes; a cursor carrying an offset must still compare.
+    for entry in api_client.app.state.stub_db["timelines"].documents[0]["entries"]:
+        entry["created_at"] = entry["created_at"].replace(tzinfo=None)
+    cursor = encode_game_cursor(
+        {"created_at": datetime(2024, 3, 2, 20, 30, tzinfo=timezone(timedelta(hours=1))), "id": "~"}
+    )
+    page = _feed(api_client, "first", cursor=cursor)
+    assert [item["game"]["created_at"][:10] for item in page["items"]] == ["2024-03-01"]
+    listed = api_client.get("/profiles/climber/games", params={"limit": 5, "cursor": cursor})
+    assert listed.status_code == 200
+    assert [game["created_at"][:10] for game in listed.json()["games"]] == ["2024-03-01"]
+
+
+def test_feed_pages_past_games_of_accounts_that_went_private(
+    api_client: TestClient, monkeypatch
+) -> None:
+    """Pulled games of a followed account that went private never cut a page short."""
+    monkeypatch.setattr(
+        feed, "get_settings", lambda: replace(get_settings(), feed_fanout_max_followers=0)
+    )
+    for sub in ("quiet", "loud", "watcher"):
+        api_client.put(f"/profiles/{sub}", json={"display_name": sub.title(), "is_public": True})
+    for target in ("quiet", "loud"):
+        response = api_client.post("/social/users/watcher/follow", json={"target_sub": target})
+        assert response.status_code == 204
+
+    for day in (1, 2, 3):
+        record_game(api_client, "quiet", ["quinn", "rival"], recorded_at=_march(day))
+    for day in (10, 11, 12, 13):
+        record_game(api_client, "loud", ["lou", "rival"], recorded_at=_march(day))
+    api_client.put("/profiles/loud", json={"is_public": False})
+
+    first = _feed(api_client, "watcher", limit=2)
+    assert [item["game"]["created_at"][:10] for item in first["items"]] == [
+        "2024-03-03",
+        "2024-03-02",
+    ]
+    second = _feed(api_client, "watcher", limit=2, cursor=first["next_cursor"])
+    assert [item["game"]["created_at"][:10] for item in second["items"]] == ["2024-03-01"]
+    assert second["next_cursor"] is None
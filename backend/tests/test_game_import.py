@@ -0,0 +1,172 @@
+"""Tests for the bulk NDJSON/CSV game import endpoint."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.repositories import PlaygroupRepository
+from app.schemas import GameCreate
+from app.services import play_data
+from backend.tests.utils import StubDatabase
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def _game_line(playgroup: dict, order: list[str], recorded_at: str) -> str:
+    return json.dumps(
+        {
+            "playgroup": playgroup,
+            "players": [{"id": seat, "name": seat.title()} for seat in order],
+            "rankings": [{"player_id": seat, "rank": rank} for rank, seat in enumerate(order, start=1)],
+            "recorded_at": recorded_at,
+        }
+    )
+
+
+def test_ndjson_import_batches_games_and_reports_rejected_rows(
+    api_client: TestClient, monkeypatch
+) -> None:
+    owner = "import-owner"
+    existing = api_client.post(f"/profiles/{owner}/playgroups", json={"name": "Existing"}).json()
+
+    lines = [
+        _game_line({"name": "Fresh Group"}, ["alice", "bob"], "2023-01-05T20:00:00+00:00"),
+        _game_line({"id": existing["id"], "name": "Existing"}, ["bob", "alice"], "2023-02-01T20:00:00+00:00"),
+        "{not json",
+        _game_line({"name": "Fresh Group"}, ["alice"], "2023-01-06T20:00:00+00:00"),
+        "",
+        _game_line({"name": "fresh   group"}, ["bob", "carol"], "2023-03-01T20:00:00+00:00"),
+        _game_line({"id": "missing", "name": "Ghost"}, ["alice", "bob"], "2023-01-01T20:00:00+00:00"),
+        json.dumps({"playgroup": {"name": "Fresh Group"}, "players": []}),
+    ]
+    monkeypatch.setattr(
+        play_data, "get_settings", lambda: replace(get_settings(), mongo_bulk_write_batch_size=2)
+    )
+    response = api_client.post(
+        f"/profiles/{owner}/games/import",
+        content="\n".join(lines).encode("utf-8"),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 3
+    assert report["rejected"] == 4
+    assert [error["row"] for error in report["errors"]] == [3, 4, 7, 8]
+    assert report["errors"][0]["error"] == "JSON invalide."
+    assert report["errors"][1]["error"] == "Au moins deux joueurs sont requis pour enregistrer une partie."
+    assert report["errors"][2]["error"] == "Groupe introuvable."
+    assert report["errors"][3]["error"].startswith("rankings")
+
+    games = api_client.app.state.stub_db["games"]
+    assert [len(batch) for batch in games.bulk_write_calls] == [2, 1]
+
+    listed = api_client.get(f"/profiles/{owner}/playgroups").json()["playgroups"]
+    playgroups = {group["name"]: group for group in listed}
+    assert set(playgroups) == {"Existing", "Fresh Group"}
+    assert playgroups["Fresh Group"]["game_count"] == 2
+    assert playgroups["Existing"]["game_count"] == 1
+    assert sorted(report["playgroup_ids"]) == sorted(group["id"] for group in playgroups.values())
+
+    detail = api_client.get(f"/profiles/{owner}/playgroups/{playgroups['Fresh Group']['id']}").json()
+    assert detail["stats"]["total_games"] == 2
+    leaderboard = api_client.get(
+        f"/profiles/{owner}/playgroups/{playgroups['Fresh Group']['id']}/leaderboard"
+    ).json()
+    assert leaderboard["total_games"] == 2
+
+
+def test_csv_import_maps_seats_to_tracked_players(api_client: TestClient) -> None:
+    owner = "csv-owner"
+    tracked = api_client.post(f"/profiles/{owner}/players", json={"name": "Alice"}).json()
+
+    body = (
+        "\ufeffPlaygroup,Recorded_At,Player_1,Deck_1,Player_2,Deck_2,Player_3,Rank_3,Notes\n"
+        'Pod,2024-01-05T20:00:00+00:00,alice,Krenko,Bob,Atraxa,Carol,2,"Long game,\nclose finish"\n'
+        "Pod,2024-01-12T20:00:00+00:00,Bob,Atraxa,Alice,Krenko,,,\n"
+        "Pod,2024-01-19T20:00:00+00:00,Bob,,Bob,,,,\n"
+        ",,,,,,,,\n"
+        "Pod,not-a-date,Alice,,Bob,,,,\n"
+    )
+    response = api_client.post(
+        f"/profiles/{owner}/games/import",
+        content=body.encode("utf-8"),
+        headers={"content-type": "text/csv"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [5, 7]
+    assert report["errors"][1]["error"].startswith("recorded_at")
+
+    games = api_client.get(f"/profiles/{owner}/games").json()["games"]
+    first = games[-1]
+    assert first["notes"] == "Long game,\nclose finish"
+    seats = {player["name"]: player for player in first["players"]}
+    assert seats["alice"]["id"] == tracked["id"]
+    assert seats["alice"]["deck_name"] == "Krenko"
+    ranks = {ranking["player_id"]: ranking["rank"] for ranking in first["rankings"]}
+    assert ranks[seats["alice"]["id"]] == 1
+    assert ranks[seats["Carol"]["id"]] == 2
+    assert ranks[seats["Bob"]["id"]] == 2
+    # Untracked guests keep one identity across imported games.
+    assert {player["id"] for player in games[0]["players"] if player["name"] == "Bob"} == {seats["Bob"]["id"]}
+
+    bad_header = api_client.post(
+        f"/profiles/{owner}/games/import",
+        params={"format": "csv"},
+        content=b"group,winner\nPod,Alice\n",
+    )
+    assert bad_header.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_import_cut_off_midway_still_counts_stored_games(monkeypatch) -> None:
+    """A stream failing after some batches landed still updates playgroups and flags stats."""
+    owner = "cut-owner"
+    database = StubDatabase()
+    playgroup = await PlaygroupRepository(database).upsert(owner, "Cut Group")
+    stats = database[get_settings().mongo_playgroup_stats_collection]
+    stats.documents.append(
+        {
+            "owner_sub": owner,
+            "playgroup_id": playgroup["id"],
+            "generation": 0,
+            "stale": False,
+            "total_games": 0,
+        }
+    )
+    monkeypatch.setattr(
+        play_data, "get_settings", lambda: replace(get_settings(), mongo_bulk_write_batch_size=1)
+    )
+    flagged_before_insert: list[bool] = []
+    original_bulk_insert = play_data.GameRepository.bulk_insert
+
+    async def bulk_insert(self, documents):
+        flagged_before_insert.append(stats.documents[0]["stale"])
+        return await original_bulk_insert(self, documents)
+
+    monkeypatch.setattr(play_data.GameRepository, "bulk_insert", bulk_insert)
+
+    async def rows():
+        reference = {"id": playgroup["id"], "name": "Cut Group"}
+        for row, day in enumerate(["05", "06"], start=1):
+            line = _game_line(reference, ["alice", "bob"], f"2023-01-{day}T20:00:00+00:00")
+            yield row, GameCreate.model_validate_json(line)
+        raise RuntimeError("Connexion interrompue.")
+
+    with pytest.raises(RuntimeError):
+        await play_data.import_games(database, owner, rows())
+
+    assert flagged_before_insert == [True, True]
+    assert len(database[get_settings().mongo_games_collection].documents) == 2
+    (stored,) = await PlaygroupRepository(database).list_for_owner(owner)
+    assert stored["game_count"] == 2
+    assert stats.documents[0]["stale"] is True
@@ -23,3 +23,11 @@ def test_health_endpoint_returns_ok(api_client: TestClient) -> None:
 
 def test_meta_router_exposes_health_route() -> None:
     assert any(route.path == "/health" for route in meta_router.routes)
+
+
+def test_moxfield_scheduler_diagnostics_lists_endpoint_budgets(api_client: TestClient) -> None:
+    response = api_client.get("/diagnostics/moxfield-scheduler")
+    assert response.status_code == 200
+    endpoints = {entry["endpoint"]: entry for entry in response.json()["endpoints"]}
+    assert {"user_search", "deck_search", "deck_detail", "default"} <= set(endpoints)
+    assert endpoints["deck_detail"]["queue_depth"] == {"interactive": 0, "background": 0}
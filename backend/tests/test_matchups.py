@@ -0,0 +1,171 @@
+"""Tests for head-to-head matchup counters and the top-K matchup endpoint."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.repositories import MatchupRepository
+from app.schemas import MatchupKind
+from app.services import play_data
+from app.services.matchups import (
+    apply_game_to_matchups,
+    game_matchup_pairs,
+    get_matchups,
+    rebuild_matchups,
+    reserve_game_matchups,
+)
+from backend.tests.utils import StubDatabase, record_game
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def test_game_matchup_pairs_cover_both_directions_and_ties() -> None:
+    game = {
+        "players": [
+            {"id": "a", "name": "A", "deck_name": "Shared"},
+            {"id": "b", "name": "B", "deck_name": "Shared"},
+            {"id": "c", "name": "C", "deck_id": "deck-c", "deck_name": "Other"},
+        ],
+        "rankings": [
+            {"player_id": "a", "rank": 1},
+            {"player_id": "b", "rank": 1},
+            {"player_id": "c", "rank": 3},
+        ],
+    }
+    pairs = {(pair["kind"], pair["subject"], pair["opponent"]): pair for pair in game_matchup_pairs(game)}
+
+    assert len([key for key in pairs if key[0] == "player"]) == 6
+    assert pairs[("player", "a", "b")]["ties"] == 1
+    assert pairs[("player", "c", "a")]["losses"] == 1
+    # Two seats on the same deck count once for that deck.
+    assert set(key for key in pairs if key[0] == "deck") == {
+        ("deck", "Shared", "deck-c"),
+        ("deck", "deck-c", "Shared"),
+    }
+    assert pairs[("deck", "Shared", "deck-c")]["wins"] == 1
+
+
+def test_matchups_update_incrementally_and_match_rebuild(api_client: TestClient) -> None:
+    owner = "matchup-owner"
+    base = f"/profiles/{owner}/stats/matchups"
+    record_game(api_client, owner, ["alice", "bob", "carol"])
+
+    # The first read serves the (empty) counters as stale and rebuilds after the response.
+    first = api_client.get(base, params={"kind": "player", "subject": "alice"})
+    assert first.status_code == 200
+    assert first.json()["stale"] is True
+    assert first.json()["matchups"] == []
+    second = api_client.get(base, params={"kind": "player", "subject": "alice"}).json()
+    assert second["stale"] is False
+    assert [row["opponent"] for row in second["matchups"]] == ["bob", "carol"]
+
+    record_game(api_client, owner, ["bob", "alice"])
+    record_game(api_client, owner, ["alice", "bob", "dave"])
+
+    collection = api_client.app.state.stub_db["matchups"]
+    state = next(doc for doc in collection.documents if doc["kind"] == "state")
+    assert state["stale"] is False
+
+    incremental = api_client.get(base, params={"kind": "player", "subject": "alice"}).json()
+    assert incremental["subject_name"] == "Alice"
+    bob = incremental["matchups"][0]
+    assert (bob["opponent"], bob["games"], bob["wins"], bob["losses"]) == ("bob", 3, 2, 1)
+    assert bob["win_rate"] == 0.667
+
+    decks = api_client.get(base, params={"subject": "Bob Deck", "limit": 1}).json()
+    assert decks["kind"] == "deck"
+    assert [(row["opponent"], row["wins"]) for row in decks["matchups"]] == [("Alice Deck", 1)]
+
+    state["stale"] = True
+    flagged = api_client.get(base, params={"kind": "player", "subject": "alice"}).json()
+    assert flagged == {**incremental, "stale": True}
+    assert state["stale"] is False
+    rebuilt = api_client.get(base, params={"kind": "player", "subject": "alice"}).json()
+    assert rebuilt == incremental
+
+    unknown = api_client.get(base, params={"kind": "player", "subject": "nobody"})
+    assert unknown.status_code == 200
+    assert unknown.json()["matchups"] == []
+
+
+def test_matchup_rebuilds_hold_a_lease_and_rewrite_rows_in_place(
+    api_client: TestClient, monkeypatch
+) -> None:
+    """Rebuilds never overlap, prune vanished pairs, and a rebuild racing an insert counts it once."""
+    owner = "matchup-lease-owner"
+    base = f"/profiles/{owner}/stats/matchups"
+    params = {"kind": "player", "subject": "alice"}
+    record_game(api_client, owner, ["alice", "bob"])
+    api_client.get(base, params=params)
+    assert api_client.get(base, params=params).json()["matchups"][0]["games"] == 1
+
+    collection = api_client.app.state.stub_db["matchups"]
+    state = next(doc for doc in collection.documents if doc["kind"] == "state")
+    collection.documents.append(
+        {"owner_sub": owner, "kind": "player", "subject": "alice", "opponent": "ghost", "games": 9}
+    )
+
+    # While another rebuild holds the lease, readers serve the current rows untouched.
+    state["stale"] = True
+    state["rebuild_token"] = "other-rebuild"
+    state["rebuild_until"] = datetime.now(timezone.utc) + timedelta(minutes=1)
+    held = api_client.get(base, params=params)
+    assert held.status_code == 200
+    assert held.json()["stale"] is True
+    assert {row["opponent"] for row in held.json()["matchups"]} == {"bob", "ghost"}
+    assert state["stale"] is True
+    assert state["rebuild_token"] == "other-rebuild"
+
+    # Once the lease expires, the rebuild takes over and deletes pairs it did not rewrite.
+    state["rebuild_until"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert api_client.get(base, params=params).json()["stale"] is True
+    rebuilt = api_client.get(base, params=params).json()
+    assert [row["opponent"] for row in rebuilt["matchups"]] == ["bob"]
+    assert state["stale"] is False
+    assert "rebuild_token" not in state
+
+    # A rebuild landing between the game insert and its pairs must not count the game twice.
+    database = api_client.app.state.stub_db
+    original_insert = play_data.GameRepository.insert
+
+    async def insert_then_rebuild(self, document):
+        await original_insert(self, document)
+        await MatchupRepository(database).mark_stale(owner)
+        await rebuild_matchups(database, owner)
+
+    monkeypatch.setattr(play_data.GameRepository, "insert", insert_then_rebuild)
+    record_game(api_client, owner, ["bob", "alice"])
+    assert state["stale"] is True
+    api_client.get(base, params=params)
+    bob = api_client.get(base, params=params).json()["matchups"][0]
+    assert (bob["opponent"], bob["games"], bob["wins"], bob["losses"]) == ("bob", 2, 1, 1)
+
+
+@pytest.mark.anyio
+async def test_overlapping_recordings_keep_matchups_fresh() -> None:
+    """Games reserved and applied concurrently all count without flagging the counters."""
+    database = StubDatabase()
+    owner = "matchup-overlap-owner"
+    await rebuild_matchups(database, owner)
+    games = [
+        {
+            "owner_sub": owner,
+            "players": [{"id": seat, "name": seat.title()} for seat in order],
+            "rankings": [{"player_id": seat, "rank": rank} for rank, seat in enumerate(order, 1)],
+        }
+        for order in (["alice", "bob"], ["bob", "alice"], ["alice", "bob"])
+    ]
+    epochs = [await reserve_game_matchups(database, owner) for _ in games]
+    for game, epoch in zip(games, epochs):
+        await apply_game_to_matchups(database, game, epoch)
+
+    result = await get_matchups(database, owner, MatchupKind.PLAYER, "alice")
+    assert result.stale is False
+    bob = result.matchups[0]
+    assert (bob.opponent, bob.games, bob.wins, bob.losses) == ("bob", 3, 2, 1)
@@ -0,0 +1,200 @@
+"""Tests for the Moxfield client transport and scheduling layers."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from app.moxfield import (
+    MoxfieldClient,
+    MoxfieldError,
+    MoxfieldNotFoundError,
+    RequestPriority,
+    RequestScheduler,
+    request_priority,
+)
+from app.moxfield.scheduler import EndpointBudget
+from app.moxfield.transport import FallbackTransport, HttpxTransport
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    """Force AnyIO to execute against asyncio for transport tests."""
+    return "asyncio"
+
+
+class _RecordingTransport:
+    """Transport double returning canned httpx responses."""
+
+    def __init__(self, name: str, responses: list[httpx.Response]) -> None:
+        self.name = name
+        self.responses = list(responses)
+        self.calls: list[tuple[str, str, dict[str, Any] | None]] = []
+        self.closed = False
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        timeout: float,
+    ) -> httpx.Response:
+        self.calls.append((method, url, params))
+        return self.responses.pop(0)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+async def test_httpx_transport_serves_client_requests_without_worker_threads() -> None:
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"publicId": "deck-1"})
+
+    transport = HttpxTransport(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    client = MoxfieldClient(base_url="https://moxfield.test", transport=transport)
+
+    detail = await client.get_deck_details("deck-1")
+    assert detail == {"publicId": "deck-1"}
+
+    with pytest.raises(MoxfieldNotFoundError):
+        await client.get_deck_details("missing")
+
+    await client.get_user_deck_summaries("Alice")
+    # Booleans are serialised like ``requests`` so both transports build the same URL.
+    assert seen[-1].url.params["includePinned"] == "True"
+
+    await client.aclose()
+    assert transport._client.is_closed
+
+
+async def test_fallback_transport_switches_after_cloudflare_challenge() -> None:
+    primary = _RecordingTransport(
+        "httpx",
+        [
+            httpx.Response(403, text="private deck"),
+            httpx.Response(403, text="challenge", headers={"cf-mitigated": "challenge"}),
+        ],
+    )
+    fallback = _RecordingTransport(
+        "cloudscraper",
+        [httpx.Response(200, json={"ok": 1}), httpx.Response(200, json={"ok": 2})],
+    )
+    transport = FallbackTransport(primary, fallback, sticky_seconds=60)
+    client = MoxfieldClient(base_url="https://moxfield.test", transport=transport, max_attempts=1)
+
+    # A plain 403 is an upstream error, not a reason to switch transports.
+    with pytest.raises(MoxfieldError):
+        await client.get_deck_details("private")
+    assert fallback.calls == []
+
+    assert await client.get_deck_details("deck-1") == {"ok": 1}
+    # Fallback stays sticky so the next call skips the challenged primary transport.
+    assert await client.get_deck_details("deck-2") == {"ok": 2}
+    assert len(primary.calls) == 2
+    assert [call[1] for call in fallback.calls] == [
+        "https://moxfield.test/v3/decks/all/deck-1",
+        "https://moxfield.test/v3/decks/all/deck-2",
+    ]
+
+    await client.aclose()
+    assert primary.closed and fallback.closed
+
+
+async def test_iter_deck_details_yields_in_order_chunk_by_chunk() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        public_id = request.url.path.rsplit("/", 1)[-1]
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await anyio.sleep(0.01 if public_id == "deck-0" else 0)
+        in_flight -= 1
+        if public_id == "deck-2":
+            return httpx.Response(404)
+        if public_id == "broken":
+            return httpx.Response(400, text="bad request")
+        return httpx.Response(200, json={"publicId": public_id})
+
+    transport = HttpxTransport(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    client = MoxfieldClient(
+        base_url="https://moxfield.test",
+        transport=transport,
+        scheduler=RequestScheduler({"deck_detail": EndpointBudget(rate=1000.0, burst=100)}),
+        detail_concurrency_limit=2,
+    )
+
+    ids = [f"deck-{index}" for index in range(5)]
+    details = [detail["publicId"] async for detail in client.iter_deck_details(ids)]
+    # Summary order is kept even when the first deck of a chunk is the slowest; 404s are skipped.
+    assert details == ["deck-0", "deck-1", "deck-3", "deck-4"]
+    assert peak == 2
+
+    streamed: list[str] = []
+    with pytest.raises(MoxfieldError):
+        async for detail in client.iter_deck_details(["deck-0", "deck-1", "broken"]):
+            streamed.append(detail["publicId"])
+    assert streamed == ["deck-0", "deck-1"]
+    await client.aclose()
+
+
+async def test_scheduler_serves_interactive_lane_before_background_waiters() -> None:
+    scheduler = RequestScheduler({"deck_detail": EndpointBudget(rate=50.0, burst=1)})
+    assert await scheduler.acquire("deck_detail") == 0.0
+
+    served: list[str] = []
+
+    async def _acquire(label: str, priority: RequestPriority) -> None:
+        with request_priority(priority):
+            await scheduler.acquire("deck_detail")
+        served.append(label)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(_acquire, "background-1", RequestPriority.BACKGROUND)
+        task_group.start_soon(_acquire, "background-2", RequestPriority.BACKGROUND)
+        await anyio.sleep(0)
+        metrics = next(entry for entry in scheduler.snapshot() if entry["endpoint"] == "deck_detail")
+        assert metrics["queue_depth"] == {"interactive": 0, "background": 2}
+        task_group.start_soon(_acquire, "interactive", RequestPriority.INTERACTIVE)
+
+    assert served == ["interactive", "background-1", "background-2"]
+    metrics = next(entry for entry in scheduler.snapshot() if entry["endpoint"] == "deck_detail")
+    assert metrics["acquired"] == 4
+    assert metrics["max_wait_ms"] > 0
+
+
+async def test_scheduler_slows_down_on_throttling_and_recovers_on_success() -> None:
+    scheduler = RequestScheduler(
+        {"deck_detail": EndpointBudget(rate=8.0, burst=8)},
+        min_rate_factor=0.25,
+        recovery_step=0.25,
+    )
+    transport = _RecordingTransport(
+        "fake",
+        [httpx.Response(429), httpx.Response(503), httpx.Response(200, json={"ok": True})],
+    )
+    client = MoxfieldClient(
+        base_url="https://moxfield.test",
+        transport=transport,
+        scheduler=scheduler,
+        retry_backoff_base=0.0,
+    )
+
+    assert await client.get_deck_details("deck-1") == {"ok": True}
+
+    metrics = next(entry for entry in scheduler.snapshot() if entry["endpoint"] == "deck_detail")
+    # 429 and 503 halve the rate twice (floored at 25%), the success adds one step back.
+    assert metrics["throttled"] == 2
+    assert metrics["effective_rate"] == pytest.approx(8.0 * 0.5)
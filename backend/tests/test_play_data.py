@@ -2,8 +2,26 @@
 
 from __future__ import annotations
 
+import json
+from dataclasses import replace
+from functools import partial
+
+import anyio
+import pytest
 from fastapi.testclient import TestClient
 
+from app.config import get_settings
+from app.schemas import GameCreate, GamePlayer, GameRecord
+from app.services import play_data
+from app.services.game_rows import GameRow, PlayerRow
+from app.services.playgroup_stats import rebuild_playgroup_stats
+from backend.tests.utils import StubDatabase
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    return "asyncio"
+
 
 def test_create_playgroup_and_list(api_client: TestClient) -> None:
     """Playgroups can be created and listed for a user."""
@@ -284,3 +302,434 @@ def test_linking_tracked_player_updates_games(api_client: TestClient) -> None:
     assert linked_entry["playerType"] == "user"
     assert linked_entry["google_sub"] == target
     assert linked_entry["decks"][0]["public_id"] == "deck-xyz"
+
+
+def test_playgroup_stats_are_maintained_incrementally(api_client: TestClient) -> None:
+    owner = "incremental-owner"
+    create_group = api_client.post(f"/profiles/{owner}/playgroups", json={"name": "Inc Group"})
+    assert create_group.status_code == 201
+    playgroup_id = create_group.json()["id"]
+
+    # The first read materializes an empty stats document; later games are $inc'd into it.
+    empty_detail = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}")
+    assert empty_detail.json()["stats"]["total_games"] == 0
+
+    winners = ["alice", "bob", "alice", "carol", "alice", "bob"]
+    for winner in winners:
+        others = [seat for seat in ("alice", "bob", "carol") if seat != winner]
+        payload = {
+            "playgroup": {"id": playgroup_id, "name": "Inc Group"},
+            "players": [
+                {"id": seat, "name": seat.title(), "deck_id": f"deck-{seat}", "deck_name": f"{seat.title()} Deck"}
+                for seat in ("alice", "bob", "carol")
+            ],
+            "rankings": [
+                {"player_id": player_id, "rank": rank}
+                for rank, player_id in enumerate([winner, *others], start=1)
+            ],
+        }
+        response = api_client.post(f"/profiles/{owner}/games", json=payload)
+        assert response.status_code == 201
+
+    stats_collection = api_client.app.state.stub_db["playgroup_stats"]
+    stored = stats_collection.documents[0]
+    assert stored["stale"] is False
+    assert stored["total_games"] == len(winners)
+
+    detail = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}").json()
+    assert len(detail["recent_games"]) == 5
+    players = detail["stats"]["player_performance"]
+    assert [entry["name"] for entry in players] == ["Alice", "Bob", "Carol"]
+    assert [entry["wins"] for entry in players] == [3, 2, 1]
+    assert all(entry["games_played"] == 6 and entry["podiums"] == 6 for entry in players)
+    decks = detail["stats"]["deck_performance"]
+    assert decks[0] == {
+        "deckId": "deck-alice",
+        "deck_name": "Alice Deck",
+        "deckFormat": None,
+        "games_played": 6,
+        "wins": 3,
+    }
+
+    # Dropping the materialized document (e.g. data recorded before it existed) rebuilds it.
+    stats_collection.documents.clear()
+    rebuilt = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}").json()
+    assert rebuilt["stats"] == detail["stats"]
+    assert stats_collection.documents[0]["stale"] is False
+
+    assert api_client.delete(f"/profiles/{owner}/playgroups/{playgroup_id}").status_code == 204
+    assert stats_collection.documents == []
+
+
+def test_rebuild_racing_a_game_insert_does_not_double_count(api_client: TestClient, monkeypatch) -> None:
+    """A stats rebuild landing between the game insert and its increment counts the game once."""
+    owner = "race-owner"
+    playgroup_id = api_client.post(f"/profiles/{owner}/playgroups", json={"name": "Race"}).json()["id"]
+    assert api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}").json()["stats"]["total_games"] == 0
+
+    database = api_client.app.state.stub_db
+    original_insert = play_data.GameRepository.insert
+
+    async def insert_then_rebuild(self, document):
+        await original_insert(self, document)
+        await rebuild_playgroup_stats(database, owner, playgroup_id)
+
+    monkeypatch.setattr(play_data.GameRepository, "insert", insert_then_rebuild)
+    response = api_client.post(
+        f"/profiles/{owner}/games",
+        json={
+            "playgroup": {"id": playgroup_id, "name": "Race"},
+            "players": [{"id": "p1", "name": "One"}, {"id": "p2", "name": "Two"}],
+            "rankings": [{"player_id": "p1", "rank": 1}, {"player_id": "p2", "rank": 2}],
+        },
+    )
+    assert response.status_code == 201
+
+    (stored,) = database["playgroup_stats"].documents
+    assert stored["stale"] is True
+    assert stored["total_games"] == 1
+    stats = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}").json()["stats"]
+    assert stats["total_games"] == 1
+    assert [entry["games_played"] for entry in stats["player_performance"]] == [1, 1]
+
+
+def test_linking_player_rebuilds_playgroup_stats(api_client: TestClient) -> None:
+    owner = "relink-owner"
+    create_player = api_client.post(f"/profiles/{owner}/players", json={"name": "Guest Seat"})
+    assert create_player.status_code == 201
+    player_id = create_player.json()["id"]
+
+    playgroup_id = None
+    for seat, winner in ((player_id, True), ("account-seat", False)):
+        seat_payload = (
+            {"id": seat, "name": "Guest Seat"}
+            if seat == player_id
+            else {"id": seat, "name": "Friend", "google_sub": "friend-sub"}
+        )
+        game = api_client.post(
+            f"/profiles/{owner}/games",
+            json={
+                "playgroup": {"name": "Relink Group"},
+                "players": [seat_payload, {"id": "rival", "name": "Rival"}],
+                "rankings": [
+                    {"player_id": seat, "rank": 1 if winner else 2},
+                    {"player_id": "rival", "rank": 2 if winner else 1},
+                ],
+            },
+        )
+        assert game.status_code == 201
+        playgroup_id = game.json()["playgroup"]["id"]
+
+    before = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}").json()
+    assert len(before["stats"]["player_performance"]) == 3
+
+    link = api_client.post(
+        f"/profiles/{owner}/players/{player_id}/link",
+        json={"google_sub": "friend-sub"},
+    )
+    assert link.status_code == 200
+    stats_collection = api_client.app.state.stub_db["playgroup_stats"]
+    assert stats_collection.documents[0]["stale"] is True
+
+    after = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}").json()
+    merged = [
+        entry for entry in after["stats"]["player_performance"] if entry["googleSub"] == "friend-sub"
+    ]
+    assert len(after["stats"]["player_performance"]) == 2
+    assert merged[0]["games_played"] == 2
+    assert merged[0]["wins"] == 1
+    assert stats_collection.documents[0]["stale"] is False
+
+
+def test_stats_endpoints_aggregate_players_and_decks(api_client: TestClient) -> None:
+    owner = "analytics-owner"
+    games = [
+        ("Group A", "alice", [("alice", "Atraxa"), ("bob", "Krenko")]),
+        ("Group A", "bob", [("alice", "Atraxa"), ("bob", "Krenko")]),
+        ("Group B", "alice", [("alice", "Atraxa"), ("carol", None)]),
+    ]
+    for group, winner, seats in games:
+        response = api_client.post(
+            f"/profiles/{owner}/games",
+            json={
+                "playgroup": {"name": group},
+                "players": [
+                    {"id": seat, "name": seat.title(), **({"deck_name": deck} if deck else {})}
+                    for seat, deck in seats
+                ],
+                "rankings": [
+                    {"player_id": seat, "rank": 1 if seat == winner else 2} for seat, _ in seats
+                ],
+            },
+        )
+        assert response.status_code == 201
+        if group == "Group B":
+            group_b = response.json()["playgroup"]["id"]
+
+    players = api_client.get(f"/profiles/{owner}/stats/players")
+    assert players.status_code == 200
+    body = players.json()
+    assert body["total_games"] == 3
+    assert [(row["name"], row["wins"], row["games_played"]) for row in body["players"]] == [
+        ("Alice", 2, 3),
+        ("Bob", 1, 2),
+        ("Carol", 0, 1),
+    ]
+    assert body["players"][0]["podiums"] == 3
+
+    decks = api_client.get(f"/profiles/{owner}/stats/decks", params={"playgroup_id": group_b}).json()
+    assert decks["total_games"] == 1
+    assert decks["decks"] == [
+        {"deckId": None, "deck_name": "Atraxa", "deckFormat": None, "wins": 1, "games_played": 1}
+    ]
+
+    games_collection = api_client.app.state.stub_db["games"]
+    last_pipeline = games_collection.aggregate_calls[-1]
+    assert last_pipeline[0] == {"$match": {"owner_sub": owner, "playgroup_id": group_b}}
+    assert any("$group" in stage for stage in last_pipeline)
+
+
+def test_list_games_pages_with_keyset_cursor(api_client: TestClient, monkeypatch) -> None:
+    owner = "paging-owner"
+    timestamps = [
+        "2024-01-01T20:00:00+00:00",
+        "2024-01-02T20:00:00+00:00",
+        "2024-01-02T20:00:00+00:00",
+        "2024-01-03T20:00:00+00:00",
+        "2024-01-04T20:00:00+00:00",
+    ]
+    for index, recorded_at in enumerate(timestamps):
+        response = api_client.post(
+            f"/profiles/{owner}/games",
+            json={
+                "playgroup": {"name": "Paging Group"},
+                "players": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}],
+                "rankings": [{"player_id": "a", "rank": 1}, {"player_id": "b", "rank": 2}],
+                "recorded_at": recorded_at,
+                "notes": f"game {index}",
+            },
+        )
+        assert response.status_code == 201
+
+    full = api_client.get(f"/profiles/{owner}/games").json()
+    assert full["next_cursor"] is None
+    expected_ids = [game["id"] for game in full["games"]]
+    assert len(expected_ids) == 5
+
+    paged_ids: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = api_client.get(f"/profiles/{owner}/games", params=params).json()
+        paged_ids.extend(game["id"] for game in page["games"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 3
+    assert paged_ids == expected_ids
+
+    invalid = api_client.get(f"/profiles/{owner}/games", params={"limit": 2, "cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+    small_pages = replace(get_settings(), game_stream_page_size=2)
+    monkeypatch.setattr(play_data, "get_settings", lambda: small_pages)
+    stream = api_client.get(f"/profiles/{owner}/games/stream")
+    assert stream.status_code == 200
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert [line["game"]["id"] for line in lines[:-1]] == expected_ids
+    assert lines[-1] == {"type": "end", "streamed_games": 5}
+
+
+def test_linking_player_migrates_games_with_one_update_many(api_client: TestClient) -> None:
+    owner = "migration-owner"
+    player_id = api_client.post(f"/profiles/{owner}/players", json={"name": "Guest"}).json()["id"]
+    seatings = [[player_id, "other"], ["other", "third"], [player_id, "third"]]
+    for seats in seatings:
+        response = api_client.post(
+            f"/profiles/{owner}/games",
+            json={
+                "playgroup": {"name": "Migration Group"},
+                "players": [{"id": seat, "name": seat.title()} for seat in seats],
+                "rankings": [
+                    {"player_id": seat, "rank": rank} for rank, seat in enumerate(seats, start=1)
+                ],
+            },
+        )
+        assert response.status_code == 201
+
+    games_collection = api_client.app.state.stub_db["games"]
+    untouched = next(
+        document for document in games_collection.documents
+        if all(seat["id"] != player_id for seat in document["players"])
+    )
+    untouched_updated_at = untouched["updated_at"]
+
+    link = api_client.post(
+        f"/profiles/{owner}/players/{player_id}/link",
+        json={"google_sub": "linked-account"},
+    )
+    assert link.status_code == 200
+
+    (filter_, update, array_filters), = games_collection.update_many_calls
+    assert filter_ == {"owner_sub": owner, "players.id": player_id}
+    assert array_filters == [{"seat.id": player_id}]
+    assert update["$set"]["players.$[seat].google_sub"] == "linked-account"
+
+    for document in games_collection.documents:
+        for seat in document["players"]:
+            if seat["id"] == player_id:
+                assert seat["google_sub"] == "linked-account"
+                assert seat["player_type"] == "user"
+            else:
+                assert seat.get("google_sub") is None
+    assert untouched["updated_at"] == untouched_updated_at
+
+
+def test_game_rows_serialize_like_game_records(api_client: TestClient) -> None:
+    """Listed rows are encoded directly to JSON identical to the GameRecord model dump."""
+    assert tuple(GamePlayer.model_fields) == PlayerRow._fields
+
+    owner = "row-owner"
+    response = api_client.post(
+        f"/profiles/{owner}/games",
+        json={
+            "playgroup": {"name": "Rows"},
+            "players": [
+                {"id": "b", "name": "Bob", "order": 1, "deck_name": "Bob Deck"},
+                {"id": "a", "name": "Alice", "order": 0, "googleSub": "alice-sub", "playerType": "user"},
+            ],
+            "rankings": [{"player_id": "a", "rank": 2}, {"player_id": "b", "rank": 1}],
+            "notes": "Close one.",
+        },
+    )
+    assert response.status_code == 201
+
+    document = api_client.app.state.stub_db["games"].documents[0]
+    row = GameRow.from_document(document)
+    record = row.to_record()
+    assert isinstance(record, GameRecord)
+    assert json.loads(row.to_json_bytes()) == record.model_dump(mode="json", by_alias=True)
+    assert [player.id for player in row.players] == ["a", "b"]
+    assert [ranking.player_id for ranking in row.rankings] == ["b", "a"]
+
+    listed = api_client.get(f"/profiles/{owner}/games")
+    assert listed.status_code == 200
+    assert listed.headers["content-type"] == "application/json"
+    assert listed.json() == {"games": [response.json()], "next_cursor": None}
+
+
+def test_record_game_counts_playgroup_usage_atomically(api_client: TestClient) -> None:
+    """Recording increments game_count server-side, never rewinds last_used_at, and skips rejected games."""
+    owner = "atomic-owner"
+    players = [{"id": "p1", "name": "One"}, {"id": "p2", "name": "Two"}]
+    rankings = [{"player_id": "p1", "rank": 1}, {"player_id": "p2", "rank": 2}]
+
+    rejected = api_client.post(
+        f"/profiles/{owner}/games",
+        json={"playgroup": {"name": "Atomic"}, "players": players[:1], "rankings": rankings[:1]},
+    )
+    assert rejected.status_code == 400
+    assert api_client.get(f"/profiles/{owner}/playgroups").json()["playgroups"] == []
+
+    first = api_client.post(
+        f"/profiles/{owner}/games",
+        json={
+            "playgroup": {"name": "Atomic"},
+            "players": players,
+            "rankings": rankings,
+            "recorded_at": "2024-05-02T20:00:00+00:00",
+        },
+    )
+    assert first.status_code == 201
+    playgroup_id = first.json()["playgroup"]["id"]
+
+    backdated = api_client.post(
+        f"/profiles/{owner}/games",
+        json={
+            "playgroup": {"id": playgroup_id, "name": "Atomic Renamed"},
+            "players": players,
+            "rankings": rankings,
+            "recorded_at": "2024-04-01T20:00:00+00:00",
+        },
+    )
+    assert backdated.status_code == 201
+    assert backdated.json()["playgroup"]["name"] == "Atomic Renamed"
+
+    playgroups = api_client.app.state.stub_db["playgroups"]
+    (stored,) = [doc for doc in playgroups.documents if doc["owner_sub"] == owner]
+    assert stored["game_count"] == 2
+    assert stored["name"] == "Atomic Renamed"
+    assert stored["slug"] == "atomic-renamed"
+    assert stored["last_used_at"].isoformat().startswith("2024-05-02T20:00:00")
+
+    missing = api_client.post(
+        f"/profiles/{owner}/games",
+        json={"playgroup": {"id": "unknown", "name": "Ghost"}, "players": players, "rankings": rankings},
+    )
+    assert missing.status_code == 404
+
+
+def test_record_game_counts_after_insert_and_defers_fanout(
+    api_client: TestClient, monkeypatch
+) -> None:
+    """A failed insert leaves the playgroup count alone; the timeline fan-out is scheduled."""
+    owner = "deferred-owner"
+    api_client.put(f"/profiles/{owner}", json={"display_name": "Deferred", "is_public": True})
+    api_client.put("/profiles/watcher", json={"display_name": "Watcher", "is_public": True})
+    followed = api_client.post("/social/users/watcher/follow", json={"target_sub": owner})
+    assert followed.status_code == 204
+    payload = {
+        "playgroup": {"name": "Deferred"},
+        "players": [{"id": "p1", "name": "One"}, {"id": "p2", "name": "Two"}],
+        "rankings": [{"player_id": "p1", "rank": 1}, {"player_id": "p2", "rank": 2}],
+    }
+    assert api_client.post(f"/profiles/{owner}/games", json=payload).status_code == 201
+
+    async def failing_insert(self, document):
+        raise RuntimeError("insert failed")
+
+    monkeypatch.setattr(play_data.GameRepository, "insert", failing_insert)
+    with pytest.raises(RuntimeError):
+        api_client.post(f"/profiles/{owner}/games", json=payload)
+    monkeypatch.undo()
+
+    database = api_client.app.state.stub_db
+    (playgroup,) = [doc for doc in database["playgroups"].documents if doc["owner_sub"] == owner]
+    assert playgroup["game_count"] == 1
+
+    scheduled: list = []
+    anyio.run(
+        partial(
+            play_data.record_game,
+            database,
+            owner,
+            GameCreate.model_validate(payload),
+            schedule_fanout=scheduled.append,
+        )
+    )
+    assert playgroup["game_count"] == 2
+    (timeline,) = database["timelines"].documents
+    assert len(timeline["entries"]) == 1
+    assert len(scheduled) == 1
+    anyio.run(scheduled[0])
+    assert len(timeline["entries"]) == 2
+
+
+@pytest.mark.anyio
+async def test_game_indexes_replace_legacy_ascending_indexes() -> None:
+    """ensure_indexes drops the superseded ascending game indexes and tolerates their absence."""
+    database = StubDatabase()
+    games = database[get_settings().mongo_games_collection]
+    games.created_indexes.append({"name": "games_owner_created", "keys": (("owner_sub", 1), ("created_at", 1))})
+
+    await play_data.GameRepository(database).ensure_indexes()
+    names = {entry["name"] for entry in games.created_indexes}
+    assert "games_owner_created" not in names
+    assert {"games_owner_created_desc", "games_playgroup_created_desc"} <= names
+
+    # A second run finds nothing left to drop.
+    await play_data.GameRepository(database).ensure_indexes()
+    assert "games_owner_created" not in {entry["name"] for entry in games.created_indexes}
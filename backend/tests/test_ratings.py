@@ -0,0 +1,149 @@
+"""Tests for multiplayer Elo ratings and rolling-window playgroup leaderboards."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.schemas import LeaderboardWindow
+from app.services import play_data
+from app.services.ratings import multiplayer_elo_deltas, rebuild_leaderboard
+from backend.tests.utils import record_game
+
+
+def test_multiplayer_elo_deltas_are_zero_sum_and_follow_rankings() -> None:
+    ratings = {"a": 1500.0, "b": 1500.0, "c": 1500.0, "d": 1500.0}
+    deltas = multiplayer_elo_deltas(ratings, {"a": 1, "b": 2, "c": 3, "d": 4}, 32)
+
+    assert sum(deltas.values()) == pytest.approx(0.0)
+    assert deltas["a"] == pytest.approx(16.0)
+    assert deltas["a"] > deltas["b"] > deltas["c"] > deltas["d"]
+
+    upset = multiplayer_elo_deltas({"low": 1300.0, "high": 1700.0}, {"low": 1, "high": 2}, 32)
+    expected = multiplayer_elo_deltas({"low": 1700.0, "high": 1300.0}, {"low": 1, "high": 2}, 32)
+    assert upset["low"] > expected["low"]
+
+
+def test_leaderboard_updates_incrementally_and_matches_replay(api_client: TestClient) -> None:
+    owner = "rating-owner"
+    playgroup_id = record_game(api_client, owner, ["alice", "bob", "carol"])["playgroup"]["id"]
+
+    first = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}/leaderboard")
+    assert first.status_code == 200
+    assert first.json()["total_games"] == 1
+
+    record_game(api_client, owner, ["alice", "carol", "bob"])
+    record_game(api_client, owner, ["bob", "alice", "carol"])
+
+    ratings_collection = api_client.app.state.stub_db["playgroup_ratings"]
+    stored = next(doc for doc in ratings_collection.documents if doc["window"] == "all")
+    assert stored["stale"] is False
+    assert stored["total_games"] == 3
+
+    incremental = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}/leaderboard").json()
+    assert incremental["window"] == "all"
+    assert [entry["name"] for entry in incremental["players"]] == ["Alice", "Bob", "Carol"]
+    assert incremental["players"][0]["wins"] == 2
+    assert incremental["decks"][0]["deck_name"] == "Alice Deck"
+    assert sum(entry["rating"] for entry in incremental["players"]) == pytest.approx(4500.0, abs=0.2)
+
+    stored["stale"] = True
+    replayed = api_client.get(f"/profiles/{owner}/playgroups/{playgroup_id}/leaderboard").json()
+    assert replayed["players"] == incremental["players"]
+    assert replayed["decks"] == incremental["decks"]
+
+    missing = api_client.get(f"/profiles/{owner}/playgroups/unknown/leaderboard")
+    assert missing.status_code == 404
+
+
+def test_recording_a_game_reserves_and_writes_every_window_in_one_batch(
+    api_client: TestClient,
+) -> None:
+    """All windows are reserved by one write and updated by one bulk, touching only the game."""
+    owner = "rating-batch-owner"
+    playgroup_id = record_game(api_client, owner, ["alice", "bob", "carol"])["playgroup"]["id"]
+    base = f"/profiles/{owner}/playgroups/{playgroup_id}/leaderboard"
+    for window in ("30d", "90d", "365d", "all"):
+        assert api_client.get(base, params={"window": window}).json()["total_games"] == 1
+
+    collection = api_client.app.state.stub_db["playgroup_ratings"]
+    update_many_calls = len(collection.update_many_calls)
+    bulk_write_calls = len(collection.bulk_write_calls)
+    record_game(api_client, owner, ["bob", "alice"])
+
+    assert len(collection.update_many_calls) == update_many_calls + 1
+    assert len(collection.bulk_write_calls) == bulk_write_calls + 1
+    operations = collection.bulk_write_calls[-1]
+    assert len(operations) == 4
+    touched = {key for key in operations[0]._doc["$set"] if key.startswith("players.")}
+    assert len(touched) == 2
+    assert all(document["stale"] is False for document in collection.documents)
+
+    leaderboard = api_client.get(base).json()
+    assert leaderboard["total_games"] == 2
+    games_played = {entry["name"]: entry["games_played"] for entry in leaderboard["players"]}
+    assert games_played == {"Alice": 2, "Bob": 2, "Carol": 1}
+
+
+def test_leaderboard_windows_only_rate_recent_games(api_client: TestClient) -> None:
+    owner = "window-owner"
+    now = datetime.now(timezone.utc)
+    playgroup_id = record_game(
+        api_client, owner, ["alice", "bob"], recorded_at=now - timedelta(days=100)
+    )["playgroup"]["id"]
+    record_game(api_client, owner, ["bob", "alice"], recorded_at=now - timedelta(days=1))
+
+    base = f"/profiles/{owner}/playgroups/{playgroup_id}/leaderboard"
+    totals = {
+        window: api_client.get(base, params={"window": window}).json()["total_games"]
+        for window in ("30d", "90d", "365d", "all")
+    }
+    assert totals == {"30d": 1, "90d": 1, "365d": 2, "all": 2}
+
+    ratings_collection = api_client.app.state.stub_db["playgroup_ratings"]
+    documents = {doc["window"]: doc for doc in ratings_collection.documents}
+    assert documents["all"]["expires_at"] is None
+    assert documents["30d"]["expires_at"] == documents["30d"]["oldest_game_at"] + timedelta(days=30)
+
+    # A backdated game cannot be folded in order, so affected windows are replayed on read.
+    record_game(api_client, owner, ["alice", "bob"], recorded_at=now - timedelta(days=2))
+    assert documents["30d"]["stale"] is True
+    assert api_client.get(base, params={"window": "30d"}).json()["total_games"] == 2
+
+    # Once the oldest rated game leaves the window, the next read replays without it.
+    documents["365d"]["expires_at"] = now - timedelta(seconds=1)
+    documents["365d"]["oldest_game_at"] = now - timedelta(days=400)
+    assert api_client.get(base, params={"window": "365d"}).json()["total_games"] == 3
+    assert documents["365d"]["oldest_game_at"] > now - timedelta(days=101)
+    assert documents["365d"]["expires_at"] > now
+
+    assert api_client.get(base, params={"window": "7d"}).status_code == 422
+
+
+def test_leaderboard_replay_racing_a_game_insert_counts_it_once(
+    api_client: TestClient, monkeypatch
+) -> None:
+    """A replay landing between the game insert and its fold rates the game once."""
+    owner = "rating-race-owner"
+    playgroup_id = record_game(api_client, owner, ["alice", "bob"])["playgroup"]["id"]
+    base = f"/profiles/{owner}/playgroups/{playgroup_id}/leaderboard"
+    assert api_client.get(base).json()["total_games"] == 1
+
+    database = api_client.app.state.stub_db
+    original_insert = play_data.GameRepository.insert
+
+    async def insert_then_replay(self, document):
+        await original_insert(self, document)
+        await rebuild_leaderboard(database, owner, playgroup_id, LeaderboardWindow.ALL_TIME)
+
+    monkeypatch.setattr(play_data.GameRepository, "insert", insert_then_replay)
+    record_game(api_client, owner, ["bob", "alice"])
+
+    stored = next(doc for doc in database["playgroup_ratings"].documents if doc["window"] == "all")
+    assert stored["stale"] is True
+    assert stored["total_games"] == 2
+    leaderboard = api_client.get(base).json()
+    assert leaderboard["total_games"] == 2
+    assert [entry["games_played"] for entry in leaderboard["players"]] == [2, 2]
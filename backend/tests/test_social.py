@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import anyio
 import pytest
 
 from app.config import get_settings
-from app.services.social import get_public_profile, list_following, search_public_profiles
+from app.repositories import ensure_user_profile_indexes
+from app.schemas import UserProfileUpdate
+from app.services import social
+from app.services.profile_search import backfill_profile_search_fields, profile_search_fields
+from app.services.profiles import upsert_user_profile
+from app.services.social import (
+    follow_user,
+    get_public_profile,
+    list_following,
+    reconcile_follow_counters,
+    search_public_profiles,
+    unfollow_user,
+)
 from backend.tests.utils import StubDatabase
 
 pytestmark = pytest.mark.anyio
@@ -86,6 +100,9 @@ async def test_search_public_profiles_filters_private_entries_and_limits_results
         ]
     )
 
+    # Profiles stored before search prefixes existed are backfilled at startup.
+    assert await backfill_profile_search_fields(database) == 4
+
     results = await search_public_profiles(
         database,
         "   BaRd  ",
@@ -102,6 +119,116 @@ async def test_search_public_profiles_filters_private_entries_and_limits_results
     assert results[1].is_followed is True
 
 
+async def test_search_public_profiles_matches_accent_folded_word_prefixes() -> None:
+    database = StubDatabase()
+    profiles = _profiles_collection(database)
+
+    assert "elo" in profile_search_fields({"display_name": "Éloïse Marchand"})["search_prefixes"]
+
+    for google_sub, name, email in [
+        ("eloise", "Éloïse Marchand", "eloise@example.com"),
+        ("marc", "Marc Élan", "mel@example.com"),
+        ("zoe", "Zoé Marchetti", "zoe@example.com"),
+        ("hidden", "Éloïse Cachée", "cachee@example.com"),
+    ]:
+        await upsert_user_profile(
+            database,
+            google_sub,
+            UserProfileUpdate(display_name=name, email=email, is_public=google_sub != "hidden"),
+        )
+
+    async def _search(query: str, limit: int = 20) -> list[str]:
+        return [entry.google_sub for entry in await search_public_profiles(database, query, limit=limit)]
+
+    assert await _search("elo") == ["eloise"]
+    assert await _search("MARCH") == ["eloise", "zoe"]
+    assert await _search("march el") == ["eloise"]
+    assert await _search("mel") == ["marc"]
+    assert await _search("arch") == []
+    assert await _search("", limit=2) == ["eloise", "marc"]
+
+    # Renaming a profile refreshes its prefixes.
+    await upsert_user_profile(database, "zoe", UserProfileUpdate(display_name="Zoé Ardent"))
+    assert await _search("marchetti") == []
+    assert await _search("ard") == ["zoe"]
+    assert all("search_prefixes" in document for document in profiles.documents)
+
+
+async def test_search_public_profiles_handles_non_latin_names_and_full_emails() -> None:
+    database = StubDatabase()
+    profiles = _profiles_collection(database)
+
+    for google_sub, name, email in [
+        ("olga", "Ольга Иванова", "olga.ivanova@example.com"),
+        ("taro", "山田 太郎", "taro@example.jp"),
+        ("alice", "Alice Martin", "alice@example.com"),
+    ]:
+        await upsert_user_profile(
+            database, google_sub, UserProfileUpdate(display_name=name, email=email, is_public=True)
+        )
+
+    async def _search(query: str) -> list[str]:
+        return [entry.google_sub for entry in await search_public_profiles(database, query)]
+
+    assert await _search("Ольга") == ["olga"]
+    assert await _search("иван") == ["olga"]
+    assert await _search("山田") == ["taro"]
+    assert await _search("alice@example.com") == ["alice"]
+    assert await _search("  Olga.Ivanova@example.com ") == ["olga"]
+    assert await _search("nobody@example.com") == []
+    # A query without any word matches nothing instead of listing everyone.
+    assert await _search("!!!") == []
+
+    # Prefixes stored by the previous ASCII-only tokenizer are recomputed at startup.
+    olga = next(document for document in profiles.documents if document["google_sub"] == "olga")
+    olga["search_prefixes"] = ["olga", "ivanova"]
+    olga.pop("search_version")
+    assert await backfill_profile_search_fields(database) == 1
+    assert await _search("ольга") == ["olga"]
+
+
+async def test_search_public_profiles_ranks_name_prefixes_and_whole_words_first() -> None:
+    database = StubDatabase()
+    for google_sub, name, email in [
+        ("bob", "Bob Annick", "bob@example.com"),
+        ("carl", "Carl Roux", "annette@example.com"),
+        ("zack", "Zack Ann", "zack@example.com"),
+        ("anna", "Anna Beaumont", "anna@example.com"),
+        ("ann", "Ann Zimmer", "az@example.com"),
+    ]:
+        await upsert_user_profile(
+            database, google_sub, UserProfileUpdate(display_name=name, email=email, is_public=True)
+        )
+
+    async def _search(query: str, limit: int = 20) -> list[str]:
+        return [entry.google_sub for entry in await search_public_profiles(database, query, limit=limit)]
+
+    # Names starting with the query, then whole-word matches, then other prefix hits.
+    assert await _search("Ann") == ["ann", "anna", "zack", "bob", "carl"]
+    assert await _search("ann", limit=3) == ["ann", "anna", "zack"]
+    assert await _search("ann zimmer") == ["ann"]
+
+    profiles = _profiles_collection(database)
+    ann = next(document for document in profiles.documents if document["google_sub"] == "ann")
+    assert ann["search_words"] == ["ann", "az", "zimmer"]
+
+
+async def test_user_profile_indexes_drop_the_legacy_text_index() -> None:
+    database = StubDatabase()
+    profiles = _profiles_collection(database)
+    profiles.created_indexes.append(
+        {"name": "profile_search_text_idx", "keys": (("display_name", "text"),)}
+    )
+
+    await ensure_user_profile_indexes(database)
+    await ensure_user_profile_indexes(database)
+
+    names = [entry["name"] for entry in profiles.created_indexes]
+    assert "profile_search_text_idx" not in names
+    assert "profile_search_prefix_idx" in names
+    assert "profile_search_words_idx" in names
+
+
 async def test_get_public_profile_returns_recent_games_and_counts_followers() -> None:
     database = StubDatabase()
     profiles = _profiles_collection(database)
@@ -193,6 +320,79 @@ async def test_get_public_profile_returns_recent_games_and_counts_followers() ->
         await get_public_profile(database, "private-hero")
 
 
+async def test_follow_counters_are_denormalized_and_reconciled() -> None:
+    database = StubDatabase()
+    profiles = _profiles_collection(database)
+    follows = _follows_collection(database)
+
+    now = datetime.now(timezone.utc)
+    hero = {"google_sub": "hero", "display_name": "Hero", "is_public": True, "created_at": now, "updated_at": now}
+    fan = {"google_sub": "fan", "display_name": "Fan", "is_public": True, "created_at": now, "updated_at": now}
+    profiles.documents.extend([hero, fan])
+    follows.documents.append({"follower_sub": "rival", "target_sub": "hero"})
+
+    # Counters are initialised lazily from the follows on first view.
+    first_view = await get_public_profile(database, "hero")
+    assert (first_view.followers_count, first_view.following_count) == (1, 0)
+    assert hero["followers_count"] == 1
+    assert "followers_count" not in fan
+
+    await get_public_profile(database, "fan")
+    await follow_user(database, "fan", "hero")
+    await follow_user(database, "fan", "hero")
+    assert (hero["followers_count"], fan["following_count"]) == (2, 1)
+    assert len(follows.documents) == 2
+
+    await unfollow_user(database, "fan", "hero")
+    await unfollow_user(database, "fan", "hero")
+    assert (hero["followers_count"], fan["following_count"]) == (1, 0)
+
+    hero["followers_count"] = 42
+    assert await reconcile_follow_counters(database) == 1
+    refreshed = await get_public_profile(database, "hero")
+    assert refreshed.followers_count == 1
+    assert await reconcile_follow_counters(database) == 0
+
+
+async def test_get_public_profile_fetches_concurrently_and_degrades_on_timeout(monkeypatch) -> None:
+    database = StubDatabase()
+    now = datetime.now(timezone.utc)
+    _profiles_collection(database).documents.append(
+        {"google_sub": "hero", "display_name": "Hero", "is_public": True, "created_at": now, "updated_at": now}
+    )
+    monkeypatch.setattr(
+        social, "get_settings", lambda: replace(get_settings(), public_profile_stage_timeout_ms=200)
+    )
+    games_started = anyio.Event()
+    fetch_profile = social.fetch_user_profile_with_follow_counts
+
+    async def _slow_games(*args: Any, **kwargs: Any) -> Any:
+        games_started.set()
+        await anyio.sleep(5)
+
+    async def _profile_after_games(*args: Any) -> Any:
+        # Only completes if the games query is already in flight.
+        await games_started.wait()
+        return await fetch_profile(*args)
+
+    monkeypatch.setattr(social, "list_games", _slow_games)
+    monkeypatch.setattr(social, "fetch_user_profile_with_follow_counts", _profile_after_games)
+
+    with anyio.fail_after(2):
+        profile = await get_public_profile(database, "hero")
+
+    assert profile.display_name == "Hero"
+    assert profile.followers_count == 0
+    assert profile.recent_games == []
+
+    async def _stuck_profile(*args: Any) -> Any:
+        await anyio.sleep(5)
+
+    monkeypatch.setattr(social, "fetch_user_profile_with_follow_counts", _stuck_profile)
+    with pytest.raises(TimeoutError):
+        await get_public_profile(database, "hero")
+
+
 async def test_list_following_returns_profiles_and_respects_sorting() -> None:
     database = StubDatabase()
     profiles = _profiles_collection(database)
@@ -0,0 +1,114 @@
+"""Tests for the columnar playgroup stats backfill."""
+
+from __future__ import annotations
+
+import random
+from array import array
+
+import pytest
+
+from app.repositories import PlaygroupStatsRepository
+from app.schemas import GameCreate
+from app.services import stats_backfill
+from app.services.play_data import record_game
+from app.services.playgroup_stats import rebuild_playgroup_stats, to_playgroup_stats
+from app.services.stats_backfill import group_sum, run_stats_backfill
+from backend.tests.utils import StubDatabase
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def _game(group: str, order: list[tuple[str, str | None]]) -> GameCreate:
+    return GameCreate.model_validate(
+        {
+            "playgroup": {"name": group},
+            "players": [
+                {"id": seat, "name": seat.title(), **({"deck_id": deck} if deck else {})}
+                for seat, deck in order
+            ],
+            "rankings": [
+                {"player_id": seat, "rank": rank} for rank, (seat, _) in enumerate(order, start=1)
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize("numpy_enabled", [False, True])
+async def test_group_sum_counts_and_weights_per_dense_group(monkeypatch, numpy_enabled) -> None:
+    if numpy_enabled:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(stats_backfill, "_numpy_available", lambda: numpy_enabled)
+
+    keys = array("q", [0, 2, 2, -1, 1, 2])
+    weights = array("b", [1, 0, 1, 1, 1, 1])
+    assert group_sum(keys, None, 4) == [1, 1, 3, 0]
+    assert group_sum(keys, weights, 4) == [1, 1, 2, 0]
+
+
+async def test_group_sum_numpy_and_loop_branches_agree(monkeypatch) -> None:
+    pytest.importorskip("numpy")
+    generator = random.Random(16)
+    size = 257
+    keys = array("q", (generator.randrange(-1, size) for _ in range(10_000)))
+    weights = array("b", (generator.randrange(0, 2) for _ in range(len(keys))))
+
+    totals = {}
+    for numpy_enabled in (False, True):
+        monkeypatch.setattr(stats_backfill, "_numpy_available", lambda: numpy_enabled)
+        totals[numpy_enabled] = (group_sum(keys, None, size), group_sum(keys, weights, size))
+    assert totals[True] == totals[False]
+    assert all(isinstance(value, int) for value in totals[True][1])
+
+
+async def test_backfill_matches_rebuilds_and_flags_moved_documents(monkeypatch) -> None:
+    database = StubDatabase()
+    owners = {"owner-a": ["Pod", "Other Pod"], "owner-b": ["Pod"]}
+    seatings = [
+        [("alice", "d1"), ("bob", None), ("carol", "d3")],
+        [("carol", "d3"), ("alice", "d1"), ("bob", None)],
+    ]
+    for owner, groups in owners.items():
+        for group in groups:
+            for seating in seatings:
+                await record_game(database, owner, _game(group, seating))
+    games = database["games"].documents
+    moved = (games[0]["owner_sub"], games[0]["playgroup_id"])
+    stats_collection = database["playgroup_stats"]
+    stats_collection.documents.append(
+        {"owner_sub": "owner-a", "playgroup_id": "deleted", "generation": 3, "stale": False}
+    )
+
+    report = await run_stats_backfill(database, batch_size=2, dry_run=True)
+    assert (report.games, report.playgroups, report.written) == (6, 3, 0)
+    assert report.seats == 18
+    assert report.column_bytes > 0
+    assert report.seconds_per_million_games >= 0
+
+    # Simulate a game landing between the generation snapshot and the bulk write.
+    original_generations = PlaygroupStatsRepository.generations
+
+    async def snapshot_then_move(self):
+        snapshot = await original_generations(self)
+        await self.mark_stale(*moved)
+        return snapshot
+
+    monkeypatch.setattr(PlaygroupStatsRepository, "generations", snapshot_then_move)
+    report = await run_stats_backfill(database, batch_size=2)
+
+    assert report.written == 2
+    assert report.flagged_stale == 2
+    documents = {(doc["owner_sub"], doc["playgroup_id"]): doc for doc in stats_collection.documents}
+    assert documents[moved]["stale"] is True
+    assert documents[("owner-a", "deleted")]["stale"] is True
+
+    for key, document in documents.items():
+        if document["stale"]:
+            continue
+        rebuilt = await rebuild_playgroup_stats(database, *key)
+        assert to_playgroup_stats(document) == to_playgroup_stats(rebuilt)
+        assert document["total_games"] == 2
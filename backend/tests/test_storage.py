@@ -8,6 +8,7 @@ from typing import Any
 from copy import deepcopy
 
 import pytest
+from pymongo import DeleteMany, ReplaceOne
 
 from pathlib import Path
 import sys
@@ -26,7 +27,11 @@ from app.schemas import (
     UserDecksResponse,
     UserSummary,
 )
-from app.repositories import MoxfieldCacheRepository, ensure_moxfield_cache_indexes
+from app.repositories import (
+    CardCatalogRepository,
+    MoxfieldCacheRepository,
+    ensure_moxfield_cache_indexes,
+)
 from app.services.storage import (
     delete_user_deck,
     fetch_user_deck_summaries,
@@ -58,12 +63,20 @@ class _StubCollection:
     def __init__(self) -> None:
         self.documents: list[dict[str, Any]] = []
         self.created_indexes: list[dict[str, Any]] = []
+        self.bulk_write_calls: list[list[Any]] = []
+        self.find_calls = 0
 
     def _matches(self, document: dict[str, Any], filter_: dict[str, Any]) -> bool:
         for key, value in filter_.items():
             if key == "$or":
                 if not any(self._matches(document, clause) for clause in value):
                     return False
+            elif isinstance(value, dict) and "$nin" in value:
+                if document.get(key) in value["$nin"]:
+                    return False
+            elif isinstance(value, dict) and "$in" in value:
+                if document.get(key) not in value["$in"]:
+                    return False
             else:
                 if document.get(key) != value:
                     return False
@@ -103,7 +116,8 @@ class _StubCollection:
                 return deepcopy(document)
         return None
 
-    def find(self, filter_: dict[str, Any]) -> _StubCursor:
+    def find(self, filter_: dict[str, Any], projection: dict[str, Any] | None = None) -> _StubCursor:
+        self.find_calls += 1
         results = [
             deepcopy(document)
             for document in self.documents
@@ -146,6 +160,30 @@ class _StubCollection:
     async def count_documents(self, filter_: dict[str, Any]) -> int:
         return sum(1 for document in self.documents if self._matches(document, filter_))
 
+    async def bulk_write(self, operations: list[Any], *, ordered: bool = True):
+        self.bulk_write_calls.append(list(operations))
+        upserted = modified = deleted = 0
+        for operation in operations:
+            if isinstance(operation, ReplaceOne):
+                result = await self.replace_one(
+                    operation._filter, operation._doc, upsert=operation._upsert
+                )
+                modified += result.matched_count
+                upserted += 1 if result.upserted_id is not None else 0
+            elif isinstance(operation, DeleteMany):
+                before = len(self.documents)
+                self.documents = [
+                    document
+                    for document in self.documents
+                    if not self._matches(document, operation._filter)
+                ]
+                deleted += before - len(self.documents)
+        return type(
+            "BulkWriteResult",
+            (),
+            {"upserted_count": upserted, "modified_count": modified, "deleted_count": deleted},
+        )()
+
     async def create_indexes(self, indexes: list[Any]):
         created_names: list[str] = []
         for raw in indexes:
@@ -371,3 +409,147 @@ async def test_ensure_moxfield_cache_indexes_creates_expected_indexes() -> None:
     assert any(
         index["name"] == "summary_user_public_id_unique" for index in summary_indexes
     )
+    assert any(index["name"] == "card_id_unique" for index in database["cards"].created_indexes)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_replace_documents_batches_bulk_writes_and_prunes_missing_decks() -> None:
+    """Deck upserts should use unordered bulk batches and drop decks no longer listed."""
+    database = _StubDatabase()
+    repository = _build_repository(database)
+    decks = database["decks"]
+    decks.documents.append(
+        {"public_id": "retired-deck", "user_name": "TestUser", "user_key": "testuser"}
+    )
+    decks.documents.append(
+        {"public_id": "other-deck", "user_name": "Someone", "user_key": "someone"}
+    )
+
+    documents = [{"public_id": f"deck-{index}", "name": f"Deck {index}"} for index in range(5)]
+    report = await repository.replace_documents(
+        "TestUser",
+        documents,
+        collection="decks",
+        prune_missing=True,
+        batch_size=2,
+    )
+
+    assert report.round_trips == 3
+    assert [batch.operations for batch in report.batches] == [2, 2, 2]
+    assert all(batch.duration_ms >= 0 for batch in report.batches)
+    assert report.upserted == 5
+    assert report.deleted == 1
+    assert isinstance(decks.bulk_write_calls[-1][-1], DeleteMany)
+
+    stored_ids = {document["public_id"] for document in decks.documents}
+    assert stored_ids == {f"deck-{index}" for index in range(5)} | {"other-deck"}
+    assert all(
+        document["user_key"] == "testuser"
+        for document in decks.documents
+        if document["public_id"] != "other-deck"
+    )
+
+
+@pytest.mark.anyio("asyncio")
+async def test_upsert_user_decks_issues_single_round_trip_for_small_collections() -> None:
+    """A typical sync should persist every deck with a single bulk_write call."""
+    database = _StubDatabase()
+    repository = _build_repository(database)
+    payload = UserDecksResponse(
+        user=_build_user_payload(),
+        total_decks=1,
+        decks=[_build_deck_detail()],
+    )
+
+    await upsert_user_decks(repository, payload)
+
+    calls = database["decks"].bulk_write_calls
+    assert len(calls) == 1
+    assert isinstance(calls[0][0], ReplaceOne)
+    assert isinstance(calls[0][-1], DeleteMany)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_decks_reference_shared_card_catalog_and_rehydrate_in_bulk() -> None:
+    """Cards with an id are stored once in the catalog and resolved with one `$in` query."""
+    database = _StubDatabase()
+    repository = _build_repository(database)
+    sol_ring = {"id": "card-sol-ring", "name": "Sol Ring", "color_identity": []}
+    tower = {"id": "card-tower", "name": "Command Tower", "color_identity": []}
+
+    def _deck(public_id: str, extra: DeckCard) -> DeckDetail:
+        board = DeckBoard(
+            name="mainboard",
+            cards=[
+                DeckCard(quantity=1, finish="foil", card=sol_ring),
+                DeckCard(quantity=1, card=tower),
+                extra,
+            ],
+        )
+        return DeckDetail(
+            public_id=public_id,
+            name=public_id,
+            format="commander",
+            public_url=f"https://moxfield.com/decks/{public_id}",
+            boards=[board],
+            stats=DeckStats(),
+            tokens=[],
+        )
+
+    payload = UserDecksResponse(
+        user=_build_user_payload(),
+        total_decks=2,
+        decks=[
+            _deck("deck-a", DeckCard(quantity=2, card={"id": "card-a", "name": "Only A"})),
+            _deck("deck-b", DeckCard(quantity=1, card={"name": "No Identifier"})),
+        ],
+    )
+    await upsert_user_decks(repository, payload)
+
+    catalog = {document["card_id"]: document["data"] for document in database["cards"].documents}
+    assert catalog == {"card-sol-ring": sol_ring, "card-tower": tower, "card-a": catalog["card-a"]}
+    stored = {document["public_id"]: document for document in database["decks"].documents}
+    entries = stored["deck-a"]["boards"][0]["cards"]
+    assert entries[0]["card_ref"] == "card-sol-ring"
+    assert entries[0]["finish"] == "foil"
+    assert "card" not in entries[0]
+    # Cards without a Moxfield id stay inline.
+    assert stored["deck-b"]["boards"][0]["cards"][2]["card"] == {"name": "No Identifier"}
+
+    # Re-syncing identical cards skips catalog writes thanks to the LRU.
+    await upsert_user_decks(repository, payload)
+    assert len(database["cards"].bulk_write_calls) == 1
+
+    # A cold repository resolves every reference with a single catalog query.
+    cold_repository = _build_repository(database)
+    cached = await fetch_user_decks(cold_repository, "TestUser")
+    assert cached is not None
+    assert database["cards"].find_calls == 1
+    cards = {deck.public_id: [entry.card for entry in deck.boards[0].cards] for deck in cached.decks}
+    assert cards["deck-a"] == [sol_ring, tower, {"id": "card-a", "name": "Only A"}]
+    assert cards["deck-b"][2] == {"name": "No Identifier"}
+
+    # Warm reads are served from the LRU without touching the catalog collection.
+    await fetch_user_decks(cold_repository, "TestUser")
+    assert database["cards"].find_calls == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_card_catalog_retries_cards_whose_write_failed() -> None:
+    """The catalog LRU only remembers cards after their bulk write succeeded."""
+    database = _StubDatabase()
+    catalog = CardCatalogRepository(database, cache_size=10)
+    cards = {"card-sol-ring": {"id": "card-sol-ring", "name": "Sol Ring"}}
+    original_bulk_write = catalog.collection.bulk_write
+
+    async def _failing_bulk_write(*args: Any, **kwargs: Any) -> Any:
+        raise RuntimeError("Mongo unavailable")
+
+    catalog.collection.bulk_write = _failing_bulk_write
+    with pytest.raises(RuntimeError):
+        await catalog.upsert_cards(cards)
+
+    catalog.collection.bulk_write = original_bulk_write
+    assert await catalog.upsert_cards(cards) == 1
+    assert [document["card_id"] for document in database["cards"].documents] == ["card-sol-ring"]
+    assert await catalog.upsert_cards(cards) == 0
@@ -0,0 +1,136 @@
+"""Tests for coalesced Moxfield sync orchestration."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import anyio
+import pytest
+
+from app.config import get_settings
+from app.moxfield import MoxfieldError
+from app.repositories import MoxfieldCacheRepository
+from app.services.sync import SingleFlight, sync_user_decks
+from backend.tests.utils import StubDatabase, StubMoxfieldClient
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    """Force AnyIO to execute against asyncio for sync orchestration tests."""
+    return "asyncio"
+
+
+class _SlowMoxfieldClient(StubMoxfieldClient):
+    """Stub client that counts collect calls and lingers so callers overlap."""
+
+    def __init__(self, payload: Dict[str, Any], *, delay: float = 0.05) -> None:
+        super().__init__(payload)
+        self.delay = delay
+        self.collect_calls = 0
+
+    async def collect_user_decks_with_details(self, username: str, **kwargs: Any) -> Dict[str, Any]:
+        self.collect_calls += 1
+        await anyio.sleep(self.delay)
+        return await super().collect_user_decks_with_details(username, **kwargs)
+
+
+def _payload() -> Dict[str, Any]:
+    return {
+        "user": {"userName": "Coalesce", "displayName": "Coalesce", "badges": []},
+        "decks": [
+            {
+                "publicId": "deck-1",
+                "name": "Deck One",
+                "format": "commander",
+                "publicUrl": "https://moxfield.com/decks/deck-1",
+                "boards": {},
+                "tokens": [],
+            }
+        ],
+    }
+
+
+async def test_sync_user_decks_coalesces_concurrent_and_late_callers() -> None:
+    database = StubDatabase()
+    repository = MoxfieldCacheRepository(database)
+    client = _SlowMoxfieldClient(_payload())
+    single_flight: SingleFlight[Any] = SingleFlight(grace_period=5.0)
+    results: list[Any] = []
+
+    async def _sync(username: str) -> None:
+        results.append(
+            await sync_user_decks(client, repository, username, single_flight=single_flight)
+        )
+
+    async with anyio.create_task_group() as task_group:
+        # Usernames differing only by case share the canonical key.
+        for username in ("Coalesce", "coalesce", "COALESCE"):
+            task_group.start_soon(_sync, username)
+
+    # A late joiner inside the grace window reuses the finished result.
+    await _sync("Coalesce")
+
+    assert client.collect_calls == 1
+    assert len(results) == 4
+    assert all(result is results[0] for result in results)
+    assert len(database[get_settings().mongo_decks_collection].bulk_write_calls) == 1
+
+
+async def test_single_flight_shares_errors_without_caching_them() -> None:
+    single_flight: SingleFlight[str] = SingleFlight(grace_period=5.0)
+    calls = 0
+
+    async def _failing() -> str:
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.01)
+        raise MoxfieldError("boom")
+
+    errors: list[Exception] = []
+
+    async def _call() -> None:
+        try:
+            await single_flight.run("key", _failing)
+        except MoxfieldError as exc:
+            errors.append(exc)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(_call)
+        task_group.start_soon(_call)
+
+    assert calls == 1
+    assert len(errors) == 2
+
+    async def _succeeding() -> str:
+        return "ok"
+
+    assert await single_flight.run("key", _succeeding) == "ok"
+    assert not single_flight.in_flight("key")
+
+
+async def test_single_flight_promotes_a_joiner_when_the_leader_is_cancelled() -> None:
+    single_flight: SingleFlight[str] = SingleFlight()
+    leaders: list[str] = []
+
+    def _work(label: str) -> Any:
+        async def _run() -> str:
+            leaders.append(label)
+            await anyio.sleep(0.05)
+            return label
+
+        return _run
+
+    outcome: dict[str, str] = {}
+
+    async def _follower() -> None:
+        outcome["follower"] = await single_flight.run("key", _work("follower"))
+
+    async with anyio.create_task_group() as task_group:
+        with anyio.move_on_after(0.01):
+            task_group.start_soon(_follower)
+            await single_flight.run("key", _work("leader"))
+
+    assert leaders == ["leader", "follower"]
+    assert outcome["follower"] == "follower"
@@ -0,0 +1,206 @@
+"""Tests for the background Moxfield sync job queue and worker."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+import pytest
+
+from app.config import get_settings
+from app.moxfield import MoxfieldError, MoxfieldNotFoundError, RequestPriority
+from app.moxfield.scheduler import current_priority
+from app.repositories import SyncJobRepository
+from app.schemas import SyncJobRequest, SyncJobStatus
+from app.services import sync as sync_service
+from app.services.sync import SingleFlight
+from app.services.sync_jobs import SyncJobWorker, enqueue_sync_job, get_sync_job
+from backend.tests.utils import StubDatabase, StubMoxfieldClient
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    """Force AnyIO to execute against asyncio for worker tests."""
+    return "asyncio"
+
+
+def _payload() -> Dict[str, Any]:
+    return {
+        "user": {"userName": "Queued", "displayName": "Queued", "badges": []},
+        "decks": [
+            {
+                "publicId": f"deck-{index}",
+                "name": f"Deck {index}",
+                "format": "commander",
+                "publicUrl": f"https://moxfield.com/decks/deck-{index}",
+                "boards": {},
+                "tokens": [],
+            }
+            for index in range(3)
+        ],
+    }
+
+
+def _worker(database: StubDatabase, client: Any) -> SyncJobWorker:
+    return SyncJobWorker(
+        database,
+        client_factory=lambda: client,
+        single_flight=SingleFlight(grace_period=0),
+        retry_backoff_base=60.0,
+        progress_interval=0.0,
+    )
+
+
+def _jobs(database: StubDatabase) -> list[dict[str, Any]]:
+    return database[get_settings().mongo_sync_jobs_collection].documents
+
+
+async def test_enqueue_deduplicates_active_jobs_and_worker_reports_progress() -> None:
+    database = StubDatabase()
+    first = await enqueue_sync_job(database, "Queued", SyncJobRequest())
+    duplicate = await enqueue_sync_job(database, " queued ", SyncJobRequest())
+
+    assert first.status is SyncJobStatus.QUEUED
+    assert duplicate.id == first.id
+    assert len(_jobs(database)) == 1
+
+    worker = _worker(database, StubMoxfieldClient(_payload()))
+    assert await worker.run_once() is True
+    assert await worker.run_once() is False
+
+    job = await get_sync_job(database, "QUEUED", first.id)
+    assert job.status is SyncJobStatus.SUCCEEDED
+    assert job.attempts == 1
+    assert job.total_decks == 3
+    assert job.progress.decks_fetched == 3
+    assert job.progress.decks_total == 3
+    assert job.finished_at is not None
+    assert len(database[get_settings().mongo_decks_collection].documents) == 3
+
+    # Once the previous job is finished a new sync can be queued.
+    follow_up = await enqueue_sync_job(database, "Queued", SyncJobRequest(mode="delta"))
+    assert follow_up.id != first.id
+    assert follow_up.mode == "delta"
+
+    with pytest.raises(LookupError):
+        await get_sync_job(database, "someone-else", first.id)
+
+
+async def test_worker_retries_upstream_errors_with_backoff_until_max_attempts() -> None:
+    database = StubDatabase()
+    job = await SyncJobRepository(database).enqueue(
+        username="Flaky", user_key="flaky", kind="decks", mode="full", max_attempts=2
+    )
+    worker = _worker(database, StubMoxfieldClient(error=MoxfieldError("HTTP 503")))
+
+    before = datetime.now(timezone.utc)
+    assert await worker.run_once() is True
+    stored = _jobs(database)[0]
+    assert stored["status"] == "queued"
+    assert stored["attempts"] == 1
+    assert stored["last_error"] == "HTTP 503"
+    assert stored["run_at"] >= before + timedelta(seconds=60)
+
+    # The retry is not due yet.
+    assert await worker.run_once() is False
+
+    stored["run_at"] = before
+    assert await worker.run_once() is True
+    final = await get_sync_job(database, "Flaky", job["id"])
+    assert final.status is SyncJobStatus.FAILED
+    assert final.attempts == 2
+    assert "active_key" not in _jobs(database)[0]
+
+
+async def test_worker_fails_immediately_for_unknown_users_and_reclaims_expired_leases() -> None:
+    database = StubDatabase()
+    repository = SyncJobRepository(database)
+    missing = await repository.enqueue(
+        username="Ghost", user_key="ghost", kind="decks", mode="full", max_attempts=5
+    )
+    worker = _worker(database, StubMoxfieldClient(error=MoxfieldNotFoundError("missing")))
+    assert await worker.run_once() is True
+    assert (await get_sync_job(database, "Ghost", missing["id"])).status is SyncJobStatus.FAILED
+
+    # A job left running by a crashed worker is picked up again once its lease expires.
+    orphan = await repository.enqueue(
+        username="Queued", user_key="queued", kind="deck_summaries", mode="full", max_attempts=5
+    )
+    claimed = await repository.claim("crashed-worker", lease_seconds=60)
+    assert claimed is not None and claimed["id"] == orphan["id"]
+    stored = next(doc for doc in _jobs(database) if doc["id"] == orphan["id"])
+    stored["lease_expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    recovering = _worker(
+        database,
+        StubMoxfieldClient(summary_payload=_payload()["user"], deck_summaries=[]),
+    )
+    assert await recovering.run_once() is True
+    recovered = await get_sync_job(database, "Queued", orphan["id"])
+    assert recovered.status is SyncJobStatus.SUCCEEDED
+    assert recovered.attempts == 2
+
+
+async def test_worker_retries_persistence_failures_and_abandons_lost_leases(monkeypatch) -> None:
+    database = StubDatabase()
+    repository = SyncJobRepository(database)
+    await repository.enqueue(
+        username="Queued", user_key="queued", kind="decks", mode="full", max_attempts=3
+    )
+
+    async def _failing_upsert(*args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("Mongo unavailable")
+
+    # A failed write is retried rather than reported as a successful sync.
+    monkeypatch.setattr(sync_service, "upsert_user_decks", _failing_upsert)
+    worker = _worker(database, StubMoxfieldClient(_payload()))
+    assert await worker.run_once() is True
+    stored = _jobs(database)[0]
+    assert stored["status"] == "queued"
+    assert stored["last_error"] == "Mongo unavailable"
+    monkeypatch.undo()
+
+    # A worker whose lease was reclaimed stops before touching the new owner's job.
+    stored["run_at"] = datetime.now(timezone.utc)
+    lost_lease = _worker(database, StubMoxfieldClient(_payload()))
+    original_record_progress = lost_lease._jobs.record_progress
+
+    async def _reclaimed(job_id: str, worker_id: str, *args: Any) -> bool:
+        stored["worker_id"] = "new-owner"
+        return await original_record_progress(job_id, worker_id, *args)
+
+    monkeypatch.setattr(lost_lease._jobs, "record_progress", _reclaimed)
+    assert await lost_lease.run_once() is True
+    assert stored["status"] == "running"
+    assert stored["worker_id"] == "new-owner"
+    assert database[get_settings().mongo_decks_collection].documents == []
+
+
+async def test_worker_runs_jobs_on_the_background_priority_lane() -> None:
+    """Queued syncs must not compete with interactive requests in the Moxfield scheduler."""
+    lanes: list[RequestPriority] = []
+
+    class _RecordingClient(StubMoxfieldClient):
+        async def collect_user_decks_with_details(
+            self, username: str, **kwargs: Any
+        ) -> Dict[str, Any]:
+            lanes.append(current_priority())
+            return await super().collect_user_decks_with_details(username, **kwargs)
+
+        async def get_user_deck_summaries(
+            self, username: str, **kwargs: Any
+        ) -> list[Dict[str, Any]]:
+            lanes.append(current_priority())
+            return await super().get_user_deck_summaries(username, **kwargs)
+
+    database = StubDatabase()
+    await enqueue_sync_job(database, "Queued", SyncJobRequest())
+    await enqueue_sync_job(database, "Summaries", SyncJobRequest(kind="deck_summaries"))
+    worker = _worker(database, _RecordingClient(_payload(), deck_summaries=[]))
+    assert await worker.run_once() is True
+    assert await worker.run_once() is True
+
+    assert lanes and set(lanes) == {RequestPriority.BACKGROUND}
+    assert current_priority() is RequestPriority.INTERACTIVE
@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+import json
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -15,10 +16,14 @@ if str(ROOT) not in sys.path:
 import pytest
 from fastapi.testclient import TestClient
 
-from app.dependencies import get_moxfield_client
+from app.dependencies import get_moxfield_client, get_sync_single_flight
 from app.moxfield import MoxfieldError, MoxfieldNotFoundError
 from app.routers import cache_router, profiles_router, users_router
-from backend.tests.utils import StubMoxfieldClient
+from app.schemas import UserProfileUpdate
+from app.services import profiles as profile_service
+from app.services.profiles import fetch_user_profile, fetch_user_profiles, upsert_user_profile
+from app.services.sync import SingleFlight
+from backend.tests.utils import StubDatabase, StubMoxfieldClient
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -235,6 +240,88 @@ def test_upsert_user_profile_creates_and_updates_document(api_client: TestClient
     )
 
 
+def test_profile_reads_are_cached_until_the_profile_is_updated(api_client: TestClient) -> None:
+    """Repeated profile reads hit the cache; a PUT invalidates the cached entry."""
+    for google_sub in ("cached-a", "cached-b"):
+        response = api_client.put(f"/profiles/{google_sub}", json={"display_name": google_sub})
+        assert response.status_code == 200
+
+    users = api_client.app.state.stub_db["users"]
+    assert api_client.get("/profiles/cached-a").json()["display_name"] == "cached-a"
+    # Edited behind the API's back: the cached copy keeps being served.
+    users.documents[0]["display_name"] = "edited elsewhere"
+    assert api_client.get("/profiles/cached-a").json()["display_name"] == "cached-a"
+
+    api_client.put("/profiles/cached-a", json={"description": "Nouvelle bio"})
+    refreshed = api_client.get("/profiles/cached-a").json()
+    assert refreshed["display_name"] == "edited elsewhere"
+    assert refreshed["description"] == "Nouvelle bio"
+
+    stats = api_client.get("/diagnostics/profile-cache").json()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (1, 1, 2)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_fetch_user_profiles_only_reads_cache_misses(anyio_backend: str, monkeypatch) -> None:
+    """Batch lookups serve cached profiles and read the rest with one ``$in`` query."""
+    database = StubDatabase()
+    for google_sub in ("one", "two", "three"):
+        await upsert_user_profile(database, google_sub, UserProfileUpdate(display_name=google_sub))
+    monkeypatch.setattr(
+        profile_service, "_profile_cache", profile_service.ProfileCache(maxsize=2, ttl_seconds=60)
+    )
+    users = database["users"]
+    queried: list[Any] = []
+    original_find = users.find
+
+    def _recording_find(filter_: Any = None, projection: Any = None) -> Any:
+        queried.append(filter_)
+        return original_find(filter_, projection)
+
+    monkeypatch.setattr(users, "find", _recording_find)
+
+    assert (await fetch_user_profile(database, "one")).display_name == "one"
+    profiles = await fetch_user_profiles(database, ["one", "two", "three", "ghost"])
+    assert set(profiles) == {"one", "two", "three"}
+    assert queried == [{"google_sub": {"$in": ["ghost", "three", "two"]}}]
+
+    cache = profile_service.get_profile_cache()
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_profile_read_racing_an_update_is_not_cached(anyio_backend: str, monkeypatch) -> None:
+    """A read that started before a write serves its result but never caches it."""
+    database = StubDatabase()
+    await upsert_user_profile(database, "racer", UserProfileUpdate(display_name="Ancien"))
+    users = database["users"]
+    original_find_one = users.find_one
+
+    async def _find_one_then_update(*args: Any, **kwargs: Any) -> Any:
+        document = await original_find_one(*args, **kwargs)
+        monkeypatch.setattr(users, "find_one", original_find_one)
+        await upsert_user_profile(database, "racer", UserProfileUpdate(display_name="Nouveau"))
+        return document
+
+    monkeypatch.setattr(users, "find_one", _find_one_then_update)
+    assert (await fetch_user_profile(database, "racer")).display_name == "Ancien"
+    assert (await fetch_user_profile(database, "racer")).display_name == "Nouveau"
+
+    # Once the write record is pruned, reads started before it are not cached either.
+    cache = profile_service.ProfileCache(maxsize=1, ttl_seconds=60)
+    version = cache.version()
+    cache.invalidate("racer")
+    cache.invalidate("other")
+    cache.put("racer", (await fetch_user_profile(database, "racer"), None), version=version)
+    assert cache.get("racer") is None
+    cache.put("racer", (await fetch_user_profile(database, "racer"), None), version=cache.version())
+    assert cache.get("racer") is not None
+
+
 def test_upsert_user_profile_rejects_long_description(api_client: TestClient) -> None:
     """Description should be limited to 1000 characters."""
     payload = {
@@ -550,3 +637,280 @@ def test_delete_user_deck_returns_404_for_unknown_identifier(api_client: TestCli
     response = api_client.delete("/users/TestUser/decks/missing-deck")
     assert response.status_code == 404
     assert response.json()["detail"] == "Deck not found."
+
+
+def _minimal_deck(public_id: str, updated_at: str, card_name: str) -> Dict[str, Any]:
+    return {
+        "publicId": public_id,
+        "name": f"Deck {public_id}",
+        "format": "commander",
+        "publicUrl": f"https://moxfield.com/decks/{public_id}",
+        "lastUpdatedAtUtc": updated_at,
+        "boards": {
+            "mainboard": {
+                "count": 1,
+                "cards": {"entry": {"quantity": 1, "card": {"name": card_name}}},
+            }
+        },
+        "tokens": [],
+    }
+
+
+def test_get_user_decks_delta_mode_only_fetches_changed_decks(api_client: TestClient) -> None:
+    """Delta sync should reuse unchanged cached decks, fetch changed/new ones and prune removed ones."""
+    user = {"userName": "DeltaUser", "displayName": "Delta", "badges": []}
+    initial_client = StubMoxfieldClient(
+        {
+            "user": user,
+            "decks": [
+                _minimal_deck("keep", "2024-01-01T00:00:00Z", "Kept Card"),
+                _minimal_deck("change", "2024-01-01T00:00:00Z", "Old Card"),
+                _minimal_deck("gone", "2024-01-01T00:00:00Z", "Gone Card"),
+            ],
+        }
+    )
+    app = api_client.app
+    # Upstream changes between the two syncs, so bypass the single-flight grace window.
+    single_flight = SingleFlight(grace_period=0)
+    app.dependency_overrides[get_sync_single_flight] = lambda: single_flight
+    app.dependency_overrides[get_moxfield_client] = lambda: initial_client
+    assert api_client.get("/users/DeltaUser/decks").status_code == 200
+
+    delta_client = StubMoxfieldClient(
+        {
+            "user": user,
+            "decks": [
+                _minimal_deck("new", "2024-02-01T00:00:00Z", "New Card"),
+                _minimal_deck("keep", "2024-01-01T00:00:00Z", "Upstream Card"),
+                _minimal_deck("change", "2024-01-05T00:00:00Z", "Fresh Card"),
+            ],
+        }
+    )
+    app.dependency_overrides[get_moxfield_client] = lambda: delta_client
+
+    response = api_client.get("/users/DeltaUser/decks", params={"mode": "delta"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [deck["public_id"] for deck in body["decks"]] == ["new", "keep", "change"]
+    assert sorted(delta_client.detail_requests) == ["change", "new"]
+    cards = {deck["public_id"]: deck["boards"][0]["cards"][0]["card"]["name"] for deck in body["decks"]}
+    assert cards == {"new": "New Card", "keep": "Kept Card", "change": "Fresh Card"}
+
+    stored_ids = {document["public_id"] for document in app.state.stub_db["decks"].documents}
+    assert stored_ids == {"new", "keep", "change"}
+
+
+def test_get_user_decks_swr_mode_serves_cache_and_revalidates_when_stale(
+    api_client: TestClient,
+) -> None:
+    """`mode=swr` should answer from Mongo and only revalidate stale snapshots in the background."""
+    user = {"userName": "CachedUser", "displayName": "Cached", "badges": []}
+    app = api_client.app
+    single_flight = SingleFlight(grace_period=0)
+    app.dependency_overrides[get_sync_single_flight] = lambda: single_flight
+
+    # Cold cache: the first call syncs inline.
+    initial_client = StubMoxfieldClient(
+        {"user": user, "decks": [_minimal_deck("one", "2024-01-01T00:00:00Z", "First Card")]}
+    )
+    app.dependency_overrides[get_moxfield_client] = lambda: initial_client
+    cold = api_client.get("/users/CachedUser/decks", params={"mode": "swr"})
+    assert cold.status_code == 200
+    assert cold.headers["X-Cache-Status"] == "MISS"
+
+    # Fresh snapshot: served from Mongo without calling Moxfield at all.
+    app.dependency_overrides[get_moxfield_client] = lambda: StubMoxfieldClient(
+        error=MoxfieldError("should not be called")
+    )
+    hit = api_client.get("/users/CachedUser/decks", params={"mode": "swr"})
+    assert hit.status_code == 200
+    assert hit.headers["X-Cache-Status"] == "HIT"
+    assert int(hit.headers["Age"]) >= 0
+    assert "X-Cache-Synced-At" in hit.headers
+    assert [deck["public_id"] for deck in hit.json()["decks"]] == ["one"]
+
+    # Stale snapshot: cached decks are returned, then refreshed in the background.
+    user_doc = app.state.stub_db["moxfield_users"].documents[0]
+    user_doc["decks_synced_at"] = datetime.now(timezone.utc) - timedelta(hours=1)
+    refreshed_client = StubMoxfieldClient(
+        {
+            "user": user,
+            "decks": [
+                _minimal_deck("one", "2024-01-01T00:00:00Z", "First Card"),
+                _minimal_deck("two", "2024-03-01T00:00:00Z", "Second Card"),
+            ],
+        }
+    )
+    app.dependency_overrides[get_moxfield_client] = lambda: refreshed_client
+    stale = api_client.get(
+        "/users/CachedUser/decks",
+        params={"mode": "swr", "max_age": 60},
+    )
+    assert stale.status_code == 200
+    assert stale.headers["X-Cache-Status"] == "STALE"
+    assert int(stale.headers["Age"]) > 60
+    assert [deck["public_id"] for deck in stale.json()["decks"]] == ["one"]
+    # The background delta refresh only fetched the new deck and persisted it.
+    assert refreshed_client.detail_requests == ["two"]
+    stored_ids = {document["public_id"] for document in app.state.stub_db["decks"].documents}
+    assert stored_ids == {"one", "two"}
+
+
+def test_get_user_decks_swr_mode_applies_stale_if_error_window(api_client: TestClient) -> None:
+    """Expired snapshots fall back to the cache on upstream errors only within `stale_if_error`."""
+    user = {"userName": "Expired", "displayName": "Expired", "badges": []}
+    app = api_client.app
+    single_flight = SingleFlight(grace_period=0)
+    app.dependency_overrides[get_sync_single_flight] = lambda: single_flight
+    seed_client = StubMoxfieldClient(
+        {"user": user, "decks": [_minimal_deck("old", "2024-01-01T00:00:00Z", "Old Card")]}
+    )
+    app.dependency_overrides[get_moxfield_client] = lambda: seed_client
+    assert api_client.get("/users/Expired/decks").status_code == 200
+
+    user_doc = app.state.stub_db["moxfield_users"].documents[0]
+    user_doc["decks_synced_at"] = datetime.now(timezone.utc) - timedelta(days=3)
+    app.dependency_overrides[get_moxfield_client] = lambda: StubMoxfieldClient(
+        error=MoxfieldError("upstream down")
+    )
+    # Beyond max_age + stale-while-revalidate the refresh is blocking.
+    params = {"mode": "swr", "max_age": 60}
+
+    served = api_client.get(
+        "/users/Expired/decks", params={**params, "stale_if_error": 7 * 24 * 3600}
+    )
+    assert served.status_code == 200
+    assert served.headers["X-Cache-Status"] == "STALE-IF-ERROR"
+    assert [deck["public_id"] for deck in served.json()["decks"]] == ["old"]
+
+    rejected = api_client.get("/users/Expired/decks", params={**params, "stale_if_error": 60})
+    assert rejected.status_code == 502
+
+    oversized = api_client.get("/users/Expired/decks", params={"mode": "swr", "max_age": 10**14})
+    assert oversized.status_code == 422
+    oversized = api_client.get(
+        "/users/Expired/deck-summaries", params={"mode": "swr", "stale_if_error": 10**14}
+    )
+    assert oversized.status_code == 422
+
+
+def _ndjson(response: Any) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_user_decks_emits_one_deck_per_line_and_persists(api_client: TestClient) -> None:
+    """NDJSON streams emit a user header, one line per deck and an end marker, live and cached."""
+    user = {"userName": "Streamer", "displayName": "Streamer", "badges": []}
+    app = api_client.app
+    seed_client = StubMoxfieldClient(
+        {"user": user, "decks": [_minimal_deck("gone", "2024-01-01T00:00:00Z", "Gone Card")]}
+    )
+    app.dependency_overrides[get_moxfield_client] = lambda: seed_client
+    assert api_client.get("/users/Streamer/decks").status_code == 200
+
+    live_decks = [
+        _minimal_deck("first", "2024-02-01T00:00:00Z", "First Card"),
+        _minimal_deck("second", "2024-02-02T00:00:00Z", "Second Card"),
+    ]
+    stream_client = StubMoxfieldClient(
+        {"user": user, "decks": live_decks},
+        summary_payload=user,
+        # "vanished" is listed but its detail returns 404: it is skipped, not fatal.
+        deck_summaries=[{"publicId": "first"}, {"publicId": "vanished"}, {"publicId": "second"}],
+    )
+    app.dependency_overrides[get_moxfield_client] = lambda: stream_client
+
+    live = api_client.get("/users/Streamer/decks/stream")
+
+    assert live.status_code == 200
+    assert live.headers["content-type"].startswith("application/x-ndjson")
+    lines = _ndjson(live)
+    assert [line["type"] for line in lines] == ["user", "deck", "deck", "end"]
+    assert lines[0]["user"]["user_name"] == "Streamer"
+    assert lines[0]["total_decks"] == 3
+    assert [line["deck"]["public_id"] for line in lines[1:3]] == ["first", "second"]
+    assert lines[1]["deck"]["boards"][0]["cards"][0]["card"]["name"] == "First Card"
+    assert lines[-1] == {"type": "end", "streamed_decks": 2}
+    assert stream_client.detail_requests == ["first", "vanished", "second"]
+
+    stored_ids = {document["public_id"] for document in app.state.stub_db["decks"].documents}
+    assert stored_ids == {"first", "second"}
+    assert app.state.stub_db["moxfield_users"].documents[0]["total_decks"] == 2
+
+    cached = api_client.get("/cache/users/streamer/decks/stream")
+    assert cached.status_code == 200
+    cached_lines = _ndjson(cached)
+    assert [line["type"] for line in cached_lines] == ["user", "deck", "deck", "end"]
+    assert {line["deck"]["public_id"] for line in cached_lines[1:3]} == {"first", "second"}
+
+    assert api_client.get("/cache/users/Nobody/decks/stream").status_code == 404
+    app.dependency_overrides[get_moxfield_client] = lambda: StubMoxfieldClient(
+        error=MoxfieldNotFoundError("missing")
+    )
+    assert api_client.get("/users/Nobody/decks/stream").status_code == 404
+
+
+def test_cached_decks_apply_board_projections(api_client: TestClient) -> None:
+    """`/cache` deck routes can drop card lists or keep only selected boards at the Mongo level."""
+    user = {"userName": "Projected", "displayName": "Projected", "badges": []}
+    deck = _minimal_deck("proj", "2024-01-01T00:00:00Z", "Main Card")
+    deck["boards"] = {
+        name: {"count": 1, "cards": {"entry": {"quantity": 1, "card": {"name": f"{name} card"}}}}
+        for name in ("commanders", "mainboard", "sideboard", "maybeboard")
+    }
+    app = api_client.app
+    app.dependency_overrides[get_moxfield_client] = lambda: StubMoxfieldClient(
+        {"user": user, "decks": [deck]}
+    )
+    assert api_client.get("/users/Projected/decks").status_code == 200
+
+    full = api_client.get("/cache/users/Projected/decks").json()
+    assert [board["name"] for board in full["decks"][0]["boards"]] == [
+        "commanders",
+        "mainboard",
+        "sideboard",
+        "maybeboard",
+    ]
+
+    light = api_client.get("/cache/users/Projected/decks", params={"include_boards": "false"})
+    assert light.status_code == 200
+    light_deck = light.json()["decks"][0]
+    assert light_deck["boards"] == []
+    assert light_deck["name"] == "Deck proj"
+
+    selected = api_client.get(
+        "/cache/users/Projected/decks",
+        params=[("boards", "commanders"), ("boards", "mainboard")],
+    )
+    selected_deck = selected.json()["decks"][0]
+    assert [board["name"] for board in selected_deck["boards"]] == ["commanders", "mainboard"]
+    assert selected_deck["boards"][1]["cards"][0]["card"] == {"name": "mainboard card"}
+    assert selected_deck["public_url"] == deck["publicUrl"]
+
+    streamed = _ndjson(
+        api_client.get("/cache/users/Projected/decks/stream", params={"boards": "commanders"})
+    )
+    assert [board["name"] for board in streamed[1]["deck"]["boards"]] == ["commanders"]
+
+
+def test_sync_job_endpoints_enqueue_and_report_status(api_client: TestClient) -> None:
+    """Sync jobs are queued with 202, deduplicated per user, and pollable by id."""
+    created = api_client.post("/users/JobUser/sync-jobs", json={"mode": "delta"})
+    assert created.status_code == 202
+    job = created.json()
+    assert job["status"] == "queued"
+    assert job["kind"] == "decks"
+    assert job["mode"] == "delta"
+    assert job["progress"] == {"stage": "queued", "decks_fetched": 0, "decks_total": None}
+
+    again = api_client.post("/users/jobuser/sync-jobs")
+    assert again.status_code == 202
+    assert again.json()["id"] == job["id"]
+
+    polled = api_client.get(f"/users/JobUser/sync-jobs/{job['id']}")
+    assert polled.status_code == 200
+    assert polled.json()["id"] == job["id"]
+
+    assert api_client.get("/users/JobUser/sync-jobs/unknown").status_code == 404
+    assert api_client.post("/users/JobUser/sync-jobs", json={"kind": "cards"}).status_code == 422
@@ -4,21 +4,302 @@ from __future__ import annotations
 
 import re
 from copy import deepcopy
+from datetime import datetime
 from functools import cmp_to_key
-from typing import Any, Dict, Iterable, List
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List
+
+from pymongo.errors import OperationFailure
+
+from app.moxfield import MoxfieldNotFoundError
+
+
+def _get_path(document: Any, path: str) -> Any:
+    """Resolve a dotted path, collecting values across arrays like MongoDB does."""
+    current: Any = document
+    for part in path.split("."):
+        if isinstance(current, list):
+            collected = []
+            for item in current:
+                if isinstance(item, dict) and part in item:
+                    value = item[part]
+                    collected.extend(value if isinstance(value, list) else [value])
+            current = collected
+        elif isinstance(current, dict):
+            current = current.get(part)
+        else:
+            return None
+    return current
+
+
+def _equals(candidate: Any, value: Any) -> bool:
+    if isinstance(candidate, list) and not isinstance(value, list):
+        return value in candidate
+    return candidate == value
+
+
+def _compare(candidate: Any, operand: Any, predicate: Any) -> bool:
+    values = candidate if isinstance(candidate, list) else [candidate]
+    for value in values:
+        if value is None:
+            continue
+        try:
+            if predicate(value, operand):
+                return True
+        except TypeError:
+            continue
+    return False
+
+
+def _match_operator(candidate: Any, operator: str, operand: Any, options: str = "") -> bool:
+    if operator == "$regex":
+        flags = re.IGNORECASE if isinstance(options, str) and "i" in options.lower() else 0
+        compiled = re.compile(operand, flags)
+        values = candidate if isinstance(candidate, list) else [candidate]
+        return any(isinstance(value, str) and compiled.search(value) for value in values)
+    if operator == "$in":
+        if not isinstance(operand, Iterable):
+            return False
+        choices = list(operand)
+        if isinstance(candidate, list):
+            return any(item in choices for item in candidate)
+        return candidate in choices
+    if operator == "$nin":
+        return not _match_operator(candidate, "$in", operand)
+    if operator == "$ne":
+        return not _equals(candidate, operand)
+    if operator == "$exists":
+        return (candidate is not None) == bool(operand)
+    if operator == "$all":
+        values = candidate if isinstance(candidate, list) else [candidate]
+        return all(item in values for item in operand)
+    if operator == "$lt":
+        return _compare(candidate, operand, lambda left, right: left < right)
+    if operator == "$lte":
+        return _compare(candidate, operand, lambda left, right: left <= right)
+    if operator == "$gt":
+        return _compare(candidate, operand, lambda left, right: left > right)
+    if operator == "$gte":
+        return _compare(candidate, operand, lambda left, right: left >= right)
+    raise NotImplementedError(f"StubCollection does not support the {operator} operator.")
+
+
+def _set_path(
+    document: dict[str, Any],
+    path: str,
+    value: Any,
+    array_filters: list[dict[str, Any]] | None = None,
+) -> None:
+    parts = path.split(".")
+    target = document
+    for index, part in enumerate(parts[:-1]):
+        if part.startswith("$[") and part.endswith("]"):
+            # Filtered positional operator: recurse into every element matching the filter.
+            name = part[2:-1]
+            conditions = {
+                key.split(".", 1)[1]: expected
+                for array_filter in array_filters or []
+                for key, expected in array_filter.items()
+                if key.split(".", 1)[0] == name
+            }
+            rest = ".".join(parts[index + 1 :])
+            for item in target if isinstance(target, list) else []:
+                if all(_equals(_get_path(item, key), expected) for key, expected in conditions.items()):
+                    _set_path(item, rest, value, array_filters)
+            return
+        target = target.setdefault(part, {})
+    target[parts[-1]] = value
+
+
+def _unset_path(document: dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    target: Any = document
+    for part in parts[:-1]:
+        target = target.get(part) if isinstance(target, dict) else None
+        if target is None:
+            return
+    if isinstance(target, dict):
+        target.pop(parts[-1], None)
+
+
+def _upsert_seed(filter_: dict[str, Any]) -> dict[str, Any]:
+    """Return the equality fields MongoDB copies from the filter into upserted documents."""
+    seed: dict[str, Any] = {}
+    for key, value in filter_.items():
+        if key.startswith("$") or (isinstance(value, dict) and any(k.startswith("$") for k in value)):
+            continue
+        _set_path(seed, key, deepcopy(value))
+    return seed
+
+
+def _apply_update(
+    document: dict[str, Any],
+    update: dict[str, Any],
+    *,
+    inserting: bool,
+    array_filters: list[dict[str, Any]] | None = None,
+) -> None:
+    """Apply the subset of MongoDB update operators used by the repositories."""
+    for operator, fields in update.items():
+        if operator == "$set" or (operator == "$setOnInsert" and inserting):
+            for path, value in fields.items():
+                _set_path(document, path, deepcopy(value), array_filters)
+        elif operator == "$setOnInsert":
+            continue
+        elif operator == "$unset":
+            for path in fields:
+                _unset_path(document, path)
+        elif operator == "$inc":
+            for path, amount in fields.items():
+                _set_path(document, path, (_get_path(document, path) or 0) + amount)
+        elif operator == "$push":
+            for path, value in fields.items():
+                items = list(_get_path(document, path) or [])
+                if isinstance(value, dict) and "$each" in value:
+                    items.extend(deepcopy(value["$each"]))
+                    for key, order in reversed(list((value.get("$sort") or {}).items())):
+                        items.sort(key=lambda item: item.get(key), reverse=order < 0)
+                    if "$slice" in value:
+                        limit = value["$slice"]
+                        items = items[:limit] if limit >= 0 else items[limit:]
+                else:
+                    items.append(deepcopy(value))
+                _set_path(document, path, items)
+        elif operator in ("$max", "$min"):
+            for path, value in fields.items():
+                current = _get_path(document, path)
+                if current is None or (value > current if operator == "$max" else value < current):
+                    _set_path(document, path, deepcopy(value))
+        else:  # pragma: no cover - guard against unsupported stub usage
+            raise NotImplementedError(f"StubCollection does not support the {operator} update.")
+
+
+def _evaluate(expression: Any, document: dict[str, Any], variables: dict[str, Any] | None = None) -> Any:
+    """Evaluate the subset of aggregation expressions used by the analytics pipelines."""
+    variables = variables or {}
+    if isinstance(expression, str) and expression.startswith("$$"):
+        name, _, path = expression[2:].partition(".")
+        value = variables.get(name)
+        return _get_path(value, path) if path else value
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(document, expression[1:])
+    if isinstance(expression, list):
+        return [_evaluate(item, document, variables) for item in expression]
+    if not isinstance(expression, dict) or len(expression) != 1:
+        return expression
+
+    operator, operand = next(iter(expression.items()))
+    if operator == "$filter":
+        items = _evaluate(operand["input"], document, variables) or []
+        name = operand.get("as", "this")
+        return [
+            item
+            for item in items
+            if _evaluate(operand["cond"], document, {**variables, name: item})
+        ]
+    if operator == "$cond":
+        condition, then, otherwise = operand
+        branch = then if _evaluate(condition, document, variables) else otherwise
+        return _evaluate(branch, document, variables)
+
+    args = _evaluate(operand, document, variables)
+    if operator == "$first":
+        return args[0] if args else None
+    if operator == "$ifNull":
+        return next((value for value in args if value is not None), None)
+    if operator == "$and":
+        return all(args)
+    if operator == "$eq":
+        return args[0] == args[1]
+    if operator == "$ne":
+        return args[0] != args[1]
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        return _match_operator(args[0], operator, args[1])
+    raise NotImplementedError(f"Stub aggregation does not support {operator}.")  # pragma: no cover
+
+
+def _run_pipeline(documents: list[dict[str, Any]], pipeline: list[dict[str, Any]], matches: Any) -> list[dict[str, Any]]:
+    """Apply ``$match``/``$sort``/``$project``/``$addFields``/``$unwind``/``$group`` stages."""
+    rows = deepcopy(documents)
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            rows = [row for row in rows if matches(row, spec)]
+        elif name == "$sort":
+            rows = StubCursor(rows).sort(list(spec.items()))._documents
+        elif name == "$limit":
+            rows = rows[:spec]
+        elif name in ("$project", "$addFields"):
+            projected = []
+            for row in rows:
+                result = dict(row) if name == "$addFields" else {}
+                for key, value in spec.items():
+                    if value in (0, False):
+                        result.pop(key, None)
+                    elif value in (1, True):
+                        if key in row:
+                            result[key] = row[key]
+                    else:
+                        result[key] = _evaluate(value, row)
+                if name == "$project" and spec.get("_id", 1) not in (0, False) and "_id" in row:
+                    result["_id"] = row["_id"]
+                projected.append(result)
+            rows = projected
+        elif name == "$unwind":
+            field = spec.lstrip("$")
+            rows = [{**row, field: item} for row in rows for item in (row.get(field) or [])]
+        elif name == "$group":
+            groups: dict[Any, dict[str, Any]] = {}
+            for row in rows:
+                key = _evaluate(spec["_id"], row)
+                group = groups.setdefault(repr(key), {"_id": key})
+                for field, accumulator in spec.items():
+                    if field == "_id":
+                        continue
+                    (operator, operand), = accumulator.items()
+                    value = _evaluate(operand, row)
+                    if operator == "$sum":
+                        group[field] = group.get(field, 0) + (value or 0)
+                    elif operator == "$first":
+                        group.setdefault(field, value)
+                    elif operator == "$last":
+                        group[field] = value
+                    else:  # pragma: no cover - guard against unsupported stub usage
+                        raise NotImplementedError(f"Stub $group does not support {operator}.")
+            rows = list(groups.values())
+        else:  # pragma: no cover - guard against unsupported stub usage
+            raise NotImplementedError(f"Stub aggregation does not support the {name} stage.")
+    return rows
 
 
 class StubCursor:
     """Minimal cursor wrapper to simulate Motor's async cursor."""
 
-    def __init__(self, documents: list[dict[str, Any]]) -> None:
+    def __init__(
+        self,
+        documents: list[dict[str, Any]],
+        project: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    ) -> None:
         self._documents = documents
+        # Applied on output, so sorts see unprojected fields like MongoDB does.
+        self._project = project
         self._limit: int | None = None
+        self.requested_batch_size: int | None = None
 
     def limit(self, value: int) -> "StubCursor":
         self._limit = value
         return self
 
+    def batch_size(self, value: int) -> "StubCursor":
+        self.requested_batch_size = value
+        return self
+
+    def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[dict[str, Any]]:
+        for document in await self.to_list():
+            yield document
+
     def sort(
         self,
         key_or_list: Any,
@@ -66,9 +347,11 @@ class StubCursor:
         effective_length = length
         if self._limit is not None:
             effective_length = self._limit if effective_length is None else min(self._limit, effective_length)
-        if effective_length is None:
-            return documents
-        return documents[:effective_length]
+        if effective_length is not None:
+            documents = documents[:effective_length]
+        if self._project is not None:
+            documents = [self._project(document) for document in documents]
+        return documents
 
 
 class StubCollection:
@@ -77,6 +360,9 @@ class StubCollection:
     def __init__(self) -> None:
         self.documents: list[dict[str, Any]] = []
         self.created_indexes: list[dict[str, Any]] = []
+        self.bulk_write_calls: list[list[Any]] = []
+        self.aggregate_calls: list[list[dict[str, Any]]] = []
+        self.update_many_calls: list[tuple[Any, ...]] = []
 
     def _matches(self, document: dict[str, Any], filter_: dict[str, Any]) -> bool:
         for key, value in filter_.items():
@@ -93,28 +379,16 @@ class StubCollection:
                 if search_terms.casefold() not in haystack:
                     return False
             else:
-                candidate = document.get(key)
-                if isinstance(value, dict):
-                    if "$regex" in value:
-                        pattern = value["$regex"]
-                        options = value.get("$options", "")
-                        flags = re.IGNORECASE if isinstance(options, str) and "i" in options.lower() else 0
-                        compiled = re.compile(pattern, flags)
-                        if not isinstance(candidate, str) or compiled.search(candidate) is None:
-                            return False
-                    elif "$in" in value:
-                        choices = value["$in"]
-                        if isinstance(choices, Iterable):
-                            if candidate not in list(choices):
-                                return False
-                        else:
-                            return False
-                    else:
-                        if candidate != value:
+                candidate = _get_path(document, key)
+                if isinstance(value, dict) and value and all(op.startswith("$") for op in value):
+                    options = value.get("$options", "")
+                    for operator, operand in value.items():
+                        if operator == "$options":
+                            continue
+                        if not _match_operator(candidate, operator, operand, options):
                             return False
-                else:
-                    if candidate != value:
-                        return False
+                elif not _equals(candidate, value):
+                    return False
         return True
 
     async def update_one(
@@ -134,16 +408,81 @@ class StubCollection:
         matched_count = 0
 
         if match is not None:
-            match.update(deepcopy(update.get("$set", {})))
+            _apply_update(match, update, inserting=False)
             matched_count = 1
-            return type("UpdateResult", (), {"matched_count": matched_count, "upserted_id": None})()
+            return type(
+                "UpdateResult",
+                (),
+                {"matched_count": matched_count, "modified_count": 1, "upserted_id": None},
+            )()
 
         if upsert:
-            new_document = deepcopy(update.get("$set", {}))
+            new_document = _upsert_seed(filter_)
+            _apply_update(new_document, update, inserting=True)
             self.documents.append(new_document)
-            return type("UpdateResult", (), {"matched_count": matched_count, "upserted_id": object()})()
-
-        return type("UpdateResult", (), {"matched_count": matched_count, "upserted_id": None})()
+            return type(
+                "UpdateResult",
+                (),
+                {"matched_count": matched_count, "modified_count": 0, "upserted_id": object()},
+            )()
+
+        return type(
+            "UpdateResult",
+            (),
+            {"matched_count": matched_count, "modified_count": 0, "upserted_id": None},
+        )()
+
+    async def update_many(
+        self,
+        filter_: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        array_filters: list[dict[str, Any]] | None = None,
+        **_: Any,
+    ):
+        self.update_many_calls.append((filter_, update, array_filters))
+        matched = [document for document in self.documents if self._matches(document, filter_)]
+        for document in matched:
+            _apply_update(document, update, inserting=False, array_filters=array_filters)
+        return type(
+            "UpdateResult",
+            (),
+            {"matched_count": len(matched), "modified_count": len(matched), "upserted_id": None},
+        )()
+
+    async def insert_one(self, document: dict[str, Any]):
+        stored = deepcopy(document)
+        stored.setdefault("_id", object())
+        self.documents.append(stored)
+        return type("InsertOneResult", (), {"inserted_id": stored["_id"]})()
+
+    async def find_one_and_update(
+        self,
+        filter_: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        sort: list[tuple[str, int]] | None = None,
+        upsert: bool = False,
+        return_document: Any = False,
+        projection: dict[str, Any] | None = None,
+        **_: Any,
+    ) -> dict[str, Any] | None:
+        """Apply ``update`` to the first match; ``return_document`` truthy returns the new state."""
+        candidates = [document for document in self.documents if self._matches(document, filter_)]
+        if sort:
+            # Sorting keeps references, so the update below mutates the stored document.
+            candidates = StubCursor(candidates).sort(sort)._documents
+        if candidates:
+            match = candidates[0]
+            before = deepcopy(match)
+            _apply_update(match, update, inserting=False)
+            return self._project(deepcopy(match) if return_document else before, projection)
+        if not upsert:
+            return None
+        new_document = _upsert_seed(filter_)
+        _apply_update(new_document, update, inserting=True)
+        self.documents.append(new_document)
+        return self._project(deepcopy(new_document), projection) if return_document else None
 
     async def replace_one(
         self,
@@ -162,33 +501,52 @@ class StubCollection:
             return type("ReplaceResult", (), {"matched_count": 0, "upserted_id": object()})()
         return type("ReplaceResult", (), {"matched_count": 0, "upserted_id": None})()
 
-    async def find_one(self, filter_: dict[str, Any]) -> dict[str, Any] | None:
+    async def find_one(
+        self, filter_: dict[str, Any], projection: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
         for document in self.documents:
             if self._matches(document, filter_):
-                return deepcopy(document)
+                return self._project(deepcopy(document), projection)
         return None
 
     def find(self, filter_: dict[str, Any] | None = None, projection: dict[str, Any] | None = None) -> StubCursor:
         filter_ = filter_ or {}
-        results = [
-            self._project(deepcopy(document), projection)
-            for document in self.documents
-            if self._matches(document, filter_)
-        ]
-        return StubCursor(results)
+        results = [deepcopy(document) for document in self.documents if self._matches(document, filter_)]
+        return StubCursor(results, lambda document: self._project(document, projection))
+
+    def aggregate(self, pipeline: list[dict[str, Any]], **_: Any) -> StubCursor:
+        self.aggregate_calls.append(pipeline)
+        return StubCursor(_run_pipeline(self.documents, pipeline, self._matches))
 
     @staticmethod
     def _project(document: dict[str, Any], projection: dict[str, Any] | None) -> dict[str, Any]:
         if not projection:
             return document
-        included = {key for key, value in projection.items() if value}
+        included = {key for key, value in projection.items() if value and key != "_id"}
         if not included:
-            return document
-        projected = {key: document[key] for key in included if key in document}
+            excluded = {key for key, value in projection.items() if not value}
+            return {key: value for key, value in document.items() if key not in excluded}
+        projected = {}
+        for key in included:
+            spec = projection[key]
+            if isinstance(spec, dict) and "$filter" in spec:
+                projected[key] = StubCollection._filter_expression(document, spec["$filter"])
+            elif key in document:
+                projected[key] = document[key]
+            elif "." in key and _get_path(document, key) is not None:
+                _set_path(projected, key, _get_path(document, key))
         if "_id" in document and (projection.get("_id", 1)):
             projected["_id"] = document["_id"]
         return projected
 
+    @staticmethod
+    def _filter_expression(document: dict[str, Any], spec: dict[str, Any]) -> list[Any]:
+        """Evaluate the ``$filter`` + ``$in`` projection form used by the repositories."""
+        items = _get_path(document, spec["input"].lstrip("$")) or []
+        field_ref, allowed = spec["cond"]["$in"]
+        field = field_ref.split(".", 1)[1]
+        return [item for item in items if _get_path(item, field) in allowed]
+
     async def delete_one(self, filter_: dict[str, Any]):
         for index, document in enumerate(self.documents):
             if self._matches(document, filter_):
@@ -196,6 +554,52 @@ class StubCollection:
                 return type("DeleteResult", (), {"deleted_count": 1})()
         return type("DeleteResult", (), {"deleted_count": 0})()
 
+    async def delete_many(self, filter_: dict[str, Any]):
+        remaining = [document for document in self.documents if not self._matches(document, filter_)]
+        deleted_count = len(self.documents) - len(remaining)
+        self.documents = remaining
+        return type("DeleteResult", (), {"deleted_count": deleted_count})()
+
+    async def bulk_write(self, operations: Iterable[Any], *, ordered: bool = True, **_: Any):
+        """Apply pymongo write models sequentially against the in-memory store."""
+        self.bulk_write_calls.append(list(operations))
+        upserted = matched = modified = deleted = inserted = 0
+        for operation in self.bulk_write_calls[-1]:
+            kind = type(operation).__name__
+            if kind == "ReplaceOne":
+                result = await self.replace_one(
+                    operation._filter, operation._doc, upsert=operation._upsert
+                )
+                modified += result.matched_count
+                upserted += 1 if result.upserted_id is not None else 0
+            elif kind == "UpdateOne":
+                result = await self.update_one(
+                    operation._filter, operation._doc, upsert=operation._upsert
+                )
+                matched += result.matched_count
+                modified += result.modified_count
+                upserted += 1 if result.upserted_id is not None else 0
+            elif kind == "InsertOne":
+                await self.insert_one(operation._doc)
+                inserted += 1
+            elif kind == "DeleteMany":
+                deleted += (await self.delete_many(operation._filter)).deleted_count
+            elif kind == "DeleteOne":
+                deleted += (await self.delete_one(operation._filter)).deleted_count
+            else:  # pragma: no cover - guard against unsupported stub usage
+                raise NotImplementedError(f"StubCollection.bulk_write does not support {kind}.")
+        return type(
+            "BulkWriteResult",
+            (),
+            {
+                "upserted_count": upserted,
+                "matched_count": matched,
+                "modified_count": modified,
+                "deleted_count": deleted,
+                "inserted_count": inserted,
+            },
+        )()
+
     async def count_documents(self, filter_: dict[str, Any]) -> int:
         return sum(1 for document in self.documents if self._matches(document, filter_))
 
@@ -216,6 +620,13 @@ class StubCollection:
             created.append(name)
         return created
 
+    async def drop_index(self, name: str) -> None:
+        """Mimic Mongo: dropping an unknown index fails with ``IndexNotFound`` (code 27)."""
+        remaining = [entry for entry in self.created_indexes if entry["name"] != name]
+        if len(remaining) == len(self.created_indexes):
+            raise OperationFailure(f"index not found with name [{name}]", code=27)
+        self.created_indexes = remaining
+
 
 class StubDatabase:
     """Dictionary-like helper that returns stub collections."""
@@ -244,11 +655,60 @@ class StubMoxfieldClient:
         self._error = error
         self._summary_payload = summary_payload or {}
         self._deck_summaries = list(deck_summaries or [])
+        self.detail_requests: list[str] = []
 
-    async def collect_user_decks_with_details(self, username: str, **_: Any) -> Dict[str, Any]:
+    async def collect_user_decks_with_details(
+        self,
+        username: str,
+        *,
+        should_fetch_detail: Any = None,
+        on_progress: Any = None,
+        **_: Any,
+    ) -> Dict[str, Any]:
+        if self._error:
+            raise self._error
+        payload = self._payload or {}
+        if should_fetch_detail is None:
+            await self._report_progress(on_progress, len(payload.get("decks", [])))
+            return payload
+        decks: list[Dict[str, Any]] = []
+        skipped: list[str] = []
+        for deck in payload.get("decks", []):
+            if should_fetch_detail(deck):
+                self.detail_requests.append(deck.get("publicId"))
+                decks.append(deck)
+            else:
+                skipped.append(deck.get("publicId"))
+        await self._report_progress(on_progress, len(decks))
+        return {
+            **payload,
+            "decks": decks,
+            "public_ids": [deck.get("publicId") for deck in payload.get("decks", [])],
+            "skipped_public_ids": skipped,
+        }
+
+    @staticmethod
+    async def _report_progress(on_progress: Any, total: int) -> None:
+        if on_progress is None:
+            return
+        for fetched in range(total + 1):
+            await on_progress(fetched, total)
+
+    async def get_deck_details(self, public_id: str) -> Dict[str, Any]:
         if self._error:
             raise self._error
-        return self._payload or {}
+        self.detail_requests.append(public_id)
+        for deck in (self._payload or {}).get("decks", []):
+            if deck.get("publicId") == public_id:
+                return deck
+        raise MoxfieldNotFoundError(f"Deck '{public_id}' was not found.")
+
+    async def iter_deck_details(self, public_ids: Any, **_: Any) -> AsyncIterator[Dict[str, Any]]:
+        for public_id in public_ids:
+            try:
+                yield await self.get_deck_details(public_id)
+            except MoxfieldNotFoundError:
+                continue
 
     async def get_user_summary(self, username: str, **_: Any) -> Dict[str, Any]:
         if self._error:
@@ -266,3 +726,29 @@ class StubMoxfieldClient:
         if self._error:
             raise self._error
         return self._deck_summaries
+
+
+def record_game(
+    client: Any,
+    owner: str,
+    order: list[str],
+    *,
+    playgroup: str = "Test Group",
+    recorded_at: datetime | None = None,
+) -> Dict[str, Any]:
+    """Record a game through the API, seats finishing in ``order``; returns the stored game.
+
+    Each seat ``"alice"`` plays as ``"Alice"`` with the deck ``"Alice Deck"``.
+    """
+    payload: Dict[str, Any] = {
+        "playgroup": {"name": playgroup},
+        "players": [
+            {"id": seat, "name": seat.title(), "deck_name": f"{seat.title()} Deck"} for seat in order
+        ],
+        "rankings": [{"player_id": seat, "rank": rank} for rank, seat in enumerate(order, start=1)],
+    }
+    if recorded_at is not None:
+        payload["recorded_at"] = recorded_at.isoformat()
+    response = client.post(f"/profiles/{owner}/games", json=payload)
+    assert response.status_code == 201, response.text
+    return response.json()